@@ -0,0 +1,100 @@
+"""Benchmark one participant's BSON stream: linear scan vs offset index.
+
+Usage:
+    python scripts/bench_bson_index.py [--bson PATH]
+    python scripts/bench_bson_index.py --synthetic [--participants 20 --days 10]
+
+Reports the one-time index build, then the time to read every heart-rate /
+steps / calories reading of one participant with ``BSONStreamer``:
+
+  * linear  — ``use_index=False``: walk and byte-match every document
+  * indexed — seek to the participant's byte ranges from the sidecar
+
+When the real ``fitbit.bson`` is not available (only Git LFS pointers are
+checked out) pass ``--synthetic`` to generate a file of the same layout:
+grouped by participant, then type, minute-level documents.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import bson  # noqa: E402
+
+from wearable_agent.collectors.lifesnaps_bson import BSONIndex, BSONStreamer  # noqa: E402
+from wearable_agent.models import MetricType  # noqa: E402
+
+_METRICS = [MetricType.HEART_RATE, MetricType.STEPS, MetricType.CALORIES]
+_TYPES = ("heart_rate", "steps", "calories", "distance", "sleep")
+
+
+def _write_synthetic(path: Path, participants: int, days: int) -> None:
+    start = datetime(2021, 5, 24)
+    with open(path, "wb") as out:
+        for p in range(participants):
+            pid = f"{p:024x}"
+            for doc_type in _TYPES:
+                docs = []
+                for minute in range(days * 1440):
+                    stamp = (start + timedelta(minutes=minute)).strftime("%m/%d/%y %H:%M:%S")
+                    value = {"bpm": 60 + minute % 40, "confidence": 2} \
+                        if doc_type == "heart_rate" else str(minute % 50)
+                    docs.append(bson.encode(
+                        {"id": pid, "type": doc_type, "data": {"dateTime": stamp, "value": value}}
+                    ))
+                out.write(b"".join(docs))
+
+
+def _timed_stream(path: Path, pid: str, use_index: bool) -> tuple[float, int]:
+    t0 = time.perf_counter()
+    n = sum(1 for _ in BSONStreamer(path, use_index=use_index).iter_readings(pid, _METRICS))
+    return time.perf_counter() - t0, n
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bson", type=Path, default=None)
+    parser.add_argument("--synthetic", action="store_true")
+    parser.add_argument("--participants", type=int, default=20)
+    parser.add_argument("--days", type=int, default=10)
+    parser.add_argument("--participant", default=None, help="Defaults to the middle one")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        path = Path(tempfile.mkdtemp(prefix="bench_bson_")) / "fitbit.bson"
+        print(f"Writing synthetic {path} ...")
+        _write_synthetic(path, args.participants, args.days)
+    else:
+        path = args.bson or (
+            Path(__file__).resolve().parent
+            / "rais_anonymized" / "mongo_rais_anonymized" / "fitbit.bson"
+        )
+        if not path.exists() or path.stat().st_size < 1_000_000:
+            sys.exit(f"{path} missing or an LFS pointer — use --synthetic")
+    print(f"BSON: {path} ({path.stat().st_size / 1024 / 1024:.0f} MB)\n")
+
+    index = BSONIndex(path)
+    index.index_path.unlink(missing_ok=True)
+    t0 = time.perf_counter()
+    index.build()
+    print(f"  index build (one-time)  {time.perf_counter() - t0:7.2f} s  "
+          f"sidecar {index.index_path.stat().st_size / 1024:.0f} KB")
+    t0 = time.perf_counter()
+    BSONIndex(path).load()
+    print(f"  index load              {(time.perf_counter() - t0) * 1000:7.1f} ms")
+
+    participants = index.participants()
+    pid = args.participant or participants[len(participants) // 2]
+    for label, use_index in (("linear", False), ("indexed", True)):
+        elapsed, n = _timed_stream(path, pid, use_index)
+        print(f"  {label:<8} stream {elapsed:7.2f} s  {n:,} readings")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Scan fitbit.bson: per-participant document counts and scan throughput.
+
+Usage:
+    python scripts/bench_bson_scan.py [--bson PATH] [--top 20]
+    python scripts/bench_bson_scan.py --synthetic [--participants 20 --days 10]
+
+Replaces ``scripts/scan_bson.py``.  Counts documents per participant, and
+reports docs/sec and MB/sec for:
+
+  * decode        — ``bson.decode_file_iter``: every document becomes a dict
+                    (what scan_bson.py and the old streamer did)
+  * mmap-peek     — ``MappedBSON`` + ``scan_keys``: walk length prefixes,
+                    peek ``id`` / ``type`` headers only on a key change
+  * filter-decode — one participant's HR/steps/calories, decode then filter
+  * filter-peek   — same, ``BSONStreamer(use_index=False)``: raw-byte match,
+                    decode only the matching documents
+  * split         — ``split_participants``: every participant's shard in one
+                    pass over ``--workers`` processes
+
+When the real ``fitbit.bson`` is not available (only Git LFS pointers are
+checked out) pass ``--synthetic`` to generate a file of the same layout:
+ObjectId ids, grouped by participant then type, minute-level documents.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import bson  # noqa: E402
+
+from wearable_agent.collectors.lifesnaps_bson import (  # noqa: E402
+    BSONStreamer,
+    MappedBSON,
+    scan_keys,
+)
+from wearable_agent.collectors.lifesnaps_split import split_participants  # noqa: E402
+from wearable_agent.models import MetricType  # noqa: E402
+
+_METRICS = [MetricType.HEART_RATE, MetricType.STEPS, MetricType.CALORIES]
+_TYPES = ("heart_rate", "steps", "calories", "distance", "sleep")
+
+
+def _write_synthetic(path: Path, participants: int, days: int) -> None:
+    start = datetime(2021, 5, 24)
+    stamps = [
+        (start + timedelta(minutes=m)).strftime("%m/%d/%y %H:%M:%S") for m in range(days * 1440)
+    ]
+    with open(path, "wb") as out:
+        for _ in range(participants):
+            pid = bson.ObjectId()
+            for doc_type in _TYPES:
+                out.write(b"".join(
+                    bson.encode({
+                        "_id": bson.ObjectId(),
+                        "id": pid,
+                        "type": doc_type,
+                        "data": {
+                            "dateTime": stamp,
+                            "value": {"bpm": 60 + m % 40, "confidence": 2}
+                            if doc_type == "heart_rate" else str(m % 50),
+                        },
+                    })
+                    for m, stamp in enumerate(stamps)
+                ))
+
+
+def _scan_decode(path: Path) -> Counter[str]:
+    counts: Counter[str] = Counter()
+    with open(path, "rb") as f:
+        for doc in bson.decode_file_iter(f):
+            counts[str(doc.get("id", ""))] += 1
+    return counts
+
+
+def _scan_peek(path: Path) -> Counter[str]:
+    counts: Counter[str] = Counter()
+    with MappedBSON(path) as mb:
+        for _, _, n, (pid, _, _) in scan_keys(mb):
+            counts[pid] += n
+    return counts
+
+
+def _filter_decode(path: Path, pid: str) -> int:
+    types = {"heart_rate", "steps", "calories"}
+    with open(path, "rb") as f:
+        return sum(
+            1 for doc in bson.decode_file_iter(f)
+            if doc.get("type") in types and str(doc.get("id")) == pid
+        )
+
+
+def _filter_peek(path: Path, pid: str) -> int:
+    return sum(1 for _ in BSONStreamer(path, use_index=False).iter_readings(pid, _METRICS))
+
+
+def _report(label: str, elapsed: float, docs: int, size: int, note: str = "") -> None:
+    print(
+        f"  {label:<14} {elapsed:7.2f} s  {docs / elapsed:>12,.0f} docs/s  "
+        f"{size / 1024 / 1024 / elapsed:8.1f} MB/s  {note}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bson", type=Path, default=None)
+    parser.add_argument("--synthetic", action="store_true")
+    parser.add_argument("--participants", type=int, default=20)
+    parser.add_argument("--days", type=int, default=10)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=None, help="Split workers (default: CPUs)")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        path = Path(tempfile.mkdtemp(prefix="bench_bson_")) / "fitbit.bson"
+        print(f"Writing synthetic {path} ...")
+        _write_synthetic(path, args.participants, args.days)
+    else:
+        path = args.bson or (
+            Path(__file__).resolve().parent
+            / "rais_anonymized" / "mongo_rais_anonymized" / "fitbit.bson"
+        )
+        if not path.exists() or path.stat().st_size < 1_000_000:
+            sys.exit(f"{path} missing or an LFS pointer — use --synthetic")
+    size = path.stat().st_size
+    print(f"Scanning {path} ({size / 1024 / 1024:.0f} MB)\n")
+
+    t0 = time.perf_counter()
+    decoded = _scan_decode(path)
+    _report("decode", time.perf_counter() - t0, sum(decoded.values()), size)
+    t0 = time.perf_counter()
+    counts = _scan_peek(path)
+    _report("mmap-peek", time.perf_counter() - t0, sum(counts.values()), size)
+    assert counts == decoded, "peek scan disagrees with full decode"
+
+    total = sum(counts.values())
+    pid = sorted(counts)[len(counts) // 2]
+    t0 = time.perf_counter()
+    n = _filter_decode(path, pid)
+    _report("filter-decode", time.perf_counter() - t0, total, size, f"{n:,} matched")
+    t0 = time.perf_counter()
+    n = _filter_peek(path, pid)
+    _report("filter-peek", time.perf_counter() - t0, total, size, f"{n:,} readings")
+    with tempfile.TemporaryDirectory(prefix="bench_split_") as out_dir:
+        t0 = time.perf_counter()
+        shards = split_participants(path, Path(out_dir), workers=args.workers)
+        _report("split", time.perf_counter() - t0, total, size, f"{len(shards)} shards")
+
+    print(f"\nTotal: {total:,} docs, {len(counts)} participants\n")
+    print(f"Top {args.top} participants by doc count:")
+    for pid, cnt in counts.most_common(args.top):
+        pct = cnt / total * 100
+        est_mb = cnt / total * size / 1024 / 1024
+        print(f"  {pid}: {cnt:>10,} docs ({pct:5.1f}%) ~{est_mb:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Benchmark dashboard read latency while a bulk sync is writing.
+
+Usage:
+    python scripts/bench_db_concurrency.py [--rows 200000] [--chunk 5000] [--readers 4]
+
+Runs the same workload against two throw-away SQLite databases:
+
+  * default — SQLite's stock settings: rollback journal, synchronous=FULL,
+    no mmap, 2 MB page cache (what a bare ``create_async_engine`` gives you)
+  * tuned   — the engine profile from ``Settings`` (WAL, synchronous=NORMAL,
+    mmap, larger cache, in-memory temp store, busy timeout)
+
+One writer bulk-inserts ``--rows`` readings in ``--chunk``-sized
+``save_batch`` transactions (a LifeSnaps sync) while ``--readers`` tasks
+poll ``get_latest_by_source`` like the dashboard does.  Reported: write
+throughput, and read latency percentiles / lock errors during the write.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker  # noqa: E402
+
+from wearable_agent.config import Settings  # noqa: E402
+from wearable_agent.models import MetricType  # noqa: E402
+from wearable_agent.storage.database import build_engine, run_migrations  # noqa: E402
+from wearable_agent.storage.repository import ReadingRepository  # noqa: E402
+
+_START = datetime(2021, 5, 24)
+_META = '{"source": "dataset"}'
+
+_PROFILES = {
+    "default": Settings(
+        sqlite_journal_mode="delete",
+        sqlite_synchronous="full",
+        sqlite_mmap_size=0,
+        sqlite_cache_size=-2_000,
+        sqlite_temp_store="default",
+        sqlite_busy_timeout_ms=5_000,  # pysqlite's own default timeout
+    ),
+    "tuned": Settings(),
+}
+
+
+def _chunk(pid: str, offset: int, n: int) -> list[tuple]:
+    return [
+        (
+            f"{pid}-{i}", pid, "fitbit", "heart_rate", float(55 + i % 60), "bpm",
+            _START + timedelta(minutes=i), _META, "dataset",
+        )
+        for i in range(offset, offset + n)
+    ]
+
+
+def _pct(samples: list[float], q: float) -> float:
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def _run_profile(name: str, settings: Settings, args: argparse.Namespace) -> None:
+    path = Path(tempfile.mkdtemp(prefix=f"bench_db_{name}_")) / "bench.db"
+    engine = build_engine(settings, url=f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(run_migrations)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    # Seed the participant the dashboard is looking at.
+    async with factory() as s:
+        await ReadingRepository(s).save_batch(_chunk("DASH", 0, 10_000))
+
+    writing = True
+    latencies: list[float] = []
+    errors = 0
+
+    async def writer() -> float:
+        nonlocal writing
+        t0 = time.perf_counter()
+        for offset in range(0, args.rows, args.chunk):
+            async with factory() as s:
+                await ReadingRepository(s).save_batch(
+                    _chunk("SYNC", offset, min(args.chunk, args.rows - offset))
+                )
+        writing = False
+        return time.perf_counter() - t0
+
+    async def reader() -> None:
+        nonlocal errors
+        while writing:
+            t0 = time.perf_counter()
+            try:
+                async with factory() as s:
+                    await ReadingRepository(s).get_latest_by_source(
+                        "DASH", MetricType.HEART_RATE, "dataset", limit=50
+                    )
+            except OperationalError:
+                errors += 1
+            latencies.append((time.perf_counter() - t0) * 1000)
+            await asyncio.sleep(args.poll_ms / 1000)
+
+    write_elapsed, *_ = await asyncio.gather(
+        writer(), *(reader() for _ in range(args.readers))
+    )
+    await engine.dispose()
+
+    print(
+        f"  {name:<8} write {args.rows / write_elapsed:>9,.0f} rows/s | "
+        f"reads {len(latencies):>6,}  "
+        f"p50 {_pct(latencies, 0.50):7.1f} ms  "
+        f"p95 {_pct(latencies, 0.95):7.1f} ms  "
+        f"p99 {_pct(latencies, 0.99):7.1f} ms  "
+        f"max {max(latencies, default=float('nan')):7.1f} ms  "
+        f"mean {statistics.fmean(latencies) if latencies else float('nan'):6.1f} ms  "
+        f"lock errors {errors}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--chunk", type=int, default=5_000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--poll-ms", type=float, default=10.0, help="Pause between reads")
+    parser.add_argument("--profile", choices=[*_PROFILES, "both"], default="both")
+    args = parser.parse_args()
+
+    print(f"Writer: {args.rows:,} rows in chunks of {args.chunk:,}; readers: {args.readers}\n")
+    for name, settings in _PROFILES.items():
+        if args.profile in (name, "both"):
+            await _run_profile(name, settings, args)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
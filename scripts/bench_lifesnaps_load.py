@@ -0,0 +1,242 @@
+"""Benchmark LifeSnaps CSV load + fetch: row-wise (old) vs vectorised (new).
+
+Usage:
+    python scripts/bench_lifesnaps_load.py [--data-dir scripts/rais_anonymized]
+    python scripts/bench_lifesnaps_load.py --synthetic [--participants 71 --days 120]
+
+Loads the daily + hourly LifeSnaps CSVs and fetches every metric for every
+participant, two ways, each in a fresh subprocess so peak RSS is measured
+independently:
+
+  * rowwise    — the previous implementation: ``DataFrame.apply(axis=1)`` for
+    hourly timestamps and ``iterrows()`` + one ``SensorReading`` per cell
+  * vectorised — ``LifeSnapsCollector.fetch()`` (``to_datetime`` +
+    ``to_timedelta``, melt to long form, one model per non-empty cell)
+  * frame      — ``LifeSnapsCollector.fetch_frame()`` only (the column batch
+    ``/lifesnaps/sync`` turns into ``save_batch`` tuples)
+
+It then simulates ``--requests`` API calls, each building a fresh
+``LifeSnapsCollector()`` and fetching one participant as the routes do:
+
+  * uncached — the shared dataset cache is dropped before every request
+    (what each route paid before the cache existed)
+  * cached   — the process-wide dataset handle: one parse, then offset slices
+
+When the real CSVs are not available (e.g. only Git LFS pointers are checked
+out) pass ``--synthetic`` to generate files of the same shape.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from wearable_agent.collectors import lifesnaps  # noqa: E402
+from wearable_agent.collectors.lifesnaps import LifeSnapsCollector  # noqa: E402
+from wearable_agent.models import DeviceType, MetricType, SensorReading  # noqa: E402
+
+_ALL_METRICS = [
+    MetricType.HEART_RATE, MetricType.STEPS, MetricType.STRESS, MetricType.SPO2,
+    MetricType.HRV, MetricType.BREATHING_RATE, MetricType.CALORIES,
+    MetricType.DISTANCE, MetricType.SLEEP,
+]
+
+
+# ── Synthetic data ────────────────────────────────────────────
+
+def _write_synthetic(root: Path, participants: int, days: int, extra_columns: int) -> Path:
+    rng = np.random.default_rng(0)
+    csv_dir = root / "csv_rais_anonymized"
+    csv_dir.mkdir(parents=True, exist_ok=True)
+    ids = [f"a{i:023x}" for i in range(participants)]  # never all-digit
+    dates = pd.date_range("2021-05-24", periods=days).strftime("%Y-%m-%d")
+
+    def _sparse(n: int, lo: float, hi: float, missing: float = 0.2) -> np.ndarray:
+        values = rng.uniform(lo, hi, n)
+        values[rng.random(n) < missing] = np.nan
+        return values
+
+    n = participants * days
+    daily = pd.DataFrame({"id": np.repeat(ids, days), "date": np.tile(dates, participants)})
+    daily["stress_score"] = _sparse(n, 50, 90)
+    daily["spo2"] = _sparse(n, 93, 99)
+    daily["rmssd"] = _sparse(n, 20, 80)
+    daily["full_sleep_breathing_rate"] = _sparse(n, 12, 18)
+    daily["minutesAsleep"] = _sparse(n, 300, 500)
+    for i in range(extra_columns):
+        daily[f"extra_{i}"] = _sparse(n, 0, 1)
+    daily.to_csv(csv_dir / "daily_fitbit_sema_df_unprocessed.csv", index=False)
+
+    n = participants * days * 24
+    hourly = pd.DataFrame({
+        "id": np.repeat(ids, days * 24),
+        "date": np.tile(np.repeat(dates, 24), participants),
+        "hour": np.tile(np.arange(24), participants * days),
+    })
+    hourly["bpm"] = _sparse(n, 55, 120)
+    hourly["steps"] = _sparse(n, 0, 2000)
+    hourly["calories"] = _sparse(n, 50, 200)
+    hourly["distance"] = _sparse(n, 0, 1500)
+    for i in range(extra_columns):
+        hourly[f"extra_{i}"] = _sparse(n, 0, 1)
+    hourly.to_csv(csv_dir / "hourly_fitbit_sema_df_unprocessed.csv", index=False)
+    return root
+
+
+# ── Previous implementation (kept for comparison) ─────────────
+
+def _rowwise_load(csv_dir: Path) -> tuple[pd.DataFrame, pd.DataFrame]:
+    daily = pd.read_csv(csv_dir / "daily_fitbit_sema_df_unprocessed.csv")
+    daily["date"] = pd.to_datetime(daily["date"])
+    hourly = pd.read_csv(csv_dir / "hourly_fitbit_sema_df_unprocessed.csv")
+    hourly["date"] = pd.to_datetime(hourly["date"])
+    hourly["timestamp"] = hourly.apply(
+        lambda row: row["date"] + timedelta(hours=int(row["hour"])), axis=1
+    )
+    return daily, hourly
+
+
+def _rowwise_fetch(daily: pd.DataFrame, hourly: pd.DataFrame, pid: str) -> list[SensorReading]:
+    readings = []
+    specs = (
+        (daily[daily["id"] == pid], "date", {
+            MetricType.STRESS: ("stress_score", "score"), MetricType.SPO2: ("spo2", "%"),
+            MetricType.HRV: ("rmssd", "ms"),
+            MetricType.BREATHING_RATE: ("full_sleep_breathing_rate", "brpm"),
+            MetricType.SLEEP: ("minutesAsleep", "min"),
+        }),
+        (hourly[hourly["id"] == pid], "timestamp", {
+            MetricType.HEART_RATE: ("bpm", "bpm"), MetricType.STEPS: ("steps", "steps"),
+            MetricType.CALORIES: ("calories", "kcal"), MetricType.DISTANCE: ("distance", "m"),
+        }),
+    )
+    for subset, ts_col, spec in specs:
+        for _, row in subset.iterrows():
+            for metric, (col, unit) in spec.items():
+                if col in row and pd.notna(row[col]):
+                    readings.append(SensorReading(
+                        participant_id=pid, device_type=DeviceType.FITBIT,
+                        metric_type=metric, value=float(row[col]), unit=unit,
+                        timestamp=row[ts_col], metadata={"source": "dataset"},
+                    ))
+    return readings
+
+
+# ── Runner ────────────────────────────────────────────────────
+
+def _run_mode(mode: str, data_dir: Path) -> dict:
+    t0 = time.perf_counter()
+    total = 0
+    if mode == "rowwise":
+        daily, hourly = _rowwise_load(data_dir / "csv_rais_anonymized")
+        load = time.perf_counter() - t0
+        for pid in sorted(daily["id"].astype(str).unique()):
+            total += len(_rowwise_fetch(daily, hourly, pid))
+    else:
+        collector = LifeSnapsCollector(data_dir)
+        participants = collector.get_participants()
+        load = time.perf_counter() - t0
+        for pid in participants:
+            if mode == "frame":
+                total += len(collector.fetch_frame(pid, _ALL_METRICS))
+            else:
+                total += len(asyncio.run(collector.fetch(pid, _ALL_METRICS)))
+    elapsed = time.perf_counter() - t0
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {"load_s": load, "total_s": elapsed, "readings": total, "peak_rss_mb": peak_mb}
+
+
+def _run_requests(mode: str, data_dir: Path, requests: int) -> dict:
+    participants = LifeSnapsCollector(data_dir).get_participants()
+    lifesnaps._datasets.clear()
+    latencies = []
+    for i in range(requests):
+        if mode == "uncached":
+            lifesnaps._datasets.clear()
+        t0 = time.perf_counter()
+        LifeSnapsCollector(data_dir).fetch_frame(participants[i % len(participants)], _ALL_METRICS)
+        latencies.append(time.perf_counter() - t0)
+    latencies.sort()
+    return {
+        "total_s": sum(latencies),
+        "slowest_ms": latencies[-1] * 1000,
+        "median_ms": latencies[len(latencies) // 2] * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data-dir", type=Path, default=None)
+    parser.add_argument("--synthetic", action="store_true")
+    parser.add_argument("--participants", type=int, default=71)
+    parser.add_argument("--days", type=int, default=120)
+    parser.add_argument("--extra-columns", type=int, default=60,
+                        help="Unused columns per synthetic file (the real CSVs are wide)")
+    parser.add_argument("--requests", type=int, default=20,
+                        help="Simulated per-participant API requests")
+    parser.add_argument(
+        "--mode", choices=["rowwise", "vectorised", "frame", "uncached", "cached"],
+        help=argparse.SUPPRESS,
+    )
+    args = parser.parse_args()
+
+    if args.mode in ("uncached", "cached"):  # child processes
+        print(json.dumps(_run_requests(args.mode, args.data_dir, args.requests)))
+        return
+    if args.mode:
+        print(json.dumps(_run_mode(args.mode, args.data_dir)))
+        return
+
+    if args.synthetic:
+        data_dir = _write_synthetic(
+            Path(tempfile.mkdtemp(prefix="bench_lifesnaps_")),
+            args.participants, args.days, args.extra_columns,
+        )
+    else:
+        data_dir = args.data_dir or LifeSnapsCollector._resolve_data_path()
+    csv_dir = data_dir / "csv_rais_anonymized"
+    sizes = {p.name: p.stat().st_size / 1024 / 1024 for p in csv_dir.glob("*.csv")}
+    if min(sizes.values(), default=0) < 0.01:
+        sys.exit(f"{csv_dir} holds no real CSVs (LFS pointers?) — use --synthetic")
+    print(f"Data: {csv_dir}  " + "  ".join(f"{k} {v:.1f} MB" for k, v in sizes.items()))
+    print()
+
+    for mode in ("rowwise", "vectorised", "frame"):
+        out = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--data-dir", str(data_dir)],
+            capture_output=True, text=True, check=True,
+        )
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        print(
+            f"  {mode:<10} load {r['load_s']:7.2f} s  load+fetch {r['total_s']:7.2f} s  "
+            f"{r['readings']:>10,} readings  peak RSS {r['peak_rss_mb']:7.0f} MB"
+        )
+
+    print(f"\n{args.requests} requests, fresh collector per request:")
+    for mode in ("uncached", "cached"):
+        out = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--data-dir", str(data_dir),
+             "--requests", str(args.requests)],
+            capture_output=True, text=True, check=True,
+        )
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        print(
+            f"  {mode:<10} total {r['total_s']:7.2f} s  slowest {r['slowest_ms']:8.1f} ms  "
+            f"median {r['median_ms']:8.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
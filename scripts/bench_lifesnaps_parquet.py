@@ -0,0 +1,116 @@
+"""Convert fitbit.bson to Parquet and compare reads against the BSON shards.
+
+Usage:
+    python scripts/bench_lifesnaps_parquet.py [--data-dir scripts/rais_anonymized]
+    python scripts/bench_lifesnaps_parquet.py --synthetic [--participants 20 --days 10]
+
+Splits ``mongo_rais_anonymized/fitbit.bson`` (if needed), converts every
+participant to ``parquet_rais_anonymized/`` with ``convert_all`` over
+``--workers`` processes, then times one participant's heart rate / steps /
+calories:
+
+  * bson-stream   — ``BSONStreamer`` on the indexed participant shard
+  * parquet-read  — ``LifeSnapsParquet.read`` (type / month partitions)
+  * bson-day      — one day via the index's day spans
+  * parquet-day   — one day via row-group timestamp statistics
+
+Run without ``--synthetic`` on real data to do the one-time conversion the
+collector otherwise does lazily per participant.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import bson  # noqa: E402
+
+from wearable_agent.collectors.lifesnaps_bson import BSONStreamer, get_index  # noqa: E402
+from wearable_agent.collectors.lifesnaps_parquet import (  # noqa: E402
+    LifeSnapsParquet,
+    convert_all,
+)
+from wearable_agent.collectors.lifesnaps_split import shard_path  # noqa: E402
+from wearable_agent.models import MetricType  # noqa: E402
+
+_METRICS = [MetricType.HEART_RATE, MetricType.STEPS, MetricType.CALORIES]
+_BSON_TYPES = ["heart_rate", "steps", "calories"]
+_START = datetime(2021, 5, 24)
+
+
+def _write_synthetic(path: Path, participants: int, days: int) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as out:
+        for p in range(participants):
+            pid = f"{p:024x}"
+            for doc_type in (*_BSON_TYPES, "distance"):
+                docs = []
+                for minute in range(days * 1440):
+                    stamp = (_START + timedelta(minutes=minute)).strftime("%m/%d/%y %H:%M:%S")
+                    value = {"bpm": 60 + minute % 40, "confidence": 2} \
+                        if doc_type == "heart_rate" else str(minute % 50)
+                    docs.append(bson.encode(
+                        {"id": pid, "type": doc_type, "data": {"dateTime": stamp, "value": value}}
+                    ))
+                out.write(b"".join(docs))
+
+
+def _timed(label: str, fn) -> None:
+    t0 = time.perf_counter()
+    n = fn()
+    print(f"  {label:<14} {time.perf_counter() - t0:7.3f} s  {n:>10,} readings")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data-dir", type=Path, default=None)
+    parser.add_argument("--synthetic", action="store_true")
+    parser.add_argument("--participants", type=int, default=20)
+    parser.add_argument("--days", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--participant", default=None, help="Defaults to the middle one")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        data_dir = Path(tempfile.mkdtemp(prefix="bench_parquet_"))
+        bson_path = data_dir / "mongo_rais_anonymized" / "fitbit.bson"
+        print(f"Writing synthetic {bson_path} ...")
+        _write_synthetic(bson_path, args.participants, args.days)
+    else:
+        data_dir = args.data_dir or Path(__file__).resolve().parent / "rais_anonymized"
+        bson_path = data_dir / "mongo_rais_anonymized" / "fitbit.bson"
+        if not bson_path.exists() or bson_path.stat().st_size < 1_000_000:
+            sys.exit(f"{bson_path} missing or an LFS pointer — use --synthetic")
+    root = data_dir / "parquet_rais_anonymized"
+    print(f"BSON: {bson_path} ({bson_path.stat().st_size / 1024 / 1024:.0f} MB)\n")
+
+    t0 = time.perf_counter()
+    converted = convert_all(bson_path, root, workers=args.workers)
+    size = sum(p.stat().st_size for p in root.rglob("*.parquet"))
+    print(f"  split + convert (one-time) {time.perf_counter() - t0:7.2f} s  "
+          f"{len(converted)} participants  {size / 1024 / 1024:.0f} MB Parquet\n")
+
+    store = LifeSnapsParquet(root)
+    participants = sorted(p.name.split("=", 1)[1] for p in root.glob("participant_id=*"))
+    pid = args.participant or participants[len(participants) // 2]
+    shard = shard_path(bson_path.parent, pid)
+    get_index(shard)
+    day = date.fromisoformat(get_index(shard).days(pid, "heart_rate")[0])
+    day_start = datetime.combine(day, datetime.min.time())
+    day_end = day_start + timedelta(days=1) - timedelta(microseconds=1)
+
+    _timed("bson-stream", lambda: sum(
+        1 for _ in BSONStreamer(shard).iter_readings(pid, _METRICS)))
+    _timed("parquet-read", lambda: store.read(pid, _BSON_TYPES).num_rows)
+    _timed("bson-day", lambda: sum(
+        1 for _ in BSONStreamer(shard).iter_readings(pid, _METRICS, start=day, end=day)))
+    _timed("parquet-day", lambda: store.read(pid, _BSON_TYPES, day_start, day_end).num_rows)
+
+
+if __name__ == "__main__":
+    main()
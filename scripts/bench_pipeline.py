@@ -0,0 +1,132 @@
+"""Benchmark StreamPipeline persistence throughput: per-reading vs micro-batched.
+
+Usage:
+    python scripts/bench_pipeline.py [--readings N] [--batch-size B] [--batch-timeout-ms T]
+
+Publishes N synthetic intraday heart-rate readings through a StreamPipeline
+backed by a throw-away SQLite database and reports readings/sec for:
+
+  * before — a per-reading consumer calling ``ReadingRepository.save()``
+    (one transaction per reading, the old ``_on_reading`` behaviour)
+  * after  — a batch consumer calling ``ReadingRepository.save_batch()``
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Point the app at a scratch database *before* importing wearable_agent.
+_TMP = Path(tempfile.mkdtemp(prefix="bench_pipeline_"))
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_TMP / 'bench.db'}"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from wearable_agent.models import DeviceType, MetricType, SensorReading  # noqa: E402
+from wearable_agent.storage.database import init_db  # noqa: E402
+from wearable_agent.storage.repository import ReadingRepository  # noqa: E402
+from wearable_agent.streaming.pipeline import StreamPipeline  # noqa: E402
+
+
+def _make_readings(n: int, participant_id: str) -> list[SensorReading]:
+    start = datetime(2026, 1, 1)
+    return [
+        SensorReading(
+            participant_id=participant_id,
+            device_type=DeviceType.FITBIT,
+            metric_type=MetricType.HEART_RATE,
+            value=float(60 + i % 40),
+            unit="bpm",
+            timestamp=start + timedelta(minutes=i),
+            metadata={"source": "live"},
+        )
+        for i in range(n)
+    ]
+
+
+async def _run(
+    pipeline: StreamPipeline, readings: list[SensorReading], done: asyncio.Event
+) -> float:
+    task = asyncio.create_task(pipeline.start())
+    t0 = time.perf_counter()
+    await pipeline.publish_batch(readings)
+    await done.wait()
+    elapsed = time.perf_counter() - t0
+    await pipeline.stop()
+    task.cancel()
+    return elapsed
+
+
+async def bench_per_reading(readings: list[SensorReading]) -> float:
+    repo = ReadingRepository()
+    done = asyncio.Event()
+    seen = 0
+
+    async def _on_reading(reading: SensorReading) -> None:
+        nonlocal seen
+        await repo.save(reading)
+        seen += 1
+        if seen == len(readings):
+            done.set()
+
+    pipeline = StreamPipeline(maxsize=len(readings) + 1, batch_size=1)
+    pipeline.add_consumer(_on_reading)
+    return await _run(pipeline, readings, done)
+
+
+async def bench_batched(
+    readings: list[SensorReading], batch_size: int, batch_timeout_ms: float
+) -> float:
+    repo = ReadingRepository()
+    done = asyncio.Event()
+    seen = 0
+
+    async def _persist_batch(batch: list[SensorReading]) -> None:
+        nonlocal seen
+        await repo.save_batch(batch)
+        seen += len(batch)
+        if seen == len(readings):
+            done.set()
+
+    pipeline = StreamPipeline(
+        maxsize=len(readings) + 1,
+        batch_size=batch_size,
+        batch_timeout_ms=batch_timeout_ms,
+    )
+    pipeline.add_batch_consumer(_persist_batch)
+    return await _run(pipeline, readings, done)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--readings", type=int, default=5_000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--batch-timeout-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    await init_db()
+    print(f"Database: {os.environ['DATABASE_URL']}")
+    print(f"Readings: {args.readings:,}\n")
+
+    before = await bench_per_reading(_make_readings(args.readings, "BENCH_SINGLE"))
+    print(
+        f"  before (per-reading save): {before:8.2f} s  "
+        f"{args.readings / before:>10,.0f} readings/s"
+    )
+
+    after = await bench_batched(
+        _make_readings(args.readings, "BENCH_BATCH"), args.batch_size, args.batch_timeout_ms
+    )
+    print(
+        f"  after  (batch={args.batch_size:<5}):      {after:8.2f} s  "
+        f"{args.readings / after:>10,.0f} readings/s"
+    )
+    print(f"\nSpeed-up: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,119 @@
+"""Benchmark ReadingRepository.save_batch against a synthetic participant.
+
+Usage:
+    python scripts/bench_save_batch.py [--rows 1000000] [--chunk 5000] [--skip-orm]
+
+Generates one participant's worth of minute-level heart-rate data and loads
+it into a throw-away SQLite database three ways:
+
+  * orm     — the old path: one ``SensorReadingRow`` per reading + ``add_all``
+  * models  — ``save_batch(list[SensorReading])`` (Core executemany)
+  * tuples  — ``save_batch(list[tuple])`` (Core executemany, no Pydantic)
+
+The ORM run is the slowest by far; pass ``--skip-orm`` to leave it out.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+_TMP = Path(tempfile.mkdtemp(prefix="bench_save_batch_"))
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_TMP / 'bench.db'}"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from wearable_agent.models import DeviceType, MetricType, SensorReading  # noqa: E402
+from wearable_agent.storage.database import (  # noqa: E402
+    SensorReadingRow,
+    get_session_factory,
+    init_db,
+)
+from wearable_agent.storage.repository import ReadingRepository  # noqa: E402
+
+_START = datetime(2021, 5, 24)
+
+
+def _models(n: int, pid: str) -> list[SensorReading]:
+    return [
+        SensorReading(
+            participant_id=pid,
+            device_type=DeviceType.FITBIT,
+            metric_type=MetricType.HEART_RATE,
+            value=float(55 + i % 60),
+            unit="bpm",
+            timestamp=_START + timedelta(minutes=i),
+            metadata={"source": "dataset"},
+        )
+        for i in range(n)
+    ]
+
+
+def _tuples(n: int, pid: str) -> list[tuple]:
+    meta = json.dumps({"source": "dataset"})
+    return [
+        (
+            str(uuid.uuid4()), pid, "fitbit", "heart_rate",
+            float(55 + i % 60), "bpm", _START + timedelta(minutes=i), meta, "dataset",
+        )
+        for i in range(n)
+    ]
+
+
+async def _orm_save_batch(readings: list[SensorReading]) -> int:
+    """The pre-fast-path implementation, kept here for comparison."""
+    async with get_session_factory()() as session:
+        rows = [
+            SensorReadingRow(
+                id=r.id,
+                participant_id=r.participant_id,
+                device_type=r.device_type.value,
+                metric_type=r.metric_type.value,
+                value=r.value,
+                unit=r.unit,
+                timestamp=r.timestamp,
+                metadata_json=json.dumps(r.metadata),
+                source=r.metadata.get("source") or "",
+            )
+            for r in readings
+        ]
+        session.add_all(rows)
+        await session.commit()
+        return len(rows)
+
+
+async def _load(label: str, rows: list, chunk: int, save) -> None:
+    t0 = time.perf_counter()
+    total = 0
+    for i in range(0, len(rows), chunk):
+        total += await save(rows[i : i + chunk])
+    elapsed = time.perf_counter() - t0
+    print(f"  {label:<7} {total:>10,} rows  {elapsed:8.2f} s  {total / elapsed:>10,.0f} rows/s")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk", type=int, default=5_000)
+    parser.add_argument("--skip-orm", action="store_true")
+    args = parser.parse_args()
+
+    await init_db()
+    repo = ReadingRepository()
+    print(f"Database: {os.environ['DATABASE_URL']}")
+    print(f"Rows per run: {args.rows:,}, chunk size: {args.chunk:,}\n")
+
+    if not args.skip_orm:
+        await _load("orm", _models(args.rows, "BENCH_ORM"), args.chunk, _orm_save_batch)
+    await _load("models", _models(args.rows, "BENCH_MODELS"), args.chunk, repo.save_batch)
+    await _load("tuples", _tuples(args.rows, "BENCH_TUPLES"), args.chunk, repo.save_batch)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
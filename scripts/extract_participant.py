@@ -2,20 +2,26 @@
 
 Usage:
     python scripts/extract_participant.py [PARTICIPANT_ID]
+    python scripts/extract_participant.py --all [--workers N]
 
-If no ID is given, lists all participant IDs found in the first 50k docs
-and asks you to choose. Writes output to:
+If no ID is given, lists all participant IDs with their doc counts and
+asks you to choose. Writes output to:
     scripts/rais_anonymized/mongo_rais_anonymized/participant_<ID>.bson
 
+``--all`` writes every participant's file in one parallel pass over the
+dump (see ``wearable_agent.collectors.lifesnaps_split``).
+
 This small file can be pushed to GitHub (no LFS needed if < 100MB)
 and downloaded on Railway for streaming.
 """
 from __future__ import annotations
 
 import sys
-import struct
+import time
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
 # Paths
 SCRIPT_DIR = Path(__file__).resolve().parent
 RAIS = SCRIPT_DIR / "rais_anonymized" / "mongo_rais_anonymized"
@@ -43,22 +49,33 @@ def reassemble_if_needed() -> Path:
     return FULL_BSON
 
 
-def scan_participants(bson_path: Path, max_docs: int = 100_000) -> dict[str, int]:
-    """Quick scan to find participant IDs and doc counts."""
-    import bson as bson_lib
+def scan_participants(bson_path: Path) -> dict[str, int]:
+    """Count docs per participant (header peeks only, whole file)."""
+    from wearable_agent.collectors.lifesnaps_bson import MappedBSON, scan_keys
 
     counts: dict[str, int] = {}
-    print(f"Scanning first {max_docs:,} docs for participant IDs...")
-    with open(bson_path, "rb") as f:
-        for i, doc in enumerate(bson_lib.decode_file_iter(f)):
-            pid = str(doc.get("id", ""))
+    print(f"Scanning {bson_path.name} for participant IDs...")
+    with MappedBSON(bson_path) as mapped:
+        for _, _, n, (pid, _, _) in scan_keys(mapped):
             if pid:
-                counts[pid] = counts.get(pid, 0) + 1
-            if i >= max_docs:
-                break
+                counts[pid] = counts.get(pid, 0) + n
     return counts
 
 
+def extract_all(bson_path: Path, workers: int | None = None) -> None:
+    """Write participant_<ID>.bson for every participant in one parallel pass."""
+    from wearable_agent.collectors.lifesnaps_split import split_participants
+
+    print(f"\nSplitting {bson_path.name} into per-participant files in {OUTPUT_DIR} ...")
+    sys.stdout.flush()
+    t0 = time.perf_counter()
+    totals = split_participants(bson_path, OUTPUT_DIR, workers=workers)
+    elapsed = time.perf_counter() - t0
+    for pid, stats in sorted(totals.items(), key=lambda x: -x[1]["bytes"]):
+        print(f"  {pid}: {stats['documents']:>10,} docs  {stats['bytes'] / 1024 / 1024:8.1f} MB")
+    print(f"\nDone: {len(totals)} participants in {elapsed:.1f} s")
+
+
 def extract_participant(
     bson_path: Path,
     participant_id: str,
@@ -118,9 +135,11 @@ def extract_participant(
 def main() -> None:
     bson_path = reassemble_if_needed()
 
-    # Parse args: extract_participant.py [PARTICIPANT_ID] [--max-docs N]
+    # Parse args: extract_participant.py [PARTICIPANT_ID] [--max-docs N] [--all [--workers N]]
     args = sys.argv[1:]
     max_docs = 0
+    workers = None
+    extract_all_flag = False
     pid = ""
 
     i = 0
@@ -128,10 +147,20 @@ def main() -> None:
         if args[i] == "--max-docs" and i + 1 < len(args):
             max_docs = int(args[i + 1])
             i += 2
+        elif args[i] == "--workers" and i + 1 < len(args):
+            workers = int(args[i + 1])
+            i += 2
+        elif args[i] == "--all":
+            extract_all_flag = True
+            i += 1
         else:
             pid = args[i]
             i += 1
 
+    if extract_all_flag:
+        extract_all(bson_path, workers=workers)
+        return
+
     if not pid:
         # Scan and let user choose
         counts = scan_participants(bson_path)
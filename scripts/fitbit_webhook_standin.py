@@ -0,0 +1,83 @@
+"""Local stand-in for Fitbit's Subscriptions API: post signed notifications.
+
+Usage:
+    python scripts/fitbit_webhook_standin.py P001 [P002 ...]
+        [--url http://localhost:8000/fitbit/webhook]
+        [--collection activities] [--date 2026-01-05]
+        [--verify CODE] [--bad-signature]
+
+Signs the body exactly like Fitbit (base64 HMAC-SHA1 keyed with
+``FITBIT_CLIENT_SECRET + "&"``), so the running server's
+``/fitbit/webhook`` accepts it and enqueues a targeted sync for each
+participant.  ``--verify`` first sends the subscriber verification GET;
+``--bad-signature`` checks that a tampered request is rejected (404).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from datetime import date
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from wearable_agent.collectors.fitbit_subscriptions import (  # noqa: E402
+    COLLECTION_METRICS,
+    REVOKED_COLLECTION,
+    SIGNATURE_HEADER,
+    sign,
+)
+
+
+def _notifications(participants: list[str], collection: str, day: str) -> list[dict]:
+    return [
+        {
+            "collectionType": collection,
+            "date": day,
+            "ownerId": f"FB-{pid}",
+            "ownerType": "user",
+            "subscriptionId": pid,
+        }
+        for pid in participants
+    ]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("participants", nargs="+")
+    parser.add_argument("--url", default="http://localhost:8000/fitbit/webhook")
+    parser.add_argument(
+        "--collection", default="activities",
+        choices=[*COLLECTION_METRICS, REVOKED_COLLECTION],
+    )
+    parser.add_argument("--date", default=date.today().isoformat())
+    parser.add_argument("--secret", default=os.environ.get("FITBIT_CLIENT_SECRET", ""))
+    parser.add_argument("--verify", help="send the verification GET with this code first")
+    parser.add_argument("--bad-signature", action="store_true")
+    args = parser.parse_args()
+
+    async with httpx.AsyncClient(timeout=10) as client:
+        if args.verify:
+            resp = await client.get(args.url, params={"verify": args.verify})
+            print(f"verify      → {resp.status_code} (expect 204)")
+
+        body = json.dumps(_notifications(args.participants, args.collection, args.date))
+        signature = sign(body.encode(), args.secret)
+        if args.bad_signature:
+            signature = sign(body.encode(), args.secret + "x")
+        resp = await client.post(
+            args.url,
+            content=body,
+            headers={"Content-Type": "application/json", SIGNATURE_HEADER: signature},
+        )
+        expected = 404 if args.bad_signature else 204
+        print(f"notify x{len(args.participants):<3} → {resp.status_code} (expect {expected})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
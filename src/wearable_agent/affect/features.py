@@ -136,6 +136,12 @@ def _linear_slope(values: Sequence[float]) -> float:
     return numerator / denominator
 
 
+def _is_daily_total(row: SensorReadingRow) -> bool:
+    """True for a Fitbit daily total (stamped 00:00 next to the minute series)."""
+    meta = json.loads(row.metadata_json) if row.metadata_json else {}
+    return meta.get("type") == "daily"
+
+
 # ── Feature extraction from readings ─────────────────────────
 
 
@@ -191,7 +197,13 @@ def extract_feature_window(
             resting_hr = r.value
             break
 
-    # ── Steps/calories/METs
+    # ── Steps/calories/METs (per-minute readings; a daily total is not
+    #    part of any window's sum)
+    for metric in (MetricType.STEPS, MetricType.CALORIES, MetricType.ACTIVE_ZONE_MINUTES):
+        if metric.value in by_metric:
+            by_metric[metric.value] = [
+                r for r in by_metric[metric.value] if not _is_daily_total(r)
+            ]
     step_readings = by_metric.get(MetricType.STEPS.value, [])
     steps_in_window = sum(r.value for r in step_readings) if step_readings else None
 
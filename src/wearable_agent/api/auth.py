@@ -15,7 +15,7 @@ from __future__ import annotations
 
 import base64
 import secrets
-from datetime import datetime, timedelta
+from datetime import datetime
 from urllib.parse import urlencode
 
 import httpx
@@ -23,7 +23,8 @@ import structlog
 from fastapi import APIRouter, HTTPException, Query, Request
 from fastapi.responses import HTMLResponse, RedirectResponse
 
-from wearable_agent.collectors.fitbit_oauth import refresh_fitbit_token
+from wearable_agent.collectors.fitbit import FitbitCollector
+from wearable_agent.collectors.fitbit_tokens import ReauthorizationRequired, get_token_manager
 from wearable_agent.config import get_settings
 from wearable_agent.storage.repository import ParticipantRepository, TokenRepository
 
@@ -133,16 +134,12 @@ async def fitbit_callback(
     expires_in = body.get("expires_in", 28800)  # default 8 hours
     scopes = body.get("scope", "")
 
-    expires_at = datetime.utcnow() + timedelta(seconds=expires_in)
-
-    # Persist tokens
-    token_repo = TokenRepository()
-    await token_repo.upsert(
-        participant_id=participant_id,
+    # Persist tokens (and replace any cached pair)
+    await get_token_manager().store(
+        participant_id,
         access_token=access_token,
         refresh_token=refresh_token,
-        provider="fitbit",
-        expires_at=expires_at,
+        expires_in=expires_in,
         scopes=scopes,
     )
 
@@ -154,6 +151,9 @@ async def fitbit_callback(
 
     logger.info("oauth.tokens_saved", participant=participant_id, scopes=scopes)
 
+    if settings.fitbit_webhook_subscribe:
+        await _subscribe(participant_id, access_token)
+
     return HTMLResponse(
         f"<h2>Success!</h2>"
         f"<p>Fitbit account linked for participant <b>{participant_id}</b>.</p>"
@@ -161,44 +161,45 @@ async def fitbit_callback(
     )
 
 
+async def _subscribe(participant_id: str, access_token: str) -> None:
+    """Best-effort: subscribe to change notifications for a new link."""
+    collector = FitbitCollector()
+    try:
+        await collector.authenticate(access_token=access_token)
+        await collector.subscribe(participant_id)
+        logger.info("oauth.subscribed", participant=participant_id)
+    except Exception:
+        logger.warning("oauth.subscribe_failed", participant=participant_id, exc_info=True)
+    finally:
+        await collector.close()
+
+
 # ── Token refresh ─────────────────────────────────────────────
 
 
 @router.post("/refresh/{participant_id}", summary="Refresh Fitbit tokens")
 async def refresh_tokens(participant_id: str):
-    """Manually trigger a token refresh for a participant."""
-    token_repo = TokenRepository()
-    token_row = await token_repo.get(participant_id, "fitbit")
-    if token_row is None:
-        raise HTTPException(404, "No tokens found for this participant.")
+    """Manually trigger a token refresh for a participant.
 
-    if not token_row.refresh_token:
-        raise HTTPException(400, "No refresh token available.")
-
-    settings = get_settings()
+    Goes through the token manager, so it never races the scheduler's
+    refresh of the same (single-use) refresh token.
+    """
     try:
-        body = await refresh_fitbit_token(
-            refresh_token=token_row.refresh_token,
-            client_id=settings.fitbit_client_id,
-            client_secret=settings.fitbit_client_secret,
-        )
-    except httpx.HTTPStatusError:
-        logger.error("oauth.refresh_failed", participant=participant_id)
-        raise HTTPException(502, "Token refresh failed.")
-
-    expires_at = datetime.utcnow() + timedelta(seconds=body.get("expires_in", 28800))
-
-    await token_repo.upsert(
-        participant_id=participant_id,
-        access_token=body["access_token"],
-        refresh_token=body.get("refresh_token", token_row.refresh_token),
-        provider="fitbit",
-        expires_at=expires_at,
-        scopes=body.get("scope", token_row.scopes),
-    )
+        token = await get_token_manager().refresh(participant_id, force=True)
+    except LookupError:
+        raise HTTPException(404, "No tokens found for this participant.") from None
+    except ReauthorizationRequired:
+        raise HTTPException(
+            401, "Fitbit access was rejected. Link Fitbit again via /auth/fitbit."
+        ) from None
+    except RuntimeError:
+        raise HTTPException(400, "No refresh token available.") from None
+    except Exception:
+        logger.error("oauth.refresh_failed", participant=participant_id, exc_info=True)
+        raise HTTPException(502, "Token refresh failed.") from None
 
     logger.info("oauth.tokens_refreshed", participant=participant_id)
-    return {"status": "refreshed", "expires_at": expires_at.isoformat()}
+    return {"status": "refreshed", "expires_at": token.expires_at.isoformat()}
 
 
 # ── Token status & revocation ─────────────────────────────────
@@ -253,5 +254,6 @@ async def revoke_tokens(participant_id: str):
         logger.warning("oauth.revoke_failed", participant=participant_id)
 
     await token_repo.delete(participant_id, "fitbit")
+    get_token_manager().forget(participant_id)
     logger.info("oauth.tokens_revoked", participant=participant_id)
     return {"status": "revoked"}
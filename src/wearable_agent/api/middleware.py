@@ -53,6 +53,7 @@ _PUBLIC_PATHS: set[str] = {
     "/redoc",
     "/auth/fitbit",
     "/auth/fitbit/callback",
+    "/fitbit/webhook",  # Fitbit-signed; verified in the route
     "/admin",
     "/app",
     "/api/stats",
@@ -47,6 +47,7 @@ async def system_info():
         "pipeline": {
             "running": _pipeline is not None,
             "pending": _pipeline.pending if _pipeline else 0,
+            "consumers": _pipeline.consumer_stats() if _pipeline else [],
         },
         "agent": {"ready": _agent is not None},
         "rule_engine": {
@@ -117,7 +118,10 @@ async def get_stats():
 @router.get("/admin/api/stream-stats", tags=["admin"])
 async def stream_stats():
     """Return real-time streaming statistics for the admin UI."""
+    from wearable_agent.api.server import _pipeline
+
     return {
+        "pipeline_consumers": _pipeline.consumer_stats() if _pipeline else [],
         "connections": {
             "total": ws_manager.active_count,
             "channels": ws_manager.channel_breakdown(),
@@ -127,6 +131,19 @@ async def stream_stats():
     }
 
 
+@router.get("/admin/api/replay", tags=["admin"])
+async def replay_sessions():
+    """LifeSnaps replay sessions with clock state and per-participant position."""
+    from wearable_agent.api.routes.lifesnaps import _replay_sessions
+
+    sessions = [s.status() for s in _replay_sessions.values()]
+    return {
+        "sessions": sessions,
+        "participants": sum(len(s["participants"]) for s in sessions),
+        "emitted": sum(s["emitted"] for s in sessions),
+    }
+
+
 @router.get("/admin/api/connections", tags=["admin"])
 async def connection_info():
     """Return connected client info per channel."""
@@ -278,7 +295,10 @@ async def get_tools_inventory():
             "category": "streaming",
             "status": "running" if _pipeline else "stopped",
             "description": "In-memory asyncio.Queue publisher/consumer pipeline for sensor readings.",
-            "details": {"pending": _pipeline.pending if _pipeline else 0},
+            "details": {
+                "pending": _pipeline.pending if _pipeline else 0,
+                "consumers": _pipeline.consumer_stats() if _pipeline else [],
+            },
         },
         {
             "name": "WearableAgent",
@@ -308,6 +328,13 @@ async def get_tools_inventory():
             "description": "Periodic Fitbit data collection scheduler.",
             "details": {
                 "interval_minutes": get_settings().scheduler_collect_interval_minutes,
+                **(
+                    {
+                        key: _scheduler_service.stats["queue"][key]
+                        for key in ("queue_depth", "in_flight", "max_lateness_seconds")
+                    }
+                    if _scheduler_service else {}
+                ),
             },
         },
         {
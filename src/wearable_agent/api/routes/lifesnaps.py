@@ -6,12 +6,18 @@ import asyncio
 from typing import Any
 
 import structlog
-from fastapi import APIRouter, BackgroundTasks, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query
+from pydantic import BaseModel, Field
 
 from wearable_agent.collectors.lifesnaps import LifeSnapsCollector
+from wearable_agent.collectors.lifesnaps_import import (
+    IMPORT_SOURCE,
+    checkpoint_dict,
+    import_high_frequency,
+)
+from wearable_agent.collectors.replay import ReplaySession
 from wearable_agent.models import MetricType
-from wearable_agent.storage.repository import ReadingRepository
+from wearable_agent.storage.repository import ImportCheckpointRepository, ReadingRepository
 
 logger = structlog.get_logger(__name__)
 
@@ -21,6 +27,10 @@ _pipeline: Any = None
 
 # Track active syncs to avoid duplicates
 _active_syncs: set[str] = set()
+# Running BSON imports, by participant (cancel via DELETE /import/{id})
+_active_imports: dict[str, asyncio.Task[Any]] = {}
+# Multi-participant replay sessions, by session id
+_replay_sessions: dict[str, ReplaySession] = {}
 
 
 def set_pipeline(pipeline: Any) -> None:
@@ -29,6 +39,18 @@ def set_pipeline(pipeline: Any) -> None:
     _pipeline = pipeline
 
 
+_STREAM_METRICS = [
+    MetricType.HEART_RATE,
+    MetricType.STEPS,
+    MetricType.STRESS,
+    MetricType.SPO2,
+    MetricType.HRV,
+    MetricType.BREATHING_RATE,
+    MetricType.CALORIES,
+    MetricType.DISTANCE,
+]
+
+
 class StreamRequest(BaseModel):
     speed: float = 1.0  # Real-time multiplier (1.0 = normal, 10.0 = 10x speed)
     metrics: list[MetricType] | None = None
@@ -128,11 +150,14 @@ async def _run_sync(participant_id: str, force: bool = False) -> None:
     try:
         if force:
             deleted = await reading_repo.delete_for_participant(participant_id)
+            # Imported BSON rows are gone too; a later import starts over.
+            await ImportCheckpointRepository().delete(participant_id)
             logger.info("lifesnaps.sync_cleared", participant=participant_id, deleted=deleted)
 
         collector = LifeSnapsCollector()
 
-        # Fetch ALL metrics from CSV (fast — no time delay)
+        # All metrics: summaries from the CSVs, HR / steps / calories from the
+        # Parquet copy of the BSON data when there is one (no replay pacing).
         all_metrics = [
             MetricType.HEART_RATE,
             MetricType.STEPS,
@@ -151,17 +176,18 @@ async def _run_sync(participant_id: str, force: bool = False) -> None:
             metrics=[m.value for m in all_metrics],
         )
 
-        readings = await collector.fetch(participant_id, all_metrics)
+        # Vectorised column batch → save_batch tuples (no per-reading models)
+        frame = await asyncio.to_thread(collector.fetch_frame, participant_id, all_metrics)
 
-        if not readings:
+        if frame.empty:
             logger.warning("lifesnaps.sync_no_data", participant=participant_id)
             return
 
         # Batch insert in chunks to avoid memory issues
-        batch_size = 500
+        batch_size = 5_000
         total_saved = 0
-        for i in range(0, len(readings), batch_size):
-            batch = readings[i : i + batch_size]
+        for i in range(0, len(frame), batch_size):
+            batch = collector.to_reading_tuples(participant_id, frame.iloc[i : i + batch_size])
             saved = await reading_repo.save_batch(batch)
             total_saved += saved
 
@@ -172,7 +198,7 @@ async def _run_sync(participant_id: str, force: bool = False) -> None:
         )
 
         # Also push through pipeline if available (triggers monitoring rules + WS broadcast)
-        if _pipeline and readings:
+        if _pipeline:
             # Push a summary notification through the pipeline
             logger.info(
                 "lifesnaps.sync_pipeline_notify",
@@ -193,6 +219,64 @@ async def _run_sync(participant_id: str, force: bool = False) -> None:
         _active_syncs.discard(participant_id)
 
 
+# ── Minute-level BSON import (resumable, cancellable) ─────────
+
+
+@router.post("/import/{participant_id}", summary="Bulk-import BSON HR/steps/calories")
+async def start_import(participant_id: str, restart: bool = False):
+    """Load the participant's minute-level heart rate, steps and calories into the DB.
+
+    Runs in the background without replay delays, committing a checkpoint
+    with every batch: calling this again after a failure, cancellation or
+    restart resumes from the last committed batch.  ``restart=true`` drops
+    previously imported rows and starts over.
+    """
+    task = _active_imports.get(participant_id)
+    if task is not None and not task.done():
+        return {"status": "already_running", "participant_id": participant_id}
+
+    task = asyncio.create_task(_run_import(participant_id, restart))
+    _active_imports[participant_id] = task
+    return {"status": "import_started", "participant_id": participant_id, "restart": restart}
+
+
+@router.get("/import/{participant_id}", summary="BSON import progress")
+async def import_status(participant_id: str):
+    """Checkpoint of the participant's import: position / total, inserted rows, status."""
+    row = await ImportCheckpointRepository().get(participant_id, IMPORT_SOURCE)
+    if row is None:
+        raise HTTPException(status_code=404, detail="No import for this participant")
+    task = _active_imports.get(participant_id)
+    return {**checkpoint_dict(row), "in_progress": task is not None and not task.done()}
+
+
+@router.delete("/import/{participant_id}", summary="Cancel a running BSON import")
+async def cancel_import(participant_id: str):
+    """Cancel the import; already committed batches stay and are resumed from."""
+    task = _active_imports.get(participant_id)
+    if task is None or task.done():
+        raise HTTPException(status_code=404, detail="No running import for this participant")
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    return await import_status(participant_id)
+
+
+async def _run_import(participant_id: str, restart: bool) -> None:
+    try:
+        await import_high_frequency(participant_id, restart=restart)
+    except FileNotFoundError as e:
+        logger.warning("lifesnaps.import_no_data", participant=participant_id, error=str(e))
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.error(
+            "lifesnaps.import_error", participant=participant_id, error=str(e), exc_info=True
+        )
+    finally:
+        if _active_imports.get(participant_id) is asyncio.current_task():
+            del _active_imports[participant_id]
+
+
 @router.get("/debug", summary="Debug data file locations")
 def debug_data_files():
     """Show data file paths and sizes for debugging deployment issues."""
@@ -259,16 +343,7 @@ async def start_streaming(
         raise HTTPException(status_code=503, detail="Pipeline service not available")
 
     speed = req.speed if req else 1.0
-    metrics = req.metrics if req and req.metrics else [
-        MetricType.HEART_RATE,
-        MetricType.STEPS,
-        MetricType.STRESS,
-        MetricType.SPO2,
-        MetricType.HRV,
-        MetricType.BREATHING_RATE,
-        MetricType.CALORIES,
-        MetricType.DISTANCE
-    ]
+    metrics = req.metrics if req and req.metrics else _STREAM_METRICS
 
     # Verify participant exists (allow BSON-only participants to pass)
     try:
@@ -310,13 +385,15 @@ async def _run_stream(participant_id: str, metrics: list[MetricType], speed: flo
     metric_counts: dict[str, int] = {}
 
     try:
-        async for reading in collector.stream(participant_id, metrics, speed=speed):
+        async for batch in collector.stream_batches(participant_id, metrics, speed=speed):
             if _pipeline:
-                await _pipeline.publish_batch([reading])
-                count += 1
-                metric_counts[reading.metric_type.value] = (
-                    metric_counts.get(reading.metric_type.value, 0) + 1
-                )
+                # One publish per replay tick, however many readings came due
+                await _pipeline.publish_batch(batch)
+                count += len(batch)
+                for reading in batch:
+                    metric_counts[reading.metric_type.value] = (
+                        metric_counts.get(reading.metric_type.value, 0) + 1
+                    )
 
                 # Log progress every 30 seconds (wall-clock)
                 now = time.monotonic()
@@ -344,3 +421,107 @@ async def _run_stream(participant_id: str, metrics: list[MetricType], speed: flo
             total_readings=count,
             per_metric=metric_counts,
         )
+
+
+# ── Multi-participant replay sessions (shared clock) ──────────
+
+
+class ReplaySessionRequest(BaseModel):
+    participants: list[str] = Field(min_length=1)
+    speed: float = Field(default=1.0, gt=0)
+    metrics: list[MetricType] | None = None
+    # True: every participant starts at once; False: keep their real time offsets
+    align_starts: bool = True
+
+
+def _get_replay_session(session_id: str) -> ReplaySession:
+    session = _replay_sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Replay session {session_id} not found")
+    return session
+
+
+@router.post("/replay", summary="Replay many participants on one clock")
+async def create_replay_session(req: ReplaySessionRequest):
+    """Start one replay session for all *participants*.
+
+    Unlike ``/stream/{participant_id}`` (one task and clock per participant)
+    the session drives every participant from one shared virtual clock and
+    one timer, publishing each tick's due readings as a single batch.
+    """
+    if _pipeline is None:
+        raise HTTPException(status_code=503, detail="Pipeline service not available")
+
+    collector = LifeSnapsCollector()
+    metrics = req.metrics or _STREAM_METRICS
+    session = ReplaySession(
+        _pipeline.publish_batch,
+        speed=req.speed,
+        align_starts=req.align_starts,
+        # Finished, failed and stopped sessions are dropped from the registry
+        on_done=lambda s: _replay_sessions.pop(s.session_id, None),
+    )
+
+    def _sources(pid: str):
+        return lambda: collector.replay_sources(pid, metrics)
+
+    await asyncio.gather(*(
+        session.add_participant(pid, _sources(pid)) for pid in dict.fromkeys(req.participants)
+    ))
+    session.start()
+    _replay_sessions[session.session_id] = session
+    logger.info(
+        "lifesnaps.replay_session_started",
+        session=session.session_id,
+        participants=len(req.participants),
+        speed=req.speed,
+    )
+    return session.status()
+
+
+@router.get("/replay", summary="List replay sessions")
+async def list_replay_sessions():
+    return [session.status() for session in _replay_sessions.values()]
+
+
+@router.get("/replay/{session_id}", summary="Replay session status")
+async def replay_session_status(session_id: str):
+    """State, clock position and per-participant position of a session."""
+    return _get_replay_session(session_id).status()
+
+
+@router.post("/replay/{session_id}/pause", summary="Pause a replay session")
+async def pause_replay_session(session_id: str):
+    session = _get_replay_session(session_id)
+    session.pause()
+    return session.status()
+
+
+@router.post("/replay/{session_id}/resume", summary="Resume a replay session")
+async def resume_replay_session(session_id: str):
+    session = _get_replay_session(session_id)
+    session.resume()
+    return session.status()
+
+
+@router.post("/replay/{session_id}/seek", summary="Seek a replay session")
+async def seek_replay_session(session_id: str, position: float = Query(ge=0)):
+    """Jump to *position* seconds of replayed (source) time; skipped readings are not sent."""
+    session = _get_replay_session(session_id)
+    await session.seek(position)
+    return session.status()
+
+
+@router.post("/replay/{session_id}/speed", summary="Change replay speed")
+async def set_replay_speed(session_id: str, speed: float = Query(gt=0)):
+    session = _get_replay_session(session_id)
+    session.set_speed(speed)
+    return session.status()
+
+
+@router.delete("/replay/{session_id}", summary="Stop and remove a replay session")
+async def stop_replay_session(session_id: str):
+    session = _get_replay_session(session_id)
+    await session.stop()
+    _replay_sessions.pop(session_id, None)
+    return session.status()
@@ -1,16 +1,40 @@
-"""Fitbit data sync API routes — trigger and monitor data collection."""
+"""Fitbit data sync API routes — trigger and monitor data collection.
+
+Backfill endpoints
+~~~~~~~~~~~~~~~~~~
+* ``POST /sync/{participant_id}/backfill?start=&end=`` — onboard history
+  in one call: records a resumable job and runs it in the background.
+* ``GET /sync/{participant_id}/backfill`` — jobs and their progress.
+* ``POST /sync/{participant_id}/backfill/{job_id}/resume`` — restart a
+  failed or cancelled job after its last committed batch.
+* ``DELETE /sync/{participant_id}/backfill/{job_id}`` — cancel a running job.
+"""
 
 from __future__ import annotations
 
-from typing import Any
+import asyncio
+from datetime import date as date_type
+from typing import Annotated, Any
 
 import structlog
 from fastapi import APIRouter, BackgroundTasks, HTTPException, Query
 from pydantic import BaseModel
 
 from wearable_agent.collectors.fitbit import FitbitCollector
+from wearable_agent.collectors.fitbit_backfill import (
+    create_backfill,
+    job_dict,
+    resume_backfills,
+    run_backfill,
+)
+from wearable_agent.collectors.fitbit_tokens import (
+    FitbitToken,
+    ReauthorizationRequired,
+    get_token_manager,
+)
 from wearable_agent.models import MetricType
-from wearable_agent.storage.repository import ParticipantRepository, TokenRepository
+from wearable_agent.storage.database import get_session_factory
+from wearable_agent.storage.repository import BackfillJobRepository
 
 logger = structlog.get_logger(__name__)
 
@@ -20,6 +44,9 @@ router = APIRouter(prefix="/sync", tags=["sync"])
 _scheduler_service: Any = None
 _pipeline: Any = None
 
+# Running backfill tasks, by job id
+_active_backfills: dict[int, asyncio.Task] = {}
+
 
 def set_scheduler(scheduler: Any, pipeline: Any = None) -> None:
     """Wire the scheduler service into this router at startup."""
@@ -59,7 +86,7 @@ async def sync_participant(participant_id: str, req: SyncRequest | None = None):
 
 @router.post("", summary="Trigger sync for all participants")
 async def sync_all():
-    """Trigger an immediate data sync for all active participants."""
+    """Queue an immediate data sync for every scheduled participant."""
     if _scheduler_service is None:
         raise HTTPException(503, "Scheduler service not available.")
     result = await _scheduler_service.trigger_sync_all()
@@ -81,35 +108,150 @@ async def scheduler_status():
 @router.get("/devices/{participant_id}", summary="List participant's Fitbit devices")
 async def get_devices(participant_id: str):
     """List all Fitbit devices linked to a participant's account."""
-    token_repo = TokenRepository()
-    token_row = await token_repo.get(participant_id, "fitbit")
-    if token_row is None:
-        raise HTTPException(404, "No Fitbit tokens found for this participant.")
-
-    collector = FitbitCollector()
+    token = await _require_token(participant_id)
+    collector = FitbitCollector(token_manager=get_token_manager())
     try:
         await collector.authenticate(
-            access_token=token_row.access_token,
-            refresh_token=token_row.refresh_token,
+            access_token=token.access_token,
+            refresh_token=token.refresh_token,
+            participant_id=participant_id,
         )
         devices = await collector.get_devices()
     except Exception as exc:
-        raise HTTPException(502, f"Failed to fetch devices: {exc}")
+        raise HTTPException(502, f"Failed to fetch devices: {exc}") from None
     finally:
         await collector.close()
 
     return {"participant_id": participant_id, "devices": devices}
 
 
+# ── Backfill ─────────────────────────────────────────────────
+
+
+@router.post("/{participant_id}/backfill", status_code=202, summary="Backfill history")
+async def start_backfill(
+    participant_id: str,
+    start: Annotated[date_type, Query(description="First day (YYYY-MM-DD)")],
+    end: Annotated[date_type, Query(description="Last day (YYYY-MM-DD)")],
+    metrics: Annotated[
+        list[str] | None, Query(description="Defaults to the synced metrics")
+    ] = None,
+    intraday: Annotated[bool, Query(description="1-minute data where Fitbit offers it")] = True,
+):
+    """Fetch *start*..*end* of Fitbit history as a resumable background job."""
+    await _require_token(participant_id)
+    try:
+        selected = [MetricType(m) for m in metrics] if metrics else None
+        job = await create_backfill(participant_id, start, end, selected, intraday=intraday)
+    except ValueError as exc:
+        raise HTTPException(400, str(exc)) from None
+
+    _launch_backfill(job["id"])
+    return job
+
+
+@router.get("/{participant_id}/backfill", summary="List backfill jobs")
+async def list_backfills(participant_id: str):
+    """Return a participant's backfill jobs, newest first, with progress."""
+    rows = await BackfillJobRepository().list_for_participant(participant_id)
+    return {
+        "participant_id": participant_id,
+        "jobs": [{**job_dict(r), "in_progress": r.id in _active_backfills} for r in rows],
+    }
+
+
+@router.post(
+    "/{participant_id}/backfill/{job_id}/resume", status_code=202, summary="Resume a backfill"
+)
+async def resume_backfill(participant_id: str, job_id: int):
+    """Restart a failed or cancelled job from its last committed batch."""
+    async with get_session_factory()() as session:
+        jobs = BackfillJobRepository(session)
+        row = await jobs.get(job_id)
+        if row is None or row.participant_id != participant_id:
+            raise HTTPException(404, "Backfill job not found.")
+        if row.status == "completed" or job_id in _active_backfills:
+            raise HTTPException(409, f"Backfill job cannot be resumed (status: {row.status}).")
+        await _require_token(participant_id)
+        await jobs.set_status(job_id, "pending")
+        job = job_dict(row)
+    _launch_backfill(job_id)
+    return job
+
+
+@router.delete("/{participant_id}/backfill/{job_id}", summary="Cancel a backfill job")
+async def cancel_backfill(participant_id: str, job_id: int):
+    """Stop a running job; it keeps every batch committed so far."""
+    row = await BackfillJobRepository().get(job_id)
+    if row is None or row.participant_id != participant_id:
+        raise HTTPException(404, "Backfill job not found.")
+    task = _active_backfills.get(job_id)
+    if task is None:
+        raise HTTPException(409, f"Backfill job is not running (status: {row.status}).")
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    return {"id": job_id, "status": "cancelled"}
+
+
+async def _require_token(participant_id: str) -> FitbitToken:
+    """The participant's usable token (refreshed if due), or an HTTP error."""
+    try:
+        token = await get_token_manager().get(participant_id)
+    except ReauthorizationRequired:
+        raise HTTPException(
+            401, "Fitbit access was rejected. Link Fitbit again via /auth/fitbit."
+        ) from None
+    except Exception as exc:
+        raise HTTPException(502, f"Could not refresh Fitbit tokens: {exc}") from None
+    if token is None:
+        raise HTTPException(404, "No Fitbit tokens found. Link Fitbit first via /auth/fitbit.")
+    if token.expired:
+        raise HTTPException(401, "Fitbit tokens expired. Link Fitbit again via /auth/fitbit.")
+    return token
+
+
+def _launch_backfill(job_id: int) -> None:
+    """Run a job in the background on the scheduler's Fitbit pool if there is one."""
+    if job_id in _active_backfills:
+        return
+    client = _scheduler_service.http_client if _scheduler_service is not None else None
+    task = asyncio.create_task(_run_backfill_task(job_id, client))
+    _active_backfills[job_id] = task
+    task.add_done_callback(lambda _: _active_backfills.pop(job_id, None))
+
+
+async def _run_backfill_task(job_id: int, client: Any) -> None:
+    try:
+        await run_backfill(job_id, client=client)
+    except asyncio.CancelledError:
+        raise
+    except Exception as exc:
+        logger.error("sync.backfill_failed", job=job_id, error=str(exc))
+
+
+async def resume_interrupted_backfills() -> list[int]:
+    """Relaunch jobs a restart interrupted (called from the server lifespan)."""
+    return await resume_backfills(_launch_backfill)
+
+
+async def stop_backfills() -> None:
+    """Cancel running jobs at shutdown and mark them to resume on the next start."""
+    running = dict(_active_backfills)
+    for task in running.values():
+        task.cancel()
+    await asyncio.gather(*running.values(), return_exceptions=True)
+    async with get_session_factory()() as session:
+        jobs = BackfillJobRepository(session)
+        for job_id in running:
+            await jobs.set_status(job_id, "pending")
+
+
 # ── Direct sync fallback ─────────────────────────────────────
 
 
 async def _direct_sync(participant_id: str, req: SyncRequest | None = None) -> dict[str, Any]:
     """Perform a direct sync without the scheduler (for single-participant use)."""
-    token_repo = TokenRepository()
-    token_row = await token_repo.get(participant_id, "fitbit")
-    if token_row is None:
-        raise HTTPException(404, "No Fitbit tokens found. Link Fitbit first via /auth/fitbit.")
+    token = await _require_token(participant_id)
 
     metrics = [MetricType.HEART_RATE, MetricType.STEPS, MetricType.SLEEP]
     if req and req.metrics:
@@ -118,19 +260,20 @@ async def _direct_sync(participant_id: str, req: SyncRequest | None = None) -> d
             try:
                 metrics.append(MetricType(m))
             except ValueError:
-                raise HTTPException(400, f"Invalid metric: {m}")
+                raise HTTPException(400, f"Invalid metric: {m}") from None
 
-    collector = FitbitCollector()
+    collector = FitbitCollector(token_manager=get_token_manager())
     try:
         await collector.authenticate(
-            access_token=token_row.access_token,
-            refresh_token=token_row.refresh_token,
+            access_token=token.access_token,
+            refresh_token=token.refresh_token,
+            participant_id=participant_id,
         )
         readings = await collector.fetch(
             participant_id, metrics, date=req.date if req else None
         )
     except Exception as exc:
-        raise HTTPException(502, f"Fitbit sync failed: {exc}")
+        raise HTTPException(502, f"Fitbit sync failed: {exc}") from None
     finally:
         await collector.close()
 
@@ -151,8 +294,8 @@ async def _direct_sync(participant_id: str, req: SyncRequest | None = None) -> d
 @router.post("/stream/{participant_id}", summary="Start live Fitbit data stream")
 async def start_live_stream(
     participant_id: str,
+    background_tasks: BackgroundTasks,
     req: LiveStreamRequest | None = None,
-    background_tasks: BackgroundTasks = BackgroundTasks(),
 ):
     """Start streaming live Fitbit data for a participant.
 
@@ -163,14 +306,7 @@ async def start_live_stream(
     if _pipeline is None:
         raise HTTPException(status_code=503, detail="Pipeline service not available")
 
-    # Verify tokens exist
-    token_repo = TokenRepository()
-    token_row = await token_repo.get(participant_id, "fitbit")
-    if token_row is None:
-        raise HTTPException(
-            status_code=404,
-            detail="No Fitbit tokens found. Link Fitbit first via /auth/fitbit.",
-        )
+    await _require_token(participant_id)
 
     logger.info("sync.live_stream_scheduled", participant=participant_id)
     background_tasks.add_task(
@@ -216,23 +352,27 @@ async def _run_live_stream(
             except ValueError:
                 logger.warning("sync.live_stream_bad_metric", metric=m)
 
-    token_repo = TokenRepository()
+    tokens = get_token_manager()
     total_readings = 0
     rounds = 0
 
     try:
         while True:
             rounds += 1
-            token_row = await token_repo.get(participant_id, "fitbit")
-            if token_row is None:
+            try:
+                token = await tokens.get(participant_id)
+            except ReauthorizationRequired:
+                token = None
+            if token is None:
                 logger.error("sync.live_stream_no_token", participant=participant_id)
                 break
 
-            collector = FitbitCollector()
+            collector = FitbitCollector(token_manager=tokens)
             try:
                 await collector.authenticate(
-                    access_token=token_row.access_token,
-                    refresh_token=token_row.refresh_token,
+                    access_token=token.access_token,
+                    refresh_token=token.refresh_token,
+                    participant_id=participant_id,
                 )
                 readings = await collector.fetch(participant_id, metrics, date=date)
             except Exception as exc:
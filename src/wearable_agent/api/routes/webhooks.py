@@ -0,0 +1,90 @@
+"""Fitbit Subscriptions webhook — push-triggered, targeted syncs.
+
+Endpoints
+~~~~~~~~~
+* ``GET /fitbit/webhook?verify=...`` — subscriber verification: 204 when
+  the code matches ``FITBIT_WEBHOOK_VERIFICATION_CODE``, 404 otherwise.
+* ``POST /fitbit/webhook`` — change notifications.  The
+  ``X-Fitbit-Signature`` is checked against the raw body (404 when it does
+  not match, as Fitbit asks), then each notified participant is handed to
+  :meth:`SchedulerService.enqueue` for an incremental fetch of only the
+  changed collection.  Fitbit expects an answer within 5 s, so nothing is
+  fetched in the request itself.  A ``userRevokedAccess`` notification
+  deletes the participant's stored tokens and takes them off the
+  scheduler until they link Fitbit again.
+
+To try it locally, ``scripts/fitbit_webhook_standin.py`` posts signed
+notifications like Fitbit does.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import structlog
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+
+from wearable_agent.collectors.fitbit_subscriptions import (
+    SIGNATURE_HEADER,
+    parse_notifications,
+    verify_signature,
+)
+from wearable_agent.collectors.fitbit_tokens import get_token_manager
+from wearable_agent.config import get_settings
+
+logger = structlog.get_logger(__name__)
+
+router = APIRouter(prefix="/fitbit", tags=["fitbit"])
+
+# Module-level reference — set by server lifespan
+_scheduler_service: Any = None
+
+
+def set_scheduler(scheduler: Any) -> None:
+    """Wire the scheduler service into this router at startup."""
+    global _scheduler_service
+    _scheduler_service = scheduler
+
+
+@router.get("/webhook", status_code=204, summary="Fitbit subscriber verification")
+async def verify_subscriber(verify: str = Query(...)) -> Response:
+    """Answer Fitbit's verification request for the subscriber endpoint."""
+    expected = get_settings().fitbit_webhook_verification_code
+    if not expected or verify != expected:
+        raise HTTPException(404)
+    return Response(status_code=204)
+
+
+@router.post("/webhook", status_code=204, summary="Fitbit change notifications")
+async def receive_notifications(request: Request) -> Response:
+    """Verify a notification batch and enqueue targeted syncs."""
+    body = await request.body()
+    settings = get_settings()
+    if not verify_signature(body, request.headers.get(SIGNATURE_HEADER),
+                            settings.fitbit_client_secret):
+        logger.warning("fitbit_webhook.bad_signature")
+        raise HTTPException(404)
+
+    try:
+        changed, revoked = parse_notifications(body)
+    except ValueError:
+        raise HTTPException(400, "Body must be a JSON list of notifications.") from None
+
+    for participant_id in revoked:
+        await get_token_manager().revoke(participant_id)
+        if _scheduler_service is not None:
+            _scheduler_service.forget(participant_id)
+        changed.pop(participant_id, None)
+        logger.warning("fitbit_webhook.access_revoked", participant=participant_id)
+
+    if changed and _scheduler_service is None:
+        logger.warning("fitbit_webhook.no_scheduler", participants=len(changed))
+    elif changed:
+        for participant_id, metrics in changed.items():
+            _scheduler_service.enqueue(participant_id, metrics)
+        logger.info(
+            "fitbit_webhook.enqueued",
+            participants=len(changed),
+            metrics=sum(len(m) for m in changed.values()),
+        )
+    return Response(status_code=204)
@@ -15,6 +15,8 @@ import structlog
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 
+from wearable_agent.affect.ema import EMAScheduler
+from wearable_agent.affect.pipeline import AffectPipeline
 from wearable_agent.agent.core import WearableAgent
 from wearable_agent.api.auth import router as auth_router
 from wearable_agent.api.middleware import setup_middleware
@@ -22,19 +24,28 @@ from wearable_agent.api.routes.admin import router as admin_router
 from wearable_agent.api.routes.affect import router as affect_router
 from wearable_agent.api.routes.analysis import router as analysis_router
 from wearable_agent.api.routes.data import router as data_router
+from wearable_agent.api.routes.lifesnaps import router as lifesnaps_router
+from wearable_agent.api.routes.lifesnaps import set_pipeline as set_lifesnaps_pipeline
+from wearable_agent.api.routes.media import router as media_router
 from wearable_agent.api.routes.participants import router as participants_router
 from wearable_agent.api.routes.rules import router as rules_router
-from wearable_agent.api.routes.sync import router as sync_router, set_scheduler
-from wearable_agent.api.routes.lifesnaps import router as lifesnaps_router, set_pipeline as set_lifesnaps_pipeline
-from wearable_agent.api.routes.media import router as media_router
+from wearable_agent.api.routes.sync import (
+    resume_interrupted_backfills,
+    set_scheduler,
+    stop_backfills,
+)
+from wearable_agent.api.routes.sync import router as sync_router
+from wearable_agent.api.routes.webhooks import router as webhooks_router
+from wearable_agent.api.routes.webhooks import set_scheduler as set_webhook_scheduler
 from wearable_agent.api.websocket import ws_manager
-from wearable_agent.config import get_settings, _PROJECT_ROOT
+from wearable_agent.config import _PROJECT_ROOT, get_settings
 from wearable_agent.models import SensorReading
 from wearable_agent.monitors.heart_rate import create_heart_rate_engine
 from wearable_agent.monitors.rules import RuleEngine
 from wearable_agent.notifications.handlers import create_dispatcher
 from wearable_agent.scheduler.service import SchedulerService
-from wearable_agent.storage.database import init_db
+from wearable_agent.storage.database import init_db, is_postgres
+from wearable_agent.storage.partitions import PartitionMaintainer
 from wearable_agent.storage.repository import (
     AlertRepository,
     BaselineRepository,
@@ -43,9 +54,8 @@ from wearable_agent.storage.repository import (
     InferenceOutputRepository,
     ReadingRepository,
 )
-from wearable_agent.streaming.pipeline import StreamPipeline
-from wearable_agent.affect.ema import EMAScheduler
-from wearable_agent.affect.pipeline import AffectPipeline
+from wearable_agent.storage.tiering import ColdStorageTiering, get_cold_store
+from wearable_agent.streaming.pipeline import OverflowPolicy, StreamPipeline
 
 logger = structlog.get_logger(__name__)
 
@@ -71,6 +81,17 @@ async def lifespan(app: FastAPI):
     # 1. Database
     await init_db()
     logger.info("server.db_ready")
+    partition_maintainer: PartitionMaintainer | None = None
+    if is_postgres():
+        partition_maintainer = PartitionMaintainer()
+        await partition_maintainer.start()
+    cold_tiering: ColdStorageTiering | None = None
+    if settings.cold_storage_enabled:
+        if get_cold_store() is None:
+            logger.warning("server.cold_storage_unavailable", reason="pyarrow not installed")
+        else:
+            cold_tiering = ColdStorageTiering()
+            await cold_tiering.start()
 
     # 2. Monitoring engine
     _rule_engine = create_heart_rate_engine()
@@ -107,35 +128,24 @@ async def lifespan(app: FastAPI):
     )
 
     # 7. Streaming pipeline with WebSocket broadcasting
-    _pipeline = StreamPipeline()
-
-    async def _on_reading(reading: SensorReading) -> None:
-        """Pipeline consumer: persist, evaluate rules, and broadcast."""
-        await reading_repo.save(reading)
-        alerts = await _agent.process_reading(reading)  # type: ignore[union-attr]
+    _pipeline = StreamPipeline(
+        batch_size=settings.pipeline_batch_size,
+        batch_timeout_ms=settings.pipeline_batch_timeout_ms,
+        consumer_maxsize=settings.pipeline_consumer_queue_size,
+        drain_timeout=settings.pipeline_drain_timeout_seconds,
+    )
 
-        # Track inbound reading for admin stats
-        reading_payload = {
-            "id": reading.id,
-            "participant_id": reading.participant_id,
-            "metric_type": reading.metric_type.value,
-            "value": reading.value,
-            "unit": reading.unit,
-            "timestamp": reading.timestamp.isoformat(),
-        }
-        ws_manager.record_inbound(reading_payload)
+    async def _persist_batch(readings: list[SensorReading]) -> None:
+        """Pipeline batch consumer: persist a micro-batch in one transaction.
 
-        # Broadcast reading to WebSocket clients
-        await ws_manager.broadcast_reading({
-            "id": reading.id,
-            "participant_id": reading.participant_id,
-            "metric_type": reading.metric_type.value,
-            "value": reading.value,
-            "unit": reading.unit,
-            "timestamp": reading.timestamp.isoformat(),
-        })
+        Upserts, so a re-delivered reading (same deterministic id) keeps the
+        latest value — e.g. a Fitbit daily total re-synced later in the day.
+        """
+        await reading_repo.upsert_batch(readings)
 
-        # Broadcast any fired alerts
+    async def _evaluate(reading: SensorReading) -> None:
+        """Pipeline consumer: evaluate rules and broadcast fired alerts."""
+        alerts = await _agent.process_reading(reading)  # type: ignore[union-attr]
         for alert in alerts:
             await ws_manager.broadcast_alert({
                 "id": alert.id,
@@ -147,7 +157,24 @@ async def lifespan(app: FastAPI):
                 "timestamp": alert.timestamp.isoformat(),
             })
 
-    _pipeline.add_consumer(_on_reading)
+    async def _broadcast(reading: SensorReading) -> None:
+        """Pipeline consumer: track and broadcast the reading to WebSocket clients."""
+        reading_payload = {
+            "id": reading.id,
+            "participant_id": reading.participant_id,
+            "metric_type": reading.metric_type.value,
+            "value": reading.value,
+            "unit": reading.unit,
+            "timestamp": reading.timestamp.isoformat(),
+        }
+        ws_manager.record_inbound(reading_payload)
+        await ws_manager.broadcast_reading(reading_payload)
+
+    # Persistence and alerting are lossless; the live view may shed load
+    # so a slow dashboard can never throttle ingestion.
+    _pipeline.add_batch_consumer(_persist_batch, overflow=OverflowPolicy.BLOCK)
+    _pipeline.add_consumer(_evaluate, overflow=OverflowPolicy.BLOCK)
+    _pipeline.add_consumer(_broadcast, overflow=settings.pipeline_broadcast_overflow)
     _pipeline_task = asyncio.create_task(_pipeline.start())
 
     # 7b. Wire LifeSnaps streaming to pipeline
@@ -160,10 +187,15 @@ async def lifespan(app: FastAPI):
             affect_pipeline=_affect_pipeline,
         )
         set_scheduler(_scheduler_service, _pipeline)
+        set_webhook_scheduler(_scheduler_service)
         await _scheduler_service.start()
         logger.info("server.scheduler_started")
     else:
         set_scheduler(None, _pipeline)
+        set_webhook_scheduler(None)
+
+    # 8b. Resume Fitbit backfills a restart interrupted
+    await resume_interrupted_backfills()
 
     logger.info("server.started", port=settings.api_port)
 
@@ -171,6 +203,7 @@ async def lifespan(app: FastAPI):
     async def _fetch_lfs_data() -> None:
         """Download LFS pointer files from GitHub in background."""
         import subprocess
+
         from wearable_agent.config import _PROJECT_ROOT
 
         script = _PROJECT_ROOT / "scripts" / "fetch_lfs.py"
@@ -199,6 +232,11 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     _lfs_task.cancel()
+    if partition_maintainer:
+        await partition_maintainer.stop()
+    if cold_tiering:
+        await cold_tiering.stop()
+    await stop_backfills()  # before the scheduler closes their shared Fitbit pool
     if _scheduler_service:
         await _scheduler_service.stop()
     if _pipeline:
@@ -234,3 +272,4 @@ app.include_router(participants_router)
 app.include_router(sync_router)
 app.include_router(lifesnaps_router)
 app.include_router(media_router)
+app.include_router(webhooks_router)
@@ -12,17 +12,26 @@ from __future__ import annotations
 
 import asyncio
 import time
-from datetime import UTC, datetime
-from typing import Any
+from collections.abc import Mapping
+from datetime import UTC, date, datetime, timedelta
+from typing import TYPE_CHECKING, Any, NamedTuple
 
 import httpx
 import structlog
 
 from wearable_agent.collectors.base import BaseCollector
 from wearable_agent.collectors.fitbit_oauth import refresh_fitbit_token
-from wearable_agent.config import get_settings
+from wearable_agent.config import Settings, get_settings
 from wearable_agent.models import DeviceType, MetricType, SensorReading
 
+try:
+    import h2  # noqa: F401 — enables httpx's HTTP/2 transport
+except ImportError:
+    h2 = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from wearable_agent.collectors.fitbit_tokens import TokenManager
+
 logger = structlog.get_logger(__name__)
 
 
@@ -73,23 +82,89 @@ _RANGE_ENDPOINTS: dict[MetricType, str] = {
     MetricType.VO2_MAX: "/1/user/-/cardioscore/date/{start}/{end}.json",
 }
 
+# Longest span (days, inclusive) each range endpoint accepts in one request;
+# Fitbit rejects longer ranges with 400.
+_RANGE_MAX_DAYS: dict[MetricType, int] = {
+    MetricType.HEART_RATE: 365,
+    MetricType.STEPS: 1095,
+    MetricType.CALORIES: 1095,
+    MetricType.DISTANCE: 1095,
+    MetricType.FLOORS: 1095,
+    MetricType.SLEEP: 100,
+    MetricType.SPO2: 30,
+    MetricType.HRV: 30,
+    MetricType.SKIN_TEMPERATURE: 30,
+    MetricType.BREATHING_RATE: 30,
+    MetricType.BODY_WEIGHT: 31,
+    MetricType.BODY_FAT: 31,
+    MetricType.VO2_MAX: 30,
+}
+
+# Intraday time-range templates (1-minute detail) for incremental syncs.
+# {date} is YYYY-MM-DD, {start} and {end} are HH:MM on that date.
+_INTRADAY_ENDPOINTS: dict[MetricType, str] = {
+    MetricType.HEART_RATE: "/1/user/-/activities/heart/date/{date}/1d/1min/time/{start}/{end}.json",
+    MetricType.STEPS: "/1/user/-/activities/steps/date/{date}/1d/1min/time/{start}/{end}.json",
+    MetricType.CALORIES: (
+        "/1/user/-/activities/calories/date/{date}/1d/1min/time/{start}/{end}.json"
+    ),
+    MetricType.DISTANCE: (
+        "/1/user/-/activities/distance/date/{date}/1d/1min/time/{start}/{end}.json"
+    ),
+    MetricType.FLOORS: "/1/user/-/activities/floors/date/{date}/1d/1min/time/{start}/{end}.json",
+    MetricType.ACTIVE_ZONE_MINUTES: (
+        "/1/user/-/activities/active-zone-minutes/date/{date}/1d/1min/time/{start}/{end}.json"
+    ),
+}
+
+
+class _MetricRequest(NamedTuple):
+    """One endpoint GET of a (possibly concurrent) multi-metric fetch."""
+
+    metric: MetricType
+    url: str
+    date: str  # YYYY-MM-DD the response refers to (first day for ranges)
+    intraday: bool = False
+
 
 # ── Rate-limit tracker ────────────────────────────────────────
 
 
 class _RateLimiter:
-    """Track Fitbit rate-limit headers and enforce back-off.
+    """Token bucket over one user's Fitbit quota, shared by concurrent requests.
+
+    The bucket holds up to ``burst`` tokens and refills at
+    ``max_per_hour / 3600`` tokens per second.  :meth:`acquire` reserves a
+    token immediately — the balance may go negative — and sleeps for the
+    deficit, so concurrent callers are served in arrival order without a
+    lock.
 
-    Fitbit returns these headers on every response:
+    On top of the bucket, the server's hourly window is a hard cap.  Fitbit
+    returns these headers on every response:
       fitbit-rate-limit-limit       – requests allowed per hour
       fitbit-rate-limit-remaining   – requests remaining in window
       fitbit-rate-limit-reset       – seconds until the window resets
+
+    ``remaining`` is decremented locally per request and overwritten by the
+    headers; once it hits zero every caller waits for the reset.
     """
 
-    def __init__(self, max_per_hour: int = 150) -> None:
+    def __init__(self, max_per_hour: int = 150, *, burst: int | None = None) -> None:
         self.limit = max_per_hour
+        self.burst = float(min(burst or max_per_hour, max_per_hour))
+        self.tokens = self.burst
         self.remaining = max_per_hour
-        self.reset_at: float = 0.0  # epoch timestamp when window resets
+        self.reset_at: float = 0.0  # monotonic time when the window resets
+        self._refilled_at = time.monotonic()
+
+    @property
+    def rate(self) -> float:
+        """Refill rate in tokens per second."""
+        return self.limit / 3600.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
 
     def update(self, headers: httpx.Headers) -> None:
         """Update state from Fitbit response headers."""
@@ -100,12 +175,133 @@ class _RateLimiter:
         if "fitbit-rate-limit-reset" in headers:
             self.reset_at = time.monotonic() + int(headers["fitbit-rate-limit-reset"])
 
-    async def wait_if_needed(self) -> None:
-        """Sleep if we're close to the rate limit."""
-        if self.remaining <= 1 and self.reset_at > time.monotonic():
-            wait = self.reset_at - time.monotonic()
+    def exhaust(self, reset_seconds: float) -> None:
+        """Mark the window as used up (after a 429) until *reset_seconds* from now."""
+        self.remaining = 0
+        self.reset_at = time.monotonic() + reset_seconds
+
+    async def wait_for_budget(self, reserve: float) -> None:
+        """Sleep until more than *reserve* of the server window is left.
+
+        Lets background work (backfills) leave headroom for live syncs.
+        Without a known window (no response headers yet) it returns at once.
+        """
+        while self.reset_at and self.budget() <= reserve:
+            wait = max(self.reset_at - time.monotonic(), 0.0)
+            logger.info("fitbit.rate_limit_reserve", wait_seconds=round(wait, 1))
+            await asyncio.sleep(wait)
+
+    def budget(self) -> float:
+        """Fraction of the hourly window still available (1.0 after a reset)."""
+        if self.reset_at and time.monotonic() >= self.reset_at:
+            return 1.0
+        return max(self.remaining, 0) / self.limit
+
+    async def acquire(self) -> None:
+        """Take one request from the budget, sleeping until it is available."""
+        now = time.monotonic()
+        if self.reset_at and now >= self.reset_at:
+            # The server window rolled over; the next response corrects this.
+            self.remaining = self.limit
+            self.reset_at = 0.0
+        if self.remaining <= 0 and self.reset_at > now:
+            wait = self.reset_at - now
             logger.warning("fitbit.rate_limit_near", wait_seconds=round(wait, 1))
             await asyncio.sleep(wait)
+            return await self.acquire()
+
+        self._refill(now)
+        self.tokens -= 1
+        self.remaining -= 1
+        if self.tokens < 0:
+            wait = -self.tokens / self.rate
+            logger.debug("fitbit.rate_limit_throttle", wait_seconds=round(wait, 1))
+            await asyncio.sleep(wait)
+
+
+# One bucket per participant, shared by every collector fetching for them.
+_user_rate_limiters: dict[str, _RateLimiter] = {}
+
+
+def _rate_limiter_for(participant_id: str) -> _RateLimiter:
+    limiter = _user_rate_limiters.get(participant_id)
+    if limiter is None:
+        settings = get_settings()
+        limiter = _user_rate_limiters[participant_id] = _RateLimiter(
+            settings.fitbit_rate_limit_per_hour, burst=settings.fitbit_rate_limit_burst
+        )
+    return limiter
+
+
+def rate_budget(participant_id: str) -> float:
+    """Fraction of *participant_id*'s Fitbit hourly quota left (1.0 if unused)."""
+    limiter = _user_rate_limiters.get(participant_id)
+    return limiter.budget() if limiter is not None else 1.0
+
+
+async def wait_for_rate_budget(participant_id: str, reserve: float) -> None:
+    """Wait until more than *reserve* of *participant_id*'s hourly quota is left."""
+    await _rate_limiter_for(participant_id).wait_for_budget(reserve)
+
+
+def plan_range_requests(
+    metrics: list[MetricType], start: date, end: date, *, intraday: bool = False
+) -> list[_MetricRequest]:
+    """Split *start*..*end* (inclusive) into requests Fitbit accepts, oldest first.
+
+    Range endpoints are chunked to their maximum span (``_RANGE_MAX_DAYS``).
+    With *intraday*, metrics that have a 1-minute endpoint get one request
+    per day instead (Fitbit's intraday limit).  Metrics without a usable
+    endpoint are skipped with a warning.
+    """
+    keyed: list[tuple[date, int, _MetricRequest]] = []
+    for index, metric in enumerate(metrics):
+        if intraday and metric in _INTRADAY_ENDPOINTS:
+            template = _INTRADAY_ENDPOINTS[metric]
+            day = start
+            while day <= end:
+                url = template.format(date=day.isoformat(), start="00:00", end="23:59")
+                keyed.append((day, index, _MetricRequest(metric, url, day.isoformat(), True)))
+                day += timedelta(days=1)
+        elif metric in _RANGE_ENDPOINTS:
+            template = _RANGE_ENDPOINTS[metric]
+            span = timedelta(days=_RANGE_MAX_DAYS.get(metric, 30) - 1)
+            first = start
+            while first <= end:
+                last = min(first + span, end)
+                url = template.format(start=first.isoformat(), end=last.isoformat())
+                keyed.append((first, index, _MetricRequest(metric, url, first.isoformat())))
+                first = last + timedelta(days=1)
+        else:
+            logger.warning("fitbit_collector.no_range_endpoint", metric=metric.value)
+    keyed.sort(key=lambda item: item[:2])
+    return [request for _, _, request in keyed]
+
+
+# ── Shared connection pool ────────────────────────────────────
+
+
+def build_fitbit_client(settings: Settings | None = None) -> httpx.AsyncClient:
+    """Create a pooled Fitbit API client that collectors can borrow.
+
+    Carries no credentials — :class:`FitbitCollector` sends each user's
+    bearer token per request — so one client (and its keep-alive TLS
+    connections) serves every participant.  HTTP/2 is used when enabled
+    and ``h2`` is installed (``pip install -e ".[http2]"``).  Keep
+    ``fitbit_pool_keepalive_expiry`` above the scheduler interval, or idle
+    connections are dropped between cycles.
+    """
+    settings = settings or get_settings()
+    return httpx.AsyncClient(
+        base_url=settings.fitbit_api_base_url,
+        timeout=settings.fitbit_request_timeout,
+        http2=settings.fitbit_http2 and h2 is not None,
+        limits=httpx.Limits(
+            max_connections=settings.fitbit_pool_max_connections,
+            max_keepalive_connections=settings.fitbit_pool_max_keepalive,
+            keepalive_expiry=settings.fitbit_pool_keepalive_expiry,
+        ),
+    )
 
 
 # ── Collector ─────────────────────────────────────────────────
@@ -116,32 +312,52 @@ class FitbitCollector(BaseCollector):
 
     Supports the full OAuth 2.0 Authorization Code Grant flow including
     automatic token refresh, per-user rate-limit tracking, and parsers
-    for every metric type in the Fitbit API.
+    for every metric type in the Fitbit API.  A participant's metrics are
+    fetched concurrently (up to ``fitbit_max_concurrent_requests``) on one
+    pooled client, drawing on that participant's shared rate-limit bucket.
 
     Usage::
 
         collector = FitbitCollector()
         await collector.authenticate(access_token="...", refresh_token="...")
         readings = await collector.fetch("P001", [MetricType.HEART_RATE])
+
+    Pass ``client`` (see :func:`build_fitbit_client`) to borrow a shared
+    pool instead of opening one per collector; :meth:`close` then leaves
+    it open.  With ``token_manager`` (and ``participant_id`` passed to
+    :meth:`authenticate`) a 401 refresh goes through the manager, which
+    persists the new pair and never refreshes a participant twice at once.
     """
 
     device_type = DeviceType.FITBIT
 
-    def __init__(self) -> None:
-        self._client: httpx.AsyncClient | None = None
+    def __init__(
+        self,
+        client: httpx.AsyncClient | None = None,
+        *,
+        token_manager: TokenManager | None = None,
+    ) -> None:
+        self._client: httpx.AsyncClient | None = client
+        self._owns_client = client is None
+        self._token_manager = token_manager
+        self._participant_id: str = ""
         self._access_token: str = ""
         self._refresh_token: str = ""
         self._rate_limiter = _RateLimiter()
+        self._refresh_lock = asyncio.Lock()
+        self._max_concurrency = get_settings().fitbit_max_concurrent_requests
 
     # ── Auth ──────────────────────────────────────────────────
 
     async def authenticate(self, **credentials: str) -> None:  # type: ignore[override]
-        """Store the OAuth 2.0 tokens and create an HTTP client.
+        """Store the OAuth 2.0 tokens (and create an HTTP client unless one was lent).
 
         Required keyword: ``access_token``.
-        Optional keyword: ``refresh_token`` (enables automatic renewal).
+        Optional keywords: ``refresh_token`` (enables automatic renewal),
+        ``participant_id`` (whose tokens the token manager refreshes).
         """
         settings = get_settings()
+        self._participant_id = credentials.get("participant_id", "")
         self._access_token = credentials.get("access_token") or settings.fitbit_access_token
         self._refresh_token = credentials.get("refresh_token") or settings.fitbit_refresh_token
 
@@ -150,23 +366,32 @@ class FitbitCollector(BaseCollector):
                 "No access_token provided via argument or FITBIT_ACCESS_TOKEN env var."
             )
 
-        self._rate_limiter = _RateLimiter(settings.fitbit_rate_limit_per_hour)
-        self._client = httpx.AsyncClient(
-            base_url=settings.fitbit_api_base_url,
-            headers={"Authorization": f"Bearer {self._access_token}"},
-            timeout=settings.fitbit_request_timeout,
+        self._rate_limiter = _RateLimiter(
+            settings.fitbit_rate_limit_per_hour, burst=settings.fitbit_rate_limit_burst
         )
+        if self._client is None:
+            self._client = build_fitbit_client(settings)
+            self._owns_client = True
         logger.info("fitbit_collector.authenticated")
 
     async def refresh_access_token(self) -> str:
         """Exchange the refresh token for a new access/refresh token pair.
 
-        Uses the shared :func:`refresh_fitbit_token` helper.  After the
-        HTTP exchange, updates instance state and re-creates the HTTP
-        client with the new bearer token.
+        Goes through the token manager when one was given, otherwise uses
+        the shared :func:`refresh_fitbit_token` helper.  After the
+        exchange, updates instance state; the next request carries the new
+        bearer token on the same pooled client.
 
         Returns the new access token.
         """
+        if self._token_manager is not None and self._participant_id:
+            token = await self._token_manager.refresh(
+                self._participant_id, stale=self._access_token
+            )
+            self._access_token = token.access_token
+            self._refresh_token = token.refresh_token
+            return self._access_token
+
         if not self._refresh_token:
             raise RuntimeError("No refresh_token available — cannot renew.")
 
@@ -180,49 +405,53 @@ class FitbitCollector(BaseCollector):
 
         self._access_token = body["access_token"]
         self._refresh_token = body.get("refresh_token", self._refresh_token)
-
-        # Re-create the HTTP client with the new token
-        if self._client:
-            await self._client.aclose()
-        self._client = httpx.AsyncClient(
-            base_url=settings.fitbit_api_base_url,
-            headers={"Authorization": f"Bearer {self._access_token}"},
-            timeout=settings.fitbit_request_timeout,
-        )
         logger.info("fitbit_collector.token_refreshed")
         return self._access_token
 
     # ── Internal request wrapper ──────────────────────────────
 
-    async def _request(self, url: str) -> dict[str, Any]:
-        """GET a Fitbit endpoint with rate-limit tracking and auto-refresh.
+    def _auth_headers(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self._access_token}"}
+
+    async def _request(self, url: str, method: str = "GET") -> dict[str, Any]:
+        """Call a Fitbit endpoint with rate-limit tracking and auto-refresh.
 
         Handles:
           - 429 Too Many Requests → wait for rate-limit reset, retry once
           - 401 Unauthorized      → attempt token refresh, retry once
+
+        Safe to call concurrently: every attempt takes a token from the
+        shared bucket, and concurrent 401s trigger a single refresh
+        (Fitbit refresh tokens are single-use).
         """
         if self._client is None:
             raise RuntimeError("Call authenticate() before making requests.")
 
-        await self._rate_limiter.wait_if_needed()
-
-        resp = await self._client.get(url)
-        self._rate_limiter.update(resp.headers)
+        limiter = self._rate_limiter
+        await limiter.acquire()
+        token = self._access_token
+        resp = await self._client.request(method, url, headers=self._auth_headers())
+        limiter.update(resp.headers)
 
-        # Handle 429 — rate limited
+        # Handle 429 — rate limited; everyone sharing the bucket waits
         if resp.status_code == 429:
             reset = int(resp.headers.get("fitbit-rate-limit-reset", "60"))
             logger.warning("fitbit.rate_limited", retry_after=reset)
-            await asyncio.sleep(reset)
-            resp = await self._client.get(url)
-            self._rate_limiter.update(resp.headers)
+            limiter.exhaust(reset)
+            await limiter.acquire()
+            token = self._access_token
+            resp = await self._client.request(method, url, headers=self._auth_headers())
+            limiter.update(resp.headers)
 
         # Handle 401 — token expired
         if resp.status_code == 401 and self._refresh_token:
-            logger.info("fitbit.token_expired_refreshing")
-            await self.refresh_access_token()
-            resp = await self._client.get(url)
-            self._rate_limiter.update(resp.headers)
+            async with self._refresh_lock:
+                if self._access_token == token:
+                    logger.info("fitbit.token_expired_refreshing")
+                    await self.refresh_access_token()
+            await limiter.acquire()
+            resp = await self._client.request(method, url, headers=self._auth_headers())
+            limiter.update(resp.headers)
 
         resp.raise_for_status()
         return resp.json()
@@ -238,17 +467,16 @@ class FitbitCollector(BaseCollector):
     ) -> list[SensorReading]:
         """Fetch readings for one date across one or more metric types."""
         target_date = date or datetime.now(UTC).strftime("%Y-%m-%d")
-        readings: list[SensorReading] = []
+        requests: list[_MetricRequest] = []
 
         for metric in metrics:
             endpoint = _ENDPOINTS.get(metric)
             if endpoint is None:
                 logger.warning("fitbit_collector.unsupported_metric", metric=metric.value)
                 continue
+            requests.append(_MetricRequest(metric, endpoint.format(date=target_date), target_date))
 
-            url = endpoint.format(date=target_date)
-            data = await self._request(url)
-            readings.extend(self._parse(participant_id, metric, data, target_date))
+        readings = await self._fetch_all(participant_id, requests)
 
         logger.info(
             "fitbit_collector.fetched",
@@ -269,22 +497,19 @@ class FitbitCollector(BaseCollector):
     ) -> list[SensorReading]:
         """Fetch readings for a date range across one or more metric types.
 
+        Long ranges are split into chunks each endpoint accepts (see
+        :func:`plan_range_requests`); for months of history use a backfill
+        job (:mod:`~wearable_agent.collectors.fitbit_backfill`) instead.
+
         Parameters
         ----------
         start_date, end_date:
             ISO date strings (``YYYY-MM-DD``).
         """
-        readings: list[SensorReading] = []
-
-        for metric in metrics:
-            endpoint = _RANGE_ENDPOINTS.get(metric)
-            if endpoint is None:
-                logger.warning("fitbit_collector.no_range_endpoint", metric=metric.value)
-                continue
-
-            url = endpoint.format(start=start_date, end=end_date)
-            data = await self._request(url)
-            readings.extend(self._parse(participant_id, metric, data, start_date))
+        requests = plan_range_requests(
+            metrics, date.fromisoformat(start_date), date.fromisoformat(end_date)
+        )
+        readings = await self._fetch_all(participant_id, requests)
 
         logger.info(
             "fitbit_collector.fetched_range",
@@ -295,6 +520,93 @@ class FitbitCollector(BaseCollector):
         )
         return readings
 
+    # ── Incremental fetch ─────────────────────────────────────
+
+    async def fetch_since(
+        self,
+        participant_id: str,
+        metrics: list[MetricType],
+        cursors: Mapping[MetricType, datetime],
+        *,
+        today: date | None = None,
+    ) -> list[SensorReading]:
+        """Re-fetch every day from each metric's cursor day up to *today*.
+
+        Intraday metrics (heart rate, steps, calories, distance, floors,
+        active zone minutes) use the ``1d/1min/time/00:00/23:59`` endpoints,
+        one request per day, and return the daily totals as well as the
+        minutes.  Other metrics use the date-range endpoint from the
+        cursor's day.  Without a cursor only *today* is fetched, and
+        catch-up after a gap reaches back at most
+        ``fitbit_sync_max_catchup_days``.
+
+        Whole days are fetched again rather than filtered on the cursor:
+        Fitbit zero-fills minutes until the device uploads, and revises
+        daily totals and summaries during the day.  Re-delivered readings
+        keep their id (:func:`~wearable_agent.models.reading_id`), so the
+        caller's upsert stores only what changed.
+        """
+        today = today or datetime.now(UTC).date()
+        oldest = today - timedelta(days=get_settings().fitbit_sync_max_catchup_days)
+        requests: list[_MetricRequest] = []
+
+        for metric in metrics:
+            cursor = cursors.get(metric)
+            first_day = min(max(cursor.date(), oldest), today) if cursor is not None else today
+            if metric in _INTRADAY_ENDPOINTS or first_day < today:
+                requests.extend(plan_range_requests([metric], first_day, today, intraday=True))
+            elif metric in _ENDPOINTS:
+                url = _ENDPOINTS[metric].format(date=today.isoformat())
+                requests.append(_MetricRequest(metric, url, today.isoformat()))
+            else:
+                logger.warning("fitbit_collector.unsupported_metric", metric=metric.value)
+
+        readings = await self._fetch_all(participant_id, requests)
+        logger.info(
+            "fitbit_collector.fetched_since",
+            participant=participant_id,
+            requests=len(requests),
+            count=len(readings),
+        )
+        return readings
+
+    async def fetch_planned(
+        self, participant_id: str, requests: list[_MetricRequest]
+    ) -> list[SensorReading]:
+        """Fetch requests from :func:`plan_range_requests` (concurrently, rate-limited)."""
+        return await self._fetch_all(participant_id, requests)
+
+    # ── Concurrent fan-out ────────────────────────────────────
+
+    async def _fetch_all(
+        self, participant_id: str, requests: list[_MetricRequest]
+    ) -> list[SensorReading]:
+        """GET every request concurrently and parse the responses in request order.
+
+        At most ``fitbit_max_concurrent_requests`` are in flight; all of
+        them draw on the participant's shared rate-limit bucket.  The first
+        failure cancels the remaining requests and is re-raised.
+        """
+        self._rate_limiter = _rate_limiter_for(participant_id)
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def _one(req: _MetricRequest) -> list[SensorReading]:
+            async with semaphore:
+                data = await self._request(req.url)
+            if req.intraday:
+                return self._parse_intraday(participant_id, req.metric, data, req.date)
+            return self._parse(participant_id, req.metric, data, req.date)
+
+        tasks = [asyncio.create_task(_one(req)) for req in requests]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        return [reading for batch in results for reading in batch]
+
     # ── Device info ───────────────────────────────────────────
 
     async def get_devices(self) -> list[dict[str, Any]]:
@@ -304,6 +616,22 @@ class FitbitCollector(BaseCollector):
         """
         return await self._request("/1/user/-/devices.json")  # type: ignore[return-value]
 
+    async def subscribe(
+        self, subscription_id: str, collection: str | None = None
+    ) -> dict[str, Any]:
+        """Subscribe to change notifications for the user's data.
+
+        POST /1/user/-/[collection/]apiSubscriptions/{subscription_id}.json
+
+        Use the participant id as *subscription_id*: it is echoed back in
+        every notification (see :mod:`~wearable_agent.collectors.fitbit_subscriptions`).
+        Without *collection* all collections are subscribed.
+        """
+        prefix = f"/1/user/-/{collection}" if collection else "/1/user/-"
+        return await self._request(
+            f"{prefix}/apiSubscriptions/{subscription_id}.json", method="POST"
+        )
+
     # ── Parsers ───────────────────────────────────────────────
 
     def _parse(
@@ -327,6 +655,58 @@ class FitbitCollector(BaseCollector):
         logger.warning("fitbit_collector.no_parser", metric=metric.value)
         return []
 
+    def _parse_intraday(
+        self,
+        participant_id: str,
+        metric: MetricType,
+        data: dict[str, Any],
+        date_str: str,
+    ) -> list[SensorReading]:
+        """Parse a 1-minute intraday response into per-minute readings.
+
+        The daily total in the same response (heart rate: the resting-HR
+        summary) is kept too, typed ``"daily"`` by its parser spec.
+        """
+        if metric is MetricType.HEART_RATE:
+            return self._parse_heart_rate(participant_id, data, date_str)
+
+        readings = self._parse(participant_id, metric, data, date_str)
+        if metric is MetricType.ACTIVE_ZONE_MINUTES:
+            # [{"dateTime": …, "minutes": [{"minute": ISO, "value": {…}}]}]
+            for day in data.get("activities-active-zone-minutes-intraday", []):
+                for point in day.get("minutes", []):
+                    value = point.get("value", {})
+                    readings.append(
+                        SensorReading(
+                            participant_id=participant_id,
+                            device_type=DeviceType.FITBIT,
+                            metric_type=metric,
+                            value=float(value.get("activeZoneMinutes", 0)),
+                            unit="minutes",
+                            timestamp=datetime.fromisoformat(point["minute"]),
+                            metadata={**_azm_metadata(point), "source": "live"},
+                        )
+                    )
+            return readings
+
+        spec = _SIMPLE_PARSERS[metric]
+        for point in data.get(f"{spec.data_key}-intraday", {}).get("dataset", []):
+            # Calories carry "level" / "mets" next to time and value.
+            meta = {k: v for k, v in point.items() if k not in ("time", "value")}
+            meta["source"] = "live"
+            readings.append(
+                SensorReading(
+                    participant_id=participant_id,
+                    device_type=DeviceType.FITBIT,
+                    metric_type=metric,
+                    value=float(point["value"]),
+                    unit=spec.unit,
+                    timestamp=datetime.fromisoformat(f"{date_str}T{point['time']}"),
+                    metadata=meta,
+                )
+            )
+        return readings
+
     # ── Generic simple-timeseries parser ──────────────────────
 
     @staticmethod
@@ -378,6 +758,8 @@ class FitbitCollector(BaseCollector):
             if spec.metadata_extractor is not None:
                 meta = spec.metadata_extractor(entry)
             meta["source"] = "live"  # Add source tag
+            if spec.subtype:
+                meta["type"] = spec.subtype
 
             readings.append(
                 SensorReading(
@@ -410,6 +792,7 @@ class FitbitCollector(BaseCollector):
                     value=float(point["value"]),
                     unit="bpm",
                     timestamp=ts,
+                    metadata={"source": "live"},
                 )
             )
 
@@ -510,9 +893,10 @@ class FitbitCollector(BaseCollector):
     # ── Lifecycle ─────────────────────────────────────────────
 
     async def close(self) -> None:
-        if self._client:
+        """Release the HTTP client; a borrowed shared pool stays open."""
+        if self._client and self._owns_client:
             await self._client.aclose()
-            self._client = None
+        self._client = None
 
 
 # ── Simple parser descriptors ────────────────────────────────
@@ -543,6 +927,10 @@ class _SimpleParserSpec:
     ts_from_date_time_keys: bool = False
     # Optional callable to extract metadata from each entry dict.
     metadata_extractor: Callable[[dict[str, Any]], dict[str, Any]] | None = None
+    # metadata["type"] of every reading.  Daily totals of metrics that also
+    # have an intraday series are "daily": both are stamped 00:00, and the
+    # type keeps the total's reading id apart from the 00:00 minute's.
+    subtype: str | None = None
 
 
 def _azm_metadata(entry: dict[str, Any]) -> dict[str, Any]:
@@ -563,21 +951,25 @@ _SIMPLE_PARSERS: dict[MetricType, _SimpleParserSpec] = {
         metric_type=MetricType.STEPS,
         data_key="activities-steps",
         unit="steps",
+        subtype="daily",
     ),
     MetricType.CALORIES: _SimpleParserSpec(
         metric_type=MetricType.CALORIES,
         data_key="activities-calories",
         unit="kcal",
+        subtype="daily",
     ),
     MetricType.DISTANCE: _SimpleParserSpec(
         metric_type=MetricType.DISTANCE,
         data_key="activities-distance",
         unit="km",
+        subtype="daily",
     ),
     MetricType.FLOORS: _SimpleParserSpec(
         metric_type=MetricType.FLOORS,
         data_key="activities-floors",
         unit="floors",
+        subtype="daily",
     ),
     # ── Nested-value timeseries ────────────────────────────
     MetricType.HRV: _SimpleParserSpec(
@@ -627,6 +1019,7 @@ _SIMPLE_PARSERS: dict[MetricType, _SimpleParserSpec] = {
         unit="minutes",
         value_path=("value", "activeZoneMinutes"),
         metadata_extractor=_azm_metadata,
+        subtype="daily",
     ),
 }
 
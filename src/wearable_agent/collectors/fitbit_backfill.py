@@ -0,0 +1,230 @@
+"""Resumable Fitbit history backfill (onboarding months of data in one call).
+
+A backfill job covers ``start_date``..``end_date`` for a list of metrics.
+The span is split into requests Fitbit accepts
+(:func:`~wearable_agent.collectors.fitbit.plan_range_requests`): one
+request per day for 1-minute intraday data, range endpoints chunked to
+their maximum span (e.g. 100 days of sleep, 30 days of SpO₂)::
+
+    job = await create_backfill("P001", date(2026, 1, 1), date(2026, 6, 30))
+    await run_backfill(job["id"])
+
+Requests are fetched in batches of ``fitbit_backfill_batch_requests`` on
+the participant's shared rate-limit bucket; before each batch the job
+waits while less than ``fitbit_backfill_rate_reserve`` of the hourly quota
+is left, so live syncs keep their headroom.  Each batch's readings are
+upserted and the job's ``position`` advanced in one transaction, so a job
+that fails, is cancelled or dies with the process resumes exactly after
+the last committed batch (:func:`resume_backfills` on startup for
+interrupted jobs, ``POST …/backfill/{job_id}/resume`` for failed or
+cancelled ones).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Callable
+from datetime import date
+from typing import Any
+
+import httpx
+import structlog
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from wearable_agent.collectors.fitbit import (
+    FitbitCollector,
+    plan_range_requests,
+    wait_for_rate_budget,
+)
+from wearable_agent.collectors.fitbit_tokens import TokenManager, get_token_manager
+from wearable_agent.config import get_settings
+from wearable_agent.models import MetricType
+from wearable_agent.storage.database import get_session_factory
+from wearable_agent.storage.repository import BackfillJobRepository, ReadingRepository
+
+logger = structlog.get_logger(__name__)
+
+DEFAULT_METRICS = [
+    MetricType.HEART_RATE,
+    MetricType.STEPS,
+    MetricType.CALORIES,
+    MetricType.DISTANCE,
+    MetricType.FLOORS,
+    MetricType.ACTIVE_ZONE_MINUTES,
+    MetricType.SLEEP,
+    MetricType.SPO2,
+    MetricType.HRV,
+    MetricType.SKIN_TEMPERATURE,
+    MetricType.BREATHING_RATE,
+]
+
+_PROGRESS_LOG_SECONDS = 10.0
+
+
+def job_dict(row: Any) -> dict[str, Any]:
+    """A ``backfill_jobs`` row as a JSON-ready progress report."""
+    return {
+        "id": row.id,
+        "participant_id": row.participant_id,
+        "start": row.start_date,
+        "end": row.end_date,
+        "metrics": [m for m in row.metrics.split(",") if m],
+        "intraday": row.intraday,
+        "status": row.status,
+        "position": row.position,
+        "total": row.total,
+        "inserted": row.inserted,
+        "percent": round(100 * row.position / row.total, 1) if row.total else 0.0,
+        "error": row.error,
+        "created_at": row.created_at,
+        "updated_at": row.updated_at,
+    }
+
+
+async def create_backfill(
+    participant_id: str,
+    start: date,
+    end: date,
+    metrics: list[MetricType] | None = None,
+    *,
+    intraday: bool = True,
+    session_factory: async_sessionmaker[AsyncSession] | None = None,
+) -> dict[str, Any]:
+    """Record a new backfill job (not started); returns its progress report.
+
+    Raises ``ValueError`` for an empty, future or over-long range.
+    """
+    max_days = get_settings().fitbit_backfill_max_days
+    if end < start:
+        raise ValueError("end must not be before start")
+    if end > date.today():
+        raise ValueError("end must not be in the future")
+    if (end - start).days + 1 > max_days:
+        raise ValueError(f"A backfill covers at most {max_days} days")
+
+    metrics = metrics or DEFAULT_METRICS
+    total = len(plan_range_requests(metrics, start, end, intraday=intraday))
+    factory = session_factory or get_session_factory()
+    async with factory() as session:
+        row = await BackfillJobRepository(session).create(
+            participant_id, start.isoformat(), end.isoformat(), metrics,
+            intraday=intraday, total=total,
+        )
+        logger.info("fitbit_backfill.created", participant=participant_id, job=row.id,
+                    start=row.start_date, end=row.end_date, requests=total)
+        return job_dict(row)
+
+
+async def run_backfill(
+    job_id: int,
+    *,
+    client: httpx.AsyncClient | None = None,
+    token_manager: TokenManager | None = None,
+    session_factory: async_sessionmaker[AsyncSession] | None = None,
+    batch_size: int | None = None,
+    on_progress: Callable[[dict[str, Any]], None] | None = None,
+) -> dict[str, Any]:
+    """Run (or resume) a backfill job until it completes.
+
+    Parameters
+    ----------
+    client:
+        Shared Fitbit pool to borrow (e.g. the scheduler's); a private one
+        is opened otherwise.
+    on_progress:
+        Called with the progress report after every committed batch.
+
+    Returns the final progress report.  Raises :class:`LookupError` for an
+    unknown job or a participant without Fitbit tokens; cancellation
+    leaves the job at the last committed batch with status ``cancelled``.
+    """
+    settings = get_settings()
+    factory = session_factory or get_session_factory()
+    batch_size = batch_size or settings.fitbit_backfill_batch_requests
+    tokens = token_manager or get_token_manager()
+
+    async with factory() as session:
+        jobs = BackfillJobRepository(session)
+        readings = ReadingRepository(session)
+
+        row = await jobs.get(job_id)
+        if row is None:
+            raise LookupError(f"No backfill job {job_id}")
+        if row.status == "completed":
+            return job_dict(row)
+        participant_id = row.participant_id
+
+        token = await tokens.get(participant_id)
+        if token is None:
+            await jobs.set_status(job_id, "failed", "No Fitbit tokens for this participant")
+            raise LookupError(f"No Fitbit tokens for participant {participant_id}")
+
+        requests = plan_range_requests(
+            [MetricType(m) for m in row.metrics.split(",") if m],
+            date.fromisoformat(row.start_date),
+            date.fromisoformat(row.end_date),
+            intraday=row.intraday,
+        )
+        collector = FitbitCollector(client=client, token_manager=tokens)
+        await collector.authenticate(
+            access_token=token.access_token,
+            refresh_token=token.refresh_token,
+            participant_id=participant_id,
+        )
+        await jobs.set_status(job_id, "running")
+        logger.info("fitbit_backfill.start", participant=participant_id, job=job_id,
+                    resume_from=row.position, total=len(requests))
+
+        t0 = last_log = time.monotonic()
+        try:
+            while row.position < len(requests):
+                await wait_for_rate_budget(participant_id, settings.fitbit_backfill_rate_reserve)
+                batch = requests[row.position:row.position + batch_size]
+                fetched = await collector.fetch_planned(participant_id, batch)
+                inserted = await readings.upsert_batch(fetched, commit=False)
+                await jobs.advance(job_id, len(batch), inserted)
+                if on_progress is not None:
+                    on_progress(job_dict(row))
+                now = time.monotonic()
+                if now - last_log >= _PROGRESS_LOG_SECONDS:
+                    logger.info("fitbit_backfill.progress", participant=participant_id,
+                                job=job_id, position=row.position, total=len(requests))
+                    last_log = now
+        except asyncio.CancelledError:
+            await session.rollback()
+            await jobs.set_status(job_id, "cancelled")
+            logger.info("fitbit_backfill.cancelled", job=job_id, position=row.position)
+            raise
+        except Exception as exc:
+            await session.rollback()
+            await jobs.set_status(job_id, "failed", str(exc))
+            raise
+        finally:
+            await collector.close()
+
+        await jobs.set_status(job_id, "completed")
+        logger.info(
+            "fitbit_backfill.complete",
+            participant=participant_id,
+            job=job_id,
+            inserted=row.inserted,
+            seconds=round(time.monotonic() - t0, 2),
+        )
+        return job_dict(row)
+
+
+async def resume_backfills(
+    start: Callable[[int], Any],
+    *,
+    session_factory: async_sessionmaker[AsyncSession] | None = None,
+) -> list[int]:
+    """Call *start* with the id of every job a restart interrupted."""
+    factory = session_factory or get_session_factory()
+    async with factory() as session:
+        ids = [row.id for row in await BackfillJobRepository(session).list_unfinished()]
+    for job_id in ids:
+        start(job_id)
+    if ids:
+        logger.info("fitbit_backfill.resumed", jobs=ids)
+    return ids
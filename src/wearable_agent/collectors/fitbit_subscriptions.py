@@ -0,0 +1,91 @@
+"""Fitbit Subscriptions API — webhook signatures and notification parsing.
+
+With a subscription, Fitbit POSTs a small JSON list to the subscriber
+endpoint whenever a user's data changes, instead of the scheduler having
+to poll for it::
+
+    [{"collectionType": "activities", "date": "2026-01-05",
+      "ownerId": "ABC123", "ownerType": "user", "subscriptionId": "P001"}]
+
+Subscriptions are created with the participant id as ``subscriptionId``
+(:meth:`FitbitCollector.subscribe`), so a notification maps straight to a
+participant.  Each request carries ``X-Fitbit-Signature``: the base64
+HMAC-SHA1 of the raw body keyed with ``client_secret + "&"``.
+
+See: https://dev.fitbit.com/build/reference/web-api/developer-guide/using-subscriptions/
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+from typing import Any
+
+import structlog
+
+from wearable_agent.models import MetricType
+
+logger = structlog.get_logger(__name__)
+
+SIGNATURE_HEADER = "X-Fitbit-Signature"
+
+# Subscription collection → the metrics a targeted sync re-fetches.
+COLLECTION_METRICS: dict[str, list[MetricType]] = {
+    "activities": [
+        MetricType.HEART_RATE,
+        MetricType.STEPS,
+        MetricType.CALORIES,
+        MetricType.DISTANCE,
+        MetricType.FLOORS,
+        MetricType.ACTIVE_ZONE_MINUTES,
+    ],
+    "sleep": [MetricType.SLEEP],
+    "body": [MetricType.BODY_WEIGHT, MetricType.BODY_FAT],
+}
+
+REVOKED_COLLECTION = "userRevokedAccess"
+
+
+def sign(body: bytes, client_secret: str) -> str:
+    """The ``X-Fitbit-Signature`` value Fitbit sends with *body*."""
+    digest = hmac.new(f"{client_secret}&".encode(), body, hashlib.sha1).digest()
+    return base64.b64encode(digest).decode()
+
+
+def verify_signature(body: bytes, signature: str | None, client_secret: str) -> bool:
+    """Whether *signature* is Fitbit's signature of *body* (constant-time)."""
+    if not signature or not client_secret:
+        return False
+    return hmac.compare_digest(sign(body, client_secret), signature)
+
+
+def parse_notifications(body: bytes) -> tuple[dict[str, set[MetricType]], set[str]]:
+    """Group a notification list by participant.
+
+    Returns ``(changed, revoked)``: the metrics to re-fetch per participant,
+    and the participants who revoked access.  Unknown collections (e.g.
+    ``foods``) and malformed entries are skipped.  Raises ``ValueError``
+    when the body is not a JSON list.
+    """
+    payload: Any = json.loads(body)
+    if not isinstance(payload, list):
+        raise ValueError("Fitbit notifications must be a JSON list")
+
+    changed: dict[str, set[MetricType]] = {}
+    revoked: set[str] = set()
+    for note in payload:
+        if not isinstance(note, dict):
+            continue
+        participant_id = note.get("subscriptionId")
+        collection = note.get("collectionType")
+        if not participant_id:
+            continue
+        if collection == REVOKED_COLLECTION:
+            revoked.add(participant_id)
+        elif collection in COLLECTION_METRICS:
+            changed.setdefault(participant_id, set()).update(COLLECTION_METRICS[collection])
+        else:
+            logger.debug("fitbit_webhook.ignored_collection", collection=collection)
+    return changed, revoked
@@ -0,0 +1,352 @@
+"""In-memory Fitbit token cache with proactive, single-flight refresh.
+
+Fitbit access tokens live for eight hours and refresh tokens are
+single-use: two concurrent refreshes for the same participant leave one
+caller holding a revoked pair.  :class:`TokenManager` is the one place
+tokens are refreshed:
+
+* :meth:`TokenManager.get` serves valid tokens from memory, so sync paths
+  pay neither a refresh round-trip nor a DB read.  The database
+  (:class:`~wearable_agent.storage.repository.TokenRepository`) is read
+  once per participant and written after every refresh.
+* Refreshes hold a per-participant ``asyncio.Lock`` (the lock map);
+  whoever waited on the lock re-checks the cache and reuses the token the
+  first caller obtained.
+* A background task (:meth:`TokenManager.start`) refreshes tokens
+  ``fitbit_token_refresh_margin_seconds`` before ``expires_at``.
+* A refresh token Fitbit rejects (``invalid_grant``) is never retried:
+  the participant is marked as needing re-authorisation and skipped until
+  a new token is stored (:class:`ReauthorizationRequired`).
+
+Usage::
+
+    tokens = get_token_manager()
+    token = await tokens.get("P001")
+    ...
+    token = await tokens.refresh("P001", stale=token.access_token)  # on 401
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+import httpx
+import structlog
+
+from wearable_agent.collectors.fitbit_oauth import refresh_fitbit_token
+from wearable_agent.config import get_settings
+from wearable_agent.storage.database import get_session_factory
+from wearable_agent.storage.repository import TokenRepository
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Awaitable, Callable
+
+logger = structlog.get_logger(__name__)
+
+_PROVIDER = "fitbit"
+_DEFAULT_EXPIRES_IN = 28800  # Fitbit's default access-token lifetime (8 h)
+_REJECTED_GRANTS = frozenset({"invalid_grant", "invalid_token"})
+
+
+class ReauthorizationRequired(RuntimeError):
+    """Fitbit rejected the participant's refresh token; they must link Fitbit again."""
+
+
+def _is_rejected_grant(exc: Exception) -> bool:
+    """Whether *exc* is Fitbit refusing the refresh token itself (retrying cannot help)."""
+    if not isinstance(exc, httpx.HTTPStatusError) or exc.response.status_code not in (400, 401):
+        return False
+    try:
+        errors = exc.response.json().get("errors") or []
+    except (ValueError, AttributeError):
+        return False
+    return any(isinstance(e, dict) and e.get("errorType") in _REJECTED_GRANTS for e in errors)
+
+
+@dataclass(slots=True)
+class FitbitToken:
+    """A participant's current token pair (``expires_at`` is naive UTC)."""
+
+    access_token: str
+    refresh_token: str = ""
+    expires_at: datetime | None = None
+    scopes: str = ""
+
+    def expires_within(self, seconds: float) -> bool:
+        if self.expires_at is None:
+            return False
+        return self.expires_at - timedelta(seconds=seconds) <= datetime.utcnow()
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_within(0)
+
+
+async def _refresh_with_settings(refresh_token: str) -> dict[str, Any]:
+    settings = get_settings()
+    return await refresh_fitbit_token(
+        refresh_token=refresh_token,
+        client_id=settings.fitbit_client_id,
+        client_secret=settings.fitbit_client_secret,
+        timeout=settings.fitbit_request_timeout,
+    )
+
+
+class TokenManager:
+    """Cache of Fitbit tokens that refreshes each participant at most once at a time.
+
+    Parameters
+    ----------
+    token_repo:
+        Where tokens are loaded from and persisted to (default: a
+        short-lived session per database call).
+    refresh_margin:
+        Seconds before ``expires_at`` at which a token counts as due.
+    check_interval:
+        Seconds between background sweeps for due tokens.
+    refresher:
+        Exchanges a refresh token for the raw Fitbit token response
+        (defaults to :func:`refresh_fitbit_token` with the app credentials).
+    """
+
+    def __init__(
+        self,
+        token_repo: TokenRepository | None = None,
+        *,
+        refresh_margin: float | None = None,
+        check_interval: float | None = None,
+        refresher: Callable[[str], Awaitable[dict[str, Any]]] | None = None,
+    ) -> None:
+        settings = get_settings()
+        self._repo = token_repo
+        self.refresh_margin = (
+            settings.fitbit_token_refresh_margin_seconds if refresh_margin is None
+            else refresh_margin
+        )
+        self.check_interval = check_interval or settings.fitbit_token_check_interval_seconds
+        self._refresher = refresher or _refresh_with_settings
+        self._cache: dict[str, FitbitToken] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        # Participants whose refresh token Fitbit rejected, until a new one is stored
+        self._needs_reauth: set[str] = set()
+        self._task: asyncio.Task | None = None
+        self.stats = {"refreshes": 0, "refresh_failures": 0, "db_loads": 0}
+
+    def _lock(self, participant_id: str) -> asyncio.Lock:
+        return self._locks.setdefault(participant_id, asyncio.Lock())
+
+    @contextlib.asynccontextmanager
+    async def _repository(self) -> AsyncIterator[TokenRepository]:
+        if self._repo is not None:
+            yield self._repo
+            return
+        async with get_session_factory()() as session:
+            yield TokenRepository(session)
+
+    # ── Reads ─────────────────────────────────────────────────
+
+    async def get(self, participant_id: str) -> FitbitToken | None:
+        """A usable token for *participant_id*, refreshing it first if due.
+
+        Returns ``None`` when the participant has not linked Fitbit.  A
+        token that is due but has no refresh token is returned as is.
+        Raises whatever the refresh raises (e.g. ``httpx.HTTPStatusError``).
+        """
+        token = self._cache.get(participant_id)
+        if token is None:
+            async with self._lock(participant_id):
+                token = await self._load(participant_id)
+            if token is None:
+                return None
+        if token.refresh_token and token.expires_within(self.refresh_margin):
+            return await self.refresh(participant_id)
+        return token
+
+    async def _load(self, participant_id: str) -> FitbitToken | None:
+        """Fill the cache from the database (caller holds the lock)."""
+        token = self._cache.get(participant_id)
+        if token is not None:
+            return token
+        async with self._repository() as repo:
+            row = await repo.get(participant_id, _PROVIDER)
+        self.stats["db_loads"] += 1
+        if row is None:
+            return None
+        token = FitbitToken(row.access_token, row.refresh_token, row.expires_at, row.scopes)
+        self._cache[participant_id] = token
+        return token
+
+    # ── Writes ────────────────────────────────────────────────
+
+    async def refresh(
+        self, participant_id: str, *, stale: str | None = None, force: bool = False
+    ) -> FitbitToken:
+        """Refresh *participant_id*'s tokens, once, however many callers ask.
+
+        *stale* is the access token a caller saw rejected (HTTP 401): if the
+        cached token already differs, someone else refreshed meanwhile and
+        that token is returned.  Without *stale* the refresh is skipped
+        unless the token is due (or *force* is set).
+
+        Raises :class:`ReauthorizationRequired` once Fitbit has rejected the
+        refresh token, without calling Fitbit again.
+        """
+        async with self._lock(participant_id):
+            token = await self._load(participant_id)
+            if token is None:
+                raise LookupError(f"No Fitbit tokens for participant {participant_id}")
+            if stale is not None and token.access_token != stale:
+                return token
+            if stale is None and not force and not token.expires_within(self.refresh_margin):
+                return token
+            if not token.refresh_token:
+                raise RuntimeError("No refresh_token available — cannot renew.")
+            if participant_id in self._needs_reauth:
+                raise ReauthorizationRequired(
+                    f"Fitbit refresh token of participant {participant_id} was rejected"
+                )
+
+            try:
+                body = await self._refresher(token.refresh_token)
+            except Exception as exc:
+                self.stats["refresh_failures"] += 1
+                if _is_rejected_grant(exc):
+                    self._needs_reauth.add(participant_id)
+                    logger.warning("tokens.reauthorization_required", participant=participant_id)
+                    raise ReauthorizationRequired(
+                        f"Fitbit refresh token of participant {participant_id} was rejected"
+                    ) from exc
+                raise
+            self.stats["refreshes"] += 1
+            token = await self.store(
+                participant_id,
+                access_token=body["access_token"],
+                refresh_token=body.get("refresh_token", token.refresh_token),
+                expires_in=body.get("expires_in", _DEFAULT_EXPIRES_IN),
+                scopes=body.get("scope", token.scopes),
+            )
+            logger.info(
+                "tokens.refreshed",
+                participant=participant_id,
+                expires_at=token.expires_at.isoformat(),
+            )
+            return token
+
+    async def store(
+        self,
+        participant_id: str,
+        *,
+        access_token: str,
+        refresh_token: str = "",
+        expires_in: float = _DEFAULT_EXPIRES_IN,
+        scopes: str = "",
+    ) -> FitbitToken:
+        """Persist a freshly issued token pair and cache it."""
+        token = FitbitToken(
+            access_token,
+            refresh_token,
+            datetime.utcnow() + timedelta(seconds=expires_in),
+            scopes,
+        )
+        async with self._repository() as repo:
+            await repo.upsert(
+                participant_id=participant_id,
+                access_token=token.access_token,
+                refresh_token=token.refresh_token,
+                provider=_PROVIDER,
+                expires_at=token.expires_at,
+                scopes=token.scopes,
+            )
+        self._cache[participant_id] = token
+        self._needs_reauth.discard(participant_id)
+        return token
+
+    def forget(self, participant_id: str) -> None:
+        """Drop a participant's cached token (after revocation)."""
+        self._cache.pop(participant_id, None)
+        self._needs_reauth.discard(participant_id)
+
+    async def revoke(self, participant_id: str) -> bool:
+        """Delete a participant's stored token and forget it (access revoked).
+
+        Waits for an in-flight refresh, so it cannot store the token again.
+        Returns whether a token was stored.
+        """
+        async with self._lock(participant_id):
+            async with self._repository() as repo:
+                deleted = await repo.delete(participant_id, _PROVIDER)
+            self.forget(participant_id)
+        return deleted
+
+    def needs_reauthorization(self, participant_id: str) -> bool:
+        """Whether Fitbit rejected the participant's refresh token."""
+        return participant_id in self._needs_reauth
+
+    # ── Proactive refresh ─────────────────────────────────────
+
+    async def refresh_due(self) -> int:
+        """Refresh every cached token within the margin of expiry; returns the count.
+
+        Participants that need re-authorisation are skipped.
+        """
+        due = [
+            pid for pid, token in self._cache.items()
+            if token.refresh_token
+            and token.expires_within(self.refresh_margin)
+            and pid not in self._needs_reauth
+        ]
+        results = await asyncio.gather(
+            *(self.refresh(pid) for pid in due), return_exceptions=True
+        )
+        for pid, result in zip(due, results, strict=True):
+            if isinstance(result, Exception):
+                logger.warning("tokens.proactive_refresh_failed", participant=pid,
+                               error=str(result))
+        return sum(1 for r in results if not isinstance(r, Exception))
+
+    async def warm(self) -> int:
+        """Load every stored Fitbit token into the cache; returns the count."""
+        async with self._repository() as repo:
+            rows = await repo.list_all(_PROVIDER)
+        for row in rows:
+            self._cache.setdefault(
+                row.participant_id,
+                FitbitToken(row.access_token, row.refresh_token, row.expires_at, row.scopes),
+            )
+        return len(rows)
+
+    def start(self) -> None:
+        """Start the background sweep (idempotent)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _run(self) -> None:
+        try:
+            await self.warm()
+        except Exception:
+            logger.exception("tokens.warm_failed")
+        while True:
+            await self.refresh_due()
+            await asyncio.sleep(self.check_interval)
+
+
+_manager: TokenManager | None = None
+
+
+def get_token_manager() -> TokenManager:
+    """The process-wide :class:`TokenManager`."""
+    global _manager
+    if _manager is None:
+        _manager = TokenManager()
+    return _manager
@@ -7,16 +7,252 @@ Fitbit device by streaming readings with time-shifted timestamps.
 from __future__ import annotations
 
 import asyncio
-import logging
+import threading
+from collections.abc import AsyncIterator, Iterator
 from datetime import datetime, timedelta
+from itertools import islice
 from pathlib import Path
-from typing import Any, AsyncIterator
+from typing import TYPE_CHECKING, Any, NamedTuple
 
+import numpy as np
 import pandas as pd
+import structlog
+
 from wearable_agent.collectors.base import BaseCollector
-from wearable_agent.models import DeviceType, MetricType, SensorReading
+from wearable_agent.collectors.lifesnaps_bson import BSON_TYPES, BSONStreamer, get_index
+from wearable_agent.collectors.lifesnaps_parquet import get_parquet_store
+from wearable_agent.collectors.lifesnaps_split import ensure_split, shard_path
+from wearable_agent.collectors.replay import ReplayEngine
+from wearable_agent.models import DeviceType, MetricType, SensorReading, reading_id
+
+if TYPE_CHECKING:
+    from wearable_agent.storage.repository import ReadingTuple
+
+logger = structlog.get_logger(__name__)
+
+# metric → (CSV column, unit)
+_DAILY_METRICS: dict[MetricType, tuple[str, str]] = {
+    MetricType.STRESS: ("stress_score", "score"),
+    MetricType.SPO2: ("spo2", "%"),
+    MetricType.HRV: ("rmssd", "ms"),
+    MetricType.BREATHING_RATE: ("full_sleep_breathing_rate", "brpm"),
+    MetricType.SLEEP: ("minutesAsleep", "min"),
+}
+_HOURLY_METRICS: dict[MetricType, tuple[str, str]] = {
+    MetricType.HEART_RATE: ("bpm", "bpm"),
+    MetricType.STEPS: ("steps", "steps"),
+    MetricType.CALORIES: ("calories", "kcal"),
+    MetricType.DISTANCE: ("distance", "m"),
+}
+
+_DATASET_METADATA_JSON = '{"source": "dataset"}'
+_BSON_METADATA_JSON = '{"source": "lifesnaps_bson"}'
+_METADATA_JSON = {"dataset": _DATASET_METADATA_JSON, "lifesnaps_bson": _BSON_METADATA_JSON}
+_BSON_METRIC_VALUES = {t: metric.value for t, (metric, _) in BSON_TYPES.items()}
+_BSON_METRICS = frozenset(metric for metric, _ in BSON_TYPES.values())
+_FRAME_COLUMNS = ["metric_type", "value", "unit", "timestamp", "source"]
+
+
+def _melt(
+    subset: pd.DataFrame,
+    metrics: list[MetricType],
+    spec: dict[MetricType, tuple[str, str]],
+    date: str | None,
+) -> pd.DataFrame:
+    """Long-form (metric_type, value, unit, timestamp, source) rows for one participant's slice."""
+    wanted = {spec[m][0]: m for m in metrics if m in spec and spec[m][0] in subset.columns}
+    if date:
+        subset = subset[subset["timestamp"].dt.normalize() == pd.to_datetime(date)]
+    subset = subset[["timestamp", *wanted]]
+
+    long = subset.melt(id_vars="timestamp", var_name="column", value_name="value")
+    long["value"] = pd.to_numeric(long["value"], errors="coerce")
+    long = long.dropna(subset=["value"])
+    long["metric_type"] = long["column"].map({c: m.value for c, m in wanted.items()})
+    long["unit"] = long["column"].map({c: spec[m][1] for c, m in wanted.items()})
+    long = long.sort_values("timestamp", kind="stable")
+    long["source"] = "dataset"
+    return long[_FRAME_COLUMNS].astype({"value": "float64"})
+
+
+def _group_by_id(df: pd.DataFrame) -> tuple[pd.DataFrame, dict[str, tuple[int, int]]]:
+    """Sort *df* by participant id (stable) and index each id's row range.
+
+    Returns the sorted frame and ``{id: (start, stop)}`` positional offsets,
+    so a participant's rows are ``df.iloc[start:stop]`` — a view, not a scan.
+    """
+    df = df[df["id"].notna()].sort_values("id", kind="stable").reset_index(drop=True)
+    ids = df["id"].to_numpy()
+    if len(ids) == 0:
+        return df, {}
+    starts = np.concatenate(([0], np.flatnonzero(ids[1:] != ids[:-1]) + 1))
+    stops = np.append(starts[1:], len(ids))
+    return df, {ids[a]: (int(a), int(b)) for a, b in zip(starts, stops, strict=True)}
+
+
+def _batched_tuples(
+    readings: Iterator[SensorReading], batch_size: int
+) -> Iterator[list[ReadingTuple]]:
+    """Group readings into lists of ``save_batch`` column tuples."""
+    while batch := [
+        (r.id, r.participant_id, r.device_type.value, r.metric_type.value, r.value,
+         r.unit, r.timestamp, _BSON_METADATA_JSON, "lifesnaps_bson")
+        for r in islice(readings, batch_size)
+    ]:
+        yield batch
+
+
+def _frame_readings(participant_id: str, frame: pd.DataFrame) -> Iterator[SensorReading]:
+    """Lazily build readings from a :func:`_melt` or ``fetch_frame`` frame."""
+    for metric, value, unit, ts, source in zip(
+        frame["metric_type"].tolist(),
+        frame["value"].tolist(),
+        frame["unit"].tolist(),
+        _to_datetimes(frame["timestamp"]),
+        frame["source"].tolist(),
+        strict=True,
+    ):
+        yield SensorReading(
+            participant_id=participant_id,
+            device_type=DeviceType.FITBIT,
+            metric_type=metric,
+            value=value,
+            unit=unit,
+            timestamp=ts,
+            metadata={"source": source},
+        )
+
+
+def _to_datetimes(ts: pd.Series) -> list[datetime]:
+    """datetime64 column → list of naive :class:`datetime` objects."""
+    return ts.to_numpy(dtype="datetime64[us]").astype(object).tolist()
+
+
+# ── Shared dataset handle ─────────────────────────────────────
+
+
+class _Frames(NamedTuple):
+    """One consistent load, swapped in atomically on reload."""
+
+    daily: pd.DataFrame
+    hourly: pd.DataFrame
+    daily_offsets: dict[str, tuple[int, int]]
+    hourly_offsets: dict[str, tuple[int, int]]
+    participants: list[str]
+
+
+class LifeSnapsDataset:
+    """Parsed LifeSnaps CSVs, grouped by participant, shared process-wide.
 
-logger = logging.getLogger(__name__)
+    Use :func:`get_dataset` rather than constructing this directly: every
+    collector for the same data directory then shares one parse.  The
+    frames are (re)loaded lazily on first access and whenever either CSV's
+    mtime or size changes; a lock makes concurrent callers wait for a
+    single load instead of each parsing the files.
+    """
+
+    def __init__(self, csv_path: Path) -> None:
+        self.csv_path = csv_path
+        self.daily_file = csv_path / "daily_fitbit_sema_df_unprocessed.csv"
+        self.hourly_file = csv_path / "hourly_fitbit_sema_df_unprocessed.csv"
+        self.load_count = 0
+
+        self._lock = threading.Lock()
+        self._signature: tuple[int, ...] | None = None
+        self._frames: _Frames | None = None
+
+    def _file_signature(self) -> tuple[int, ...]:
+        if not self.daily_file.exists() or not self.hourly_file.exists():
+            raise FileNotFoundError(
+                f"LifeSnaps CSV files not found in {self.csv_path}. "
+                "Please run scripts/download_lifesnaps.py or unzip the archive."
+            )
+        daily, hourly = self.daily_file.stat(), self.hourly_file.stat()
+        return (daily.st_mtime_ns, daily.st_size, hourly.st_mtime_ns, hourly.st_size)
+
+    def ensure_loaded(self) -> _Frames:
+        """Return the cached frames, loading the CSVs if they are missing or stale."""
+        signature = self._file_signature()
+        frames = self._frames
+        if frames is not None and signature == self._signature:
+            return frames
+        with self._lock:
+            # Another thread may have finished the load while we waited.
+            signature = self._file_signature()
+            if self._frames is not None and signature == self._signature:
+                return self._frames
+            if self._frames is not None:
+                logger.info("lifesnaps.csv_changed", csv_path=str(self.csv_path))
+            self._frames = self._load()
+            self._signature = signature
+            return self._frames
+
+    def _load(self) -> _Frames:
+        logger.info(
+            "lifesnaps.loading_csv",
+            daily=str(self.daily_file),
+            daily_size_mb=round(self.daily_file.stat().st_size / 1024 / 1024, 1),
+            hourly=str(self.hourly_file),
+            hourly_size_mb=round(self.hourly_file.stat().st_size / 1024 / 1024, 1),
+        )
+        # Only the id / time columns and the metric columns we map are read.
+        daily_cols = {"id", "date", *(col for col, _ in _DAILY_METRICS.values())}
+        hourly_cols = {"id", "date", "hour", *(col for col, _ in _HOURLY_METRICS.values())}
+
+        daily = pd.read_csv(
+            self.daily_file, usecols=lambda c: c in daily_cols, dtype={"id": str}
+        )
+        daily["timestamp"] = pd.to_datetime(daily["date"])
+
+        hourly = pd.read_csv(
+            self.hourly_file, usecols=lambda c: c in hourly_cols, dtype={"id": str}
+        )
+        hourly["date"] = pd.to_datetime(hourly["date"])
+        hours = (
+            pd.to_numeric(hourly["hour"], errors="coerce").fillna(0)
+            if "hour" in hourly
+            else 0
+        )
+        hourly["timestamp"] = hourly["date"] + pd.to_timedelta(hours, unit="h")
+
+        daily, daily_offsets = _group_by_id(daily)
+        hourly, hourly_offsets = _group_by_id(hourly)
+        frames = _Frames(daily, hourly, daily_offsets, hourly_offsets, sorted(daily_offsets))
+        self.load_count += 1
+        logger.info(
+            "lifesnaps.csv_loaded",
+            participants=len(frames.participants),
+            daily_rows=len(daily),
+            hourly_rows=len(hourly),
+            daily_columns=list(daily.columns),
+        )
+        return frames
+
+    @property
+    def participants(self) -> list[str]:
+        return list(self.ensure_loaded().participants)
+
+    def participant_rows(self, participant_id: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """The participant's (daily, hourly) rows, via the offset index."""
+        frames = self.ensure_loaded()
+        pid = str(participant_id)
+        d0, d1 = frames.daily_offsets.get(pid, (0, 0))
+        h0, h1 = frames.hourly_offsets.get(pid, (0, 0))
+        return frames.daily.iloc[d0:d1], frames.hourly.iloc[h0:h1]
+
+
+_datasets: dict[Path, LifeSnapsDataset] = {}
+_datasets_lock = threading.Lock()
+
+
+def get_dataset(data_path: Path) -> LifeSnapsDataset:
+    """Return the shared :class:`LifeSnapsDataset` for a ``rais_anonymized`` dir."""
+    csv_path = (Path(data_path) / "csv_rais_anonymized").resolve()
+    with _datasets_lock:
+        dataset = _datasets.get(csv_path)
+        if dataset is None:
+            dataset = _datasets[csv_path] = LifeSnapsDataset(csv_path)
+        return dataset
 
 
 class LifeSnapsCollector(BaseCollector):
@@ -26,7 +262,7 @@ class LifeSnapsCollector(BaseCollector):
 
     def __init__(self, data_dir: Path | None = None) -> None:
         """Initialize the collector and load dataset indices.
-        
+
         Args:
             data_dir: Path to the 'rais_anonymized' directory. If None,
                      searches multiple known locations.
@@ -35,14 +271,16 @@ class LifeSnapsCollector(BaseCollector):
             self.data_path = data_dir
         else:
             self.data_path = self._resolve_data_path()
-        
+
         self.csv_path = self.data_path / "csv_rais_anonymized"
         self.daily_file = self.csv_path / "daily_fitbit_sema_df_unprocessed.csv"
         self.hourly_file = self.csv_path / "hourly_fitbit_sema_df_unprocessed.csv"
 
-        self._daily_df: pd.DataFrame | None = None
-        self._hourly_df: pd.DataFrame | None = None
-        self._participants: list[str] = []
+        # Parsed frames are shared by every collector on the same directory.
+        self.dataset = get_dataset(self.data_path)
+        self.mongo_path = self.data_path / "mongo_rais_anonymized"
+        # Columnar copy of the high-frequency BSON data (None without pyarrow)
+        self.parquet = get_parquet_store(self.data_path / "parquet_rais_anonymized")
 
     @staticmethod
     def _resolve_data_path() -> Path:
@@ -82,66 +320,86 @@ class LifeSnapsCollector(BaseCollector):
                 with open(part, "rb") as inp:
                     while chunk := inp.read(64 * 1024 * 1024):
                         out.write(chunk)
-        logger.info(f"Reassembled: {output_file} ({output_file.stat().st_size / 1024 / 1024:.0f} MB)")
+        size_mb = output_file.stat().st_size / 1024 / 1024
+        logger.info(f"Reassembled: {output_file} ({size_mb:.0f} MB)")
 
     def _load_data(self) -> None:
-        """Lazy load the CSV data."""
-        if self._daily_df is not None:
-            return
-
-        if not self.daily_file.exists() or not self.hourly_file.exists():
-            raise FileNotFoundError(
-                f"LifeSnaps CSV files not found in {self.csv_path}. "
-                "Please run scripts/download_lifesnaps.py or unzip the archive."
-            )
-
-        logger.info(
-            "lifesnaps.loading_csv",
-            daily=str(self.daily_file),
-            daily_size_mb=round(self.daily_file.stat().st_size / 1024 / 1024, 1),
-            hourly=str(self.hourly_file),
-            hourly_size_mb=round(self.hourly_file.stat().st_size / 1024 / 1024, 1),
-        )
-        # Load daily data
-        self._daily_df = pd.read_csv(self.daily_file)
-        self._daily_df['date'] = pd.to_datetime(self._daily_df['date'])
-        
-        # Load hourly data
-        self._hourly_df = pd.read_csv(self.hourly_file)
-        # Hourly file has 'date' and 'hour'? Or 'time'? 
-        # Based on columns seen: 'date', 'hour' (likely int 0-23?)
-        # Let's create a full timestamp
-        self._hourly_df['date'] = pd.to_datetime(self._hourly_df['date'])
-        
-        # Helper to combine date + hour -> timestamp
-        # Assuming 'hour' is 0-23 integer or string
-        def parse_hourly_ts(row):
-            d = row['date']
-            h = int(row['hour']) if 'hour' in row else 0 # fallback
-            return d + timedelta(hours=h)
-
-        self._hourly_df['timestamp'] = self._hourly_df.apply(parse_hourly_ts, axis=1)
-
-        # Extract unique participants
-        self._participants = sorted(self._daily_df['id'].unique().astype(str).tolist())
-        logger.info(
-            "lifesnaps.csv_loaded",
-            participants=len(self._participants),
-            daily_rows=len(self._daily_df),
-            hourly_rows=len(self._hourly_df),
-            daily_columns=list(self._daily_df.columns),
-        )
+        """Lazy load the CSV data (shared, reloaded when the files change)."""
+        self.dataset.ensure_loaded()
 
     async def authenticate(self, **credentials: str) -> None:
         """No generic authentication needed for local files."""
         # Ensure data is loaded
         self._load_data()
-        pass
 
     def get_participants(self) -> list[str]:
         """Return list of available participant IDs."""
-        self._load_data()
-        return self._participants
+        return self.dataset.participants
+
+    def parquet_types(
+        self, participant_id: str, metrics: list[MetricType], *, convert: bool = True
+    ) -> list[str]:
+        """BSON types of *metrics* that can be read from the Parquet copy.
+
+        With *convert*, a participant whose BSON shard exists but has no
+        current Parquet copy is converted first (blocking, one-time).
+        Returns ``[]`` when the Parquet path is unavailable.
+        """
+        types = [t for t, (m, _) in BSON_TYPES.items() if m in metrics]
+        if self.parquet is None or not types:
+            return []
+        shard = shard_path(self.mongo_path, participant_id)
+        if self.parquet.is_current(participant_id, shard):
+            return types
+        if not (convert and shard.exists() and shard.stat().st_size > 200):
+            return []
+        try:
+            self.parquet.convert_participant(participant_id, shard)
+        except Exception as exc:
+            logger.warning(
+                "lifesnaps.parquet_convert_failed", participant=participant_id, error=str(exc)
+            )
+            return []
+        return types
+
+    def fetch_frame(
+        self,
+        participant_id: str,
+        metrics: list[MetricType],
+        *,
+        date: str | None = None,
+    ) -> pd.DataFrame:
+        """Return a participant's readings as one long-form column batch.
+
+        Columns: ``metric_type`` (str), ``value`` (float), ``unit`` (str),
+        ``timestamp`` (datetime64) and ``source`` (str).  Daily metrics come
+        first, then hourly ones; each block is ordered by timestamp.  Empty
+        cells are dropped.
+
+        Heart rate, steps and calories come from the high-frequency Parquet
+        copy of the BSON data instead of the hourly CSV when the participant
+        has one (see :meth:`parquet_types`); those rows come last and carry
+        the ``lifesnaps_bson`` source of the bulk import, so both paths
+        produce the same reading ids.
+        """
+        hf_types = self.parquet_types(participant_id, metrics)
+        hf_metrics = {BSON_TYPES[t][0] for t in hf_types}
+        csv_metrics = [m for m in metrics if m not in hf_metrics]
+        daily, hourly = self.dataset.participant_rows(participant_id)
+        frames = [
+            _melt(daily, csv_metrics, _DAILY_METRICS, date),
+            _melt(hourly, csv_metrics, _HOURLY_METRICS, date),
+        ]
+        if hf_types:
+            assert self.parquet is not None
+            start = end = None
+            if date:
+                start = pd.Timestamp(date).to_pydatetime()
+                end = start + timedelta(days=1) - timedelta(microseconds=1)
+            hf = self.parquet.read_frame(participant_id, hf_types, start, end)
+            frames.append(hf.assign(source="lifesnaps_bson"))
+            frames = [f for f in frames if len(f)] or frames[:1]
+        return pd.concat(frames, ignore_index=True)
 
     async def fetch(
         self,
@@ -151,229 +409,254 @@ class LifeSnapsCollector(BaseCollector):
         date: str | None = None,
     ) -> list[SensorReading]:
         """Fetch historical readings from the dataset."""
-        self._load_data()
-        assert self._daily_df is not None
-        assert self._hourly_df is not None
-
-        # Filter by participant (handle type mismatch str vs int)
-        try:
-            pid_int = int(participant_id)
-            daily_subset = self._daily_df[self._daily_df['id'] == pid_int]
-            hourly_subset = self._hourly_df[self._hourly_df['id'] == pid_int]
-        except ValueError:
-            # if IDs are not ints
-            daily_subset = self._daily_df[self._daily_df['id'] == participant_id]
-            hourly_subset = self._hourly_df[self._hourly_df['id'] == participant_id]
-
-        if date:
-            target_date = pd.to_datetime(date)
-            daily_subset = daily_subset[daily_subset['date'] == target_date]
-            # specific date for hourly too
-            hourly_subset = hourly_subset[hourly_subset['date'] == target_date]
-
-        readings: list[SensorReading] = []
-
-        # 1. Process Daily Metrics
-        for _, row in daily_subset.iterrows():
-            ts = row['date'] # Daily granularity usually means 00:00:00 or end of day?
-            
-            if MetricType.STRESS in metrics and 'stress_score' in row and pd.notna(row['stress_score']):
-                readings.append(SensorReading(
-                    participant_id=participant_id,
-                    device_type=DeviceType.FITBIT,
-                    metric_type=MetricType.STRESS,
-                    value=float(row['stress_score']),
-                    unit="score",
-                    timestamp=ts,
-                    metadata={"source": "dataset"}
-                ))
-            
-            if MetricType.SPO2 in metrics and 'spo2' in row and pd.notna(row['spo2']):
-                readings.append(SensorReading(
-                    participant_id=participant_id,
-                    device_type=DeviceType.FITBIT,
-                    metric_type=MetricType.SPO2,
-                    value=float(row['spo2']),
-                    unit="%",
-                    timestamp=ts,
-                    metadata={"source": "dataset"}
-                ))
+        frame = await asyncio.to_thread(self.fetch_frame, participant_id, metrics, date=date)
+        # Plain validated construction: pydantic-core is faster here than
+        # model_construct, which runs the default factories in Python.
+        return list(_frame_readings(participant_id, frame))
 
-            if MetricType.HRV in metrics and 'rmssd' in row and pd.notna(row['rmssd']):
-                readings.append(SensorReading(
-                    participant_id=participant_id,
-                    device_type=DeviceType.FITBIT,
-                    metric_type=MetricType.HRV,
-                    value=float(row['rmssd']),
-                    unit="ms",
-                    timestamp=ts,
-                    metadata={"source": "dataset"}
-                ))
-
-            if MetricType.BREATHING_RATE in metrics and 'full_sleep_breathing_rate' in row and pd.notna(row['full_sleep_breathing_rate']):
-                readings.append(SensorReading(
-                    participant_id=participant_id,
-                    device_type=DeviceType.FITBIT,
-                    metric_type=MetricType.BREATHING_RATE,
-                    value=float(row['full_sleep_breathing_rate']),
-                    unit="brpm",
-                    timestamp=ts,
-                    metadata={"source": "dataset"}
-                ))
+    @staticmethod
+    def to_reading_tuples(participant_id: str, frame: pd.DataFrame) -> list[ReadingTuple]:
+        """Convert a :meth:`fetch_frame` batch into ``save_batch`` column tuples."""
+        n = len(frame)
+        metrics = frame["metric_type"].tolist()
+        timestamps = _to_datetimes(frame["timestamp"])
+        sources = frame["source"].tolist()
+        return list(zip(
+            [
+                reading_id(participant_id, m, ts, src)
+                for m, ts, src in zip(metrics, timestamps, sources, strict=True)
+            ],
+            [participant_id] * n,
+            [DeviceType.FITBIT.value] * n,
+            metrics,
+            frame["value"].tolist(),
+            frame["unit"].tolist(),
+            timestamps,
+            [_METADATA_JSON[src] for src in sources],
+            sources,
+            strict=True,
+        ))
+
+    async def _participant_bson(self, participant_id: str) -> Path | None:
+        """Path of the participant's own BSON shard, splitting fitbit.bson if needed.
+
+        The full dump is never streamed directly: when a shard is missing it
+        is split once, for all participants, in a process pool
+        (:func:`~wearable_agent.collectors.lifesnaps_split.ensure_split`).
+        """
+        mongo_dir = self.mongo_path
 
-            if MetricType.SLEEP in metrics and 'minutesAsleep' in row and pd.notna(row['minutesAsleep']):
-                readings.append(SensorReading(
-                    participant_id=participant_id,
-                    device_type=DeviceType.FITBIT,
-                    metric_type=MetricType.SLEEP,
-                    value=float(row['minutesAsleep']),
-                    unit="min",
-                    timestamp=ts,
-                    metadata={"source": "dataset"}
-                ))
+        # 1. Prefer per-participant BSON (small, deployed via GitHub or split)
+        per_participant = shard_path(mongo_dir, participant_id)
+        if per_participant.exists() and per_participant.stat().st_size > 200:
+            logger.info(
+                "lifesnaps.bson_source",
+                source="per-participant",
+                path=str(per_participant),
+                size_mb=round(per_participant.stat().st_size / 1024 / 1024, 1),
+            )
+            return per_participant
+
+        # 2. Split the full fitbit.bson into shards (reassembling LFS parts first)
+        bson_path = mongo_dir / "fitbit.bson"
+        if not bson_path.exists():
+            parts_dir = bson_path.parent / "fitbit_parts"
+            if parts_dir.exists() and list(parts_dir.glob("fitbit.bson.part*")):
+                logger.info("Reassembling fitbit.bson from LFS parts...")
+                await asyncio.to_thread(self._reassemble_bson, parts_dir, bson_path)
+            else:
+                logger.warning(
+                    "lifesnaps.bson_not_found",
+                    participant=participant_id,
+                    mongo_dir=str(mongo_dir),
+                    files=(
+                        [f.name for f in mongo_dir.iterdir()]
+                        if mongo_dir.exists()
+                        else []
+                    ),
+                )
+                return None
 
-        # 2. Process Hourly Metrics
-        for _, row in hourly_subset.iterrows():
-            ts = row['timestamp']
+        logger.info(
+            "lifesnaps.bson_source",
+            source="split",
+            path=str(bson_path),
+            size_mb=round(bson_path.stat().st_size / 1024 / 1024, 1),
+        )
+        participants = await asyncio.to_thread(ensure_split, bson_path)
+        if participant_id not in participants:
+            logger.warning(
+                "lifesnaps.bson_participant_missing",
+                participant=participant_id,
+                participants=len(participants),
+            )
+            return None
+        return per_participant
 
-            if MetricType.HEART_RATE in metrics and 'bpm' in row and pd.notna(row['bpm']):
-                readings.append(SensorReading(
-                    participant_id=participant_id,
-                    device_type=DeviceType.FITBIT,
-                    metric_type=MetricType.HEART_RATE,
-                    value=float(row['bpm']),
-                    unit="bpm",
-                    timestamp=ts,
-                    metadata={"source": "dataset"}
-                ))
+    async def _high_frequency_source(
+        self, participant_id: str, metrics: list[MetricType]
+    ) -> Any | Path | None:
+        """Where the BSON-only metrics are read from.
 
-            if MetricType.STEPS in metrics and 'steps' in row and pd.notna(row['steps']):
-                 readings.append(SensorReading(
-                    participant_id=participant_id,
-                    device_type=DeviceType.FITBIT,
-                    metric_type=MetricType.STEPS,
-                    value=float(row['steps']),
-                    unit="steps",
-                    timestamp=ts,
-                    metadata={"source": "dataset"}
-                ))
-            
-            # Fallback for 'ageps' if that was the column name? 
-            # Assuming 'steps' exists or I need to check columns again. 
-            # I'll stick to 'steps' and update if needed.
-
-            if MetricType.CALORIES in metrics and 'calories' in row and pd.notna(row['calories']):
-                readings.append(SensorReading(
-                    participant_id=participant_id,
-                    device_type=DeviceType.FITBIT,
-                    metric_type=MetricType.CALORIES,
-                    value=float(row['calories']),
-                    unit="kcal",
-                    timestamp=ts,
-                    metadata={"source": "dataset"}
-                ))
+        Returns the participant's :meth:`LifeSnapsParquet.read` table when a
+        Parquet copy is (or can now be made) current, else the path of the
+        participant's BSON shard, or ``None`` when there is no BSON data.
+        """
+        types = await asyncio.to_thread(
+            self.parquet_types, participant_id, metrics, convert=False
+        )
+        if not types:
+            bson_path = await self._participant_bson(participant_id)
+            if bson_path is None:
+                return None
+            # Convert once; later replays and syncs read the columnar copy.
+            types = await asyncio.to_thread(self.parquet_types, participant_id, metrics)
+            if not types:
+                # Load (or build, once) the offset index off the event loop.
+                try:
+                    await asyncio.to_thread(get_index, bson_path)
+                except Exception as exc:
+                    logger.warning("lifesnaps.bson_index_failed", error=str(exc))
+                return bson_path
+
+        assert self.parquet is not None
+        logger.info("lifesnaps.bson_source", source="parquet", participant=participant_id)
+        return await asyncio.to_thread(self.parquet.read, participant_id, types)
+
+    async def high_frequency_batches(
+        self,
+        participant_id: str,
+        metrics: list[MetricType],
+        *,
+        offset: int = 0,
+        batch_size: int = 5_000,
+    ) -> tuple[int, Iterator[list[ReadingTuple]]] | None:
+        """Total count and ``save_batch`` tuple batches of the BSON-only metrics.
+
+        No replay pacing and original timestamps.  Readings come in a fixed
+        order (Parquet: by timestamp, BSON: file order), so an import resumes
+        by skipping the first *offset* readings.  The iterator does blocking
+        work; advance it off the event loop.  ``None`` when there is no data.
+        """
+        source = await self._high_frequency_source(participant_id, metrics)
+        if source is None:
+            return None
+        if isinstance(source, Path):
+            types = [t for t, (m, _) in BSON_TYPES.items() if m in metrics]
+            total = (await asyncio.to_thread(get_index, source)).count(participant_id, types)
+            readings = BSONStreamer(source).iter_readings(participant_id, metrics)
+            return total, _batched_tuples(islice(readings, offset, None), batch_size)
+        table = source.slice(offset)
+        return source.num_rows, (
+            self._parquet_tuples(participant_id, batch)
+            for batch in table.to_batches(max_chunksize=batch_size)
+        )
 
-            if MetricType.DISTANCE in metrics and 'distance' in row and pd.notna(row['distance']):
-                 readings.append(SensorReading(
+    @staticmethod
+    def _parquet_readings(participant_id: str, table: Any) -> Iterator[SensorReading]:
+        """Build readings from a :meth:`LifeSnapsParquet.read` table, one batch at a time."""
+        for batch in table.to_batches():
+            columns = batch.to_pydict()
+            for ts, value, doc_type in zip(
+                columns["timestamp"], columns["value"], columns["type"], strict=True
+            ):
+                metric, unit = BSON_TYPES[doc_type]
+                yield SensorReading(
                     participant_id=participant_id,
                     device_type=DeviceType.FITBIT,
-                    metric_type=MetricType.DISTANCE,
-                    value=float(row['distance']),
-                    unit="m", # LifeSnaps likely meters or km? Usually API is km or meters.
+                    metric_type=metric,
+                    value=value,
+                    unit=unit,
                     timestamp=ts,
-                    metadata={"source": "dataset"}
-                ))
+                    metadata={"source": "lifesnaps_bson"},
+                )
 
-        return readings
+    @staticmethod
+    def _parquet_tuples(participant_id: str, batch: Any) -> list[ReadingTuple]:
+        """A Parquet record batch as ``save_batch`` column tuples."""
+        columns = batch.to_pydict()
+        n = batch.num_rows
+        metrics = [_BSON_METRIC_VALUES[t] for t in columns["type"]]
+        return list(zip(
+            [
+                reading_id(participant_id, m, ts, "lifesnaps_bson")
+                for m, ts in zip(metrics, columns["timestamp"], strict=True)
+            ],
+            [participant_id] * n,
+            [DeviceType.FITBIT.value] * n,
+            metrics,
+            columns["value"],
+            [BSON_TYPES[t][1] for t in columns["type"]],
+            columns["timestamp"],
+            [_BSON_METADATA_JSON] * n,
+            ["lifesnaps_bson"] * n,
+            strict=True,
+        ))
+
+    async def replay_sources(
+        self, participant_id: str, metrics: list[MetricType]
+    ) -> list[Iterator[SensorReading]]:
+        """Lazy, individually time-sorted reading sources for :class:`ReplayEngine`.
+
+        Summary metrics (stress, SpO2, HRV, …) come from the daily / hourly
+        CSV slices, one source each.  HR, steps and calories come from the
+        Parquet copy (one source, sorted) or else the BSON shard (one
+        source per type, each in file order).
+        """
+        sources: list[Iterator[SensorReading]] = []
+        csv_metrics = [m for m in metrics if m not in _BSON_METRICS]
+        if csv_metrics:
+            daily, hourly = self.dataset.participant_rows(participant_id)
+            for subset, spec in ((daily, _DAILY_METRICS), (hourly, _HOURLY_METRICS)):
+                frame = await asyncio.to_thread(_melt, subset, csv_metrics, spec, None)
+                if len(frame):
+                    sources.append(_frame_readings(participant_id, frame))
 
-    async def _stream_bson(
+        bson_metrics = [m for m in metrics if m in _BSON_METRICS]
+        if bson_metrics:
+            source = await self._high_frequency_source(participant_id, bson_metrics)
+            if isinstance(source, Path):
+                streamer = BSONStreamer(source)
+                sources.extend(streamer.iter_readings(participant_id, [m]) for m in bson_metrics)
+            elif source is not None:
+                sources.append(self._parquet_readings(participant_id, source))
+        return sources
+
+    async def stream_batches(
         self,
         participant_id: str,
         metrics: list[MetricType],
         speed: float = 1.0,
-    ) -> AsyncIterator[SensorReading]:
-        """Yield readings from BSON file, time-shifted."""
-        from wearable_agent.collectors.lifesnaps_bson import BSONStreamer
-
-        mongo_dir = self.data_path / "mongo_rais_anonymized"
+        start_date: str | None = None,
+        *,
+        tick: float = 0.05,
+    ) -> AsyncIterator[list[SensorReading]]:
+        """Replay a participant's readings time-shifted to now, in due-time batches.
 
-        # 1. Prefer per-participant BSON (small, deployed via GitHub)
-        per_participant = mongo_dir / f"participant_{participant_id}.bson"
-        if per_participant.exists() and per_participant.stat().st_size > 200:
-            bson_path = per_participant
-            logger.info(
-                "lifesnaps.bson_source",
-                source="per-participant",
-                path=str(bson_path),
-                size_mb=round(bson_path.stat().st_size / 1024 / 1024, 1),
-            )
-        else:
-            # 2. Fall back to full fitbit.bson
-            bson_path = mongo_dir / "fitbit.bson"
-            if not bson_path.exists():
-                parts_dir = bson_path.parent / "fitbit_parts"
-                if parts_dir.exists() and list(parts_dir.glob("fitbit.bson.part*")):
-                    logger.info("Reassembling fitbit.bson from LFS parts...")
-                    self._reassemble_bson(parts_dir, bson_path)
-                else:
-                    logger.warning(
-                        "lifesnaps.bson_not_found",
-                        participant=participant_id,
-                        mongo_dir=str(mongo_dir),
-                        files=(
-                            [f.name for f in mongo_dir.iterdir()]
-                            if mongo_dir.exists()
-                            else []
-                        ),
-                    )
-            else:
-                logger.info(
-                    "lifesnaps.bson_source",
-                    source="full-file",
-                    path=str(bson_path),
-                    size_mb=round(bson_path.stat().st_size / 1024 / 1024, 1),
-                )
-        streamer = BSONStreamer(bson_path)
-        
-        # We need to find the first timestamp to synchronize
-        # BSON reader is a generator, so we can't sort beforehand without reading all (3GB!)
-        # So we assume the file is roughly chronological or we accept some out-of-order delivery
-        # relative to the VERY start.
-        # However, for time-shifting, we need a reference 'start' time.
-        # We'll use the first record encountered as the anchor.
-        
-        first_ts: datetime | None = None
-        replay_start_realtime: datetime | None = None
-
-        # Filter metrics supported by BSON
-        bson_supported = [MetricType.HEART_RATE, MetricType.STEPS, MetricType.CALORIES]
-        target_metrics = [m for m in metrics if m in bson_supported]
-
-        if not target_metrics:
+        All sources are merged by one :class:`ReplayEngine`: one wake-up per
+        *tick* regardless of *speed*, bounded memory.  *start_date*
+        (``YYYY-MM-DD``) skips everything before that day.
+        """
+        sources = await self.replay_sources(participant_id, metrics)
+        if not sources:
+            logger.warning("lifesnaps.replay_no_data", participant=participant_id)
             return
-
-        for reading in streamer.iter_readings(participant_id, target_metrics):
-            if first_ts is None:
-                first_ts = reading.timestamp
-                replay_start_realtime = datetime.now()
-            
-            # Time shift
-            # Calculate delay
-            assert first_ts is not None
-            assert replay_start_realtime is not None
-            
-            time_offset = reading.timestamp - first_ts
-            target_emit_time = replay_start_realtime + (time_offset / speed)
-            
-            # Wait
-            now = datetime.now()
-            wait_seconds = (target_emit_time - now).total_seconds()
-            
-            if wait_seconds > 0:
-                await asyncio.sleep(wait_seconds)
-                
-            reading.timestamp = target_emit_time
-            yield reading
+        start = datetime.fromisoformat(start_date) if start_date else None
+        engine = ReplayEngine(sources, speed=speed, tick=tick, start=start)
+        logger.info(
+            "lifesnaps.replay_start",
+            participant=participant_id,
+            sources=len(sources),
+            speed=speed,
+        )
+        async for batch in engine.batches():
+            yield batch
+        logger.info(
+            "lifesnaps.replay_done",
+            participant=participant_id,
+            emitted=engine.emitted,
+            max_lag_ms=round(engine.max_lag * 1000, 1),
+        )
 
     async def stream(
         self,
@@ -386,111 +669,8 @@ class LifeSnapsCollector(BaseCollector):
 
         High-frequency metrics (HR, Steps, Calories) come from BSON;
         daily/hourly summary metrics (Stress, SpO2, HRV, …) from CSV.
-        Both streams are merged into a single async iterator.
+        Both are merged in timestamp order (see :meth:`stream_batches`).
         """
-        bson_supported = {MetricType.HEART_RATE, MetricType.STEPS, MetricType.CALORIES}
-        csv_metrics = [m for m in metrics if m not in bson_supported]
-        bson_metrics = [m for m in metrics if m in bson_supported]
-
-        queue: asyncio.Queue[SensorReading | None] = asyncio.Queue()
-        producer_count = int(bool(csv_metrics)) + int(bool(bson_metrics))
-
-        if producer_count == 0:
-            return
-
-        # ── producer helpers (each puts None when done) ──────────
-
-        async def _produce_csv() -> None:
-            try:
-                logger.info(
-                    "lifesnaps.csv_producer_start",
-                    participant=participant_id,
-                    metrics=[m.value for m in csv_metrics],
-                )
-                readings = await self.fetch(participant_id, csv_metrics)
-                if not readings:
-                    logger.warning(
-                        "lifesnaps.csv_producer_empty",
-                        participant=participant_id,
-                    )
-                    return
-                readings.sort(key=lambda r: r.timestamp)
-                logger.info(
-                    "lifesnaps.csv_producer_loaded",
-                    participant=participant_id,
-                    total_readings=len(readings),
-                    date_range=f"{readings[0].timestamp} → {readings[-1].timestamp}",
-                )
-                anchor = readings[0].timestamp
-                wall_start = datetime.now()
-                emitted = 0
-                for r in readings:
-                    offset = r.timestamp - anchor
-                    target = wall_start + (offset / speed)
-                    delay = (target - datetime.now()).total_seconds()
-                    if delay > 0:
-                        await asyncio.sleep(delay)
-                    r.timestamp = datetime.now()
-                    await queue.put(r)
-                    emitted += 1
-                logger.info(
-                    "lifesnaps.csv_producer_done",
-                    participant=participant_id,
-                    emitted=emitted,
-                )
-            except Exception as exc:
-                logger.error("csv_producer_failed", error=str(exc), exc_info=True)
-            finally:
-                await queue.put(None)
-
-        async def _produce_bson() -> None:
-            bson_count = 0
-            try:
-                logger.info(
-                    "lifesnaps.bson_producer_start",
-                    participant=participant_id,
-                    metrics=[m.value for m in bson_metrics],
-                )
-                async for r in self._stream_bson(participant_id, bson_metrics, speed):
-                    await queue.put(r)
-                    bson_count += 1
-                    if bson_count % 5000 == 0:
-                        logger.info(
-                            "lifesnaps.bson_producer_progress",
-                            participant=participant_id,
-                            emitted=bson_count,
-                        )
-                logger.info(
-                    "lifesnaps.bson_producer_done",
-                    participant=participant_id,
-                    emitted=bson_count,
-                )
-            except Exception as exc:
-                logger.error(
-                    "bson_producer_failed",
-                    error=str(exc),
-                    emitted_before_error=bson_count,
-                    exc_info=True,
-                )
-            finally:
-                await queue.put(None)
-
-        # ── launch producers ─────────────────────────────────────
-        tasks: list[asyncio.Task[None]] = []
-        if csv_metrics:
-            tasks.append(asyncio.create_task(_produce_csv()))
-        if bson_metrics:
-            tasks.append(asyncio.create_task(_produce_bson()))
-
-        # ── consumer: yield until all producers signal done ──────
-        remaining = producer_count
-        try:
-            while remaining > 0:
-                item = await queue.get()
-                if item is None:
-                    remaining -= 1
-                else:
-                    yield item
-        finally:
-            for t in tasks:
-                t.cancel()
+        async for batch in self.stream_batches(participant_id, metrics, speed, start_date):
+            for reading in batch:
+                yield reading
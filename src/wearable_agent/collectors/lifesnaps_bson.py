@@ -1,11 +1,35 @@
-"""BSON reader for LifeSnaps high-frequency data."""
+"""BSON reader for LifeSnaps high-frequency data.
+
+``fitbit.bson`` is a ~3 GB ``mongodump`` of length-prefixed documents::
+
+    {"id": <participant>, "type": "heart_rate", "data": {"dateTime": "05/24/21 00:00:01", ...}}
+
+Finding one participant's documents by decoding the whole file takes
+minutes, so :class:`BSONIndex` records — once — the byte ranges each
+(participant, type, day) occupies, in a JSON sidecar next to the file
+(``fitbit.bson.idx.json``).  :class:`BSONStreamer` seeks straight to those
+ranges and decodes only the matching documents.  The sidecar is rebuilt
+automatically when the BSON file's size or mtime changes.
+
+All reads go through :class:`MappedBSON`, which memory-maps the file and
+walks the length prefixes without copying.  ``id`` / ``type`` are matched
+against their encoded bytes, so ``bson.decode`` only runs on documents
+that are actually wanted.
+"""
 
 from __future__ import annotations
 
-import logging
-from datetime import datetime
+import json
+import mmap
+import os
+import struct
+import threading
+from collections.abc import Generator, Iterable, Iterator, Sequence
+from datetime import date, datetime
 from pathlib import Path
-from typing import AsyncIterator, Generator
+from typing import Any
+
+import structlog
 
 try:
     import bson
@@ -14,21 +38,567 @@ except ImportError:
 
 from wearable_agent.models import DeviceType, MetricType, SensorReading
 
-logger = logging.getLogger(__name__)
+logger = structlog.get_logger(__name__)
+
+# BSON ``type`` values streamed as readings → (metric, unit)
+BSON_TYPES: dict[str, tuple[MetricType, str]] = {
+    "heart_rate": (MetricType.HEART_RATE, "bpm"),
+    "steps": (MetricType.STEPS, "steps"),
+    "calories": (MetricType.CALORIES, "kcal"),
+}
+
+_INDEX_VERSION = 1
+_INT32 = struct.Struct("<i")
+_INT64 = struct.Struct("<q")
+
+# BSON element type → fixed value size (variable-size types handled in peek)
+_FIXED_SIZES = {
+    0x01: 8, 0x07: 12, 0x08: 1, 0x09: 8, 0x0A: 0, 0x10: 4, 0x11: 8, 0x12: 8,
+    0x13: 16, 0x7F: 0, 0xFF: 0,
+}
+
+# (start offset, end offset, document count); end is exclusive
+Span = tuple[int, int, int]
+
+
+def _file_signature(path: Path) -> tuple[int, int]:
+    st = path.stat()
+    return st.st_size, st.st_mtime_ns
+
+
+def _doc_day(data: Any) -> str:
+    """ISO day of a document's ``data.dateTime`` ("MM/DD/YY HH:MM:SS" or ISO)."""
+    dt_str = data.get("dateTime") if isinstance(data, dict) else None
+    if not isinstance(dt_str, str):
+        return ""
+    if len(dt_str) >= 8 and dt_str[2] == "/" and dt_str[5] == "/":
+        return f"20{dt_str[6:8]}-{dt_str[0:2]}-{dt_str[3:5]}"
+    return dt_str[:10]
+
+
+def encode_element(name: str, value: str) -> list[bytes]:
+    """Encoded BSON element(s) ``name: value`` can appear as in a document.
+
+    A 24-hex *value* may be stored as a string or as an ``ObjectId``.
+    """
+    key = name.encode() + b"\x00"
+    raw = value.encode()
+    forms = [b"\x02" + key + _INT32.pack(len(raw) + 1) + raw + b"\x00"]
+    if len(value) == 24:
+        try:
+            forms.append(b"\x07" + key + bytes.fromhex(value))
+        except ValueError:
+            pass
+    return forms
+
+
+class MappedBSON:
+    """Read-only memory map over a file of concatenated BSON documents.
+
+    Documents are addressed by ``(start, end)`` byte offsets; nothing is
+    copied or decoded until :meth:`decode` is called::
+
+        with MappedBSON(path) as mb:
+            for start, end in mb.find_documents([id_needles, type_needles]):
+                doc = mb.decode(start, end)
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        self.size = os.fstat(self._file.fileno()).st_size
+        self._mm: mmap.mmap | None = None
+        self._view: memoryview = memoryview(b"")
+        if self.size:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if hasattr(self._mm, "madvise"):
+                self._mm.madvise(mmap.MADV_SEQUENTIAL)
+            self._view = memoryview(self._mm)
+
+    def __enter__(self) -> MappedBSON:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._view.release()
+        if self._mm is not None:
+            try:
+                self._mm.close()
+            except BufferError:
+                pass  # a caller still holds a slice; the GC unmaps later
+            self._mm = None
+        self._file.close()
+
+    def documents(self, start: int = 0, end: int | None = None) -> Iterator[tuple[int, int]]:
+        """Yield ``(start, end)`` of each document in ``[start, end)``.
+
+        Only the 4-byte length prefixes are read.  A truncated trailing
+        document ends the iteration.
+        """
+        view, stop = self._view, self.size if end is None else min(end, self.size)
+        unpack = _INT32.unpack_from
+        pos = start
+        while pos + 4 <= stop:
+            (length,) = unpack(view, pos)
+            if length < 5:
+                raise ValueError(f"Corrupt BSON document length {length} at offset {pos}")
+            if pos + length > self.size:
+                return
+            yield pos, pos + length
+            pos += length
+
+    def view(self, start: int, end: int) -> memoryview:
+        """Zero-copy slice of the raw bytes."""
+        return self._view[start:end]
+
+    def decode(self, start: int, end: int) -> dict[str, Any]:
+        return bson.decode(self._view[start:end])
+
+    def contains_all(self, needles: Sequence[bytes], start: int, end: int) -> bool:
+        """Whether every byte *needle* occurs in ``[start, end)``."""
+        assert self._mm is not None
+        find = self._mm.find
+        return all(find(needle, start, end) >= 0 for needle in needles)
+
+    def find_documents(
+        self,
+        groups: Sequence[Sequence[bytes]],
+        start: int = 0,
+        end: int | None = None,
+    ) -> Iterator[tuple[int, int]]:
+        """Yield ``(start, end)`` of documents containing a needle from every group.
+
+        Build needles with :func:`encode_element`.  A hit may come from a
+        nested field, so callers confirm on the decoded document; a miss is
+        definitive.  The first group should be the most selective: the scan
+        jumps (``mmap.find``) to its next occurrence and only walks length
+        prefixes up to the document that contains it.
+        """
+        if not groups or self._mm is None:
+            return
+        view, find, unpack = self._view, self._mm.find, _INT32.unpack_from
+        stop = self.size if end is None else min(end, self.size)
+        rest = [list(g) for g in groups[1:]]
+        # Next known occurrence of each lead needle (-1: none left).
+        lead = {needle: find(needle, start, stop) for needle in groups[0]}
+        pos = start
+        while pos + 4 <= stop:
+            hits = [h for h in lead.values() if h >= 0]
+            if not hits:
+                return
+            hit = min(hits)
+            # Walk to the document that contains the hit.
+            while True:
+                (length,) = unpack(view, pos)
+                if length < 5:
+                    raise ValueError(f"Corrupt BSON document length {length} at offset {pos}")
+                nxt = pos + length
+                if nxt > hit or nxt > stop:
+                    break
+                pos = nxt
+            if nxt > self.size:
+                return
+            for group in rest:
+                for needle in group:
+                    if find(needle, pos, nxt) >= 0:
+                        break
+                else:
+                    break  # no needle of this group: not a candidate
+            else:
+                yield pos, nxt
+            pos = nxt
+            for needle, h in lead.items():
+                if 0 <= h < pos:
+                    lead[needle] = find(needle, pos, stop)
+
+    def _elements(
+        self, start: int, end: int, names: Iterable[str]
+    ) -> dict[str, tuple[int, int, int, int]]:
+        """``name → (type, element start, value start, value end)`` for top-level fields.
+
+        Walks the element headers and stops once every name is found.
+        """
+        view, unpack = self._view, _INT32.unpack_from
+        assert self._mm is not None
+        find = self._mm.find
+        wanted = {n.encode(): n for n in names}
+        found: dict[str, tuple[int, int, int, int]] = {}
+        pos, last = start + 4, end - 1
+        while pos < last and len(found) < len(wanted):
+            element, etype = pos, view[pos]
+            name_end = find(b"\x00", pos + 1, last)
+            if name_end < 0:
+                break
+            name = wanted.get(bytes(view[pos + 1 : name_end]))
+            pos = name_end + 1
+            if etype in (0x02, 0x0D, 0x0E):  # string, code, symbol
+                size = 4 + unpack(view, pos)[0]
+            elif etype in (0x03, 0x04):  # document, array
+                size = unpack(view, pos)[0]
+            elif etype == 0x05:  # binary
+                size = 5 + unpack(view, pos)[0]
+            elif etype in _FIXED_SIZES:
+                size = _FIXED_SIZES[etype]
+            else:
+                break  # unsupported element type: stop peeking
+            if name is not None:
+                found[name] = (etype, element, pos, pos + size)
+            pos += size
+        return found
+
+    def peek(self, start: int, end: int, names: Iterable[str]) -> dict[str, Any]:
+        """Decode only the named top-level fields of the document at *start*.
+
+        Strings and ints come back as Python values, ``ObjectId`` as its hex
+        string and embedded documents as ``(start, end)`` offsets (which can
+        be peeked in turn); other types as ``None``.
+        """
+        view = self._view
+        found: dict[str, Any] = {}
+        for name, (etype, _, pos, stop) in self._elements(start, end, names).items():
+            if etype == 0x02:
+                found[name] = bytes(view[pos + 4 : stop - 1]).decode()
+            elif etype == 0x07:
+                found[name] = bytes(view[pos:stop]).hex()
+            elif etype == 0x10:
+                found[name] = _INT32.unpack_from(view, pos)[0]
+            elif etype == 0x12:
+                found[name] = _INT64.unpack_from(view, pos)[0]
+            elif etype == 0x03:
+                found[name] = (pos, stop)
+            else:
+                found[name] = None
+        return found
+
+    def peek_key(self, start: int, end: int) -> tuple[tuple[str, str, str], list[bytes]]:
+        """``(id, type, day)`` of a document without decoding it.
+
+        Also returns byte needles present in every document with the same
+        key: the raw ``id`` and ``type`` elements, and the ``dateTime``
+        element up to its date part.
+        """
+        view = self._view
+        elements = self._elements(start, end, ("id", "type", "data"))
+        values = self.peek(start, end, ("id", "type", "data"))
+        needles = [
+            bytes(view[elements[n][1] : elements[n][3]]) for n in ("id", "type") if n in elements
+        ]
+        day = ""
+        data = values.get("data")
+        if isinstance(data, tuple):
+            dt = self._elements(data[0], data[1], ("dateTime",)).get("dateTime")
+            if dt is not None and dt[0] == 0x02:
+                day = _doc_day({"dateTime": bytes(view[dt[2] + 4 : dt[3] - 1]).decode()})
+                width = 8 if view[dt[2] + 6] == ord("/") else 10  # MM/DD/YY or ISO date
+                needles.append(bytes(view[dt[1] : dt[2] + 4 + width]))
+        key = (str(values.get("id", "")), str(values.get("type", "")), day)
+        return key, needles
+
+
+def scan_keys(
+    mapped: MappedBSON, start: int = 0, end: int | None = None
+) -> Iterator[tuple[int, int, int, tuple[str, str, str]]]:
+    """Yield ``(start, end, count, (id, type, day))`` runs of consecutive documents.
+
+    The file is grouped by participant and type, so each document is first
+    checked against the current run's encoded key (a few ``mmap.find``
+    calls); only on a change are its headers peeked.  *start* / *end*
+    restrict the scan to a document-aligned byte range.
+    """
+    if mapped._mm is None:
+        return
+    view, find, unpack = mapped._view, mapped._mm.find, _INT32.unpack_from
+    key: tuple[str, str, str] | None = None
+    needles: list[bytes] = []
+    run_start = run_end = count = 0
+    pos, size = start, mapped.size if end is None else min(end, mapped.size)
+    while pos + 4 <= size:
+        (length,) = unpack(view, pos)
+        if length < 5:
+            raise ValueError(f"Corrupt BSON document length {length} at offset {pos}")
+        doc_end = pos + length
+        if doc_end > size:
+            break  # truncated trailing document
+        if key is not None:
+            for needle in needles:
+                if find(needle, pos, doc_end) < 0:
+                    break
+            else:
+                run_end, count, pos = doc_end, count + 1, doc_end
+                continue
+        doc_key, doc_needles = mapped.peek_key(pos, doc_end)
+        if doc_key == key:
+            run_end, count = doc_end, count + 1
+        else:
+            if key is not None:
+                yield run_start, run_end, count, key
+            key, needles, run_start, run_end, count = doc_key, doc_needles, pos, doc_end, 1
+        pos = doc_end
+    if key is not None:
+        yield run_start, run_end, count, key
+
+
+# ── Offset index ──────────────────────────────────────────────
+
+
+class BSONIndex:
+    """Byte ranges per (participant, type, day) for one BSON file.
+
+    Use :func:`get_index` to share a loaded index between streamers.
+    """
+
+    def __init__(self, bson_path: Path, index_path: Path | None = None) -> None:
+        self.bson_path = Path(bson_path)
+        self.index_path = index_path or self.bson_path.with_name(
+            self.bson_path.name + ".idx.json"
+        )
+        self.signature: tuple[int, int] | None = None
+        self._lock = threading.Lock()
+        # participant → type → day → [span, …]
+        self._spans: dict[str, dict[str, dict[str, list[Span]]]] = {}
+
+    # ── Build / persist ───────────────────────────────────────
+
+    def is_current(self) -> bool:
+        return self.signature is not None and self.signature == _file_signature(self.bson_path)
+
+    def load(self) -> bool:
+        """Load the sidecar; ``False`` when it is missing, unreadable or stale."""
+        try:
+            payload = json.loads(self.index_path.read_text())
+        except (OSError, ValueError):
+            return False
+        signature = (payload.get("bson_size"), payload.get("bson_mtime_ns"))
+        if payload.get("version") != _INDEX_VERSION or signature != _file_signature(
+            self.bson_path
+        ):
+            return False
+        self._spans = {
+            pid: {
+                doc_type: {day: [tuple(s) for s in spans] for day, spans in days.items()}
+                for doc_type, days in types.items()
+            }
+            for pid, types in payload["spans"].items()
+        }
+        self.signature = signature  # type: ignore[assignment]
+        return True
+
+    def build(self) -> None:
+        """Scan the BSON file once and write the sidecar."""
+        if bson is None:
+            raise RuntimeError("pymongo/bson not installed — cannot index BSON data")
+        signature = _file_signature(self.bson_path)
+        logger.info(
+            "lifesnaps.bson_index_building",
+            path=str(self.bson_path),
+            size_mb=round(signature[0] / 1024 / 1024, 1),
+        )
+        spans: dict[str, dict[str, dict[str, list[Span]]]] = {}
+        docs = 0
+        with MappedBSON(self.bson_path) as mapped:
+            for run_start, run_end, count, (pid, doc_type, day) in scan_keys(mapped):
+                docs += count
+                spans.setdefault(pid, {}).setdefault(doc_type, {}).setdefault(day, []).append(
+                    (run_start, run_end, count)
+                )
+
+        self._spans = spans
+        self.signature = signature
+        self._write()
+        logger.info(
+            "lifesnaps.bson_index_built",
+            path=str(self.index_path),
+            documents=docs,
+            participants=len(spans),
+            spans=sum(len(s) for t in spans.values() for d in t.values() for s in d.values()),
+        )
+
+    def _write(self) -> None:
+        assert self.signature is not None
+        payload = {
+            "version": _INDEX_VERSION,
+            "bson_size": self.signature[0],
+            "bson_mtime_ns": self.signature[1],
+            "spans": self._spans,
+        }
+        tmp = self.index_path.with_name(self.index_path.name + ".tmp")
+        try:
+            tmp.write_text(json.dumps(payload, separators=(",", ":")))
+            os.replace(tmp, self.index_path)
+        except OSError as exc:
+            # Read-only data dir: keep the index in memory for this process.
+            logger.warning(
+                "lifesnaps.bson_index_not_saved", path=str(self.index_path), error=str(exc)
+            )
+
+    def ensure_current(self) -> None:
+        """Load the sidecar, or rebuild it if the BSON file has changed.
+
+        Concurrent callers wait for a single load / build.
+        """
+        if self.is_current():
+            return
+        with self._lock:
+            if not self.is_current() and not self.load():
+                self.build()
+
+    # ── Lookup ────────────────────────────────────────────────
+
+    def participants(self) -> list[str]:
+        return sorted(self._spans)
+
+    def days(self, participant_id: str, doc_type: str) -> list[str]:
+        return sorted(self._spans.get(participant_id, {}).get(doc_type, {}))
+
+    def count(self, participant_id: str, types: Iterable[str]) -> int:
+        """Number of indexed documents for *participant_id* of the given *types*."""
+        return sum(n for _, _, n in self._select(participant_id, types, None, None))
+
+    def spans(
+        self,
+        participant_id: str,
+        types: Iterable[str],
+        start: date | None = None,
+        end: date | None = None,
+    ) -> list[tuple[int, int]]:
+        """Merged ``(start, end)`` byte ranges in file order for the selection.
+
+        *start* / *end* limit the days (inclusive); documents without a
+        parseable day are only included when neither bound is given.
+        """
+        ranges = sorted((a, b) for a, b, _ in self._select(participant_id, types, start, end))
+        merged: list[tuple[int, int]] = []
+        for a, b in ranges:
+            if merged and merged[-1][1] == a:
+                merged[-1] = (merged[-1][0], b)
+            else:
+                merged.append((a, b))
+        return merged
+
+    def _select(
+        self,
+        participant_id: str,
+        types: Iterable[str],
+        start: date | None,
+        end: date | None,
+    ) -> Iterator[Span]:
+        by_type = self._spans.get(str(participant_id), {})
+        lo = start.isoformat() if start else None
+        hi = end.isoformat() if end else None
+        for doc_type in types:
+            for day, spans in by_type.get(doc_type, {}).items():
+                if (lo or hi) and (not day or (lo and day < lo) or (hi and day > hi)):
+                    continue
+                yield from spans
+
+
+_indexes: dict[Path, BSONIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(bson_path: Path) -> BSONIndex:
+    """Shared, up-to-date :class:`BSONIndex` for *bson_path* (built if needed)."""
+    path = Path(bson_path).resolve()
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            index = _indexes[path] = BSONIndex(path)
+    index.ensure_current()
+    return index
+
+
+# ── Streaming ─────────────────────────────────────────────────
+
+
+def parse_datetime(dt_str: str) -> datetime | None:
+    """Parse "MM/DD/YY HH:MM:SS" (sliced directly — strptime is ~10x slower) or ISO."""
+    if len(dt_str) == 17 and dt_str[2] == "/" and dt_str[5] == "/" and dt_str[8] == " ":
+        try:
+            return datetime(
+                2000 + int(dt_str[6:8]), int(dt_str[0:2]), int(dt_str[3:5]),
+                int(dt_str[9:11]), int(dt_str[12:14]), int(dt_str[15:17]),
+            )
+        except ValueError:
+            pass
+    try:
+        return datetime.strptime(dt_str, "%m/%d/%y %H:%M:%S")
+    except ValueError:
+        try:
+            return datetime.fromisoformat(dt_str)
+        except ValueError:
+            return None
+
+
+def doc_value(doc_type: str, data: dict[str, Any]) -> float | None:
+    """Numeric value of a document's ``data`` block, or ``None`` if unusable."""
+    try:
+        if doc_type == "heart_rate":
+            # value is a dict: {"bpm": 67, "confidence": 1}
+            val_obj = data.get("value")
+            return float(val_obj.get("bpm", 0)) if isinstance(val_obj, dict) else float(val_obj)
+        # steps: "0", calories: "2.62" (strings)
+        return float(data.get("value", 0))
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_doc(doc: dict[str, Any], participant_id: str) -> SensorReading | None:
+    """Turn one BSON document into a reading, or ``None`` if it is unusable."""
+    doc_type = doc.get("type")
+    if doc_type not in BSON_TYPES:
+        return None
+    data = doc.get("data", {})
+    if not data:
+        return None
+
+    # Extract timestamp (e.g., "05/24/21 00:00:01")
+    dt_str = data.get("dateTime")
+    if not dt_str:
+        return None
+    # Note: naive parse, assuming local or consistent UTC
+    timestamp = parse_datetime(dt_str)
+    if timestamp is None:
+        return None  # Skip malformed dates
+
+    metric, unit = BSON_TYPES[doc_type]
+    val = doc_value(doc_type, data)
+    if val is None:
+        return None
+
+    return SensorReading(
+        participant_id=participant_id,
+        device_type=DeviceType.FITBIT,
+        metric_type=metric,
+        value=val,
+        unit=unit,
+        timestamp=timestamp,
+        metadata={"source": "lifesnaps_bson"},
+    )
 
 
 class BSONStreamer:
     """Streams high-frequency data from the monolithic fitbit.bson file."""
 
-    def __init__(self, bson_path: Path) -> None:
+    def __init__(self, bson_path: Path, *, use_index: bool = True) -> None:
         self.bson_path = bson_path
+        self.use_index = use_index
 
     def iter_readings(
-        self, participant_id: str, metrics: list[MetricType]
+        self,
+        participant_id: str,
+        metrics: list[MetricType],
+        *,
+        start: date | None = None,
+        end: date | None = None,
     ) -> Generator[SensorReading, None, None]:
         """Yield sensor readings from BSON matching the filter criteria.
 
-        This performs a linear scan of the BSON file.
+        Readings come in file order.  With the offset index only the
+        participant's byte ranges are read; without it (``use_index=False``
+        or index unavailable) the whole file is scanned.  *start* / *end*
+        optionally limit the days (inclusive).
         """
         if not self.bson_path.exists():
             logger.error(f"BSON file not found at {self.bson_path}")
@@ -38,97 +608,49 @@ class BSONStreamer:
             logger.error("pymongo/bson not installed — cannot stream BSON data")
             return
 
-        # Map MetricType to BSON 'type' string
-        type_map = {}
-        if MetricType.HEART_RATE in metrics:
-            type_map["heart_rate"] = MetricType.HEART_RATE
-        if MetricType.STEPS in metrics:
-            type_map["steps"] = MetricType.STEPS
-        if MetricType.CALORIES in metrics:
-            type_map["calories"] = MetricType.CALORIES
-        # Add others if schema confirmed
-
-        if not type_map:
+        target_types = {t for t, (m, _) in BSON_TYPES.items() if m in metrics}
+        if not target_types:
             return
 
-        target_types = set(type_map.keys())
+        ranges: Sequence[tuple[int, int | None]] = [(0, None)]
+        if self.use_index:
+            try:
+                index = get_index(self.bson_path)
+                spans = index.spans(participant_id, target_types, start, end)
+            except Exception as exc:
+                logger.warning("lifesnaps.bson_index_unavailable", error=str(exc))
+            else:
+                ranges = spans
+                logger.info(
+                    "lifesnaps.bson_indexed_read",
+                    participant=participant_id,
+                    ranges=len(spans),
+                    mb=round(sum(b - a for a, b in spans) / 1024 / 1024, 1),
+                )
 
+        pid_needles = encode_element("id", participant_id)
+        type_needles = [n for t in sorted(target_types) for n in encode_element("type", t)]
         try:
-            with open(self.bson_path, "rb") as f:
-                # Iterate over BSON documents efficiently
-                for doc in bson.decode_file_iter(f):
-                    doc_type = doc.get("type")
-                    
-                    # 1. Check if type matches
-                    if doc_type not in target_types:
-                        continue
-
-                    # 2. Check if participant matches
-                    # BSON 'id' field is the participant ID
-                    if doc.get("id") != participant_id:
-                        continue
-
-                    # 3. Parse and yield
-                    try:
-                        data = doc.get("data", {})
-                        if not data:
+            with MappedBSON(self.bson_path) as mapped:
+                for range_start, range_end in ranges:
+                    # Match id / type on the raw bytes; decode only candidates.
+                    candidates = mapped.find_documents(
+                        [pid_needles, type_needles], range_start, range_end
+                    )
+                    for doc_start, doc_end in candidates:
+                        doc = mapped.decode(doc_start, doc_end)
+                        if doc.get("type") not in target_types:
                             continue
-
-                        # Extract timestamp (e.g., "05/24/21 00:00:01")
-                        dt_str = data.get("dateTime")
-                        if not dt_str:
+                        if str(doc.get("id")) != participant_id:
                             continue
-                        
-                        # Handle potential format variations if any (saw "MM/DD/YY HH:MM:SS" in sample)
-                        try:
-                            # Note: naive parse, assuming local or consistent UTC
-                            timestamp = datetime.strptime(dt_str, "%m/%d/%y %H:%M:%S")
-                        except ValueError:
-                             try:
-                                timestamp = datetime.fromisoformat(dt_str)
-                             except ValueError:
-                                continue # Skip malformed dates
-
-                        # Extract Value
-                        val = 0.0
-                        unit = ""
-                        metric = type_map[doc_type]
-
-                        if (doc_type == "heart_rate"):
-                            # value is a dict: {"bpm": 67, "confidence": 1}
-                            val_obj = data.get("value")
-                            if isinstance(val_obj, dict):
-                                val = float(val_obj.get("bpm", 0))
-                            else:
-                                val = float(val_obj) # fallback
-                            unit = "bpm"
-
-                        elif (doc_type == "steps"):
-                            # value: "0" (string)
-                            val = float(data.get("value", 0))
-                            unit = "steps"
-                        
-                        elif (doc_type == "calories"):
-                             # value: "2.62"
-                             val = float(data.get("value", 0))
-                             unit = "kcal"
-
-                        yield SensorReading(
-                            participant_id=participant_id,
-                            device_type=DeviceType.FITBIT,
-                            metric_type=metric,
-                            value=val,
-                            unit=unit,
-                            timestamp=timestamp,
-                            metadata={"source": "lifesnaps_bson"}
-                        )
-
-                    except Exception as e:
-                        # Log but don't crash stream on one bad record
-                        # logger.warning(f"Failed to parse BSON record: {e}")
-                        continue
-
+                        reading = _parse_doc(doc, participant_id)
+                        if reading is None:
+                            continue
+                        if (start and reading.timestamp.date() < start) or (
+                            end and reading.timestamp.date() > end
+                        ):
+                            continue
+                        yield reading
         except Exception as e:
             logger.error(f"Error streaming BSON: {e}")
             raise
-
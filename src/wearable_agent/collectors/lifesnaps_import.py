@@ -0,0 +1,148 @@
+"""Bulk import of LifeSnaps minute-level data (HR, steps, calories) into the DB.
+
+Unlike :meth:`LifeSnapsCollector.stream`, nothing is time-shifted or paced:
+the participant's readings are read from the Parquet copy (or the BSON
+shard) in fixed order and written in ``save_batch`` chunks::
+
+    await import_high_frequency("5f4e…")
+
+Each batch is inserted and its checkpoint (``import_checkpoints.position``,
+the number of source readings consumed) advanced in one transaction, so an
+import that fails, is cancelled or dies with the process resumes exactly
+after the last committed batch.  Cancel by cancelling the task.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Callable
+from typing import Any
+
+import structlog
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from wearable_agent.collectors.lifesnaps import LifeSnapsCollector
+from wearable_agent.config import get_settings
+from wearable_agent.models import MetricType
+from wearable_agent.storage.database import get_session_factory
+from wearable_agent.storage.repository import ImportCheckpointRepository, ReadingRepository
+
+logger = structlog.get_logger(__name__)
+
+IMPORT_SOURCE = "lifesnaps_bson"
+METRICS = [MetricType.HEART_RATE, MetricType.STEPS, MetricType.CALORIES]
+
+_PROGRESS_LOG_SECONDS = 10.0
+
+
+def checkpoint_dict(row: Any) -> dict[str, Any]:
+    """An ``import_checkpoints`` row as a JSON-ready progress report."""
+    return {
+        "participant_id": row.participant_id,
+        "source": row.source,
+        "status": row.status,
+        "position": row.position,
+        "total": row.total,
+        "inserted": row.inserted,
+        "percent": round(100 * row.position / row.total, 1) if row.total else 0.0,
+        "error": row.error,
+        "started_at": row.started_at,
+        "updated_at": row.updated_at,
+    }
+
+
+async def import_high_frequency(
+    participant_id: str,
+    *,
+    collector: LifeSnapsCollector | None = None,
+    session_factory: async_sessionmaker[AsyncSession] | None = None,
+    batch_size: int | None = None,
+    restart: bool = False,
+    on_progress: Callable[[dict[str, Any]], None] | None = None,
+) -> dict[str, Any]:
+    """Import (or resume importing) one participant's minute-level readings.
+
+    Parameters
+    ----------
+    restart:
+        Delete previously imported ``lifesnaps_bson`` rows and start from
+        the first reading instead of the checkpoint.
+    on_progress:
+        Called with the progress report after every committed batch.
+
+    Returns the final progress report.  Raises :class:`FileNotFoundError`
+    when the participant has no BSON data; cancellation (``CancelledError``)
+    leaves the checkpoint at the last committed batch with status
+    ``cancelled``.
+    """
+    collector = collector or LifeSnapsCollector()
+    factory = session_factory or get_session_factory()
+    batch_size = batch_size or get_settings().lifesnaps_import_batch_size
+
+    async with factory() as session:
+        checkpoints = ImportCheckpointRepository(session)
+        readings = ReadingRepository(session)
+
+        if restart:
+            deleted = await readings.delete_for_participant(participant_id, source=IMPORT_SOURCE)
+            logger.info("lifesnaps.import_reset", participant=participant_id, deleted=deleted)
+            existing = None
+        else:
+            existing = await checkpoints.get(participant_id, IMPORT_SOURCE)
+        offset = existing.position if existing is not None else 0
+
+        plan = await collector.high_frequency_batches(
+            participant_id, METRICS, offset=offset, batch_size=batch_size
+        )
+        if plan is None:
+            raise FileNotFoundError(f"No BSON data for participant {participant_id}")
+        total, batches = plan
+        row = await checkpoints.start(participant_id, IMPORT_SOURCE, total, restart=restart)
+        logger.info(
+            "lifesnaps.import_start",
+            participant=participant_id,
+            resume_from=row.position,
+            total=total,
+        )
+
+        t0 = last_log = time.monotonic()
+        try:
+            while True:
+                # Decoding / column conversion happens in the iterator.
+                batch = await asyncio.to_thread(next, batches, None)
+                if batch is None:
+                    break
+                inserted = await readings.save_batch(batch, commit=False)
+                await checkpoints.advance(participant_id, IMPORT_SOURCE, len(batch), inserted)
+                if on_progress is not None:
+                    on_progress(checkpoint_dict(row))
+                now = time.monotonic()
+                if now - last_log >= _PROGRESS_LOG_SECONDS:
+                    logger.info(
+                        "lifesnaps.import_progress",
+                        participant=participant_id,
+                        position=row.position,
+                        total=total,
+                        rate=round(row.inserted / (now - t0)),
+                    )
+                    last_log = now
+        except asyncio.CancelledError:
+            await session.rollback()
+            await checkpoints.finish(participant_id, IMPORT_SOURCE, "cancelled")
+            logger.info("lifesnaps.import_cancelled", participant=participant_id,
+                        position=row.position)
+            raise
+        except Exception as exc:
+            await session.rollback()
+            await checkpoints.finish(participant_id, IMPORT_SOURCE, "failed", str(exc))
+            raise
+
+        await checkpoints.finish(participant_id, IMPORT_SOURCE, "completed")
+        logger.info(
+            "lifesnaps.import_complete",
+            participant=participant_id,
+            inserted=row.inserted,
+            seconds=round(time.monotonic() - t0, 2),
+        )
+        return checkpoint_dict(row)
@@ -0,0 +1,280 @@
+"""Columnar (Parquet) copy of the LifeSnaps high-frequency BSON data.
+
+Heart rate, steps and calories at minute / 5-second resolution only exist
+in ``fitbit.bson``.  Decoding them on every replay or bulk sync is the slow
+part, so :class:`LifeSnapsParquet` converts each participant's BSON shard
+once into a partitioned dataset::
+
+    <root>/participant_id=<id>/type=heart_rate/month=2021-05/data.parquet
+
+with ``timestamp`` (µs, naive) and ``value`` columns, sorted by timestamp
+and written in row groups whose min/max statistics let :meth:`read` skip
+everything outside the requested time window.  Type and month are
+partition directories, so unwanted metrics and months are never opened.
+
+A participant's ``_source.json`` records the size / mtime of the shard it
+was converted from; a changed shard is reconverted on next use.
+
+Requires the optional ``pyarrow`` dependency (``pip install -e ".[parquet]"``);
+without it the collector keeps reading BSON.
+"""
+
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any
+from urllib.parse import quote
+
+import pandas as pd
+import structlog
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None  # type: ignore[assignment]
+    pq = None  # type: ignore[assignment]
+
+from wearable_agent.collectors.lifesnaps_bson import (
+    BSON_TYPES,
+    MappedBSON,
+    doc_value,
+    encode_element,
+    parse_datetime,
+)
+from wearable_agent.storage.partitions import add_months, month_start
+
+logger = structlog.get_logger(__name__)
+
+_SOURCE_NAME = "_source.json"
+# ~1 day of 5-second heart rate per row group: day-level time filters skip
+# whole row groups via their timestamp statistics.
+_ROW_GROUP_SIZE = 20_000
+
+_SCHEMA = (
+    pa.schema([("timestamp", pa.timestamp("us")), ("value", pa.float64())])
+    if pa is not None
+    else None
+)
+
+
+def _signature(path: Path) -> list[int]:
+    st = path.stat()
+    return [st.st_size, st.st_mtime_ns]
+
+
+class LifeSnapsParquet:
+    """Participant / type / month partitioned Parquet files under *root*."""
+
+    def __init__(self, root: str | Path) -> None:
+        if pq is None:
+            raise RuntimeError("Parquet conversion requires pyarrow: pip install -e '.[parquet]'")
+        self.root = Path(root)
+
+    # ── Layout ────────────────────────────────────────────────
+
+    def participant_dir(self, participant_id: str) -> Path:
+        return self.root / f"participant_id={quote(participant_id, safe='')}"
+
+    def _type_dir(self, participant_id: str, doc_type: str) -> Path:
+        return self.participant_dir(participant_id) / f"type={doc_type}"
+
+    def months(self, participant_id: str, doc_type: str) -> list[date]:
+        directory = self._type_dir(participant_id, doc_type)
+        if not directory.is_dir():
+            return []
+        months = []
+        for path in directory.glob("month=*/data.parquet"):
+            try:
+                months.append(datetime.strptime(path.parent.name[6:], "%Y-%m").date())
+            except ValueError:
+                continue
+        return sorted(months)
+
+    def has(self, participant_id: str) -> bool:
+        return (self.participant_dir(participant_id) / _SOURCE_NAME).exists()
+
+    def is_current(self, participant_id: str, shard: Path | None) -> bool:
+        """Converted, and (when the source shard is present) from this version of it."""
+        try:
+            source = json.loads((self.participant_dir(participant_id) / _SOURCE_NAME).read_text())
+        except (OSError, ValueError):
+            return False
+        if shard is None or not shard.exists():
+            return True
+        return source.get("signature") == _signature(shard)
+
+    # ── Convert ───────────────────────────────────────────────
+
+    def convert_participant(self, participant_id: str, shard: Path) -> dict[str, int]:
+        """Convert one participant's BSON shard; returns rows written per type.
+
+        Only heart_rate / steps / calories documents of *participant_id* are
+        decoded.  The participant's directory is replaced atomically.
+        """
+        columns: dict[str, tuple[list[datetime], list[float]]] = {t: ([], []) for t in BSON_TYPES}
+        pid_needles = encode_element("id", participant_id)
+        type_needles = [n for t in BSON_TYPES for n in encode_element("type", t)]
+        with MappedBSON(shard) as mapped:
+            for start, end in mapped.find_documents([pid_needles, type_needles]):
+                doc = mapped.decode(start, end)
+                doc_type = doc.get("type")
+                data = doc.get("data")
+                if doc_type not in columns or str(doc.get("id")) != participant_id:
+                    continue
+                if not isinstance(data, dict) or not isinstance(data.get("dateTime"), str):
+                    continue
+                ts = parse_datetime(data["dateTime"])
+                value = doc_value(doc_type, data)
+                if ts is None or value is None:
+                    continue
+                columns[doc_type][0].append(ts)
+                columns[doc_type][1].append(value)
+
+        final = self.participant_dir(participant_id)
+        staging = final.with_name(final.name + ".tmp")
+        shutil.rmtree(staging, ignore_errors=True)
+        counts: dict[str, int] = {}
+        for doc_type, (timestamps, values) in columns.items():
+            if not timestamps:
+                continue
+            table = pa.table(
+                {"timestamp": pa.array(timestamps, pa.timestamp("us")), "value": values},
+                schema=_SCHEMA,
+            ).sort_by("timestamp")
+            counts[doc_type] = table.num_rows
+            self._write_months(staging / f"type={doc_type}", table)
+
+        staging.mkdir(parents=True, exist_ok=True)
+        (staging / _SOURCE_NAME).write_text(
+            json.dumps({"shard": shard.name, "signature": _signature(shard), "rows": counts})
+        )
+        shutil.rmtree(final, ignore_errors=True)
+        os.replace(staging, final)
+        logger.info("lifesnaps.parquet_converted", participant=participant_id, rows=counts)
+        return counts
+
+    @staticmethod
+    def _write_months(type_dir: Path, table: Any) -> None:
+        ts = table.column("timestamp").to_pandas()
+        first, last = month_start(ts.iloc[0]), month_start(ts.iloc[-1])
+        month = first
+        while month <= last:
+            lower = pd.Timestamp(month)
+            upper = pd.Timestamp(add_months(month, 1))
+            lo, hi = ts.searchsorted(lower), ts.searchsorted(upper)
+            if hi > lo:
+                path = type_dir / f"month={month:%Y-%m}" / "data.parquet"
+                path.parent.mkdir(parents=True, exist_ok=True)
+                pq.write_table(
+                    table.slice(lo, hi - lo), path,
+                    compression="zstd", row_group_size=_ROW_GROUP_SIZE,
+                )
+            month = add_months(month, 1)
+
+    # ── Read ──────────────────────────────────────────────────
+
+    def read(
+        self,
+        participant_id: str,
+        types: list[str],
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> Any:
+        """``type`` / ``timestamp`` / ``value`` table for the selection, by timestamp.
+
+        Type and month are pruned by directory; *start* / *end* (inclusive)
+        are pushed down to the row groups' timestamp statistics.
+        """
+        first = month_start(start) if start else None
+        last = month_start(end) if end else None
+        tables = []
+        for doc_type in types:
+            paths = [
+                self._type_dir(participant_id, doc_type) / f"month={m:%Y-%m}" / "data.parquet"
+                for m in self.months(participant_id, doc_type)
+                if (first is None or m >= first) and (last is None or m <= last)
+            ]
+            if not paths:
+                continue
+            filters = []
+            if start is not None:
+                filters.append(("timestamp", ">=", start))
+            if end is not None:
+                filters.append(("timestamp", "<=", end))
+            table = pq.read_table(
+                paths, schema=_SCHEMA, columns=["timestamp", "value"], filters=filters or None
+            )
+            tables.append(table.append_column("type", pa.array([doc_type] * table.num_rows)))
+        if not tables:
+            return pa.table(
+                {"timestamp": pa.array([], pa.timestamp("us")), "value": pa.array([], pa.float64()),
+                 "type": pa.array([], pa.string())}
+            )
+        return pa.concat_tables(tables).sort_by("timestamp")
+
+    def read_frame(
+        self,
+        participant_id: str,
+        types: list[str],
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> pd.DataFrame:
+        """:meth:`read` as a ``metric_type`` / ``value`` / ``unit`` / ``timestamp`` frame."""
+        df = self.read(participant_id, types, start, end).to_pandas()
+        df["metric_type"] = df["type"].map({t: m.value for t, (m, _) in BSON_TYPES.items()})
+        df["unit"] = df["type"].map({t: unit for t, (_, unit) in BSON_TYPES.items()})
+        return df[["metric_type", "value", "unit", "timestamp"]]
+
+
+def get_parquet_store(root: Path) -> LifeSnapsParquet | None:
+    """A :class:`LifeSnapsParquet` on *root*, or ``None`` when pyarrow is missing."""
+    if pq is None:
+        return None
+    return LifeSnapsParquet(root)
+
+
+def _convert_one(root: str, participant_id: str, shard: str) -> dict[str, int]:
+    return LifeSnapsParquet(root).convert_participant(participant_id, Path(shard))
+
+
+def convert_all(
+    bson_path: Path,
+    root: Path,
+    *,
+    workers: int | None = None,
+    force: bool = False,
+) -> dict[str, dict[str, int]]:
+    """Split *bson_path* (if needed) and convert every participant in a process pool.
+
+    Participants whose Parquet copy is current are skipped unless *force*.
+    """
+    from wearable_agent.collectors.lifesnaps_split import ensure_split, shard_path
+
+    store = LifeSnapsParquet(root)
+    participants = ensure_split(bson_path, workers=workers)
+    todo = {
+        pid: shard_path(bson_path.parent, pid)
+        for pid in participants
+        if force or not store.is_current(pid, shard_path(bson_path.parent, pid))
+    }
+    results: dict[str, dict[str, int]] = {}
+    if not todo:
+        return results
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1,
+                             mp_context=context) as pool:
+        futures = {
+            pid: pool.submit(_convert_one, str(root), pid, str(shard))
+            for pid, shard in todo.items()
+        }
+        for pid, future in futures.items():
+            results[pid] = future.result()
+    logger.info("lifesnaps.parquet_convert_all", participants=len(results), root=str(root))
+    return results
@@ -0,0 +1,224 @@
+"""Split the monolithic LifeSnaps ``fitbit.bson`` into per-participant shards.
+
+One parallel pass over the dump writes ``participant_<id>.bson`` for every
+participant next to it (or into *out_dir*)::
+
+    shards = ensure_split(mongo_dir / "fitbit.bson")
+
+The file is cut into document-aligned byte ranges (:func:`plan_ranges`);
+each range is scanned in a ``ProcessPoolExecutor`` worker with the
+header-peeking reader, and every participant run is copied out as raw
+bytes — nothing is decoded.  Workers write per-range part files, which are
+concatenated in range order so each shard keeps the dump's document order.
+
+A ``split_manifest.json`` records the source file's size / mtime and the
+per-participant counts; :func:`ensure_split` reuses a current split and
+redoes it when the dump changes.
+"""
+
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import struct
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import structlog
+
+from wearable_agent.collectors.lifesnaps_bson import MappedBSON, scan_keys
+
+logger = structlog.get_logger(__name__)
+
+MANIFEST_NAME = "split_manifest.json"
+_MANIFEST_VERSION = 1
+_INT32 = struct.Struct("<i")
+# Participant ids become file names; anything else is skipped.
+_SAFE_ID = re.compile(r"^[\w-]+$")
+
+_split_lock = threading.Lock()
+
+
+def shard_path(out_dir: Path, participant_id: str) -> Path:
+    return Path(out_dir) / f"participant_{participant_id}.bson"
+
+
+def _signature(path: Path) -> tuple[int, int]:
+    st = path.stat()
+    return st.st_size, st.st_mtime_ns
+
+
+def plan_ranges(bson_path: Path, parts: int) -> list[tuple[int, int]]:
+    """Cut *bson_path* into at most *parts* document-aligned ``(start, end)`` ranges.
+
+    Boundaries are found by walking the 4-byte length prefixes (no decoding)
+    from one target offset to the next.
+    """
+    size = bson_path.stat().st_size
+    if size == 0:
+        return []
+    parts = max(1, parts)
+    targets = [size * i // parts for i in range(1, parts)]
+    bounds = [0]
+    with open(bson_path, "rb") as f:
+        pos = 0
+        for target in targets:
+            while pos < target:
+                f.seek(pos)
+                header = f.read(4)
+                if len(header) < 4:
+                    break
+                (length,) = _INT32.unpack(header)
+                if length < 5:
+                    raise ValueError(f"Corrupt BSON document length {length} at offset {pos}")
+                pos += length
+            if bounds[-1] < pos < size:
+                bounds.append(pos)
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:], strict=True))
+
+
+def _split_range(bson_path: str, start: int, end: int, part_dir: str, part: int) -> dict:
+    """Worker: copy each participant's runs in ``[start, end)`` to part files."""
+    counts: dict[str, list[int]] = {}
+    handles: dict[str, Any] = {}
+    try:
+        with MappedBSON(Path(bson_path)) as mapped:
+            for run_start, run_end, count, (pid, _, _) in scan_keys(mapped, start, end):
+                if not _SAFE_ID.match(pid):
+                    continue
+                out = handles.get(pid)
+                if out is None:
+                    out = handles[pid] = open(Path(part_dir) / f"{part:04d}_{pid}.bson", "wb")
+                with mapped.view(run_start, run_end) as chunk:
+                    out.write(chunk)
+                stats = counts.setdefault(pid, [0, 0])
+                stats[0] += count
+                stats[1] += run_end - run_start
+    finally:
+        for out in handles.values():
+            out.close()
+    return counts
+
+
+def split_participants(
+    bson_path: Path,
+    out_dir: Path | None = None,
+    *,
+    workers: int | None = None,
+) -> dict[str, dict[str, int]]:
+    """Write one ``participant_<id>.bson`` per participant in a single parallel pass.
+
+    Returns ``{participant_id: {"documents": n, "bytes": b}}`` and writes the
+    manifest.  Existing shards for the same participants are replaced.
+    """
+    bson_path = Path(bson_path)
+    out_dir = Path(out_dir or bson_path.parent)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    signature = _signature(bson_path)
+    workers = workers or os.cpu_count() or 1
+    ranges = plan_ranges(bson_path, workers * 4)
+    logger.info(
+        "lifesnaps.split_start",
+        path=str(bson_path),
+        size_mb=round(signature[0] / 1024 / 1024, 1),
+        ranges=len(ranges),
+        workers=workers,
+    )
+
+    totals: dict[str, dict[str, int]] = {}
+    with tempfile.TemporaryDirectory(prefix=".split_", dir=out_dir) as part_dir:
+        # spawn: safe to call from a threaded server process.
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            futures = [
+                pool.submit(_split_range, str(bson_path), start, end, part_dir, i)
+                for i, (start, end) in enumerate(ranges)
+            ]
+            for future in futures:
+                for pid, (docs, size) in future.result().items():
+                    stats = totals.setdefault(pid, {"documents": 0, "bytes": 0})
+                    stats["documents"] += docs
+                    stats["bytes"] += size
+
+        # Concatenate parts in range order → file order within each shard.
+        parts: dict[str, list[Path]] = {}
+        for part in sorted(Path(part_dir).glob("*.bson")):
+            parts.setdefault(part.stem.split("_", 1)[1], []).append(part)
+        for pid, files in parts.items():
+            tmp = Path(part_dir) / f"{pid}.shard"
+            with open(tmp, "wb") as out:
+                for part in files:
+                    with open(part, "rb") as inp:
+                        shutil.copyfileobj(inp, out, 16 * 1024 * 1024)
+                    part.unlink()
+            os.replace(tmp, shard_path(out_dir, pid))
+
+    _write_manifest(out_dir, bson_path, signature, totals)
+    logger.info(
+        "lifesnaps.split_done",
+        participants=len(totals),
+        documents=sum(s["documents"] for s in totals.values()),
+        out_dir=str(out_dir),
+    )
+    return totals
+
+
+def _write_manifest(
+    out_dir: Path,
+    bson_path: Path,
+    signature: tuple[int, int],
+    participants: dict[str, dict[str, int]],
+) -> None:
+    payload = {
+        "version": _MANIFEST_VERSION,
+        "source": bson_path.name,
+        "bson_size": signature[0],
+        "bson_mtime_ns": signature[1],
+        "participants": participants,
+    }
+    tmp = out_dir / (MANIFEST_NAME + ".tmp")
+    tmp.write_text(json.dumps(payload, indent=1))
+    os.replace(tmp, out_dir / MANIFEST_NAME)
+
+
+def load_manifest(
+    bson_path: Path, out_dir: Path | None = None
+) -> dict[str, dict[str, int]] | None:
+    """Participants of a split that is current for *bson_path*, else ``None``."""
+    bson_path = Path(bson_path)
+    out_dir = Path(out_dir or bson_path.parent)
+    try:
+        payload = json.loads((out_dir / MANIFEST_NAME).read_text())
+    except (OSError, ValueError):
+        return None
+    if (
+        payload.get("version") != _MANIFEST_VERSION
+        or payload.get("source") != bson_path.name
+        or (payload.get("bson_size"), payload.get("bson_mtime_ns")) != _signature(bson_path)
+    ):
+        return None
+    participants = payload.get("participants", {})
+    if not all(shard_path(out_dir, pid).exists() for pid in participants):
+        return None
+    return participants
+
+
+def ensure_split(
+    bson_path: Path,
+    out_dir: Path | None = None,
+    *,
+    workers: int | None = None,
+) -> dict[str, dict[str, int]]:
+    """Reuse a current split of *bson_path*, or split it (once, under a lock)."""
+    with _split_lock:
+        participants = load_manifest(bson_path, out_dir)
+        if participants is None:
+            participants = split_participants(bson_path, out_dir, workers=workers)
+        return participants
@@ -0,0 +1,473 @@
+"""Heap-merge replay of time-ordered reading sources on one wall clock.
+
+:class:`ReplayEngine` merges any number of sources that are each sorted
+by timestamp (``heapq.merge``: one pending reading per source, so memory
+stays bounded however long the history is) and replays them time-shifted
+to now at ``speed`` × real time (each shifted reading gets the id of its
+new timestamp, see :meth:`~wearable_agent.models.SensorReading.restamp`)::
+
+    engine = ReplayEngine([csv_daily, csv_hourly, heart_rate], speed=60)
+    async for batch in engine.batches():
+        await pipeline.publish_batch(batch)
+
+Instead of one ``asyncio.sleep`` per reading it wakes once per ``tick``
+and emits everything that came due since as one batch, so a 1000× replay
+of minute-level data costs the event loop ~1/tick wake-ups per second,
+not thousands.  A reading is emitted at most about one tick after it is
+due; :attr:`ReplayEngine.max_lag` records the worst case observed.
+
+:class:`ReplaySession` does the same for many participants at once: one
+timer task and one :class:`VirtualClock` (pause / resume / seek / speed)
+for all of them, publishing every participant's due readings per tick.
+It is the load generator for capacity tests.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import time
+import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable, Iterator
+from datetime import datetime, timedelta
+from operator import attrgetter
+from typing import Any
+
+import structlog
+
+from wearable_agent.models import SensorReading
+
+logger = structlog.get_logger(__name__)
+
+
+class ReplayEngine:
+    """Replay time-sorted reading sources, merged, time-shifted to now.
+
+    Parameters
+    ----------
+    sources:
+        Iterables of readings, each sorted by timestamp.  They are consumed
+        lazily (in a worker thread, so they may decode files).
+    speed:
+        Replay multiplier (``60.0`` = one source minute per wall second).
+    tick:
+        Seconds between wake-ups; readings due within a tick form a batch.
+    max_batch:
+        Upper bound on a batch.  A larger backlog (slow consumer, huge
+        speed) is split into several batches without sleeping in between.
+    start:
+        Skip source readings before this time.
+    """
+
+    def __init__(
+        self,
+        sources: Iterable[Iterable[SensorReading]],
+        *,
+        speed: float = 1.0,
+        tick: float = 0.05,
+        max_batch: int = 1_000,
+        start: datetime | None = None,
+    ) -> None:
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        self.speed = speed
+        self.tick = tick
+        self.max_batch = max_batch
+        self.start = start
+        self._merged = heapq.merge(*sources, key=attrgetter("timestamp"))
+        self._head: SensorReading | None = None
+        self._exhausted = False
+
+        self.emitted = 0
+        self.batches_emitted = 0
+        self.max_lag = 0.0  # Seconds the first reading of a batch was late
+
+    def _take(self, horizon: datetime | None) -> list[SensorReading]:
+        """Pull readings due by *horizon* (source time), at most ``max_batch``.
+
+        With ``horizon=None`` only the next reading is loaded into the head.
+        """
+        batch: list[SensorReading] = []
+        head = self._head
+        while len(batch) < self.max_batch:
+            if head is None:
+                head = next(self._merged, None)
+                if head is None:
+                    self._exhausted = True
+                    break
+                if self.start is not None and head.timestamp < self.start:
+                    head = None
+                    continue
+            if horizon is None or head.timestamp > horizon:
+                break
+            batch.append(head)
+            head = None
+        self._head = head
+        return batch
+
+    def _shift(self, batch: list[SensorReading], origin: datetime, shifted: datetime) -> None:
+        """Re-stamp *batch* from source time to wall time (worker thread: this
+        re-derives, i.e. hashes, every reading's id)."""
+        for reading in batch:
+            reading.restamp(shifted + (reading.timestamp - origin) / self.speed)
+
+    async def batches(self) -> AsyncIterator[list[SensorReading]]:
+        """Yield batches of readings as they come due, timestamps shifted to now."""
+        await asyncio.to_thread(self._take, None)
+        if self._head is None:
+            return
+        origin = self._head.timestamp
+        wall_origin = time.monotonic()
+        shifted_origin = datetime.now()
+
+        while True:
+            elapsed = time.monotonic() - wall_origin
+            horizon = origin + timedelta(seconds=elapsed * self.speed)
+            batch = await asyncio.to_thread(self._take, horizon)
+            if batch:
+                due = (batch[0].timestamp - origin).total_seconds() / self.speed
+                self.max_lag = max(self.max_lag, elapsed - due)
+                await asyncio.to_thread(self._shift, batch, origin, shifted_origin)
+                self.emitted += len(batch)
+                self.batches_emitted += 1
+                yield batch
+            if self._head is None and self._exhausted:
+                break
+            if len(batch) == self.max_batch:
+                await asyncio.sleep(0)  # backlog: catch up, but let others run
+                continue
+            assert self._head is not None
+            next_due = (self._head.timestamp - origin).total_seconds() / self.speed
+            await asyncio.sleep(max(self.tick, next_due - (time.monotonic() - wall_origin)))
+
+        logger.debug(
+            "replay.finished",
+            emitted=self.emitted,
+            batches=self.batches_emitted,
+            max_lag_ms=round(self.max_lag * 1000, 1),
+        )
+
+
+# ── Multi-participant sessions ────────────────────────────────
+
+
+class VirtualClock:
+    """Replay position in virtual (source) seconds, advancing at ``speed`` × wall time.
+
+    Starts paused at position 0.
+    """
+
+    def __init__(self, speed: float = 1.0) -> None:
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        self.speed = speed
+        self._base = 0.0
+        self._wall: float | None = None  # monotonic time of _base while running
+
+    @property
+    def paused(self) -> bool:
+        return self._wall is None
+
+    def position(self) -> float:
+        if self._wall is None:
+            return self._base
+        return self._base + (time.monotonic() - self._wall) * self.speed
+
+    def resume(self) -> None:
+        if self._wall is None:
+            self._wall = time.monotonic()
+
+    def pause(self) -> None:
+        self._base = self.position()
+        self._wall = None
+
+    def seek(self, position: float) -> None:
+        self._base = position
+        if self._wall is not None:
+            self._wall = time.monotonic()
+
+    def set_speed(self, speed: float) -> None:
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        self.seek(self.position())
+        self.speed = speed
+
+    def wall_delay(self, position: float) -> float:
+        """Wall seconds until the clock reaches *position* (``inf`` while paused)."""
+        if self._wall is None:
+            return float("inf")
+        return (position - self.position()) / self.speed
+
+
+SourceFactory = Callable[[], Awaitable[Iterable[Iterable[SensorReading]]]]
+
+
+class _Track:
+    """One participant's merged readings and replay position within a session."""
+
+    def __init__(self, participant_id: str, factory: SourceFactory) -> None:
+        self.participant_id = participant_id
+        self.factory = factory
+        self.anchor: datetime | None = None  # source time at virtual position 0
+        self.offset = 0.0  # virtual position at which the track joined
+        self.first: datetime | None = None
+        self.position: datetime | None = None  # source time of the last emitted reading
+        self.emitted = 0
+        self._readings: Iterator[SensorReading] = iter(())
+        self._head: SensorReading | None = None
+
+    @property
+    def done(self) -> bool:
+        return self._head is None
+
+    async def load(self) -> None:
+        """(Re)build the sources and read the first reading."""
+        sources = await self.factory()
+        self._readings = heapq.merge(*sources, key=attrgetter("timestamp"))
+        self._head = await asyncio.to_thread(next, self._readings, None)
+        self.first = self._head.timestamp if self._head is not None else None
+
+    def head_position(self) -> float:
+        assert self._head is not None and self.anchor is not None
+        return (self._head.timestamp - self.anchor).total_seconds()
+
+    def take(self, position: float, limit: int, out: list[tuple[float, SensorReading]]) -> None:
+        """Move readings due by virtual *position* into *out* (blocking; worker thread)."""
+        while self._head is not None and limit > 0 and self.head_position() <= position:
+            out.append((self.head_position(), self._head))
+            self.position = self._head.timestamp
+            self.emitted += 1
+            limit -= 1
+            self._head = next(self._readings, None)
+
+    def skip_to(self, position: float) -> None:
+        """Drop readings before virtual *position* (blocking; worker thread)."""
+        while self._head is not None and self.head_position() < position:
+            self._head = next(self._readings, None)
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "participant_id": self.participant_id,
+            "position": self.position.isoformat() if self.position else None,
+            "emitted": self.emitted,
+            "done": self.done,
+        }
+
+
+class ReplaySession:
+    """Replay many participants on one shared :class:`VirtualClock` with one timer task.
+
+    Each participant's sources (see :meth:`add_participant`) are merged as
+    in :class:`ReplayEngine`.  With ``align_starts`` every participant's
+    first reading sits at virtual position 0 (all start together);
+    otherwise the session keeps their absolute time offsets.  Every tick,
+    all readings due across participants go to *publish* as one batch,
+    timestamps shifted to now.
+
+    Controls: :meth:`pause`, :meth:`resume`, :meth:`seek` (virtual
+    seconds; seeking backwards rebuilds the sources), :meth:`set_speed`,
+    :meth:`stop`.  *on_done* is called with the session whenever its timer
+    task ends: finished, failed or stopped.
+    """
+
+    def __init__(
+        self,
+        publish: Callable[[list[SensorReading]], Awaitable[None]],
+        *,
+        session_id: str | None = None,
+        speed: float = 1.0,
+        tick: float = 0.05,
+        max_batch: int = 5_000,
+        align_starts: bool = True,
+        on_done: Callable[[ReplaySession], None] | None = None,
+    ) -> None:
+        self.session_id = session_id or uuid.uuid4().hex[:12]
+        self.clock = VirtualClock(speed)
+        self.tick = tick
+        self.max_batch = max_batch
+        self.align_starts = align_starts
+        self._publish = publish
+        self._on_done = on_done
+        self._tracks: dict[str, _Track] = {}
+        self._origin: datetime | None = None
+        self._lock = asyncio.Lock()  # serialises ticks with seek / add
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        self._stopped = False
+        self.created_at = datetime.now()
+        self.emitted = 0
+        self.ticks = 0
+        self.max_lag = 0.0
+
+    # ── Setup ─────────────────────────────────────────────────
+
+    async def add_participant(self, participant_id: str, factory: SourceFactory) -> None:
+        """Add a participant whose time-sorted sources are built by ``await factory()``.
+
+        A participant added to a running session joins at the current
+        position (aligned) or skips what is already past (absolute).
+        """
+        track = _Track(participant_id, factory)
+        await track.load()
+        async with self._lock:
+            track.offset = self.clock.position()
+            self._place(track)
+            if not self.align_starts and track.first is not None:
+                await asyncio.to_thread(track.skip_to, track.offset)
+            self._tracks[participant_id] = track
+        self._wakeup.set()
+
+    def _place(self, track: _Track) -> None:
+        """Set the track's anchor: the source time at virtual position 0."""
+        if track.first is None:
+            return
+        if self.align_starts:
+            track.anchor = track.first - timedelta(seconds=track.offset)
+            return
+        if self._origin is None or (self._task is None and track.first < self._origin):
+            # Not started yet: the earliest participant defines position 0.
+            self._origin = track.first
+            for other in self._tracks.values():
+                other.anchor = self._origin
+        track.anchor = self._origin
+
+    # ── Controls ──────────────────────────────────────────────
+
+    def start(self) -> None:
+        if self._task is None:
+            self.clock.resume()
+            self._task = asyncio.create_task(self._run())
+            self._task.add_done_callback(self._done)
+
+    def _done(self, task: asyncio.Task[None]) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(
+                "replay.session_failed", session=self.session_id, error=str(task.exception())
+            )
+        if self._on_done is not None:
+            self._on_done(self)
+
+    def pause(self) -> None:
+        self.clock.pause()
+        self._wakeup.set()
+
+    def resume(self) -> None:
+        self.clock.resume()
+        self._wakeup.set()
+
+    def set_speed(self, speed: float) -> None:
+        self.clock.set_speed(speed)
+        self._wakeup.set()
+
+    async def seek(self, position: float) -> None:
+        """Jump to virtual *position* seconds; readings in between are skipped."""
+        position = max(0.0, position)
+        async with self._lock:
+            backwards = position < self.clock.position()
+            for track in self._tracks.values():
+                if backwards:
+                    await track.load()
+                    track.emitted = 0
+                    track.position = None
+                    self._place(track)
+                if track.first is not None:
+                    await asyncio.to_thread(track.skip_to, position)
+            self.clock.seek(position)
+        if self._task is not None and self._task.done() and not self._stopped:
+            # Finished, then rewound: run again from the new position.
+            self._task = None
+            self.start()
+        self._wakeup.set()
+
+    async def stop(self) -> None:
+        self._stopped = True
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self.clock.pause()
+
+    async def wait(self) -> None:
+        """Wait until every participant has been replayed (or the session stopped)."""
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    # ── Timer ─────────────────────────────────────────────────
+
+    def _take_due(
+        self, position: float, now: datetime, speed: float
+    ) -> list[tuple[float, SensorReading]]:
+        """Take readings due at virtual *position*, oldest first, re-stamped to
+        wall time (worker thread: re-stamping hashes every reading's id)."""
+        due: list[tuple[float, SensorReading]] = []
+        for track in self._tracks.values():
+            track.take(position, self.max_batch - len(due), due)
+        due.sort(key=lambda item: item[0])
+        for at, reading in due:
+            reading.restamp(now - timedelta(seconds=(position - at) / speed))
+        return due
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            full = False
+            if not self.clock.paused:
+                async with self._lock:
+                    position = self.clock.position()
+                    due = await asyncio.to_thread(
+                        self._take_due, position, datetime.now(), self.clock.speed
+                    )
+                if due:
+                    full = len(due) >= self.max_batch
+                    self.max_lag = max(self.max_lag, (position - due[0][0]) / self.clock.speed)
+                    self.emitted += len(due)
+                    self.ticks += 1
+                    await self._publish([reading for _, reading in due])
+            active = [t for t in self._tracks.values() if not t.done]
+            if self._tracks and not active:
+                break
+            if full:
+                await asyncio.sleep(0)
+                continue
+            delay = self.tick
+            if active:
+                next_due = min(t.head_position() for t in active)
+                delay = max(self.tick, self.clock.wall_delay(next_due))
+            try:
+                # Controls (pause / seek / speed / new participant) wake the timer.
+                await asyncio.wait_for(self._wakeup.wait(), timeout=min(delay, 3600))
+            except TimeoutError:
+                pass
+        self.clock.pause()
+        logger.info(
+            "replay.session_finished",
+            session=self.session_id,
+            participants=len(self._tracks),
+            emitted=self.emitted,
+            max_lag_ms=round(self.max_lag * 1000, 1),
+        )
+
+    # ── Status ────────────────────────────────────────────────
+
+    @property
+    def state(self) -> str:
+        if self._stopped:
+            return "stopped"
+        if self._task is None:
+            return "created"
+        if self._task.done():
+            return "finished"
+        return "paused" if self.clock.paused else "running"
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "state": self.state,
+            "speed": self.clock.speed,
+            "position_seconds": round(self.clock.position(), 3),
+            "align_starts": self.align_starts,
+            "emitted": self.emitted,
+            "ticks": self.ticks,
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+            "created_at": self.created_at.isoformat(),
+            "participants": [t.status() for t in self._tracks.values()],
+        }
@@ -56,11 +56,51 @@ class Settings(BaseSettings):
 
     # ── Fitbit API behaviour ──────────────────────────────────
     fitbit_rate_limit_per_hour: int = 150  # Fitbit default per-user limit
+    fitbit_rate_limit_burst: int = 30  # Token-bucket size; refills at the hourly rate
+    fitbit_max_concurrent_requests: int = 12  # In-flight metric requests per participant
+    fitbit_sync_max_catchup_days: int = 2  # Incremental sync looks back at most this far
+    fitbit_http2: bool = True  # Used when the optional h2 package is installed
+    fitbit_pool_max_connections: int = 20  # Shared scheduler pool, all participants
+    fitbit_pool_max_keepalive: int = 10
+    fitbit_pool_keepalive_expiry: float = 900.0  # Seconds; outlive the scheduler interval
     fitbit_request_timeout: float = 30.0
+    fitbit_token_refresh_margin_seconds: float = 600.0  # Refresh this long before expiry
+    fitbit_token_check_interval_seconds: float = 60.0
+    fitbit_webhook_verification_code: str = ""  # From the Fitbit app's subscriber settings
+    fitbit_webhook_subscribe: bool = False  # Create a subscription when a participant links
+    fitbit_backfill_max_days: int = 1095  # Longest history one backfill job may cover
+    fitbit_backfill_batch_requests: int = 24  # Requests per committed backfill batch
+    fitbit_backfill_rate_reserve: float = 0.2  # Quota fraction left to live syncs
     fitbit_api_base_url: str = "https://api.fitbit.com"
 
     # ── Database ──────────────────────────────────────────────
     database_url: str = _DEFAULT_DB_URL
+    db_pool_size: int = 5  # Persistent connections (one aiosqlite thread each)
+    db_max_overflow: int = 5  # Extra connections allowed under burst load
+    db_pool_timeout: float = 30.0  # Seconds to wait for a free connection
+    db_echo: bool = False
+
+    # ── Cold storage (Parquet tier, needs pyarrow) ───────────
+    cold_storage_enabled: bool = False  # Run the compaction job in the API process
+    cold_storage_dir: str = str(_DB_DIR / "cold")
+    cold_storage_after_days: int = 90  # Readings older than this move to Parquet
+    cold_storage_interval_hours: float = 24.0  # Compaction job period
+
+    # ── PostgreSQL backend (ignored for SQLite) ───────────────
+    # "auto" uses a TimescaleDB hypertable when the extension is installed,
+    # otherwise native monthly range partitions.
+    postgres_timescale: Literal["auto", "on", "off"] = "auto"
+    timescale_chunk_interval: str = "7 days"
+    postgres_partition_months_ahead: int = 3  # Partitions created ahead of time
+    postgres_partition_maintenance_hours: float = 24.0  # Maintenance task period
+
+    # ── SQLite engine profile (ignored for other backends) ────
+    sqlite_journal_mode: Literal["wal", "delete", "truncate", "persist", "memory"] = "wal"
+    sqlite_synchronous: Literal["off", "normal", "full", "extra"] = "normal"
+    sqlite_mmap_size: int = 256 * 1024 * 1024  # Bytes of the file memory-mapped
+    sqlite_cache_size: int = -64_000  # Negative = KiB (≈64 MB page cache per connection)
+    sqlite_temp_store: Literal["default", "file", "memory"] = "memory"
+    sqlite_busy_timeout_ms: int = 5_000  # Wait this long on a locked database
 
     # ── API server ────────────────────────────────────────────
     api_host: str = "0.0.0.0"
@@ -85,6 +125,19 @@ class Settings(BaseSettings):
     scheduler_enabled: bool = True
     scheduler_collect_interval_minutes: int = 5
     scheduler_max_concurrent_syncs: int = 3
+    scheduler_max_interval_minutes: float = 60.0  # Cap for idle / throttled participants
+    scheduler_lag_factor: float = 0.5  # Poll at least every lag × factor after new data stops
+    scheduler_budget_low_water: float = 0.25  # Stretch intervals below this quota fraction
+
+    # ── LifeSnaps dataset ─────────────────────────────────────
+    lifesnaps_import_batch_size: int = 5_000  # Readings per insert + checkpoint commit
+
+    # ── Streaming pipeline ────────────────────────────────────
+    pipeline_batch_size: int = 500  # Max readings handed to batch consumers at once
+    pipeline_batch_timeout_ms: float = 50.0  # Max wait for a batch to fill up
+    pipeline_consumer_queue_size: int = 1_000  # Per-consumer queue capacity
+    pipeline_broadcast_overflow: Literal["block", "drop_oldest", "sample"] = "drop_oldest"
+    pipeline_drain_timeout_seconds: float = 10.0  # Shutdown wait for lossless consumers
 
     # ── Agent behaviour ───────────────────────────────────────
     agent_check_interval_seconds: int = 300
@@ -2,12 +2,13 @@
 
 from __future__ import annotations
 
+import hashlib
 import uuid
-from datetime import datetime
+from datetime import UTC, datetime
 from enum import Enum
 from typing import Any
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 # ── Enums ─────────────────────────────────────────────────────
 
@@ -59,9 +60,45 @@ class AlertSeverity(str, Enum):
 
 # ── Data transfer objects ─────────────────────────────────────
 
+# Fixed namespace for :func:`reading_id` — never change it, stored ids depend on it.
+_READING_ID_NAMESPACE = uuid.UUID("6c1f3a52-8d0e-5b7a-9f43-2e9d5c7b1a60")
+_READING_ID_NAMESPACE_BYTES = _READING_ID_NAMESPACE.bytes
+
+
+def reading_id(
+    participant_id: str,
+    metric_type: MetricType | str,
+    timestamp: datetime,
+    source: str = "",
+    subtype: str = "",
+) -> str:
+    """Deterministic reading id: a UUID5 over the reading's natural key.
+
+    The same measurement always gets the same id, so re-ingesting it hits
+    the ``sensor_readings`` primary key instead of adding a duplicate row.
+    *source* and *subtype* are ``metadata["source"]`` / ``metadata["type"]``
+    (e.g. a resting-HR summary vs the intraday HR at the same minute).
+    Aware timestamps are normalised to naive UTC, as stored.
+    """
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(UTC).replace(tzinfo=None)
+    metric = metric_type.value if isinstance(metric_type, MetricType) else metric_type
+    key = f"{participant_id}|{metric}|{timestamp.isoformat()}|{source}|{subtype}"
+    # Same value as str(uuid.uuid5(...)) without building a UUID object —
+    # this runs once per reading on every bulk load.
+    digest = bytearray(hashlib.sha1(_READING_ID_NAMESPACE_BYTES + key.encode()).digest()[:16])
+    digest[6] = (digest[6] & 0x0F) | 0x50  # version 5
+    digest[8] = (digest[8] & 0x3F) | 0x80  # RFC 4122 variant
+    h = digest.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
 class SensorReading(BaseModel):
-    """A single sensor data point collected from a wearable device."""
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    """A single sensor data point collected from a wearable device.
+
+    ``id`` defaults to :func:`reading_id` of the reading's natural key.
+    """
+    id: str = ""
     participant_id: str
     device_type: DeviceType
     metric_type: MetricType
@@ -70,6 +107,30 @@ class SensorReading(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     metadata: dict[str, Any] = Field(default_factory=dict)
 
+    @model_validator(mode="after")
+    def _derive_id(self) -> SensorReading:
+        if not self.id:
+            self.id = self._natural_id()
+        return self
+
+    def _natural_id(self) -> str:
+        return reading_id(
+            self.participant_id,
+            self.metric_type,
+            self.timestamp,
+            self.metadata.get("source") or "",
+            self.metadata.get("type") or "",
+        )
+
+    def restamp(self, timestamp: datetime) -> None:
+        """Move the reading to *timestamp* and re-derive its id from the new key.
+
+        For replays that shift history to the present: keeping the
+        historical id would give one id several timestamps.
+        """
+        self.timestamp = timestamp
+        self.id = self._natural_id()
+
 
 class Alert(BaseModel):
     """An alert generated when a monitored value breaches a rule."""
@@ -0,0 +1,260 @@
+"""Due-time planning for participant syncs.
+
+:class:`SyncPlanner` keeps every active participant in a heap ordered by
+the (monotonic) time their next sync is due, instead of syncing everyone
+at once every interval:
+
+* New participants are staggered evenly across one interval, so a cycle
+  is a steady trickle of syncs rather than a burst.
+* After each sync the next due time adapts.  The interval grows with the
+  device's observed sync lag — how long since the newest non-zero reading
+  last moved forward, i.e. since the device last uploaded — so a watch
+  that has not uploaded for hours is polled less often.  (Fitbit
+  zero-fills minutes it has no upload for yet, so "the sync returned new
+  rows" says nothing about the device.)  Failures back off exponentially.
+  A participant whose Fitbit rate-limit budget runs low is stretched
+  further.
+* :meth:`expedite` makes a tracked participant due now (a Fitbit webhook
+  said new data is waiting).  The resulting *targeted* sync does not
+  reset the regular schedule: afterwards the participant returns to the
+  poll it pre-empted.
+* ``pop_due`` records how late each sync started (``lateness``), and
+  :meth:`stats` reports queue depth and per-participant lateness.
+
+The planner does no I/O; :class:`~wearable_agent.scheduler.service.SchedulerService`
+drives it.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+
+@dataclass(slots=True)
+class ParticipantPlan:
+    """Scheduling state of one participant (times are planner-clock seconds)."""
+
+    participant_id: str
+    due: float
+    interval: float
+    last_data: float  # when the device's newest data last moved forward (or when added)
+    newest_data: datetime | None = None  # newest non-zero reading timestamp seen
+    failures: int = 0
+    running: bool = False
+    syncs: int = 0
+    lateness: float = 0.0  # how late the last sync started
+    max_lateness: float = 0.0
+    targeted: bool = False  # due because of expedite(), not the regular poll
+    regular_due: float | None = None  # the regular poll a targeted sync pre-empted
+    expedite_after: bool = False  # expedited while running: go again on completion
+
+
+class SyncPlanner:
+    """Priority queue of participants by next-due time.
+
+    Parameters
+    ----------
+    interval:
+        Base seconds between syncs of a participant whose device is active.
+    max_interval:
+        Upper bound on the adapted interval.
+    lag_factor:
+        The interval is at least ``lag_factor × device lag``.
+    budget_low_water:
+        Below this fraction of the hourly rate limit left, the interval is
+        stretched by ``budget_low_water / budget``.
+    clock:
+        Monotonic time source (injectable for tests).
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        *,
+        max_interval: float,
+        lag_factor: float = 0.5,
+        budget_low_water: float = 0.25,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.interval = interval
+        self.max_interval = max(max_interval, interval)
+        self.lag_factor = lag_factor
+        self.budget_low_water = budget_low_water
+        self._clock = clock
+        self._plans: dict[str, ParticipantPlan] = {}
+        # (due, seq, participant_id); entries whose due no longer matches
+        # the plan (rescheduled / removed / running) are skipped lazily.
+        self._heap: list[tuple[float, int, str]] = []
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+    def get(self, participant_id: str) -> ParticipantPlan | None:
+        return self._plans.get(participant_id)
+
+    # ── Membership ────────────────────────────────────────────
+
+    def set_participants(self, participant_ids: Iterable[str]) -> None:
+        """Track exactly *participant_ids*: stagger new ones, drop missing ones."""
+        now = self._clock()
+        wanted = list(dict.fromkeys(participant_ids))
+        for pid in self._plans.keys() - set(wanted):
+            del self._plans[pid]
+        new = [pid for pid in wanted if pid not in self._plans]
+        for i, pid in enumerate(new):
+            plan = ParticipantPlan(
+                pid, due=now + self.interval * i / len(new), interval=self.interval,
+                last_data=now,
+            )
+            self._plans[pid] = plan
+            self._push(plan)
+
+    def remove(self, participant_id: str) -> None:
+        """Stop tracking *participant_id* (a running sync completes into nothing)."""
+        self._plans.pop(participant_id, None)
+
+    def _push(self, plan: ParticipantPlan) -> None:
+        heapq.heappush(self._heap, (plan.due, next(self._seq), plan.participant_id))
+
+    def _top(self) -> tuple[float, str] | None:
+        """The earliest live heap entry, discarding stale ones."""
+        while self._heap:
+            due, _, pid = self._heap[0]
+            plan = self._plans.get(pid)
+            if plan is not None and not plan.running and plan.due == due:
+                return due, pid
+            heapq.heappop(self._heap)
+        return None
+
+    def expedite(self, participant_id: str) -> bool:
+        """Make *participant_id* due now for a targeted sync.
+
+        Only tracked participants can be expedited (membership comes from
+        :meth:`set_participants`); returns ``False`` for anyone else.
+        """
+        now = self._clock()
+        plan = self._plans.get(participant_id)
+        if plan is None:
+            return False
+        if plan.running:
+            plan.expedite_after = True
+            return True
+        if plan.due <= now:
+            return True  # already due; the next sync picks it up
+        plan.regular_due = plan.due
+        plan.due = now
+        plan.targeted = True
+        self._push(plan)
+        return True
+
+    def expedite_all(self) -> int:
+        """:meth:`expedite` every tracked participant; returns how many."""
+        return sum(self.expedite(pid) for pid in list(self._plans))
+
+    # ── Dispatch ──────────────────────────────────────────────
+
+    def next_due(self) -> float | None:
+        """Clock time of the earliest pending sync, or ``None`` when idle."""
+        top = self._top()
+        return top[0] if top is not None else None
+
+    def pop_due(self) -> ParticipantPlan | None:
+        """Take the most overdue participant, if any is due, and mark it running."""
+        top = self._top()
+        now = self._clock()
+        if top is None or top[0] > now:
+            return None
+        heapq.heappop(self._heap)
+        plan = self._plans[top[1]]
+        plan.running = True
+        plan.lateness = now - plan.due
+        plan.max_lateness = max(plan.max_lateness, plan.lateness)
+        return plan
+
+    def complete(
+        self,
+        participant_id: str,
+        *,
+        new_readings: int,
+        failed: bool = False,
+        budget: float = 1.0,
+        newest_data: datetime | None = None,
+    ) -> float | None:
+        """Record a finished sync and schedule the next one.
+
+        *newest_data* is the timestamp of the newest non-zero reading the
+        sync saw; the device counts as having uploaded when it moves
+        forward.  Without it, any *new_readings* count as an upload.
+        *budget* is the fraction of the participant's hourly rate limit
+        left.  After a targeted sync the participant goes back to the
+        regular poll it pre-empted.  Returns the new interval, or ``None``
+        if the participant was removed meanwhile.
+        """
+        plan = self._plans.get(participant_id)
+        if plan is None:
+            return None
+        now = self._clock()
+        plan.running = False
+        plan.syncs += 1
+        plan.failures = plan.failures + 1 if failed else 0
+        if newest_data is not None:
+            if plan.newest_data is None or newest_data > plan.newest_data:
+                plan.newest_data = newest_data
+                plan.last_data = now
+        elif new_readings:
+            plan.last_data = now
+
+        if plan.targeted and plan.regular_due is not None and not failed:
+            plan.due = max(plan.regular_due, now)
+        else:
+            interval = max(self.interval, self.lag_factor * (now - plan.last_data))
+            if plan.failures:
+                interval = max(interval, self.interval * 2 ** min(plan.failures, 10))
+            if budget < self.budget_low_water:
+                interval *= self.budget_low_water / max(budget, 0.01)
+            plan.interval = min(interval, self.max_interval)
+            plan.due = now + plan.interval
+        plan.targeted = False
+        plan.regular_due = None
+        if plan.expedite_after:
+            plan.expedite_after = False
+            plan.targeted = True
+            plan.regular_due = plan.due
+            plan.due = now
+        self._push(plan)
+        return plan.interval
+
+    # ── Metrics ───────────────────────────────────────────────
+
+    def stats(self) -> dict[str, Any]:
+        """Queue depth, lateness and per-participant schedule (seconds)."""
+        now = self._clock()
+        plans = sorted(self._plans.values(), key=lambda p: p.due)
+        return {
+            "scheduled": len(plans),
+            "queue_depth": sum(1 for p in plans if not p.running and p.due <= now),
+            "in_flight": sum(1 for p in plans if p.running),
+            "max_lateness_seconds": round(max((p.lateness for p in plans), default=0.0), 3),
+            "participants": [
+                {
+                    "participant_id": p.participant_id,
+                    "due_in_seconds": round(p.due - now, 3),
+                    "interval_seconds": round(p.interval, 3),
+                    "device_lag_seconds": round(now - p.last_data, 3),
+                    "lateness_seconds": round(p.lateness, 3),
+                    "max_lateness_seconds": round(p.max_lateness, 3),
+                    "failures": p.failures,
+                    "syncs": p.syncs,
+                    "running": p.running,
+                    "targeted": p.targeted,
+                }
+                for p in plans
+            ],
+        }
@@ -3,33 +3,58 @@
 Architecture
 ~~~~~~~~~~~~
 The ``SchedulerService`` runs as a background component within the
-FastAPI lifespan.  Every ``scheduler_collect_interval_minutes`` it:
-
-1. Loads all active participants with valid Fitbit tokens.
-2. For each participant (up to ``max_concurrent_syncs`` at a time):
-   a. Authenticates the ``FitbitCollector`` with stored tokens.
-   b. Fetches today's data for all configured metrics.
-   c. Publishes readings to the ``StreamPipeline``.
-   d. Auto-refreshes expired tokens.
+FastAPI lifespan.  Participants are not synced all at once per interval:
+a :class:`~wearable_agent.scheduler.planner.SyncPlanner` orders them by
+next-due time, staggers them across ``scheduler_collect_interval_minutes``
+and adapts each participant's interval to device sync lag, failures and
+remaining rate-limit budget.  A Fitbit webhook notification
+(:meth:`SchedulerService.enqueue`) makes a participant due immediately
+for a targeted sync of just the changed collection.  The loop:
+
+1. Reloads the active participants once per interval.
+2. Dispatches each participant when due (up to ``max_concurrent_syncs``
+   at a time):
+   a. Authenticates a ``FitbitCollector`` with the participant's cached
+      tokens (``TokenManager``); it borrows the
+      scheduler's shared, keep-alive ``httpx`` pool (HTTP/2 when available)
+      and sends the participant's bearer token per request.
+   b. Re-fetches each metric from its sync cursor's day (the day of its
+      newest non-zero reading) up to today, whole days at a time.
+   c. Upserts them and advances the per-metric cursors in
+      ``sync_cursors`` in one transaction.
+   d. Publishes the new or revised readings to the ``StreamPipeline``.
    e. Updates ``last_sync`` timestamp.
 
-Token refresh failures are logged but do not block other participants.
+The ``TokenManager`` refreshes tokens in the background before they
+expire, one refresh per participant at a time.  Token refresh failures
+are logged but do not block other participants.
 """
 
 from __future__ import annotations
 
 import asyncio
-from datetime import UTC, datetime, timedelta
-from typing import Any
+import contextlib
+import time
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any
 
 import httpx
 import structlog
 
-from wearable_agent.collectors.fitbit import FitbitCollector
-from wearable_agent.collectors.fitbit_oauth import refresh_fitbit_token
+from wearable_agent.collectors.fitbit import FitbitCollector, build_fitbit_client, rate_budget
+from wearable_agent.collectors.fitbit_tokens import TokenManager, get_token_manager
 from wearable_agent.config import get_settings
 from wearable_agent.models import MetricType
-from wearable_agent.storage.repository import ParticipantRepository, TokenRepository
+from wearable_agent.scheduler.planner import SyncPlanner
+from wearable_agent.storage.database import get_session_factory
+from wearable_agent.storage.repository import (
+    ParticipantRepository,
+    ReadingRepository,
+    SyncCursorRepository,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
 
 logger = structlog.get_logger(__name__)
 
@@ -64,8 +89,9 @@ class SchedulerService:
         self,
         pipeline: Any | None = None,  # StreamPipeline — avoid circular import
         affect_pipeline: Any | None = None,
-        interval_minutes: int | None = None,
+        interval_minutes: float | None = None,
         max_concurrent: int | None = None,
+        token_manager: TokenManager | None = None,
     ) -> None:
         settings = get_settings()
         self._pipeline = pipeline
@@ -74,17 +100,30 @@ class SchedulerService:
         self._max_concurrent = max_concurrent or settings.scheduler_max_concurrent_syncs
         self._running = False
         self._task: asyncio.Task | None = None
+        self._http: httpx.AsyncClient | None = None
+        self._pending: dict[str, set[MetricType]] = {}  # webhook-changed metrics
+        self._revoked: set[str] = set()  # access revoked; skipped until re-linked
+        # Newest non-zero reading timestamp of each participant's last sync
+        self._newest_data: dict[str, datetime] = {}
+        self._wakeup = asyncio.Event()
+        self._planner = SyncPlanner(
+            self._interval * 60,
+            max_interval=settings.scheduler_max_interval_minutes * 60,
+            lag_factor=settings.scheduler_lag_factor,
+            budget_low_water=settings.scheduler_budget_low_water,
+        )
 
         self._participant_repo = ParticipantRepository()
-        self._token_repo = TokenRepository()
+        self._tokens = token_manager or get_token_manager()
 
         # Track sync stats
         self._stats = {
             "last_run": None,
-            "total_runs": 0,
-            "last_readings_count": 0,
-            "last_errors": 0,
             "active_syncs": 0,
+            "syncs_completed": 0,
+            "readings_total": 0,
+            "errors_total": 0,
+            "targeted_syncs": 0,
         }
 
     # ── Lifecycle ─────────────────────────────────────────────
@@ -94,6 +133,7 @@ class SchedulerService:
         if self._running:
             return
         self._running = True
+        self._tokens.start()
         self._task = asyncio.create_task(self._run_loop())
         logger.info(
             "scheduler.started",
@@ -102,19 +142,29 @@ class SchedulerService:
         )
 
     async def stop(self) -> None:
-        """Stop the scheduler gracefully."""
+        """Stop the scheduler gracefully and close the shared HTTP pool."""
         self._running = False
         if self._task:
             self._task.cancel()
-            try:
+            with contextlib.suppress(asyncio.CancelledError):
                 await self._task
-            except asyncio.CancelledError:
-                pass
+        await self._tokens.stop()
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
         logger.info("scheduler.stopped")
 
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """The Fitbit connection pool shared by every participant's collector."""
+        if self._http is None or self._http.is_closed:
+            self._http = build_fitbit_client()
+        return self._http
+
     @property
     def stats(self) -> dict[str, Any]:
-        return dict(self._stats)
+        """Counters plus the planner's queue depth and per-participant lateness."""
+        return {**self._stats, "queue": self._planner.stats(), "tokens": dict(self._tokens.stats)}
 
     @property
     def is_running(self) -> bool:
@@ -123,131 +173,173 @@ class SchedulerService:
     # ── Main loop ─────────────────────────────────────────────
 
     async def _run_loop(self) -> None:
-        """Run the collection loop forever."""
-        while self._running:
-            try:
-                await self._collect_all()
-            except Exception:
-                logger.exception("scheduler.run_error")
-
-            # Wait for next interval
-            await asyncio.sleep(self._interval * 60)
-
-    async def _collect_all(self) -> None:
-        """Run one collection cycle for all active participants."""
-        participants = await self._participant_repo.list_all(active_only=True)
-        if not participants:
-            logger.debug("scheduler.no_participants")
-            return
-
-        self._stats["total_runs"] += 1
-        self._stats["last_run"] = datetime.now(UTC).isoformat()
-        total_readings = 0
-        total_errors = 0
-
-        # Limit concurrency
+        """Dispatch participant syncs as they come due, forever."""
         semaphore = asyncio.Semaphore(self._max_concurrent)
+        in_flight: set[asyncio.Task] = set()
+        next_refresh = 0.0
+        try:
+            while self._running:
+                now = time.monotonic()
+                if now >= next_refresh:
+                    try:
+                        participants = await self._participant_repo.list_all(active_only=True)
+                        await self._readmit_relinked()
+                        self._planner.set_participants(
+                            p.participant_id for p in participants
+                            if p.participant_id not in self._revoked
+                        )
+                    except Exception:
+                        logger.exception("scheduler.run_error")
+                    next_refresh = now + self._interval * 60
+
+                # Take a slot first, so waiting for one counts as lateness.
+                await semaphore.acquire()
+                self._wakeup.clear()  # before pop_due, so no enqueue() is missed
+                plan = self._planner.pop_due()
+                if plan is None:
+                    semaphore.release()
+                    due = self._planner.next_due()
+                    wake = next_refresh if due is None else min(due, next_refresh)
+                    with contextlib.suppress(TimeoutError):
+                        await asyncio.wait_for(
+                            self._wakeup.wait(), max(wake - time.monotonic(), 0.0)
+                        )
+                    continue
+
+                # A targeted sync fetches only what the webhook reported as
+                # changed; a regular one covers it anyway.
+                pending = self._pending.pop(plan.participant_id, set())
+                extra = sorted(pending.difference(_SYNC_METRICS), key=lambda m: m.value)
+                metrics = None
+                if plan.targeted and pending:
+                    metrics = [m for m in _SYNC_METRICS if m in pending] + extra
+                    self._stats["targeted_syncs"] += 1
+                elif extra:
+                    metrics = _SYNC_METRICS + extra
+                task = asyncio.create_task(
+                    self._run_planned(plan.participant_id, semaphore, metrics)
+                )
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+        finally:
+            for task in in_flight:
+                task.cancel()
 
-        async def _sync_one(participant_id: str) -> tuple[int, int]:
-            async with semaphore:
-                return await self._sync_participant(participant_id)
-
-        tasks = [_sync_one(p.participant_id) for p in participants]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        for result in results:
-            if isinstance(result, Exception):
-                total_errors += 1
-                logger.error("scheduler.participant_error", error=str(result))
-            else:
-                readings_count, errors = result
-                total_readings += readings_count
-                total_errors += errors
-
-        self._stats["last_readings_count"] = total_readings
-        self._stats["last_errors"] = total_errors
-        logger.info(
-            "scheduler.cycle_complete",
-            participants=len(participants),
-            readings=total_readings,
-            errors=total_errors,
-        )
+    async def _run_planned(
+        self,
+        participant_id: str,
+        semaphore: asyncio.Semaphore,
+        metrics: list[MetricType] | None = None,
+    ) -> None:
+        """Run one due sync and hand the outcome back to the planner."""
+        readings, errors = 0, 1
+        self._stats["active_syncs"] += 1
+        try:
+            readings, errors = await self._sync_participant(participant_id, metrics)
+        except Exception:
+            logger.exception("scheduler.participant_error", participant=participant_id)
+        finally:
+            semaphore.release()
+            interval = self._planner.complete(
+                participant_id,
+                new_readings=readings,
+                failed=errors > 0,
+                budget=rate_budget(participant_id),
+                newest_data=self._newest_data.pop(participant_id, None),
+            )
+            self._wakeup.set()  # expedited while running → due again now
+            self._stats["active_syncs"] -= 1
+            self._stats["syncs_completed"] += 1
+            self._stats["readings_total"] += readings
+            self._stats["errors_total"] += errors
+            self._stats["last_run"] = datetime.now(UTC).isoformat()
+            logger.debug(
+                "scheduler.next_sync",
+                participant=participant_id,
+                interval_seconds=round(interval or 0.0, 1),
+            )
 
     # ── Per-participant sync ──────────────────────────────────
 
-    async def _sync_participant(self, participant_id: str) -> tuple[int, int]:
-        """Sync data for a single participant.
+    async def _sync_participant(
+        self, participant_id: str, metrics: list[MetricType] | None = None
+    ) -> tuple[int, int]:
+        """Sync data for a single participant (all metrics unless *metrics*).
 
         Returns (readings_count, error_count).
         """
         errors = 0
 
-        # 1. Load tokens
-        token_row = await self._token_repo.get(participant_id, "fitbit")
-        if token_row is None:
+        # 1. Tokens come from the manager's cache, refreshed ahead of expiry
+        try:
+            token = await self._tokens.get(participant_id)
+        except Exception:
+            logger.exception("scheduler.refresh_failed", participant=participant_id)
+            return 0, 1
+        if token is None:
             logger.warning("scheduler.no_token", participant=participant_id)
             return 0, 1
+        if token.expired and not token.refresh_token:
+            logger.warning("scheduler.token_expired_no_refresh", participant=participant_id)
+            return 0, 1
 
-        # 2. Check & refresh expired tokens
-        access_token = token_row.access_token
-        refresh_token = token_row.refresh_token
-
-        if token_row.expires_at and token_row.expires_at < datetime.utcnow():
-            if refresh_token:
-                try:
-                    access_token, refresh_token = await self._refresh_token(
-                        participant_id, refresh_token
-                    )
-                except Exception:
-                    logger.exception("scheduler.refresh_failed", participant=participant_id)
-                    return 0, 1
-            else:
-                logger.warning("scheduler.token_expired_no_refresh", participant=participant_id)
-                return 0, 1
-
-        # 3. Collect data
-        collector = FitbitCollector()
+        # 2. Collect whole days from the per-metric cursors' days (a 401
+        #    mid-sync is refreshed once, through the manager, by the collector)
+        async with get_session_factory()() as session:
+            cursors = await SyncCursorRepository(session).get_all(participant_id)
+        collector = FitbitCollector(client=self.http_client, token_manager=self._tokens)
         try:
             await collector.authenticate(
-                access_token=access_token,
-                refresh_token=refresh_token,
+                access_token=token.access_token,
+                refresh_token=token.refresh_token,
+                participant_id=participant_id,
+            )
+            fetched = await collector.fetch_since(
+                participant_id, metrics or _SYNC_METRICS, cursors
             )
-            readings = await collector.fetch(participant_id, _SYNC_METRICS)
         except httpx.HTTPStatusError as exc:
-            if exc.response.status_code == 401 and refresh_token:
-                # Token likely expired during request — try refresh & retry
-                try:
-                    access_token, refresh_token = await self._refresh_token(
-                        participant_id, refresh_token
-                    )
-                    await collector.close()
-                    collector = FitbitCollector()
-                    await collector.authenticate(
-                        access_token=access_token,
-                        refresh_token=refresh_token,
-                    )
-                    readings = await collector.fetch(participant_id, _SYNC_METRICS)
-                except Exception:
-                    logger.exception("scheduler.retry_failed", participant=participant_id)
-                    return 0, 1
-            else:
-                logger.error(
-                    "scheduler.fetch_error",
-                    participant=participant_id,
-                    status=exc.response.status_code,
-                )
-                return 0, 1
+            logger.error(
+                "scheduler.fetch_error",
+                participant=participant_id,
+                status=exc.response.status_code,
+            )
+            return 0, 1
         except Exception:
             logger.exception("scheduler.fetch_error", participant=participant_id)
             return 0, 1
         finally:
             await collector.close()
 
-        # 4. Publish to pipeline
+        # 3. Upsert and advance the cursors in one transaction, so a cursor
+        #    never moves past a reading that is not committed (a failed
+        #    write is re-fetched next time).  Only new or revised readings
+        #    go on to the pipeline; its persistence consumer's upsert of
+        #    them is then a no-op.
+        try:
+            async with get_session_factory()() as session:
+                readings = await ReadingRepository(session).upsert_changed(
+                    fetched, commit=False
+                )
+                # Zero-filled minutes the device has not uploaded yet must
+                # not move a cursor: it marks the newest real data, and the
+                # next sync re-fetches from its day.
+                uploaded = [r for r in fetched if r.value]
+                await SyncCursorRepository(session).advance(participant_id, uploaded)
+                await session.commit()
+        except Exception:
+            logger.exception("scheduler.persist_error", participant=participant_id)
+            return 0, 1
+        if uploaded:
+            # The planner's device-lag signal (see SyncPlanner.complete)
+            self._newest_data[participant_id] = max(
+                r.timestamp.astimezone(UTC).replace(tzinfo=None) if r.timestamp.tzinfo
+                else r.timestamp
+                for r in uploaded
+            )
         if readings and self._pipeline:
             await self._pipeline.publish_batch(readings)
 
-        # 5. Update last_sync
+        # 4. Update last_sync
         await self._participant_repo.update_last_sync(
             participant_id, datetime.utcnow()
         )
@@ -259,43 +351,47 @@ class SchedulerService:
         )
         return len(readings), errors
 
-    # ── Token refresh ─────────────────────────────────────────
+    # ── Manual trigger ────────────────────────────────────────
 
-    async def _refresh_token(
-        self, participant_id: str, refresh_token: str
-    ) -> tuple[str, str]:
-        """Refresh Fitbit tokens and persist the new pair.
+    def forget(self, participant_id: str) -> None:
+        """Stop syncing *participant_id* (Fitbit access revoked).
 
-        Returns (new_access_token, new_refresh_token).
+        The participant stays out of the schedule until tokens are linked
+        again, which the next participant reload notices.
         """
-        settings = get_settings()
-        body = await refresh_fitbit_token(
-            refresh_token=refresh_token,
-            client_id=settings.fitbit_client_id,
-            client_secret=settings.fitbit_client_secret,
-        )
+        self._revoked.add(participant_id)
+        self._pending.pop(participant_id, None)
+        self._planner.remove(participant_id)
 
-        new_access = body["access_token"]
-        new_refresh = body.get("refresh_token", refresh_token)
-        expires_at = datetime.utcnow() + timedelta(seconds=body.get("expires_in", 28800))
-
-        await self._token_repo.upsert(
-            participant_id=participant_id,
-            access_token=new_access,
-            refresh_token=new_refresh,
-            provider="fitbit",
-            expires_at=expires_at,
-            scopes=body.get("scope", ""),
-        )
+    async def _readmit_relinked(self) -> None:
+        for participant_id in list(self._revoked):
+            try:
+                token = await self._tokens.get(participant_id)
+            except Exception:
+                continue
+            if token is not None:
+                self._revoked.discard(participant_id)
 
-        logger.info("scheduler.token_refreshed", participant=participant_id)
-        return new_access, new_refresh
+    def enqueue(self, participant_id: str, metrics: Iterable[MetricType]) -> None:
+        """Sync *metrics* for *participant_id* as soon as a slot is free.
 
-    # ── Manual trigger ────────────────────────────────────────
+        Used by the Fitbit webhook: only the changed collection is fetched,
+        and the participant's regular poll is left where it was.
+        Participants the scheduler does not track (inactive, unknown or
+        revoked) are ignored.
+        """
+        if self._planner.get(participant_id) is None:
+            logger.debug("scheduler.enqueue_ignored", participant=participant_id)
+            return
+        self._pending.setdefault(participant_id, set()).update(metrics)
+        self._planner.expedite(participant_id)
+        self._wakeup.set()
 
-    async def trigger_sync(self, participant_id: str) -> dict[str, Any]:
+    async def trigger_sync(
+        self, participant_id: str, metrics: list[MetricType] | None = None
+    ) -> dict[str, Any]:
         """Manually trigger an immediate sync for a single participant."""
-        readings_count, errors = await self._sync_participant(participant_id)
+        readings_count, errors = await self._sync_participant(participant_id, metrics)
         return {
             "participant_id": participant_id,
             "readings": readings_count,
@@ -304,9 +400,16 @@ class SchedulerService:
         }
 
     async def trigger_sync_all(self) -> dict[str, Any]:
-        """Manually trigger an immediate sync for all active participants."""
-        await self._collect_all()
+        """Make every scheduled participant due now.
+
+        The syncs run through the planner like any other, within the
+        concurrency limit, and never overlap a participant's running sync.
+        """
+        queued = self._planner.expedite_all()
+        self._wakeup.set()
+        logger.info("scheduler.sync_all_queued", participants=queued)
         return {
-            "status": "complete",
+            "status": "queued",
+            "participants": queued,
             "stats": self.stats,
         }
@@ -2,15 +2,37 @@
 
 from __future__ import annotations
 
-from datetime import datetime
-from typing import AsyncGenerator
-
-from sqlalchemy import DateTime, Float, Integer, String, Text, func
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+import json
+from collections.abc import AsyncGenerator
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import (
+    Boolean,
+    DateTime,
+    Float,
+    Index,
+    Integer,
+    PrimaryKeyConstraint,
+    String,
+    Text,
+    TypeDecorator,
+    event,
+    func,
+    inspect,
+)
+from sqlalchemy.dialects.postgresql import JSONB, TIMESTAMP
+from sqlalchemy.engine import Connection, Dialect, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
-from wearable_agent.config import get_settings
-
+from wearable_agent.config import Settings, get_settings
 
 # ── Base ──────────────────────────────────────────────────────
 
@@ -18,22 +40,109 @@ class Base(DeclarativeBase):
     """Shared declarative base for all ORM models."""
 
 
+# ── Portable column types ─────────────────────────────────────
+
+class UTCDateTime(TypeDecorator):
+    """``TIMESTAMPTZ`` on PostgreSQL, plain ``DATETIME`` elsewhere.
+
+    The Python side always sees naive UTC datetimes, as the rest of the
+    code base expects: naive values are taken to be UTC on the way in and
+    aware values from the database are converted to naive UTC on the way out.
+    """
+
+    impl = DateTime
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect: Dialect) -> Any:
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(TIMESTAMP(timezone=True))
+        return dialect.type_descriptor(DateTime())
+
+    def process_bind_param(self, value: datetime | None, dialect: Dialect) -> datetime | None:
+        if value is None:
+            return None
+        if dialect.name == "postgresql":
+            return value.replace(tzinfo=UTC) if value.tzinfo is None else value
+        if value.tzinfo is not None:
+            return value.astimezone(UTC).replace(tzinfo=None)
+        return value
+
+    def process_result_value(self, value: datetime | None, dialect: Dialect) -> datetime | None:
+        if value is not None and value.tzinfo is not None:
+            return value.astimezone(UTC).replace(tzinfo=None)
+        return value
+
+
+class JSONText(TypeDecorator):
+    """``JSONB`` on PostgreSQL, ``TEXT`` elsewhere — always a JSON *string* in Python.
+
+    Keeps the ``metadata_json: str`` contract of the ORM rows while letting
+    PostgreSQL store and index the document natively.
+    """
+
+    impl = Text
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect: Dialect) -> Any:
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(JSONB())
+        return dialect.type_descriptor(Text())
+
+    def process_bind_param(self, value: str | None, dialect: Dialect) -> Any:
+        if value is not None and dialect.name == "postgresql":
+            return json.loads(value)
+        return value
+
+    def process_result_value(self, value: Any, dialect: Dialect) -> str | None:
+        if value is not None and not isinstance(value, str):
+            return json.dumps(value)
+        return value
+
+
 # ── ORM tables ────────────────────────────────────────────────
 
 class SensorReadingRow(Base):
-    """Persisted sensor data point."""
+    """Persisted sensor data point.
 
-    __tablename__ = "sensor_readings"
+    The primary key is ``(id, timestamp)`` because PostgreSQL requires the
+    partition key in every unique constraint of a partitioned table; on
+    PostgreSQL the table is range-partitioned by month on ``timestamp``
+    (see :mod:`wearable_agent.storage.partitions`).
+    """
 
-    id: Mapped[str] = mapped_column(String(36), primary_key=True)
-    participant_id: Mapped[str] = mapped_column(String(128), index=True)
+    __tablename__ = "sensor_readings"
+    __table_args__ = (
+        PrimaryKeyConstraint("id", "timestamp", name="pk_sensor_readings"),
+        # Serves every hot lookup (latest / range per participant + metric)
+        # including its ORDER BY timestamp; participant_id alone uses the prefix.
+        Index(
+            "ix_sensor_readings_participant_metric_ts",
+            "participant_id",
+            "metric_type",
+            "timestamp",
+        ),
+        # Source-filtered reads (dashboard: dataset vs live).
+        Index(
+            "ix_sensor_readings_participant_metric_source_ts",
+            "participant_id",
+            "metric_type",
+            "source",
+            "timestamp",
+        ),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
+
+    id: Mapped[str] = mapped_column(String(36))
+    participant_id: Mapped[str] = mapped_column(String(128))
     device_type: Mapped[str] = mapped_column(String(32))
-    metric_type: Mapped[str] = mapped_column(String(32), index=True)
+    metric_type: Mapped[str] = mapped_column(String(32))
     value: Mapped[float] = mapped_column(Float)
     unit: Mapped[str] = mapped_column(String(16), default="")
-    timestamp: Mapped[datetime] = mapped_column(DateTime, index=True)
-    metadata_json: Mapped[str] = mapped_column(Text, default="{}")
-    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    timestamp: Mapped[datetime] = mapped_column(UTCDateTime, index=True)
+    metadata_json: Mapped[str] = mapped_column(JSONText, default="{}")
+    # Promoted from metadata["source"] at write time ("dataset", "live", …)
+    source: Mapped[str] = mapped_column(String(32), default="", server_default="")
+    created_at: Mapped[datetime] = mapped_column(UTCDateTime, server_default=func.now())
 
 
 class AlertRow(Base):
@@ -97,6 +206,66 @@ class OAuthTokenRow(Base):
     updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
 
 
+class ImportCheckpointRow(Base):
+    """Progress of a resumable bulk import (e.g. LifeSnaps BSON → readings).
+
+    ``position`` counts source readings already committed; it is advanced
+    in the same transaction as each inserted batch.
+    """
+
+    __tablename__ = "import_checkpoints"
+
+    participant_id: Mapped[str] = mapped_column(String(128), primary_key=True)
+    source: Mapped[str] = mapped_column(String(32), primary_key=True)
+    status: Mapped[str] = mapped_column(String(16), default="running")
+    position: Mapped[int] = mapped_column(Integer, default=0)
+    total: Mapped[int] = mapped_column(Integer, default=0)
+    inserted: Mapped[int] = mapped_column(Integer, default=0)
+    error: Mapped[str] = mapped_column(Text, default="")
+    started_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+
+
+class SyncCursorRow(Base):
+    """High-water mark of incremental Fitbit syncs per (participant, metric).
+
+    ``last_timestamp`` is the newest reading already published; the next
+    sync asks Fitbit for data from there and drops anything not newer.
+    """
+
+    __tablename__ = "sync_cursors"
+
+    participant_id: Mapped[str] = mapped_column(String(128), primary_key=True)
+    metric_type: Mapped[str] = mapped_column(String(32), primary_key=True)
+    last_timestamp: Mapped[datetime] = mapped_column(DateTime)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+
+
+class BackfillJobRow(Base):
+    """A Fitbit history backfill: its date range and how far it got.
+
+    The job's requests are a deterministic plan of ``(metrics, start_date,
+    end_date, intraday)``; ``position`` counts requests already stored and
+    is advanced in the same transaction as each batch of readings.
+    """
+
+    __tablename__ = "backfill_jobs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    participant_id: Mapped[str] = mapped_column(String(128), index=True)
+    start_date: Mapped[str] = mapped_column(String(10))  # YYYY-MM-DD, inclusive
+    end_date: Mapped[str] = mapped_column(String(10))
+    metrics: Mapped[str] = mapped_column(Text)  # comma-separated MetricType values
+    intraday: Mapped[bool] = mapped_column(Boolean, default=True)
+    status: Mapped[str] = mapped_column(String(16), default="pending")
+    position: Mapped[int] = mapped_column(Integer, default=0)
+    total: Mapped[int] = mapped_column(Integer, default=0)
+    inserted: Mapped[int] = mapped_column(Integer, default=0)
+    error: Mapped[str] = mapped_column(Text, default="")
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+
+
 # ── Affect inference tables ───────────────────────────────────
 
 
@@ -211,11 +380,81 @@ _engine = None
 _session_factory: async_sessionmaker[AsyncSession] | None = None
 
 
-def _get_engine():
+def sqlite_pragmas(settings: Settings) -> list[str]:
+    """PRAGMA statements applied to every new SQLite connection.
+
+    WAL lets the dashboard keep reading while a bulk sync writes, and
+    ``synchronous=NORMAL`` is durable in WAL mode except against power loss
+    of the last committed transactions.
+    """
+    return [
+        f"PRAGMA journal_mode={settings.sqlite_journal_mode.upper()}",
+        f"PRAGMA synchronous={settings.sqlite_synchronous.upper()}",
+        f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}",
+        f"PRAGMA cache_size={int(settings.sqlite_cache_size)}",
+        f"PRAGMA temp_store={settings.sqlite_temp_store.upper()}",
+        f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}",
+    ]
+
+
+def normalize_database_url(url: str) -> str:
+    """Map the URLs hosting platforms hand out onto the async drivers we use.
+
+    ``postgres://`` / ``postgresql://`` (Railway, Heroku, …) become
+    ``postgresql+asyncpg://``; ``sqlite://`` becomes ``sqlite+aiosqlite://``.
+    URLs that already name a driver are returned unchanged.
+    """
+    for prefix, replacement in (
+        ("postgres://", "postgresql+asyncpg://"),
+        ("postgresql://", "postgresql+asyncpg://"),
+        ("sqlite://", "sqlite+aiosqlite://"),
+    ):
+        if url.startswith(prefix):
+            return replacement + url[len(prefix):]
+    return url
+
+
+def is_postgres(url: str | None = None) -> bool:
+    """Whether *url* (default: the configured database) is PostgreSQL."""
+    url = normalize_database_url(url or get_settings().database_url)
+    return make_url(url).get_backend_name() == "postgresql"
+
+
+def build_engine(settings: Settings | None = None, url: str | None = None) -> AsyncEngine:
+    """Create an async engine with the configured pool and SQLite profile."""
+    settings = settings or get_settings()
+    url = normalize_database_url(url or settings.database_url)
+    is_sqlite = make_url(url).get_backend_name() == "sqlite"
+    in_memory = is_sqlite and make_url(url).database in (None, "", ":memory:")
+
+    kwargs: dict[str, Any] = {"echo": settings.db_echo}
+    if not in_memory:  # in-memory SQLite uses a single static connection
+        kwargs.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+        )
+    engine = create_async_engine(url, **kwargs)
+
+    if is_sqlite:
+        pragmas = sqlite_pragmas(settings)
+
+        @event.listens_for(engine.sync_engine, "connect")
+        def _apply_pragmas(dbapi_connection: Any, _record: Any) -> None:
+            cursor = dbapi_connection.cursor()
+            try:
+                for pragma in pragmas:
+                    cursor.execute(pragma)
+            finally:
+                cursor.close()
+
+    return engine
+
+
+def _get_engine() -> AsyncEngine:
     global _engine
     if _engine is None:
-        settings = get_settings()
-        _engine = create_async_engine(settings.database_url, echo=False)
+        _engine = build_engine(get_settings())
     return _engine
 
 
@@ -233,19 +472,72 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+# ── Migrations ────────────────────────────────────────────────
+
+_MIGRATIONS_DIR = Path(__file__).resolve().parent / "migrations"
+_BASELINE_REVISION = "0001"
+
+
+def _alembic_config(connection: Connection | None = None):
+    """Programmatic Alembic config pointing at the packaged migration scripts."""
+    from alembic.config import Config
+
+    cfg = Config()
+    cfg.set_main_option("script_location", str(_MIGRATIONS_DIR))
+    cfg.attributes["connection"] = connection
+    return cfg
+
+
+def run_migrations(connection: Connection) -> None:
+    """Bring the schema on *connection* up to the latest Alembic revision.
+
+    * Fresh database → create all tables from the ORM models and stamp head.
+    * Pre-migration database (tables but no ``alembic_version``) → stamp the
+      baseline revision, then upgrade.
+    * Otherwise → upgrade to head.
+    """
+    from alembic import command
+    from alembic.runtime.migration import MigrationContext
+
+    cfg = _alembic_config(connection)
+    current = MigrationContext.configure(connection).get_current_revision()
+    if current is None:
+        if not inspect(connection).has_table(SensorReadingRow.__tablename__):
+            _create_schema(connection)
+            command.stamp(cfg, "head")
+            return
+        command.stamp(cfg, _BASELINE_REVISION)
+    command.upgrade(cfg, "head")
+    # Safety net for model tables that have no revision of their own.
+    Base.metadata.create_all(connection)
+
+
+def _create_schema(connection: Connection) -> None:
+    if connection.dialect.name == "postgresql":
+        from wearable_agent.storage.partitions import create_postgres_schema
+
+        create_postgres_schema(connection)
+    else:
+        Base.metadata.create_all(connection)
+
+
 async def init_db() -> None:
-    """Create all tables (idempotent). Use Alembic for migrations in production."""
+    """Create missing tables and apply pending Alembic migrations (idempotent)."""
     # Ensure the parent directory of the SQLite file exists at runtime
     # (covers cases where the dir was cleaned between import and first use).
     settings = get_settings()
-    url = settings.database_url
-    if url.startswith("sqlite"):
-        from pathlib import Path
-
+    url = normalize_database_url(settings.database_url)
+    if url.startswith("sqlite") and ":memory:" not in url:
         # URL format: sqlite+aiosqlite:///path/to/db
         db_path = Path(url.split("///", 1)[-1])
         db_path.parent.mkdir(parents=True, exist_ok=True)
 
     engine = _get_engine()
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(run_migrations)
+        if conn.dialect.name == "postgresql":
+            from wearable_agent.storage.partitions import ensure_partitions
+
+            await conn.run_sync(
+                ensure_partitions, months_ahead=settings.postgres_partition_months_ahead
+            )
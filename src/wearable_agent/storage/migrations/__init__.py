@@ -0,0 +1 @@
+"""Alembic migration scripts for the wearable-agent schema."""
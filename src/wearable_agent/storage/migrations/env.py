@@ -0,0 +1,76 @@
+"""Alembic environment for the wearable-agent schema.
+
+Used both by the ``alembic`` CLI (``alembic.ini`` at the project root) and
+programmatically by :func:`wearable_agent.storage.database.init_db`, which
+hands over an already-open connection via ``config.attributes``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import pool
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from wearable_agent.config import get_settings
+from wearable_agent.storage.database import Base, normalize_database_url
+
+config = context.config
+if config.config_file_name is not None:  # invoked through the alembic CLI
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def _database_url() -> str:
+    return normalize_database_url(
+        config.get_main_option("sqlalchemy.url") or get_settings().database_url
+    )
+
+
+def run_migrations_offline() -> None:
+    """Emit the migration SQL to stdout instead of executing it."""
+    context.configure(
+        url=_database_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection: Connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_async_migrations() -> None:
+    engine = create_async_engine(_database_url(), poolclass=pool.NullPool)
+    async with engine.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+        await connection.commit()
+    await engine.dispose()
+
+
+def run_migrations_online() -> None:
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        do_run_migrations(connection)
+    else:
+        asyncio.run(run_async_migrations())
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,25 @@
+"""Baseline — the schema as created by ``Base.metadata.create_all`` before
+migrations were introduced.
+
+Existing databases without an ``alembic_version`` table are stamped at
+this revision by ``init_db()`` and then upgraded.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16
+"""
+
+from __future__ import annotations
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    pass
+
+
+def downgrade() -> None:
+    pass
@@ -0,0 +1,45 @@
+"""Composite (participant_id, metric_type, timestamp) index on sensor_readings.
+
+Every hot reading query filters on participant and metric and orders by
+timestamp.  The composite index serves those lookups and their ordering
+directly; the single-column participant_id / metric_type indexes become
+redundant (participant_id is the composite's prefix) and are dropped.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def _index_names() -> set[str]:
+    inspector = sa.inspect(op.get_bind())
+    return {ix["name"] for ix in inspector.get_indexes("sensor_readings")}
+
+
+def upgrade() -> None:
+    existing = _index_names()
+    if "ix_sensor_readings_participant_metric_ts" not in existing:
+        op.create_index(
+            "ix_sensor_readings_participant_metric_ts",
+            "sensor_readings",
+            ["participant_id", "metric_type", "timestamp"],
+        )
+    for name in ("ix_sensor_readings_participant_id", "ix_sensor_readings_metric_type"):
+        if name in existing:
+            op.drop_index(name, table_name="sensor_readings")
+
+
+def downgrade() -> None:
+    op.create_index("ix_sensor_readings_participant_id", "sensor_readings", ["participant_id"])
+    op.create_index("ix_sensor_readings_metric_type", "sensor_readings", ["metric_type"])
+    op.drop_index("ix_sensor_readings_participant_metric_ts", table_name="sensor_readings")
@@ -0,0 +1,65 @@
+"""Promote the data source out of metadata_json into an indexed column.
+
+``get_latest_by_source`` used to match ``metadata_json LIKE '%"source": …%'``,
+which scans the JSON text of every row for the participant and metric.
+This revision adds ``sensor_readings.source``, backfills it from the JSON
+(``json_extract`` on SQLite, ``->>`` on PostgreSQL) and indexes it
+alongside participant, metric and timestamp.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+_INDEX = "ix_sensor_readings_participant_metric_source_ts"
+
+_BACKFILL = {
+    "sqlite": (
+        "UPDATE sensor_readings "
+        "SET source = COALESCE(json_extract(metadata_json, '$.source'), '') "
+        "WHERE json_valid(metadata_json)"
+    ),
+    "postgresql": (
+        "UPDATE sensor_readings "
+        "SET source = COALESCE(metadata_json::json ->> 'source', '') "
+        "WHERE metadata_json::text LIKE '%\"source\"%'"
+    ),
+}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = {c["name"] for c in inspector.get_columns("sensor_readings")}
+    if "source" not in columns:
+        op.add_column(
+            "sensor_readings",
+            sa.Column("source", sa.String(32), nullable=False, server_default=""),
+        )
+
+    backfill = _BACKFILL.get(bind.dialect.name)
+    if backfill is not None:
+        op.execute(backfill)
+
+    if _INDEX not in {ix["name"] for ix in inspector.get_indexes("sensor_readings")}:
+        op.create_index(
+            _INDEX,
+            "sensor_readings",
+            ["participant_id", "metric_type", "source", "timestamp"],
+        )
+
+
+def downgrade() -> None:
+    op.drop_index(_INDEX, table_name="sensor_readings")
+    with op.batch_alter_table("sensor_readings") as batch:
+        batch.drop_column("source")
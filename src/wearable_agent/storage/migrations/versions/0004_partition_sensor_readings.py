@@ -0,0 +1,98 @@
+"""Time-partition sensor_readings on PostgreSQL (JSONB / TIMESTAMPTZ columns).
+
+An existing, unpartitioned PostgreSQL ``sensor_readings`` table is rebuilt
+in the layout :mod:`wearable_agent.storage.partitions` creates for fresh
+databases — monthly range partitions, or a TimescaleDB hypertable — with
+``metadata_json`` as ``JSONB``, ``timestamp`` / ``created_at`` as
+``TIMESTAMPTZ`` and a ``(id, timestamp)`` primary key.  Rows are copied
+across and the old table is dropped.
+
+SQLite is left as is: existing files keep their ``id``-only primary key,
+which is stricter than ``(id, timestamp)`` and needs no rebuild.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+_LEGACY = "sensor_readings_unpartitioned"
+_COLUMNS = (
+    "id, participant_id, device_type, metric_type, value, unit, "
+    "timestamp, metadata_json, source, created_at"
+)
+
+
+def _is_hypertable(bind: sa.engine.Connection) -> bool:
+    has_timescale = bind.execute(
+        sa.text("SELECT 1 FROM pg_extension WHERE extname = 'timescaledb'")
+    ).first()
+    if not has_timescale:
+        return False
+    return bind.execute(
+        sa.text(
+            "SELECT 1 FROM timescaledb_information.hypertables "
+            "WHERE hypertable_name = 'sensor_readings'"
+        )
+    ).first() is not None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    from wearable_agent.storage.partitions import (
+        create_month_partition,
+        create_reading_table,
+        ensure_partitions,
+        is_natively_partitioned,
+        use_timescale,
+    )
+
+    if is_natively_partitioned(bind) or _is_hypertable(bind):
+        return
+
+    # Move the old table (and the names of its key / indexes) out of the way.
+    inspector = sa.inspect(bind)
+    pk_name = inspector.get_pk_constraint("sensor_readings").get("name")
+    index_names = [ix["name"] for ix in inspector.get_indexes("sensor_readings")]
+    op.rename_table("sensor_readings", _LEGACY)
+    if pk_name:
+        op.execute(f'ALTER TABLE {_LEGACY} RENAME CONSTRAINT "{pk_name}" TO {_LEGACY}_pkey')
+    for name in index_names:
+        op.drop_index(name, table_name=_LEGACY)
+
+    timescale = use_timescale(bind)
+    create_reading_table(bind, timescale=timescale)
+    if not timescale:
+        months = bind.execute(
+            sa.text(f"SELECT DISTINCT date_trunc('month', timestamp)::date FROM {_LEGACY}")
+        ).scalars().all()
+        for month in months:
+            create_month_partition(bind, month)
+        ensure_partitions(bind)
+
+    op.execute(
+        f"INSERT INTO sensor_readings ({_COLUMNS}) "
+        f"SELECT id, participant_id, device_type, metric_type, value, unit, "
+        f"timestamp AT TIME ZONE 'UTC', metadata_json::jsonb, source, "
+        f"created_at AT TIME ZONE 'UTC' FROM {_LEGACY} "
+        f"ON CONFLICT DO NOTHING"
+    )
+    op.drop_table(_LEGACY)
+
+
+def downgrade() -> None:
+    # The partitioned layout is a superset of what earlier revisions expect
+    # from the ORM's point of view; converting back is not supported.
+    pass
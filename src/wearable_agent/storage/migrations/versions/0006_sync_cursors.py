@@ -0,0 +1,38 @@
+"""Per-metric high-water marks for incremental Fitbit syncs.
+
+One row per (participant, metric) holds the timestamp of the newest reading
+the scheduler has published, so each cycle fetches only the intraday range
+after it instead of the whole day.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-16
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+_TABLE = "sync_cursors"
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table(_TABLE):
+        return
+    op.create_table(
+        _TABLE,
+        sa.Column("participant_id", sa.String(128), primary_key=True),
+        sa.Column("metric_type", sa.String(32), primary_key=True),
+        sa.Column("last_timestamp", sa.DateTime, nullable=False),
+        sa.Column("updated_at", sa.DateTime, server_default=sa.func.now(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table(_TABLE)
@@ -0,0 +1,180 @@
+"""Re-key sensor_readings with deterministic ids and drop duplicate rows.
+
+Reading ids used to be random ``uuid4`` values, so re-ingesting the same
+measurement added a second row.  They are now :func:`wearable_agent.models.reading_id`
+(a UUID5 over participant, metric, timestamp, source and ``metadata["type"]``).
+This revision rewrites the ids of existing rows the same way, walking each
+(participant, metric) group in timestamp-ordered chunks, keeping the most
+recently written row of each natural key and deleting the rest.
+
+Fitbit daily totals of metrics that also have an intraday series are keyed
+with subtype ``"daily"`` (see ``_SimpleParserSpec.subtype``).  Before this
+series the collector stored only the daily totals of those metrics, so
+their untyped live rows at midnight are re-keyed (and tagged) as daily.
+
+Upserts target ``(id, timestamp)``: that is the primary key of fresh and
+PostgreSQL tables, while pre-0004 SQLite files (``id``-only primary key)
+get a unique index on it.  Cold-tier Parquet files are not rewritten.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-16
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Iterator
+from datetime import datetime, time
+from typing import Any
+
+import sqlalchemy as sa
+from alembic import op
+
+from wearable_agent.models import reading_id
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+_UNIQUE = "uq_sensor_readings_id_timestamp"
+
+# Rows re-keyed per round trip; a timestamp is never split across chunks.
+_CHUNK = 5_000
+
+_readings = sa.table(
+    "sensor_readings",
+    sa.column("id", sa.String),
+    sa.column("participant_id", sa.String),
+    sa.column("metric_type", sa.String),
+    # Untyped: rows are matched on the stored value exactly as read back
+    # (SQLite text need not be in the format SQLAlchemy would bind).
+    sa.column("timestamp"),
+    sa.column("metadata_json", sa.Text),
+    sa.column("source", sa.String),
+    sa.column("created_at", sa.DateTime),
+)
+
+
+# Metrics whose Fitbit daily total is stamped at the same midnight as the
+# first minute of their intraday series.
+_DAILY_TOTAL_METRICS = frozenset(
+    {"steps", "calories", "distance", "floors", "active_zone_minutes"}
+)
+
+
+def _metadata(metadata_json: Any) -> dict[str, Any]:
+    if isinstance(metadata_json, dict):
+        return metadata_json
+    try:
+        metadata = json.loads(metadata_json or "{}")
+    except ValueError:
+        return {}
+    return metadata if isinstance(metadata, dict) else {}
+
+
+def _is_untyped_daily_total(
+    metric_type: str, when: datetime, source: str, metadata: dict[str, Any]
+) -> bool:
+    return (
+        metric_type in _DAILY_TOTAL_METRICS
+        and source == "live"
+        and not metadata.get("type")
+        and when.time() == time.min
+    )
+
+
+def _chunks(
+    bind: sa.engine.Connection, participant_id: str, metric_type: str
+) -> Iterator[list[sa.Row[Any]]]:
+    """Yield a group's rows in timestamp order, newest write first per timestamp.
+
+    Duplicates share a timestamp, so every chunk holds all rows of the
+    timestamps it covers.
+    """
+    t = _readings.c
+    query = (
+        sa.select(t.id, t.timestamp, t.source, t.metadata_json)
+        .where(t.participant_id == participant_id, t.metric_type == metric_type)
+        .order_by(t.timestamp, t.created_at.desc().nulls_last())
+    )
+    after = None
+    while True:
+        page = query if after is None else query.where(t.timestamp > after)
+        rows = bind.execute(page.limit(_CHUNK)).all()
+        if len(rows) == _CHUNK:
+            last = rows[-1].timestamp
+            rows = [row for row in rows if row.timestamp != last]
+            rows += bind.execute(query.where(t.timestamp == last)).all()
+        if not rows:
+            return
+        yield rows
+        after = rows[-1].timestamp
+
+
+def _rekey_group(bind: sa.engine.Connection, participant_id: str, metric_type: str) -> None:
+    for rows in _chunks(bind, participant_id, metric_type):
+        _rekey_rows(bind, participant_id, metric_type, rows)
+
+
+def _rekey_rows(
+    bind: sa.engine.Connection,
+    participant_id: str,
+    metric_type: str,
+    rows: list[sa.Row[Any]],
+) -> None:
+    t = _readings.c
+    seen: set[str] = set()
+    stale: list[dict[str, Any]] = []
+    updates: list[dict[str, Any]] = []
+    retyped: list[dict[str, Any]] = []
+    for old_id, ts, source, metadata_json in rows:
+        when = ts if isinstance(ts, datetime) else datetime.fromisoformat(ts)
+        metadata = _metadata(metadata_json)
+        if _is_untyped_daily_total(metric_type, when, source or "", metadata):
+            metadata = {**metadata, "type": "daily"}
+            retyped.append({"old": old_id, "ts": ts, "meta": json.dumps(metadata)})
+        new_id = reading_id(
+            participant_id, metric_type, when, source or "", metadata.get("type") or ""
+        )
+        if new_id in seen:
+            stale.append({"old": old_id, "ts": ts})
+            continue
+        seen.add(new_id)
+        if new_id != old_id:
+            updates.append({"old": old_id, "ts": ts, "new": new_id})
+
+    match = sa.and_(t.id == sa.bindparam("old"), t.timestamp == sa.bindparam("ts"))
+    if stale:
+        bind.execute(sa.delete(_readings).where(match), stale)
+    if retyped:
+        bind.execute(
+            sa.update(_readings).where(match).values(metadata_json=sa.bindparam("meta")),
+            retyped,
+        )
+    if updates:
+        bind.execute(
+            sa.update(_readings).where(match).values(id=sa.bindparam("new")), updates
+        )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    t = _readings.c
+    groups = bind.execute(sa.select(t.participant_id, t.metric_type).distinct()).all()
+    for participant_id, metric_type in groups:
+        _rekey_group(bind, participant_id, metric_type)
+
+    inspector = sa.inspect(bind)
+    primary_key = inspector.get_pk_constraint("sensor_readings")["constrained_columns"]
+    if sorted(primary_key) != ["id", "timestamp"] and _UNIQUE not in {
+        ix["name"] for ix in inspector.get_indexes("sensor_readings")
+    }:
+        op.create_index(_UNIQUE, "sensor_readings", ["id", "timestamp"], unique=True)
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if _UNIQUE in {ix["name"] for ix in inspector.get_indexes("sensor_readings")}:
+        op.drop_index(_UNIQUE, "sensor_readings")
@@ -0,0 +1,49 @@
+"""Persistent Fitbit backfill jobs.
+
+One row per backfill request records its date range, metrics and how many
+of its planned requests have been stored, so a backfill interrupted by a
+restart resumes where it stopped.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-16
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+_TABLE = "backfill_jobs"
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table(_TABLE):
+        return
+    op.create_table(
+        _TABLE,
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("participant_id", sa.String(128), nullable=False),
+        sa.Column("start_date", sa.String(10), nullable=False),
+        sa.Column("end_date", sa.String(10), nullable=False),
+        sa.Column("metrics", sa.Text, nullable=False),
+        sa.Column("intraday", sa.Boolean, nullable=False),
+        sa.Column("status", sa.String(16), nullable=False),
+        sa.Column("position", sa.Integer, nullable=False),
+        sa.Column("total", sa.Integer, nullable=False),
+        sa.Column("inserted", sa.Integer, nullable=False),
+        sa.Column("error", sa.Text, nullable=False),
+        sa.Column("created_at", sa.DateTime, server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime, server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_backfill_jobs_participant_id", _TABLE, ["participant_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_backfill_jobs_participant_id", _TABLE)
+    op.drop_table(_TABLE)
@@ -0,0 +1,278 @@
+"""Time partitioning of ``sensor_readings`` on PostgreSQL.
+
+Two layouts are supported, chosen by ``postgres_timescale``:
+
+* **Native declarative partitioning** (default) — ``sensor_readings`` is a
+  ``PARTITION BY RANGE (timestamp)`` parent with one child table per UTC
+  month (``sensor_readings_p2026_10``) plus a ``sensor_readings_default``
+  catch-all.  :func:`ensure_partitions` creates upcoming months ahead of
+  time and carves months out of the default partition when rows landed
+  there (e.g. a historical LifeSnaps import).
+* **TimescaleDB hypertable** — when the extension is installed (or forced
+  on), the table is created unpartitioned and handed to
+  ``create_hypertable``; Timescale then manages its own chunks and
+  :func:`ensure_partitions` has nothing to do.
+
+:class:`PartitionMaintainer` runs :func:`ensure_partitions` periodically
+inside the API process.  SQLite databases are left untouched.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, date, datetime
+from typing import Any
+
+import structlog
+from sqlalchemy import MetaData, text
+from sqlalchemy.engine import Connection
+
+from wearable_agent.config import Settings, get_settings
+from wearable_agent.storage.database import Base, SensorReadingRow
+
+logger = structlog.get_logger(__name__)
+
+_TABLE = SensorReadingRow.__tablename__
+_DEFAULT_PARTITION = f"{_TABLE}_default"
+
+
+# ── Month arithmetic ──────────────────────────────────────────
+
+def month_start(value: date | datetime) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, n: int) -> date:
+    index = month.year * 12 + (month.month - 1) + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """Child table name for *month*, e.g. ``sensor_readings_p2026_10``."""
+    return f"{_TABLE}_p{month.year:04d}_{month.month:02d}"
+
+
+def _bound(month: date) -> str:
+    return f"{month.isoformat()} 00:00:00+00"
+
+
+# ── Schema creation ───────────────────────────────────────────
+
+def use_timescale(connection: Connection, settings: Settings | None = None) -> bool:
+    """Resolve ``postgres_timescale`` against what the server offers."""
+    mode = (settings or get_settings()).postgres_timescale
+    if mode == "off":
+        return False
+    if mode == "on":
+        connection.execute(text("CREATE EXTENSION IF NOT EXISTS timescaledb"))
+        return True
+    installed = connection.execute(
+        text("SELECT 1 FROM pg_extension WHERE extname = 'timescaledb'")
+    ).first()
+    return installed is not None
+
+
+def create_reading_table(
+    connection: Connection, *, timescale: bool, settings: Settings | None = None
+) -> None:
+    """Create ``sensor_readings`` (and its indexes) in the chosen layout."""
+    table = SensorReadingRow.__table__
+    if not timescale:
+        table.create(connection, checkfirst=True)
+        # Catch-all so writes never fail for a month without a partition.
+        connection.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {_DEFAULT_PARTITION} PARTITION OF {_TABLE} DEFAULT"
+        ))
+        return
+
+    # Hypertables must start out as plain tables: drop the PARTITION BY clause
+    # on a private copy of the table definition.
+    plain = table.to_metadata(MetaData())
+    plain.dialect_options["postgresql"]["partition_by"] = None
+    plain.create(connection, checkfirst=True)
+    interval = (settings or get_settings()).timescale_chunk_interval
+    connection.execute(text(
+        f"SELECT create_hypertable('{_TABLE}', 'timestamp', "
+        f"chunk_time_interval => INTERVAL '{interval}', "
+        f"if_not_exists => TRUE, migrate_data => TRUE)"
+    ))
+
+
+def create_postgres_schema(connection: Connection, settings: Settings | None = None) -> None:
+    """Create every table on a fresh PostgreSQL database."""
+    timescale = use_timescale(connection, settings)
+    create_reading_table(connection, timescale=timescale, settings=settings)
+    Base.metadata.create_all(
+        connection,
+        tables=[t for t in Base.metadata.sorted_tables if t.name != _TABLE],
+    )
+    logger.info("partitions.schema_created", layout="hypertable" if timescale else "native")
+
+
+# ── Maintenance ───────────────────────────────────────────────
+
+def is_natively_partitioned(connection: Connection) -> bool:
+    return connection.execute(
+        text(
+            "SELECT 1 FROM pg_partitioned_table p "
+            "JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relname = :table AND c.relnamespace = current_schema()::regnamespace"
+        ),
+        {"table": _TABLE},
+    ).first() is not None
+
+
+def _existing_partitions(connection: Connection) -> set[str]:
+    rows = connection.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits i "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "WHERE parent.relname = :table "
+            "AND parent.relnamespace = current_schema()::regnamespace"
+        ),
+        {"table": _TABLE},
+    )
+    return {r[0] for r in rows}
+
+
+def _months_in_default(connection: Connection) -> list[date]:
+    rows = connection.execute(
+        text(
+            f"SELECT DISTINCT date_trunc('month', timestamp AT TIME ZONE 'UTC')::date "
+            f"FROM {_DEFAULT_PARTITION}"
+        )
+    )
+    return sorted(r[0] for r in rows)
+
+
+def create_month_partition(
+    connection: Connection, month: date, *, has_default_rows: bool = False
+) -> None:
+    """Create the partition for *month*, moving its rows out of the default one."""
+    name = partition_name(month)
+    lower, upper = _bound(month), _bound(add_months(month, 1))
+    if not has_default_rows:
+        connection.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {_TABLE} "
+            f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+        ))
+        return
+
+    # Rows for this month already sit in the default partition, which would
+    # make CREATE … PARTITION OF fail: detach the default, move the rows into
+    # the new partition, then re-attach it.
+    connection.execute(text(f"ALTER TABLE {_TABLE} DETACH PARTITION {_DEFAULT_PARTITION}"))
+    connection.execute(text(
+        f"CREATE TABLE {name} PARTITION OF {_TABLE} "
+        f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+    ))
+    where = f"timestamp >= '{lower}' AND timestamp < '{upper}'"
+    connection.execute(text(
+        f"INSERT INTO {_TABLE} SELECT * FROM {_DEFAULT_PARTITION} WHERE {where}"
+    ))
+    connection.execute(text(f"DELETE FROM {_DEFAULT_PARTITION} WHERE {where}"))
+    connection.execute(text(f"ALTER TABLE {_TABLE} ATTACH PARTITION {_DEFAULT_PARTITION} DEFAULT"))
+
+
+def ensure_partitions(
+    connection: Connection,
+    months_ahead: int = 3,
+    now: datetime | None = None,
+) -> list[str]:
+    """Create missing monthly partitions; return the names created.
+
+    Covers the current UTC month plus *months_ahead* upcoming ones, and every
+    month that currently has rows in the default partition.  A no-op on
+    SQLite and on TimescaleDB hypertables.
+    """
+    if connection.dialect.name != "postgresql" or not is_natively_partitioned(connection):
+        return []
+
+    existing = _existing_partitions(connection)
+    if _DEFAULT_PARTITION not in existing:
+        connection.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {_DEFAULT_PARTITION} PARTITION OF {_TABLE} DEFAULT"
+        ))
+
+    current = month_start(now or datetime.now(UTC))
+    wanted = {add_months(current, i) for i in range(months_ahead + 1)}
+    in_default = set(_months_in_default(connection))
+
+    created: list[str] = []
+    for month in sorted(wanted | in_default):
+        name = partition_name(month)
+        if name in existing:
+            continue
+        create_month_partition(connection, month, has_default_rows=month in in_default)
+        created.append(name)
+
+    if created:
+        logger.info("partitions.created", partitions=created)
+    return created
+
+
+class PartitionMaintainer:
+    """Background task that keeps monthly partitions ahead of the clock.
+
+    Integration::
+
+        maintainer = PartitionMaintainer()
+        await maintainer.start()
+        ...
+        await maintainer.stop()
+    """
+
+    def __init__(
+        self,
+        engine: Any | None = None,  # AsyncEngine; defaults to the app engine
+        interval_hours: float | None = None,
+        months_ahead: int | None = None,
+    ) -> None:
+        settings = get_settings()
+        self._engine = engine
+        self._interval = interval_hours or settings.postgres_partition_maintenance_hours
+        self._months_ahead = (
+            settings.postgres_partition_months_ahead if months_ahead is None else months_ahead
+        )
+        self._task: asyncio.Task | None = None
+        self._stats: dict[str, Any] = {"last_run": None, "runs": 0, "created": [], "errors": 0}
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        return dict(self._stats)
+
+    async def run_once(self) -> list[str]:
+        """Run one maintenance pass; return the partitions created."""
+        from wearable_agent.storage.database import _get_engine
+
+        engine = self._engine or _get_engine()
+        async with engine.begin() as conn:
+            created = await conn.run_sync(ensure_partitions, months_ahead=self._months_ahead)
+        self._stats["last_run"] = datetime.now(UTC).isoformat()
+        self._stats["runs"] += 1
+        self._stats["created"] = created
+        return created
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run_loop())
+            logger.info("partitions.maintainer_started", interval_hours=self._interval)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run_loop(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                self._stats["errors"] += 1
+                logger.exception("partitions.maintenance_error")
+            await asyncio.sleep(self._interval * 3600)
@@ -2,11 +2,15 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
-from datetime import datetime
-from typing import Sequence
+from collections.abc import Sequence
+from datetime import UTC, datetime
+from typing import Any
 
-from sqlalchemy import func, select
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from wearable_agent.affect.models import (
@@ -21,15 +25,149 @@ from wearable_agent.affect.models import (
 from wearable_agent.models import Alert, MetricType, SensorReading
 from wearable_agent.storage.database import (
     AlertRow,
+    BackfillJobRow,
     EMALabelRow,
     FeatureWindowRow,
+    ImportCheckpointRow,
     InferenceOutputRow,
     OAuthTokenRow,
     ParticipantBaselineRow,
     ParticipantRow,
     SensorReadingRow,
+    SyncCursorRow,
     get_session_factory,
 )
+from wearable_agent.storage.tiering import ColdStore, get_cold_store
+
+# Column order for the plain-tuple form accepted by ``ReadingRepository.save_batch``.
+READING_COLUMNS: tuple[str, ...] = (
+    "id",
+    "participant_id",
+    "device_type",
+    "metric_type",
+    "value",
+    "unit",
+    "timestamp",
+    "metadata_json",
+    "source",
+)
+
+ReadingTuple = tuple[str, str, str, str, float, str, datetime, str, str]
+
+
+def _dump_metadata(metadata: dict[str, Any], cache: dict[Any, str]) -> str:
+    """``json.dumps`` with a per-batch cache — bulk loads mostly repeat a
+    handful of metadata dicts such as ``{"source": "dataset"}``."""
+    if not metadata:
+        return "{}"
+    try:
+        key: Any = tuple(metadata.items())
+        hash(key)
+    except TypeError:
+        return json.dumps(metadata)
+    dumped = cache.get(key)
+    if dumped is None:
+        dumped = cache[key] = json.dumps(metadata)
+    return dumped
+
+
+def _insert_ignore(dialect_name: str) -> Any:
+    """Build an ``INSERT`` into ``sensor_readings`` that skips duplicate keys."""
+    table = SensorReadingRow.__table__
+    if dialect_name == "sqlite":
+        return insert(table).prefix_with("OR IGNORE")
+    if dialect_name == "postgresql":
+        return pg_insert(table).on_conflict_do_nothing(index_elements=["id", "timestamp"])
+    return insert(table)
+
+
+def _upsert(dialect_name: str) -> Any:
+    """Build an ``INSERT … ON CONFLICT (id, timestamp) DO UPDATE`` into ``sensor_readings``.
+
+    Only rows whose value, unit or metadata actually changed are rewritten,
+    so re-ingesting identical data costs an index probe per row.
+    """
+    table = SensorReadingRow.__table__
+    if dialect_name == "sqlite":
+        stmt = sqlite_insert(table)
+    elif dialect_name == "postgresql":
+        stmt = pg_insert(table)
+    else:
+        return insert(table)
+    new = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=["id", "timestamp"],
+        set_={
+            "device_type": new.device_type,
+            "value": new.value,
+            "unit": new.unit,
+            "metadata_json": new.metadata_json,
+            "source": new.source,
+        },
+        where=(table.c.value != new.value)
+        | (table.c.unit != new.unit)
+        | (table.c.metadata_json != new.metadata_json),
+    )
+
+
+def _reading_params(readings: Sequence[SensorReading | ReadingTuple]) -> list[dict[str, Any]]:
+    """Executemany parameters for :data:`READING_COLUMNS` from models or tuples."""
+    dump_cache: dict[Any, str] = {}
+    return [
+        dict(zip(READING_COLUMNS, r, strict=True)) if isinstance(r, tuple)
+        else {
+            "id": r.id,
+            "participant_id": r.participant_id,
+            "device_type": r.device_type.value,
+            "metric_type": r.metric_type.value,
+            "value": r.value,
+            "unit": r.unit,
+            "timestamp": r.timestamp,
+            "metadata_json": _dump_metadata(r.metadata, dump_cache),
+            "source": r.metadata.get("source") or "",
+        }
+        for r in readings
+    ]
+
+
+# ── Reading query builders ───────────────────────────────────
+# Kept at module level so the statements the repository runs can be
+# inspected directly (e.g. EXPLAIN QUERY PLAN in the storage tests).
+# All are served by ``ix_sensor_readings_participant_metric_ts`` (or its
+# ``…_source_ts`` sibling when filtering on source).
+
+
+def _latest_stmt(
+    participant_id: str, metric_type: str, limit: int, source: str | None = None
+) -> Any:
+    stmt = select(SensorReadingRow).where(
+        SensorReadingRow.participant_id == participant_id,
+        SensorReadingRow.metric_type == metric_type,
+    )
+    if source is not None:
+        stmt = stmt.where(SensorReadingRow.source == source)
+    return stmt.order_by(SensorReadingRow.timestamp.desc()).limit(limit)
+
+
+def _range_stmt(participant_id: str, metric_type: str, start: datetime, end: datetime) -> Any:
+    return (
+        select(SensorReadingRow)
+        .where(
+            SensorReadingRow.participant_id == participant_id,
+            SensorReadingRow.metric_type == metric_type,
+            SensorReadingRow.timestamp >= start,
+            SensorReadingRow.timestamp <= end,
+        )
+        .order_by(SensorReadingRow.timestamp.asc())
+    )
+
+
+def _count_stmt(participant_id: str) -> Any:
+    return (
+        select(func.count())
+        .select_from(SensorReadingRow)
+        .where(SensorReadingRow.participant_id == participant_id)
+    )
 
 
 class BaseRepository:
@@ -45,7 +183,20 @@ class BaseRepository:
 
 
 class ReadingRepository(BaseRepository):
-    """CRUD operations for :class:`SensorReading` objects."""
+    """CRUD operations for :class:`SensorReading` objects.
+
+    :meth:`get_range` also returns readings that were compacted into the
+    Parquet cold tier (see :mod:`wearable_agent.storage.tiering`); the other
+    reads only see the hot SQL rows.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession | None = None,
+        cold_store: ColdStore | None = None,
+    ) -> None:
+        super().__init__(session)
+        self._cold_store = cold_store if cold_store is not None else get_cold_store()
 
     # ── Write ─────────────────────────────────────────────────
 
@@ -60,54 +211,108 @@ class ReadingRepository(BaseRepository):
             unit=reading.unit,
             timestamp=reading.timestamp,
             metadata_json=json.dumps(reading.metadata),
+            source=reading.metadata.get("source") or "",
         )
         session.add(row)
         await session.commit()
 
-    async def save_batch(self, readings: list[SensorReading]) -> int:
-        session = await self._session()
-        rows = [
-            SensorReadingRow(
-                id=r.id,
-                participant_id=r.participant_id,
-                device_type=r.device_type.value,
-                metric_type=r.metric_type.value,
-                value=r.value,
-                unit=r.unit,
-                timestamp=r.timestamp,
-                metadata_json=json.dumps(r.metadata),
-            )
-            for r in readings
-        ]
-        session.add_all(rows)
-        await session.commit()
-        return len(rows)
+    async def save_batch(
+        self, readings: Sequence[SensorReading | ReadingTuple], *, commit: bool = True
+    ) -> int:
+        """Bulk-insert readings with a single Core ``executemany``.
+
+        *readings* may mix :class:`SensorReading` objects and plain column
+        tuples in :data:`READING_COLUMNS` order (``metadata_json`` already
+        serialised, ``source`` given explicitly), which lets bulk loaders
+        skip building Pydantic models.
+
+        Rows whose id already exists are skipped (``INSERT OR IGNORE`` on
+        SQLite, ``ON CONFLICT DO NOTHING`` on PostgreSQL); since ids are
+        derived from the natural key (:func:`~wearable_agent.models.reading_id`),
+        re-ingesting a reading is a no-op.  Returns the number of rows
+        actually inserted.  With ``commit=False`` the insert joins the
+        session's open transaction (e.g. to commit it together with an
+        :class:`ImportCheckpointRepository` update).
+        """
+        if not readings:
+            return 0
+        session = await self._session()
+        params = _reading_params(readings)
+        stmt = _insert_ignore(session.get_bind().dialect.name)
+        result = await session.execute(stmt, params)
+        if commit:
+            await session.commit()
+        return result.rowcount if result.rowcount >= 0 else len(params)
+
+    async def upsert_batch(
+        self, readings: Sequence[SensorReading | ReadingTuple], *, commit: bool = True
+    ) -> int:
+        """Like :meth:`save_batch`, but existing readings take the new values.
+
+        For sources that revise data already delivered (e.g. a Fitbit day
+        re-synced after the device uploaded more).  Unchanged rows are left
+        alone.  Returns the number of rows inserted or updated.
+        """
+        if not readings:
+            return 0
+        session = await self._session()
+        params = _reading_params(readings)
+        stmt = _upsert(session.get_bind().dialect.name)
+        result = await session.execute(stmt, params)
+        if commit:
+            await session.commit()
+        return result.rowcount if result.rowcount >= 0 else len(params)
+
+    async def upsert_changed(
+        self, readings: Sequence[SensorReading], *, commit: bool = True
+    ) -> list[SensorReading]:
+        """:meth:`upsert_batch` returning the readings actually inserted or updated.
+
+        Lets a sync that re-fetches overlapping windows forward only what
+        is new or revised.
+        """
+        if not readings:
+            return []
+        session = await self._session()
+        stmt = _upsert(session.get_bind().dialect.name).returning(SensorReadingRow.id)
+        result = await session.execute(stmt, _reading_params(readings))
+        changed = set(result.scalars().all())
+        if commit:
+            await session.commit()
+        return [r for r in readings if r.id in changed]
 
     # ── Read ──────────────────────────────────────────────────
 
     async def count_for_participant(self, participant_id: str) -> int:
         """Count total readings stored for a participant."""
         session = await self._session()
-        stmt = (
-            select(func.count())
-            .select_from(SensorReadingRow)
-            .where(SensorReadingRow.participant_id == participant_id)
-        )
-        result = await session.execute(stmt)
+        result = await session.execute(_count_stmt(participant_id))
         return result.scalar() or 0
 
-    async def delete_for_participant(self, participant_id: str) -> int:
-        """Delete all readings for a participant. Returns count deleted."""
+    async def delete_for_participant(
+        self, participant_id: str, *, source: str | None = None
+    ) -> int:
+        """Delete all readings for a participant. Returns count deleted.
+
+        With *source*, only that source's hot rows are deleted; the Parquet
+        cold tier is only cleared for a full delete.
+        """
         from sqlalchemy import delete as sa_delete
 
         session = await self._session()
-        # Count first
-        count = await self.count_for_participant(participant_id)
         stmt = sa_delete(SensorReadingRow).where(
             SensorReadingRow.participant_id == participant_id
         )
+        if source is not None:
+            result = await session.execute(stmt.where(SensorReadingRow.source == source))
+            await session.commit()
+            return result.rowcount or 0
+        # Count first
+        count = await self.count_for_participant(participant_id)
         await session.execute(stmt)
         await session.commit()
+        if self._cold_store is not None:
+            await asyncio.to_thread(self._cold_store.delete_participant, participant_id)
         return count
 
     async def get_latest(
@@ -117,16 +322,7 @@ class ReadingRepository(BaseRepository):
         limit: int = 1,
     ) -> Sequence[SensorReadingRow]:
         session = await self._session()
-        stmt = (
-            select(SensorReadingRow)
-            .where(
-                SensorReadingRow.participant_id == participant_id,
-                SensorReadingRow.metric_type == metric_type.value,
-            )
-            .order_by(SensorReadingRow.timestamp.desc())
-            .limit(limit)
-        )
-        result = await session.execute(stmt)
+        result = await session.execute(_latest_stmt(participant_id, metric_type.value, limit))
         return result.scalars().all()
 
     async def get_latest_by_source(
@@ -138,19 +334,9 @@ class ReadingRepository(BaseRepository):
     ) -> Sequence[SensorReadingRow]:
         """Get latest readings filtered by data source (dataset or live)."""
         session = await self._session()
-        # Filter by metadata JSON containing source field
-        # Note: SQLite JSON functions may be limited, using LIKE for now
-        stmt = (
-            select(SensorReadingRow)
-            .where(
-                SensorReadingRow.participant_id == participant_id,
-                SensorReadingRow.metric_type == metric_type.value,
-                SensorReadingRow.metadata_json.like(f'%"source": "{data_source}"%'),
-            )
-            .order_by(SensorReadingRow.timestamp.desc())
-            .limit(limit)
+        result = await session.execute(
+            _latest_stmt(participant_id, metric_type.value, limit, source=data_source)
         )
-        result = await session.execute(stmt)
         return result.scalars().all()
 
     async def get_range(
@@ -161,18 +347,24 @@ class ReadingRepository(BaseRepository):
         end: datetime,
     ) -> Sequence[SensorReadingRow]:
         session = await self._session()
-        stmt = (
-            select(SensorReadingRow)
-            .where(
-                SensorReadingRow.participant_id == participant_id,
-                SensorReadingRow.metric_type == metric_type.value,
-                SensorReadingRow.timestamp >= start,
-                SensorReadingRow.timestamp <= end,
-            )
-            .order_by(SensorReadingRow.timestamp.asc())
+        result = await session.execute(
+            _range_stmt(participant_id, metric_type.value, start, end)
         )
-        result = await session.execute(stmt)
-        return result.scalars().all()
+        hot = result.scalars().all()
+        if self._cold_store is None:
+            return hot
+        cold = await asyncio.to_thread(
+            self._cold_store.read_range, participant_id, metric_type.value, start, end
+        )
+        if not cold:
+            return hot
+        # A row can exist in both tiers if compaction stopped between writing
+        # the Parquet file and deleting the SQL rows; the SQL copy wins.
+        hot_ids = {r.id for r in hot}
+        merged = [r for r in cold if r.id not in hot_ids]
+        merged.extend(hot)
+        merged.sort(key=lambda r: r.timestamp)
+        return merged
 
 
 class AlertRepository(BaseRepository):
@@ -441,6 +633,205 @@ class BaselineRepository(BaseRepository):
         await session.commit()
 
 
+# ── Bulk import checkpoints ───────────────────────────────────
+
+
+class ImportCheckpointRepository(BaseRepository):
+    """Progress rows of resumable bulk imports, keyed by participant and source."""
+
+    async def get(self, participant_id: str, source: str) -> ImportCheckpointRow | None:
+        session = await self._session()
+        return await session.get(ImportCheckpointRow, (participant_id, source))
+
+    async def start(
+        self, participant_id: str, source: str, total: int, *, restart: bool = False
+    ) -> ImportCheckpointRow:
+        """Mark an import as running; keeps the committed position unless *restart*."""
+        session = await self._session()
+        row = await session.get(ImportCheckpointRow, (participant_id, source))
+        if row is None:
+            row = ImportCheckpointRow(
+                participant_id=participant_id, source=source, position=0, inserted=0
+            )
+            session.add(row)
+        elif restart:
+            row.position = 0
+            row.inserted = 0
+            row.started_at = datetime.utcnow()
+        row.status = "running"
+        row.total = total
+        row.error = ""
+        row.updated_at = datetime.utcnow()
+        await session.commit()
+        return row
+
+    async def advance(self, participant_id: str, source: str, consumed: int, inserted: int) -> None:
+        """Move the checkpoint forward and commit (with any pending batch insert)."""
+        session = await self._session()
+        row = await session.get(ImportCheckpointRow, (participant_id, source))
+        if row is None:
+            raise LookupError(f"No import checkpoint for {participant_id}/{source}")
+        row.position += consumed
+        row.inserted += inserted
+        row.updated_at = datetime.utcnow()
+        await session.commit()
+
+    async def finish(
+        self, participant_id: str, source: str, status: str, error: str = ""
+    ) -> None:
+        session = await self._session()
+        row = await session.get(ImportCheckpointRow, (participant_id, source))
+        if row is None:
+            return
+        row.status = status
+        row.error = error
+        row.updated_at = datetime.utcnow()
+        await session.commit()
+
+    async def delete(self, participant_id: str, source: str | None = None) -> int:
+        """Drop a participant's checkpoints (all sources unless *source*)."""
+        from sqlalchemy import delete as sa_delete
+
+        session = await self._session()
+        stmt = sa_delete(ImportCheckpointRow).where(
+            ImportCheckpointRow.participant_id == participant_id
+        )
+        if source is not None:
+            stmt = stmt.where(ImportCheckpointRow.source == source)
+        result = await session.execute(stmt)
+        await session.commit()
+        return result.rowcount or 0
+
+
+class BackfillJobRepository(BaseRepository):
+    """Fitbit backfill jobs and their committed progress."""
+
+    async def create(
+        self,
+        participant_id: str,
+        start_date: str,
+        end_date: str,
+        metrics: Sequence[MetricType],
+        *,
+        intraday: bool = True,
+        total: int = 0,
+    ) -> BackfillJobRow:
+        session = await self._session()
+        row = BackfillJobRow(
+            participant_id=participant_id,
+            start_date=start_date,
+            end_date=end_date,
+            metrics=",".join(m.value for m in metrics),
+            intraday=intraday,
+            status="pending",
+            position=0,
+            total=total,
+            inserted=0,
+            error="",
+        )
+        session.add(row)
+        await session.commit()
+        return row
+
+    async def get(self, job_id: int) -> BackfillJobRow | None:
+        session = await self._session()
+        return await session.get(BackfillJobRow, job_id)
+
+    async def list_for_participant(self, participant_id: str) -> Sequence[BackfillJobRow]:
+        session = await self._session()
+        stmt = (
+            select(BackfillJobRow)
+            .where(BackfillJobRow.participant_id == participant_id)
+            .order_by(BackfillJobRow.id.desc())
+        )
+        return (await session.execute(stmt)).scalars().all()
+
+    async def list_unfinished(self) -> Sequence[BackfillJobRow]:
+        """Jobs a restart should resume (pending or still marked running)."""
+        session = await self._session()
+        stmt = (
+            select(BackfillJobRow)
+            .where(BackfillJobRow.status.in_(("pending", "running")))
+            .order_by(BackfillJobRow.id)
+        )
+        return (await session.execute(stmt)).scalars().all()
+
+    async def advance(self, job_id: int, consumed: int, inserted: int) -> None:
+        """Move the job forward and commit (with any pending batch upsert)."""
+        session = await self._session()
+        row = await session.get(BackfillJobRow, job_id)
+        if row is None:
+            raise LookupError(f"No backfill job {job_id}")
+        row.position += consumed
+        row.inserted += inserted
+        row.updated_at = datetime.utcnow()
+        await session.commit()
+
+    async def set_status(self, job_id: int, status: str, error: str = "") -> None:
+        session = await self._session()
+        row = await session.get(BackfillJobRow, job_id)
+        if row is None:
+            return
+        row.status = status
+        row.error = error
+        row.updated_at = datetime.utcnow()
+        await session.commit()
+
+
+class SyncCursorRepository(BaseRepository):
+    """Per-(participant, metric) high-water marks of incremental syncs."""
+
+    async def get_all(self, participant_id: str) -> dict[MetricType, datetime]:
+        session = await self._session()
+        stmt = select(SyncCursorRow).where(SyncCursorRow.participant_id == participant_id)
+        rows = (await session.execute(stmt)).scalars().all()
+        return {MetricType(row.metric_type): row.last_timestamp for row in rows}
+
+    async def advance(self, participant_id: str, readings: Sequence[SensorReading]) -> int:
+        """Move each metric's cursor to its newest reading in *readings*.
+
+        Cursors never move backwards.  Returns the number of cursors moved.
+        """
+        newest: dict[str, datetime] = {}
+        for r in readings:
+            if r.participant_id != participant_id:
+                continue
+            ts = r.timestamp
+            if ts.tzinfo is not None:  # stored as naive UTC, as UTCDateTime does
+                ts = ts.astimezone(UTC).replace(tzinfo=None)
+            if r.metric_type.value not in newest or ts > newest[r.metric_type.value]:
+                newest[r.metric_type.value] = ts
+        if not newest:
+            return 0
+
+        session = await self._session()
+        moved = 0
+        for metric, ts in newest.items():
+            row = await session.get(SyncCursorRow, (participant_id, metric))
+            if row is None:
+                session.add(SyncCursorRow(
+                    participant_id=participant_id, metric_type=metric, last_timestamp=ts
+                ))
+            elif ts > row.last_timestamp:
+                row.last_timestamp = ts
+                row.updated_at = datetime.utcnow()
+            else:
+                continue
+            moved += 1
+        await session.commit()
+        return moved
+
+    async def delete(self, participant_id: str) -> int:
+        from sqlalchemy import delete as sa_delete
+
+        session = await self._session()
+        result = await session.execute(
+            sa_delete(SyncCursorRow).where(SyncCursorRow.participant_id == participant_id)
+        )
+        await session.commit()
+        return result.rowcount or 0
+
+
 # ── Participant & OAuth token repositories ────────────────────
 
 
@@ -520,7 +911,7 @@ class TokenRepository(BaseRepository):
         scopes: str = "",
     ) -> None:
         session = await self._session()
-        existing = await self.get(participant_id, provider)
+        existing = await self._get(session, participant_id, provider)
         if existing is not None:
             existing.access_token = access_token
             existing.refresh_token = refresh_token
@@ -540,7 +931,13 @@ class TokenRepository(BaseRepository):
         await session.commit()
 
     async def get(self, participant_id: str, provider: str = "fitbit") -> OAuthTokenRow | None:
-        session = await self._session()
+        return await self._get(await self._session(), participant_id, provider)
+
+    @staticmethod
+    async def _get(
+        session: AsyncSession, participant_id: str, provider: str
+    ) -> OAuthTokenRow | None:
+        # Look up on the caller's session so updates to the row are committed.
         stmt = select(OAuthTokenRow).where(
             OAuthTokenRow.participant_id == participant_id,
             OAuthTokenRow.provider == provider,
@@ -550,7 +947,7 @@ class TokenRepository(BaseRepository):
 
     async def delete(self, participant_id: str, provider: str = "fitbit") -> bool:
         session = await self._session()
-        row = await self.get(participant_id, provider)
+        row = await self._get(session, participant_id, provider)
         if row is None:
             return False
         await session.delete(row)
@@ -0,0 +1,321 @@
+"""Cold-storage tier: old sensor readings compacted into Parquet files.
+
+Raw minute-level readings are only ever appended to ``sensor_readings``.
+:class:`ColdStorageTiering` periodically moves every complete UTC month
+older than ``cold_storage_after_days`` out of SQL into one Parquet file per
+participant, metric and month::
+
+    <cold_storage_dir>/participant_id=P001/metric_type=heart_rate/2026-01.parquet
+
+and deletes the moved rows from the database.  :class:`ColdStore` reads the
+files back; :meth:`ReadingRepository.get_range` unions those cold slices
+with the hot SQL rows, so callers do not need to know where a reading lives.
+
+Requires the optional ``pyarrow`` dependency (``pip install -e ".[parquet]"``);
+without it the tier is simply disabled.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import shutil
+from collections.abc import Mapping, Sequence
+from datetime import UTC, date, datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+from urllib.parse import quote
+
+import structlog
+from sqlalchemy import delete, func, select
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None  # type: ignore[assignment]
+    pq = None  # type: ignore[assignment]
+
+from wearable_agent.config import get_settings
+from wearable_agent.storage.database import SensorReadingRow, get_session_factory
+from wearable_agent.storage.partitions import add_months, month_start
+
+logger = structlog.get_logger(__name__)
+
+# Columns kept in the Parquet files (created_at is not preserved).
+COLD_COLUMNS: tuple[str, ...] = (
+    "id",
+    "participant_id",
+    "device_type",
+    "metric_type",
+    "value",
+    "unit",
+    "timestamp",
+    "metadata_json",
+    "source",
+)
+
+_SCHEMA = (
+    pa.schema([
+        ("id", pa.string()),
+        ("participant_id", pa.string()),
+        ("device_type", pa.string()),
+        ("metric_type", pa.string()),
+        ("value", pa.float64()),
+        ("unit", pa.string()),
+        ("timestamp", pa.timestamp("us")),  # naive UTC, like the ORM rows
+        ("metadata_json", pa.string()),
+        ("source", pa.string()),
+    ])
+    if pa is not None
+    else None
+)
+
+_DELETE_CHUNK = 500
+
+
+class ColdStore:
+    """Month-partitioned Parquet files under *root*."""
+
+    def __init__(self, root: str | Path) -> None:
+        if pq is None:
+            raise RuntimeError("Cold storage requires pyarrow: pip install -e '.[parquet]'")
+        self.root = Path(root)
+
+    # ── Layout ────────────────────────────────────────────────
+
+    def _metric_dir(self, participant_id: str, metric_type: str) -> Path:
+        return (
+            self.root
+            / f"participant_id={quote(participant_id, safe='')}"
+            / f"metric_type={quote(metric_type, safe='')}"
+        )
+
+    def month_path(self, participant_id: str, metric_type: str, month: date) -> Path:
+        return self._metric_dir(participant_id, metric_type) / f"{month:%Y-%m}.parquet"
+
+    def months(self, participant_id: str, metric_type: str) -> list[date]:
+        """Months that have a cold file for this participant / metric."""
+        directory = self._metric_dir(participant_id, metric_type)
+        if not directory.is_dir():
+            return []
+        months = []
+        for path in directory.glob("*.parquet"):
+            try:
+                months.append(datetime.strptime(path.stem, "%Y-%m").date())
+            except ValueError:
+                continue
+        return sorted(months)
+
+    # ── Write ─────────────────────────────────────────────────
+
+    def write_month(
+        self,
+        participant_id: str,
+        metric_type: str,
+        month: date,
+        rows: Sequence[Mapping[str, Any]],
+    ) -> int:
+        """Write *rows* (dicts keyed by :data:`COLD_COLUMNS`) into the month's file.
+
+        Rows are merged with an existing file (later duplicates of an id win),
+        sorted by timestamp and written atomically.  Returns the file's row count.
+        """
+        path = self.month_path(participant_id, metric_type, month)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        table = pa.Table.from_pylist(
+            [{c: r[c] for c in COLD_COLUMNS} for r in rows], schema=_SCHEMA
+        )
+
+        if path.exists():
+            merged = pa.concat_tables([pq.read_table(path, schema=_SCHEMA), table]).to_pandas()
+            merged = merged.drop_duplicates("id", keep="last")
+            table = pa.Table.from_pandas(merged, schema=_SCHEMA, preserve_index=False)
+        table = table.sort_by("timestamp")
+
+        tmp = path.with_suffix(".parquet.tmp")
+        pq.write_table(table, tmp, compression="zstd")
+        os.replace(tmp, path)
+        return table.num_rows
+
+    def delete_participant(self, participant_id: str) -> None:
+        """Remove every cold file for *participant_id*."""
+        directory = self.root / f"participant_id={quote(participant_id, safe='')}"
+        shutil.rmtree(directory, ignore_errors=True)
+
+    # ── Read ──────────────────────────────────────────────────
+
+    def read_range(
+        self,
+        participant_id: str,
+        metric_type: str,
+        start: datetime,
+        end: datetime,
+    ) -> list[SensorReadingRow]:
+        """Cold readings with ``start <= timestamp <= end``, oldest first.
+
+        Returned rows are transient :class:`SensorReadingRow` objects (not
+        attached to any session).
+        """
+        first, last = month_start(start), month_start(end)
+        paths = [
+            self.month_path(participant_id, metric_type, m)
+            for m in self.months(participant_id, metric_type)
+            if first <= m <= last
+        ]
+        if not paths:
+            return []
+        filters = [("timestamp", ">=", start), ("timestamp", "<=", end)]
+        tables = [pq.read_table(p, schema=_SCHEMA, filters=filters) for p in paths]
+        return [SensorReadingRow(**r) for r in pa.concat_tables(tables).to_pylist()]
+
+
+@lru_cache
+def _store_for(root: str) -> ColdStore:
+    return ColdStore(root)
+
+
+def get_cold_store() -> ColdStore | None:
+    """The configured :class:`ColdStore`, or ``None`` when pyarrow is missing."""
+    if pq is None:
+        return None
+    return _store_for(get_settings().cold_storage_dir)
+
+
+# ── Compaction job ────────────────────────────────────────────
+
+class ColdStorageTiering:
+    """Moves complete months older than the configured age into Parquet.
+
+    Integration::
+
+        tiering = ColdStorageTiering()
+        await tiering.start()   # or: await tiering.compact()
+        ...
+        await tiering.stop()
+    """
+
+    def __init__(
+        self,
+        store: ColdStore | None = None,
+        *,
+        after_days: int | None = None,
+        interval_hours: float | None = None,
+        session_factory: Any | None = None,
+    ) -> None:
+        settings = get_settings()
+        self._store = store or ColdStore(settings.cold_storage_dir)
+        self._after = timedelta(
+            days=settings.cold_storage_after_days if after_days is None else after_days
+        )
+        self._interval = interval_hours or settings.cold_storage_interval_hours
+        self._session_factory = session_factory
+        self._task: asyncio.Task | None = None
+        self._stats: dict[str, Any] = {
+            "last_run": None,
+            "last_cutoff": None,
+            "months_compacted": 0,
+            "rows_compacted": 0,
+            "errors": 0,
+        }
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        return dict(self._stats)
+
+    def cutoff(self, now: datetime | None = None) -> datetime:
+        """Start of the oldest month that is *not* compacted yet."""
+        now = now or datetime.now(UTC).replace(tzinfo=None)
+        return datetime.combine(month_start(now - self._after), datetime.min.time())
+
+    async def compact(self, now: datetime | None = None) -> dict[str, int]:
+        """Compact every eligible (participant, metric, month) slice once."""
+        factory = self._session_factory or get_session_factory()
+        cutoff = self.cutoff(now)
+        months = rows_moved = 0
+
+        async with factory() as session:
+            pairs = (await session.execute(
+                select(SensorReadingRow.participant_id, SensorReadingRow.metric_type)
+                .where(SensorReadingRow.timestamp < cutoff)
+                .distinct()
+            )).all()
+
+            for participant_id, metric_type in pairs:
+                oldest = (await session.execute(
+                    select(func.min(SensorReadingRow.timestamp)).where(
+                        SensorReadingRow.participant_id == participant_id,
+                        SensorReadingRow.metric_type == metric_type,
+                    )
+                )).scalar()
+                month = month_start(oldest)
+                while month < cutoff.date():
+                    moved = await self._compact_month(session, participant_id, metric_type, month)
+                    if moved:
+                        months += 1
+                        rows_moved += moved
+                    month = add_months(month, 1)
+
+        self._stats.update(
+            last_run=datetime.now(UTC).isoformat(),
+            last_cutoff=cutoff.isoformat(),
+            months_compacted=self._stats["months_compacted"] + months,
+            rows_compacted=self._stats["rows_compacted"] + rows_moved,
+        )
+        logger.info("tiering.compacted", cutoff=cutoff.isoformat(), months=months, rows=rows_moved)
+        return {"months": months, "rows": rows_moved}
+
+    async def _compact_month(
+        self, session: Any, participant_id: str, metric_type: str, month: date
+    ) -> int:
+        lower = datetime.combine(month, datetime.min.time())
+        upper = datetime.combine(add_months(month, 1), datetime.min.time())
+        in_month = (
+            SensorReadingRow.participant_id == participant_id,
+            SensorReadingRow.metric_type == metric_type,
+            SensorReadingRow.timestamp >= lower,
+            SensorReadingRow.timestamp < upper,
+        )
+        columns = [getattr(SensorReadingRow, c) for c in COLD_COLUMNS]
+        rows = [r._asdict() for r in (await session.execute(select(*columns).where(*in_month)))]
+        if not rows:
+            return 0
+
+        # Parquet first, then delete exactly the rows that were written — rows
+        # inserted meanwhile stay hot until the next run.
+        await asyncio.to_thread(self._store.write_month, participant_id, metric_type, month, rows)
+        ids = [r["id"] for r in rows]
+        for i in range(0, len(ids), _DELETE_CHUNK):
+            await session.execute(
+                delete(SensorReadingRow).where(
+                    *in_month, SensorReadingRow.id.in_(ids[i : i + _DELETE_CHUNK])
+                )
+            )
+        await session.commit()
+        return len(rows)
+
+    # ── Background loop ───────────────────────────────────────
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run_loop())
+            logger.info("tiering.started", after_days=self._after.days, root=str(self._store.root))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run_loop(self) -> None:
+        while True:
+            try:
+                await self.compact()
+            except Exception:
+                self._stats["errors"] += 1
+                logger.exception("tiering.compaction_error")
+            await asyncio.sleep(self._interval * 3600)
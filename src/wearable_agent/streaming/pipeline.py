@@ -3,7 +3,11 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Callable, Awaitable
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from enum import Enum
+from typing import Any
 
 import structlog
 
@@ -11,6 +15,173 @@ from wearable_agent.models import SensorReading
 
 logger = structlog.get_logger(__name__)
 
+# Longest window :meth:`_ConsumerWorker.throughput` can report over
+_THROUGHPUT_HORIZON = 60
+
+
+class OverflowPolicy(str, Enum):
+    """What a consumer queue does when it is full.
+
+    * ``block`` — the dispatcher waits for room (lossless, applies
+      back-pressure to ingestion; use for persistence).
+    * ``drop_oldest`` — evict the oldest queued item to make room
+      (use for live views that only care about recent data).
+    * ``sample`` — while full, admit only every *n*-th item (evicting the
+      oldest), drop the rest; keeps a thinned-out but evenly spread feed.
+    """
+
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    SAMPLE = "sample"
+
+
+class _ConsumerWorker:
+    """A registered consumer with its own bounded queue, worker task, and counters.
+
+    Per-reading consumers queue individual readings; batch consumers queue
+    whole micro-batches.  Counters are always expressed in readings.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[Any], Awaitable[None]],
+        *,
+        batched: bool,
+        maxsize: int,
+        overflow: OverflowPolicy,
+        sample_every: int,
+    ) -> None:
+        self.fn = fn
+        self.name = getattr(fn, "__qualname__", repr(fn))
+        self.batched = batched
+        self.overflow = overflow
+        self.sample_every = max(1, sample_every)
+        self.queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=max(1, maxsize))
+        # Monotonic enqueue time of every queued item, oldest first
+        self._enqueued_at: deque[float] = deque()
+        self.task: asyncio.Task[None] | None = None
+
+        self.enqueued = 0
+        self.processed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.pending_readings = 0
+        self.last_latency_ms: float | None = None
+        self._overflow_seen = 0
+        # Rolling throughput: [monotonic second, readings processed in it],
+        # one bucket per second, evicted once older than the horizon
+        self._recent: deque[list[int]] = deque()
+
+    @staticmethod
+    def _size(item: Any) -> int:
+        return len(item) if isinstance(item, list) else 1
+
+    async def offer(self, item: Any) -> None:
+        """Enqueue *item* according to the overflow policy."""
+        size = self._size(item)
+        enqueued_at = time.monotonic()
+
+        if self.overflow is OverflowPolicy.BLOCK or not self.queue.full():
+            await self.queue.put(item)
+        elif self.overflow is OverflowPolicy.SAMPLE:
+            self._overflow_seen += 1
+            if self._overflow_seen % self.sample_every != 0:
+                self.dropped += size
+                return
+            self._evict_oldest()
+            self.queue.put_nowait(item)
+        else:  # DROP_OLDEST
+            self._evict_oldest()
+            self.queue.put_nowait(item)
+
+        self._enqueued_at.append(enqueued_at)
+        self.enqueued += size
+        self.pending_readings += size
+
+    def _evict_oldest(self) -> None:
+        try:
+            old = self.queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        self._enqueued_at.popleft()
+        self.queue.task_done()
+        size = self._size(old)
+        self.dropped += size
+        self.pending_readings -= size
+
+    async def run(self) -> None:
+        """Worker loop: process queued items until cancelled."""
+        while True:
+            item = await self.queue.get()
+            enqueued_at = self._enqueued_at.popleft()
+            size = self._size(item)
+            try:
+                await self.fn(item)
+            except Exception as exc:
+                self.errors += 1
+                logger.error(
+                    "stream_pipeline.consumer_error",
+                    consumer=self.name,
+                    batch_size=size if self.batched else None,
+                    error=str(exc),
+                )
+            finally:
+                now = time.monotonic()
+                self.processed += size
+                self.pending_readings -= size
+                self.last_latency_ms = round((now - enqueued_at) * 1000, 1)
+                self._record(now, size)
+                self.queue.task_done()
+
+    def _record(self, now: float, size: int) -> None:
+        second = int(now)
+        if self._recent and self._recent[-1][0] == second:
+            self._recent[-1][1] += size
+        else:
+            self._recent.append([second, size])
+        while self._recent[0][0] <= second - _THROUGHPUT_HORIZON:
+            self._recent.popleft()
+
+    def lag_seconds(self) -> float:
+        """Age of the oldest item still waiting in the queue."""
+        if not self._enqueued_at:
+            return 0.0
+        return time.monotonic() - self._enqueued_at[0]
+
+    def drop_pending(self) -> int:
+        """Count everything still queued as dropped (shutdown); returns readings."""
+        pending = self.pending_readings
+        self.dropped += pending
+        self.pending_readings = 0
+        return pending
+
+    def throughput(self, window: float = 60.0) -> float:
+        """Readings processed per second over the last *window* seconds.
+
+        Counted in whole-second buckets; *window* is capped at the 60 s
+        that are kept.
+        """
+        window = min(window, _THROUGHPUT_HORIZON)
+        cutoff = time.monotonic() - window
+        return sum(n for t, n in self._recent if t > cutoff) / window
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "batched": self.batched,
+            "overflow": self.overflow.value,
+            "queue_size": self.queue.qsize(),
+            "queue_maxsize": self.queue.maxsize,
+            "pending_readings": self.pending_readings,
+            "lag_seconds": round(self.lag_seconds(), 3),
+            "last_latency_ms": self.last_latency_ms,
+            "enqueued": self.enqueued,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "throughput_per_sec": round(self.throughput(), 2),
+        }
+
 
 class StreamPipeline:
     """In-process async pipeline that buffers sensor readings, persists them,
@@ -18,18 +189,96 @@ class StreamPipeline:
 
     The pipeline decouples producers (collectors) from consumers (monitors,
     storage) using an :class:`asyncio.Queue`.
+
+    The dispatch loop works in micro-batches: it drains up to
+    ``batch_size`` readings, or whatever arrived within
+    ``batch_timeout_ms`` of the first one, and fans the batch out to the
+    consumers.  Every consumer has its own bounded queue and worker task,
+    so a slow consumer (e.g. a WebSocket broadcast) only ever delays
+    itself — unless it is registered with the ``block`` overflow policy.
+
+    :meth:`stop` hands out what was already published and gives the
+    ``block`` consumers up to ``drain_timeout`` seconds to work off their
+    queues before the workers are cancelled.
     """
 
-    def __init__(self, maxsize: int = 10_000) -> None:
+    def __init__(
+        self,
+        maxsize: int = 10_000,
+        batch_size: int = 500,
+        batch_timeout_ms: float = 50.0,
+        consumer_maxsize: int = 1_000,
+        drain_timeout: float = 10.0,
+    ) -> None:
         self._queue: asyncio.Queue[SensorReading] = asyncio.Queue(maxsize=maxsize)
-        self._consumers: list[Callable[[SensorReading], Awaitable[None]]] = []
+        self._workers: list[_ConsumerWorker] = []
+        self._batch_size = max(1, batch_size)
+        self._batch_timeout = max(0.0, batch_timeout_ms) / 1000
+        self._consumer_maxsize = consumer_maxsize
+        self._drain_timeout = max(0.0, drain_timeout)
         self._running = False
+        self._dispatcher: asyncio.Task[None] | None = None
+        self._idle = False
+        self._processed_total = 0
+        self._batches_total = 0
 
     # ── Configuration ─────────────────────────────────────────
 
-    def add_consumer(self, fn: Callable[[SensorReading], Awaitable[None]]) -> None:
-        """Register an async callback that receives every reading."""
-        self._consumers.append(fn)
+    def add_consumer(
+        self,
+        fn: Callable[[SensorReading], Awaitable[None]],
+        *,
+        maxsize: int | None = None,
+        overflow: OverflowPolicy | str = OverflowPolicy.BLOCK,
+        sample_every: int = 10,
+    ) -> None:
+        """Register an async callback that receives every reading.
+
+        Parameters
+        ----------
+        maxsize:
+            Capacity of the consumer's queue, in readings.
+        overflow:
+            :class:`OverflowPolicy` applied when the queue is full.
+        sample_every:
+            For the ``sample`` policy, admit one in this many readings
+            while the queue is full.
+        """
+        self._add_worker(fn, False, maxsize, overflow, sample_every)
+
+    def add_batch_consumer(
+        self,
+        fn: Callable[[list[SensorReading]], Awaitable[None]],
+        *,
+        maxsize: int | None = None,
+        overflow: OverflowPolicy | str = OverflowPolicy.BLOCK,
+        sample_every: int = 10,
+    ) -> None:
+        """Register an async callback that receives readings in micro-batches.
+
+        ``maxsize`` here counts batches, not readings.  See
+        :meth:`add_consumer` for the other parameters.
+        """
+        self._add_worker(fn, True, maxsize, overflow, sample_every)
+
+    def _add_worker(
+        self,
+        fn: Callable[[Any], Awaitable[None]],
+        batched: bool,
+        maxsize: int | None,
+        overflow: OverflowPolicy | str,
+        sample_every: int,
+    ) -> None:
+        worker = _ConsumerWorker(
+            fn,
+            batched=batched,
+            maxsize=maxsize or self._consumer_maxsize,
+            overflow=OverflowPolicy(overflow),
+            sample_every=sample_every,
+        )
+        self._workers.append(worker)
+        if self._running:
+            worker.task = asyncio.create_task(worker.run())
 
     # ── Producer side ─────────────────────────────────────────
 
@@ -41,52 +290,157 @@ class StreamPipeline:
         for r in readings:
             await self._queue.put(r)
 
-    # ── Consumer loop ─────────────────────────────────────────
+    # ── Dispatch loop ─────────────────────────────────────────
 
-    async def start(self) -> None:
-        """Start the consumer loop (run as a background task)."""
-        import time
+    async def _next_batch(self) -> list[SensorReading]:
+        """Wait for one reading, then drain until the batch is full or the
+        batch window closes.
+
+        Raises :class:`TimeoutError` if nothing arrives within a second, so
+        the caller can re-check :attr:`_running`.
+        """
+        self._idle = True
+        try:
+            first = await asyncio.wait_for(self._queue.get(), timeout=1.0)
+        finally:
+            self._idle = False
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._batch_timeout
+
+        while len(batch) < self._batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except TimeoutError:
+                break
+        return batch
+
+    async def _dispatch(self, batch: list[SensorReading]) -> None:
+        """Fan *batch* out to every consumer queue."""
+        for worker in self._workers:
+            if worker.batched:
+                await worker.offer(batch)
+            else:
+                for reading in batch:
+                    await worker.offer(reading)
 
+    async def start(self) -> None:
+        """Start the dispatch loop and consumer workers (run as a background task)."""
         self._running = True
+        self._dispatcher = asyncio.current_task()
         self._processed_total = 0
-        logger.info("stream_pipeline.started", consumers=len(self._consumers))
+        self._batches_total = 0
+        for worker in self._workers:
+            if worker.task is None or worker.task.done():
+                worker.task = asyncio.create_task(worker.run())
+        logger.info(
+            "stream_pipeline.started",
+            consumers=len(self._workers),
+            batch_size=self._batch_size,
+        )
 
         last_stats_time = time.monotonic()
 
-        while self._running:
-            try:
-                reading = await asyncio.wait_for(self._queue.get(), timeout=1.0)
-            except asyncio.TimeoutError:
-                continue
-
-            for consumer in self._consumers:
+        try:
+            while self._running:
                 try:
-                    await consumer(reading)
-                except Exception as exc:
-                    logger.error(
-                        "stream_pipeline.consumer_error",
-                        consumer=consumer.__qualname__,
-                        error=str(exc),
+                    batch = await self._next_batch()
+                except TimeoutError:
+                    continue
+
+                await self._dispatch_counted(batch)
+
+                # Periodic stats every 60 seconds
+                now = time.monotonic()
+                if now - last_stats_time >= 60:
+                    logger.info(
+                        "stream_pipeline.stats",
+                        processed_total=self._processed_total,
+                        batches_total=self._batches_total,
+                        queue_pending=self._queue.qsize(),
+                        consumers=self.consumer_stats(),
                     )
+                    last_stats_time = now
+        finally:
+            self._dispatcher = None
+            if self._running:
+                # Cancelled without stop(): nothing to drain into
+                self._running = False
+                self._cancel_workers()
 
-            self._processed_total += 1
+    async def _dispatch_counted(self, batch: list[SensorReading]) -> None:
+        await self._dispatch(batch)
+        self._processed_total += len(batch)
+        self._batches_total += 1
+        for _ in batch:
             self._queue.task_done()
 
-            # Periodic stats every 60 seconds
-            now = time.monotonic()
-            if now - last_stats_time >= 60:
-                logger.info(
-                    "stream_pipeline.stats",
-                    processed_total=self._processed_total,
-                    queue_pending=self._queue.qsize(),
-                )
-                last_stats_time = now
+    def _cancel_workers(self) -> None:
+        for worker in self._workers:
+            if worker.task is not None:
+                worker.task.cancel()
+                worker.task = None
 
-    async def stop(self) -> None:
-        """Gracefully stop the consumer loop."""
+    async def _drain(self, lossless: list[_ConsumerWorker]) -> None:
+        """Dispatch what is still published, then wait for *lossless* queues."""
+        while not self._queue.empty():
+            size = min(self._batch_size, self._queue.qsize())
+            await self._dispatch_counted([self._queue.get_nowait() for _ in range(size)])
+        await asyncio.gather(*(w.queue.join() for w in lossless))
+
+    async def stop(self, timeout: float | None = None) -> None:
+        """Gracefully stop the dispatch loop and consumer workers.
+
+        Readings already published are still dispatched, and ``block``
+        consumers get up to *timeout* seconds (default ``drain_timeout``)
+        to process their queues.  Whatever is left after that is dropped
+        and logged; lossy consumers are not waited for.
+        """
         self._running = False
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (self._drain_timeout if timeout is None else timeout)
+
+        dispatcher = self._dispatcher
+        if dispatcher is not None and dispatcher is not asyncio.current_task():
+            if self._idle:
+                # Waiting for the first reading of a batch: nothing in hand
+                dispatcher.cancel()
+            await asyncio.wait({dispatcher}, timeout=max(0.0, deadline - loop.time()))
+            if not dispatcher.done():
+                # Stuck offering to a full ``block`` queue
+                dispatcher.cancel()
+
+        lossless = [
+            w
+            for w in self._workers
+            if w.overflow is OverflowPolicy.BLOCK and w.task is not None and not w.task.done()
+        ]
+        try:
+            await asyncio.wait_for(self._drain(lossless), max(0.0, deadline - loop.time()))
+        except TimeoutError:
+            dropped = {w.name: w.drop_pending() for w in lossless if w.pending_readings}
+            logger.warning(
+                "stream_pipeline.drain_timeout",
+                dropped_readings=sum(dropped.values()) + self._queue.qsize(),
+                undispatched=self._queue.qsize(),
+                consumers=dropped,
+            )
+
+        self._cancel_workers()
         logger.info("stream_pipeline.stopped")
 
     @property
     def pending(self) -> int:
         return self._queue.qsize()
+
+    def consumer_stats(self) -> list[dict[str, Any]]:
+        """Per-consumer queue depth, lag, drop and throughput counters."""
+        return [w.snapshot() for w in self._workers]
@@ -29,6 +29,7 @@ from wearable_agent.affect.models import (
     StressLevel,
     ValenceLevel,
 )
+from wearable_agent.storage.database import SensorReadingRow
 
 
 # ── Activity context classification ──────────────────────────
@@ -98,6 +99,28 @@ class TestFeatureExtraction:
         assert fw.quality.hr_coverage_pct == 0.0
         assert fw.quality.sufficient_baseline is False
 
+    def test_daily_totals_are_not_summed_into_windows(self):
+        start = datetime(2026, 1, 5)
+
+        def steps(minute: int, value: float, meta: dict) -> SensorReadingRow:
+            return SensorReadingRow(
+                id=f"s{minute}-{value}", participant_id="P001", device_type="fitbit",
+                metric_type="steps", value=value, unit="steps",
+                timestamp=start + timedelta(minutes=minute), metadata_json=json.dumps(meta),
+            )
+
+        fw = extract_feature_window(
+            participant_id="P001",
+            readings=[
+                steps(0, 8123, {"source": "live", "type": "daily"}),
+                steps(0, 3, {"source": "live"}),
+                steps(1, 4, {"source": "live"}),
+            ],
+            window_start=start,
+            window_end=start + timedelta(minutes=5),
+        )
+        assert fw.steps_in_window == 7
+
 
 # ── Baseline EWMA update ─────────────────────────────────────
 
@@ -1,10 +1,21 @@
 """Tests for the FastAPI server endpoints."""
 
+import json
+from datetime import datetime
+
 import pytest
 from asgi_lifespan import LifespanManager
 from httpx import ASGITransport, AsyncClient
 
+from wearable_agent.api import auth
+from wearable_agent.api.routes import sync, webhooks
 from wearable_agent.api.server import app
+from wearable_agent.collectors.fitbit_subscriptions import SIGNATURE_HEADER, sign
+from wearable_agent.collectors.fitbit_tokens import FitbitToken, ReauthorizationRequired
+from wearable_agent.config import Settings
+from wearable_agent.models import MetricType
+from wearable_agent.storage.database import get_session_factory
+from wearable_agent.storage.repository import BackfillJobRepository
 
 
 @pytest.fixture
@@ -62,3 +73,189 @@ async def test_rules_crud(client: AsyncClient):
     # Delete it
     resp = await client.delete(f"/rules/{rule_id}")
     assert resp.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_replay_session_admin(client: AsyncClient):
+    resp = await client.get("/admin/api/replay")
+    assert resp.status_code == 200
+    assert resp.json()["sessions"] == []
+
+    resp = await client.get("/lifesnaps/replay/nope")
+    assert resp.status_code == 404
+    resp = await client.post("/lifesnaps/replay", json={"participants": []})
+    assert resp.status_code == 422
+
+
+class _EnqueueRecorder:
+    def __init__(self):
+        self.calls: list[tuple[str, set[MetricType]]] = []
+        self.forgotten: list[str] = []
+
+    def enqueue(self, participant_id, metrics):
+        self.calls.append((participant_id, set(metrics)))
+
+    def forget(self, participant_id):
+        self.forgotten.append(participant_id)
+
+
+@pytest.mark.asyncio
+async def test_fitbit_webhook(client: AsyncClient, monkeypatch):
+    settings = Settings(fitbit_client_secret="s3cret", fitbit_webhook_verification_code="abc123")
+    monkeypatch.setattr(webhooks, "get_settings", lambda: settings)
+    recorder = _EnqueueRecorder()
+    monkeypatch.setattr(webhooks, "_scheduler_service", recorder)
+
+    assert (await client.get("/fitbit/webhook", params={"verify": "abc123"})).status_code == 204
+    assert (await client.get("/fitbit/webhook", params={"verify": "nope"})).status_code == 404
+
+    body = json.dumps([
+        {"collectionType": "sleep", "date": "2026-01-05", "subscriptionId": "P001"},
+        {"collectionType": "activities", "date": "2026-01-05", "subscriptionId": "P002"},
+        {"collectionType": "foods", "date": "2026-01-05", "subscriptionId": "P002"},
+    ]).encode()
+    resp = await client.post("/fitbit/webhook", content=body,
+                             headers={SIGNATURE_HEADER: sign(body, "s3cret")})
+    assert resp.status_code == 204
+    assert recorder.calls[0] == ("P001", {MetricType.SLEEP})
+    assert recorder.calls[1][0] == "P002" and MetricType.STEPS in recorder.calls[1][1]
+
+    # Tampered body / wrong key → rejected, nothing enqueued
+    resp = await client.post("/fitbit/webhook", content=body + b" ",
+                             headers={SIGNATURE_HEADER: sign(body, "s3cret")})
+    assert resp.status_code == 404
+    resp = await client.post("/fitbit/webhook", content=body,
+                             headers={SIGNATURE_HEADER: sign(body, "other")})
+    assert resp.status_code == 404
+    assert len(recorder.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_fitbit_webhook_revocation(client: AsyncClient, monkeypatch):
+    settings = Settings(fitbit_client_secret="s3cret")
+    monkeypatch.setattr(webhooks, "get_settings", lambda: settings)
+    recorder = _EnqueueRecorder()
+    monkeypatch.setattr(webhooks, "_scheduler_service", recorder)
+    revoked: list[str] = []
+
+    class _Revoker:
+        async def revoke(self, participant_id):
+            revoked.append(participant_id)
+            return True
+
+    monkeypatch.setattr(webhooks, "get_token_manager", _Revoker)
+
+    body = json.dumps([
+        {"collectionType": "sleep", "date": "2026-01-05", "subscriptionId": "P001"},
+        {"collectionType": "userRevokedAccess", "subscriptionId": "P001"},
+    ]).encode()
+    resp = await client.post("/fitbit/webhook", content=body,
+                             headers={SIGNATURE_HEADER: sign(body, "s3cret")})
+    assert resp.status_code == 204
+    assert revoked == ["P001"] and recorder.forgotten == ["P001"]
+    assert recorder.calls == []
+
+
+class _Tokens:
+    def __init__(self, token: FitbitToken | None):
+        self.token = token
+
+    async def get(self, participant_id):
+        return self.token
+
+
+@pytest.mark.asyncio
+async def test_failed_backfill_can_be_resumed(client: AsyncClient, monkeypatch):
+    launched: list[int] = []
+    monkeypatch.setattr(sync, "_launch_backfill", launched.append)
+    tokens = _Tokens(FitbitToken("access", "refresh"))
+    monkeypatch.setattr(sync, "get_token_manager", lambda: tokens)
+
+    resp = await client.post(
+        "/sync/P-resume/backfill", params={"start": "2026-01-05", "end": "2026-01-05"}
+    )
+    assert resp.status_code == 202
+    job_id = resp.json()["id"]
+    async with get_session_factory()() as session:
+        await BackfillJobRepository(session).set_status(job_id, "failed", "HTTP 500")
+
+    resp = await client.post(f"/sync/P-resume/backfill/{job_id}/resume")
+    assert resp.status_code == 202
+    assert resp.json()["status"] == "pending" and resp.json()["error"] == ""
+    assert launched == [job_id, job_id]
+
+    assert (await client.post(f"/sync/P-other/backfill/{job_id}/resume")).status_code == 404
+    async with get_session_factory()() as session:
+        await BackfillJobRepository(session).set_status(job_id, "completed")
+    assert (await client.post(f"/sync/P-resume/backfill/{job_id}/resume")).status_code == 409
+
+    tokens.token = None
+    resp = await client.post(
+        "/sync/P-resume/backfill", params={"start": "2026-01-05", "end": "2026-01-05"}
+    )
+    assert resp.status_code == 404
+    assert launched == [job_id, job_id]
+
+
+class _Collector:
+    """Records how a route builds and authenticates its Fitbit collector."""
+
+    built: list[dict] = []
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+    async def authenticate(self, **credentials):
+        self.built.append({**self.kwargs, **credentials})
+
+    async def get_devices(self):
+        return [{"id": "D1"}]
+
+    async def close(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_devices_refresh_through_token_manager(client: AsyncClient, monkeypatch):
+    tokens = _Tokens(FitbitToken("access", "refresh"))
+    monkeypatch.setattr(sync, "get_token_manager", lambda: tokens)
+    monkeypatch.setattr(sync, "FitbitCollector", _Collector)
+    _Collector.built = []
+
+    resp = await client.get("/sync/devices/P-devices")
+    assert resp.status_code == 200 and resp.json()["devices"] == [{"id": "D1"}]
+    [built] = _Collector.built
+    assert built["token_manager"] is tokens and built["participant_id"] == "P-devices"
+
+    tokens.token = None
+    assert (await client.get("/sync/devices/P-devices")).status_code == 404
+
+
+class _Refresher:
+    def __init__(self, outcome: FitbitToken | Exception):
+        self.outcome = outcome
+        self.calls: list[tuple[str, bool]] = []
+
+    async def refresh(self, participant_id, *, force=False):
+        self.calls.append((participant_id, force))
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+
+@pytest.mark.asyncio
+async def test_manual_refresh_refreshes_once(client: AsyncClient, monkeypatch):
+    tokens = _Refresher(FitbitToken("new", "r2", datetime(2026, 1, 5)))
+    monkeypatch.setattr(auth, "get_token_manager", lambda: tokens)
+    resp = await client.post("/auth/fitbit/refresh/P-refresh")
+    assert resp.status_code == 200 and resp.json()["expires_at"] == "2026-01-05T00:00:00"
+    assert tokens.calls == [("P-refresh", True)]
+
+    for outcome, status in [
+        (ReauthorizationRequired("rejected"), 401),
+        (LookupError("no tokens"), 404),
+        (RuntimeError("no refresh token"), 400),
+        (OSError("network down"), 502),
+    ]:
+        tokens.outcome = outcome
+        assert (await client.post("/auth/fitbit/refresh/P-refresh")).status_code == status
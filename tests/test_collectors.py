@@ -1,9 +1,29 @@
 """Tests for data models and collector registry."""
 
+import asyncio
+import base64
+import hashlib
+import hmac
+import time
+from datetime import date, datetime, timedelta
+
+import httpx
 import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
+from wearable_agent.collectors import fitbit, fitbit_backfill
+from wearable_agent.collectors.fitbit import FitbitCollector, _RateLimiter, plan_range_requests
+from wearable_agent.collectors.fitbit_backfill import create_backfill
+from wearable_agent.collectors.fitbit_subscriptions import (
+    parse_notifications,
+    sign,
+    verify_signature,
+)
+from wearable_agent.collectors.fitbit_tokens import ReauthorizationRequired, TokenManager
 from wearable_agent.collectors.registry import available_devices, get_collector
 from wearable_agent.models import DeviceType, MetricType, SensorReading
+from wearable_agent.storage.database import Base
+from wearable_agent.storage.repository import BackfillJobRepository, TokenRepository
 
 
 class TestModels:
@@ -41,3 +61,483 @@ class TestCollectorRegistry:
     def test_unknown_device_raises(self):
         with pytest.raises(ValueError, match="No collector registered"):
             get_collector(DeviceType.GARMIN)
+
+
+def _day_series(key: str) -> dict:
+    return {key: [{"dateTime": "2026-01-05", "value": "10"}]}
+
+
+def _mock_client(handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url="https://api.fitbit.test", transport=httpx.MockTransport(handler)
+    )
+
+
+async def _fitbit_collector(handler, access_token: str = "old") -> FitbitCollector:
+    collector = FitbitCollector(client=_mock_client(handler))
+    await collector.authenticate(access_token=access_token, refresh_token="r1")
+    return collector
+
+
+class TestFitbitConcurrentFetch:
+    async def test_metrics_fetched_concurrently_in_order(self):
+        in_flight = peak = 0
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.1)
+            in_flight -= 1
+            kind = request.url.path.split("/")[5]
+            return httpx.Response(200, json=_day_series(f"activities-{kind}"))
+
+        collector = await _fitbit_collector(handler)
+        metrics = [MetricType.STEPS, MetricType.CALORIES, MetricType.DISTANCE, MetricType.FLOORS]
+        start = time.monotonic()
+        readings = await collector.fetch("P-concurrent", metrics, date="2026-01-05")
+        elapsed = time.monotonic() - start
+        await collector.close()
+
+        assert [r.metric_type for r in readings] == metrics
+        assert peak == len(metrics)
+        assert elapsed < 0.25  # ≈ one round trip, not four
+
+    async def test_concurrent_401s_refresh_once(self, monkeypatch):
+        refreshes = 0
+
+        async def fake_refresh(**_):
+            nonlocal refreshes
+            refreshes += 1
+            await asyncio.sleep(0.01)
+            return {"access_token": "new", "refresh_token": "r2"}
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await asyncio.sleep(0.01)
+            if request.headers["Authorization"] != "Bearer new":
+                return httpx.Response(401)
+            kind = request.url.path.split("/")[5]
+            return httpx.Response(200, json=_day_series(f"activities-{kind}"))
+
+        monkeypatch.setattr(fitbit, "refresh_fitbit_token", fake_refresh)
+        collector = await _fitbit_collector(handler)
+        readings = await collector.fetch(
+            "P-refresh", [MetricType.STEPS, MetricType.CALORIES, MetricType.FLOORS],
+            date="2026-01-05",
+        )
+        await collector.close()
+        assert len(readings) == 3
+        assert refreshes == 1
+
+    async def test_error_propagates(self):
+        async def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(500 if "calories" in request.url.path else 200,
+                                  json=_day_series("activities-steps"))
+
+        collector = await _fitbit_collector(handler)
+        with pytest.raises(httpx.HTTPStatusError):
+            await collector.fetch(
+                "P-error", [MetricType.STEPS, MetricType.CALORIES], date="2026-01-05"
+            )
+        await collector.close()
+
+
+class TestFitbitIncrementalFetch:
+    async def test_refetches_whole_days_from_cursor_day(self):
+        urls: list[str] = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            path = request.url.path
+            urls.append(path)
+            if "/heart/" in path:
+                return httpx.Response(200, json={
+                    "activities-heart": [
+                        {"dateTime": "2026-01-05", "value": {"restingHeartRate": 58}},
+                    ],
+                    "activities-heart-intraday": {"dataset": [
+                        {"time": "10:15:00", "value": 70}, {"time": "10:16:00", "value": 72},
+                    ]},
+                })
+            if "/steps/" in path:
+                return httpx.Response(200, json={
+                    "activities-steps": [{"dateTime": "2026-01-05", "value": "30"}],
+                    "activities-steps-intraday": {"dataset": [
+                        {"time": "00:00:00", "value": 10}, {"time": "00:01:00", "value": 20},
+                    ]},
+                })
+            return httpx.Response(200, json={"hrv": [
+                {"dateTime": "2026-01-04", "value": {"dailyRmssd": 40}},
+                {"dateTime": "2026-01-05", "value": {"dailyRmssd": 42}},
+            ]})
+
+        collector = await _fitbit_collector(handler)
+        cursors = {
+            MetricType.HEART_RATE: datetime(2026, 1, 5, 10, 15),
+            MetricType.HRV: datetime(2026, 1, 4),
+        }
+        readings = await collector.fetch_since(
+            "P-incremental", [MetricType.HEART_RATE, MetricType.STEPS, MetricType.HRV],
+            cursors, today=date(2026, 1, 5),
+        )
+        await collector.close()
+
+        assert urls == [
+            "/1/user/-/activities/heart/date/2026-01-05/1d/1min/time/00:00/23:59.json",
+            "/1/user/-/activities/steps/date/2026-01-05/1d/1min/time/00:00/23:59.json",
+            "/1/user/-/hrv/date/2026-01-04/2026-01-05.json",
+        ]
+        got = [(r.metric_type, r.timestamp, r.value, r.metadata.get("type")) for r in readings]
+        # Nothing is dropped at the cursor: minutes may still be revised.
+        assert got == [
+            (MetricType.HEART_RATE, datetime(2026, 1, 5, 10, 15), 70.0, None),
+            (MetricType.HEART_RATE, datetime(2026, 1, 5, 10, 16), 72.0, None),
+            (MetricType.HEART_RATE, datetime(2026, 1, 5), 58.0, "resting"),
+            (MetricType.STEPS, datetime(2026, 1, 5), 30.0, "daily"),
+            (MetricType.STEPS, datetime(2026, 1, 5, 0, 0), 10.0, None),
+            (MetricType.STEPS, datetime(2026, 1, 5, 0, 1), 20.0, None),
+            (MetricType.HRV, datetime(2026, 1, 4), 40.0, None),
+            (MetricType.HRV, datetime(2026, 1, 5), 42.0, None),
+        ]
+
+    def test_daily_total_and_midnight_minute_have_distinct_ids(self):
+        collector = FitbitCollector()
+        data = {
+            "activities-steps": [{"dateTime": "2026-01-05", "value": "8123"}],
+            "activities-steps-intraday": {"dataset": [{"time": "00:00:00", "value": 3}]},
+        }
+        daily, minute = collector._parse_intraday("P-ids", MetricType.STEPS, data, "2026-01-05")
+
+        assert daily.timestamp == minute.timestamp == datetime(2026, 1, 5)
+        assert daily.metadata["type"] == "daily" and "type" not in minute.metadata
+        assert daily.id != minute.id
+
+    async def test_catches_up_across_days(self):
+        urls: list[str] = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            urls.append(request.url.path)
+            return httpx.Response(200, json={})
+
+        collector = await _fitbit_collector(handler)
+        await collector.fetch_since(
+            "P-gap", [MetricType.STEPS], {MetricType.STEPS: datetime(2025, 12, 1, 8, 0)},
+            today=date(2026, 1, 5),
+        )
+        await collector.close()
+        # The cursor is older than the catch-up window: whole days from there.
+        assert urls == [
+            f"/1/user/-/activities/steps/date/2026-01-0{d}/1d/1min/time/00:00/23:59.json"
+            for d in (3, 4, 5)
+        ]
+
+
+class TestSharedFitbitPool:
+    async def test_collectors_borrow_one_client_with_per_request_tokens(self):
+        seen: list[str] = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request.headers["Authorization"])
+            return httpx.Response(200, json=_day_series("activities-steps"))
+
+        pool = _mock_client(handler)
+        for token in ("token-a", "token-b"):
+            collector = FitbitCollector(client=pool)
+            await collector.authenticate(access_token=token)
+            await collector.fetch(f"P-{token}", [MetricType.STEPS], date="2026-01-05")
+            await collector.close()
+
+        assert seen == ["Bearer token-a", "Bearer token-b"]
+        assert not pool.is_closed  # borrowed, not owned
+        assert "Authorization" not in pool.headers
+        await pool.aclose()
+
+    async def test_pool_limits_from_settings(self):
+        from wearable_agent.config import Settings
+
+        client = fitbit.build_fitbit_client(
+            Settings(fitbit_pool_max_connections=7, fitbit_pool_keepalive_expiry=600)
+        )
+        pool = client._transport._pool
+        assert (pool._max_connections, pool._keepalive_expiry) == (7, 600)
+        await client.aclose()
+
+    async def test_scheduler_owns_the_pool(self):
+        from wearable_agent.scheduler.service import SchedulerService
+
+        scheduler = SchedulerService()
+        client = scheduler.http_client
+        assert scheduler.http_client is client
+        await scheduler.stop()
+        assert client.is_closed
+
+
+class TestRateLimiter:
+    async def test_bucket_throttles_after_burst(self):
+        limiter = _RateLimiter(36_000, burst=2)  # refills 10 tokens/s
+        start = time.monotonic()
+        await asyncio.gather(*(limiter.acquire() for _ in range(4)))
+        # Two tokens in the bucket, the next two wait 0.1 s and 0.2 s.
+        assert 0.18 <= time.monotonic() - start < 0.3
+
+    async def test_server_window_is_a_hard_cap(self):
+        limiter = _RateLimiter(150)
+        limiter.update(httpx.Headers({
+            "fitbit-rate-limit-remaining": "1", "fitbit-rate-limit-reset": "3600",
+        }))
+        start = time.monotonic()
+        await limiter.acquire()  # the last request in the window
+        assert time.monotonic() - start < 0.01
+        limiter.exhaust(0.1)
+        await limiter.acquire()  # waits for the reset
+        assert time.monotonic() - start >= 0.1
+        assert limiter.remaining == limiter.limit - 1
+
+
+@pytest.fixture
+async def token_repo(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'tokens.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        yield TokenRepository(session)
+    await engine.dispose()
+
+
+class _Refresher:
+    def __init__(self):
+        self.calls: list[str] = []
+
+    async def __call__(self, refresh_token: str) -> dict:
+        self.calls.append(refresh_token)
+        await asyncio.sleep(0.01)
+        n = len(self.calls)
+        return {"access_token": f"a{n}", "refresh_token": f"r{n + 1}", "expires_in": 28800}
+
+
+async def _link(repo: TokenRepository, pid: str, expires_in_s: float) -> None:
+    expires_at = datetime.utcnow() + timedelta(seconds=expires_in_s)
+    await repo.upsert(pid, "a0", "r1", expires_at=expires_at)
+
+
+class TestTokenManager:
+    async def test_valid_token_served_from_cache(self, token_repo):
+        await _link(token_repo, "P1", 3600)
+        refresher = _Refresher()
+        tokens = TokenManager(token_repo, refresh_margin=600, refresher=refresher)
+        for _ in range(3):
+            assert (await tokens.get("P1")).access_token == "a0"
+        assert tokens.stats["db_loads"] == 1 and refresher.calls == []
+        assert await tokens.get("nobody") is None
+
+    async def test_concurrent_callers_refresh_once(self, token_repo):
+        await _link(token_repo, "P1", 60)  # inside the 10-minute margin
+        refresher = _Refresher()
+        tokens = TokenManager(token_repo, refresh_margin=600, refresher=refresher)
+        results = await asyncio.gather(*(tokens.get("P1") for _ in range(10)))
+        assert {t.access_token for t in results} == {"a1"}
+        assert refresher.calls == ["r1"]
+        row = await token_repo.get("P1")
+        assert (row.access_token, row.refresh_token) == ("a1", "r2")
+        assert row.expires_at > datetime.utcnow() + timedelta(hours=7)
+
+    async def test_stale_401_reuses_newer_token(self, token_repo):
+        await _link(token_repo, "P1", 3600)
+        refresher = _Refresher()
+        tokens = TokenManager(token_repo, refresh_margin=600, refresher=refresher)
+        first, second = await asyncio.gather(
+            tokens.refresh("P1", stale="a0"), tokens.refresh("P1", stale="a0")
+        )
+        assert first.access_token == second.access_token == "a1"
+        assert refresher.calls == ["r1"]
+
+    async def test_background_sweep_refreshes_before_expiry(self, token_repo):
+        await _link(token_repo, "due", 300)
+        await _link(token_repo, "fresh", 7200)
+        refresher = _Refresher()
+        tokens = TokenManager(token_repo, refresh_margin=600, check_interval=0.01,
+                              refresher=refresher)
+        tokens.start()
+        await asyncio.sleep(0.1)
+        await tokens.stop()
+        assert refresher.calls == ["r1"]
+        assert (await token_repo.get("due")).access_token == "a1"
+        assert (await token_repo.get("fresh")).access_token == "a0"
+
+    async def test_rejected_refresh_token_is_not_retried(self, token_repo):
+        await _link(token_repo, "P1", 60)
+        calls: list[str] = []
+
+        async def rejecting(refresh_token: str) -> dict:
+            calls.append(refresh_token)
+            request = httpx.Request("POST", "https://api.fitbit.com/oauth2/token")
+            response = httpx.Response(
+                400, request=request,
+                json={"errors": [{"errorType": "invalid_grant"}], "success": False},
+            )
+            raise httpx.HTTPStatusError("400", request=request, response=response)
+
+        tokens = TokenManager(token_repo, refresh_margin=600, refresher=rejecting)
+        await tokens.warm()
+        assert await tokens.refresh_due() == 0
+        assert await tokens.refresh_due() == 0
+        with pytest.raises(ReauthorizationRequired):
+            await tokens.get("P1")
+        assert calls == ["r1"] and tokens.needs_reauthorization("P1")
+
+        # Re-linking stores a new token and clears the mark
+        await tokens.store("P1", access_token="b0", refresh_token="s1", expires_in=60)
+        assert not tokens.needs_reauthorization("P1")
+        assert await tokens.refresh_due() == 0
+        assert calls == ["r1", "s1"]
+
+    async def test_revoke_deletes_stored_token(self, token_repo):
+        await _link(token_repo, "P1", 3600)
+        tokens = TokenManager(token_repo, refresh_margin=600, refresher=_Refresher())
+        assert (await tokens.get("P1")).access_token == "a0"
+        assert await tokens.revoke("P1")
+        assert await token_repo.get("P1") is None
+        assert await tokens.get("P1") is None
+        assert not await tokens.revoke("P1")
+
+    async def test_collector_401_refreshes_through_manager(self, token_repo):
+        await _link(token_repo, "P1", 3600)
+        refresher = _Refresher()
+        tokens = TokenManager(token_repo, refresh_margin=600, refresher=refresher)
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            if request.headers["Authorization"] != "Bearer a1":
+                return httpx.Response(401)
+            kind = request.url.path.split("/")[5]
+            return httpx.Response(200, json=_day_series(f"activities-{kind}"))
+
+        token = await tokens.get("P1")
+        collector = FitbitCollector(client=_mock_client(handler), token_manager=tokens)
+        await collector.authenticate(access_token=token.access_token,
+                                     refresh_token=token.refresh_token, participant_id="P1")
+        readings = await collector.fetch(
+            "P1", [MetricType.STEPS, MetricType.CALORIES], date="2026-01-05"
+        )
+        await collector.close()
+        assert len(readings) == 2
+        assert refresher.calls == ["r1"]
+        assert (await tokens.get("P1")).access_token == "a1"
+
+
+class TestFitbitSubscriptions:
+    def test_signature_matches_fitbit_scheme(self):
+        body = b'[{"collectionType":"sleep","subscriptionId":"P1"}]'
+        expected = base64.b64encode(hmac.new(b"sec&", body, hashlib.sha1).digest()).decode()
+        assert sign(body, "sec") == expected
+        assert verify_signature(body, expected, "sec")
+        assert not verify_signature(body + b" ", expected, "sec")
+        assert not verify_signature(body, None, "sec")
+        assert not verify_signature(body, sign(body, ""), "")  # no secret configured
+
+    def test_notifications_grouped_by_participant(self):
+        changed, revoked = parse_notifications(
+            b'[{"collectionType":"activities","subscriptionId":"P1"},'
+            b'{"collectionType":"sleep","subscriptionId":"P1"},'
+            b'{"collectionType":"foods","subscriptionId":"P2"},'
+            b'{"collectionType":"userRevokedAccess","subscriptionId":"P3"},'
+            b'{"collectionType":"sleep"}, 7]'
+        )
+        assert set(changed) == {"P1"}
+        assert {MetricType.SLEEP, MetricType.HEART_RATE, MetricType.STEPS} <= changed["P1"]
+        assert revoked == {"P3"}
+        with pytest.raises(ValueError):
+            parse_notifications(b'{"collectionType": "sleep"}')
+
+    async def test_subscribe_posts_subscription(self):
+        seen = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            seen.append((request.method, request.url.path))
+            return httpx.Response(201, json={"subscriptionId": "P1"})
+
+        collector = await _fitbit_collector(handler)
+        await collector.subscribe("P1")
+        await collector.subscribe("P1", "sleep")
+        await collector.close()
+        assert seen == [
+            ("POST", "/1/user/-/apiSubscriptions/P1.json"),
+            ("POST", "/1/user/-/sleep/apiSubscriptions/P1.json"),
+        ]
+
+
+class TestBackfill:
+    def test_plan_chunks_to_endpoint_limits(self):
+        start, end = date(2025, 1, 1), date(2026, 2, 4)  # 400 days
+        plan = plan_range_requests([MetricType.HEART_RATE, MetricType.SLEEP], start, end)
+        hr = [r.url for r in plan if r.metric == MetricType.HEART_RATE]
+        assert hr == [
+            "/1/user/-/activities/heart/date/2025-01-01/2025-12-31.json",
+            "/1/user/-/activities/heart/date/2026-01-01/2026-02-04.json",
+        ]
+        assert sum(r.metric == MetricType.SLEEP for r in plan) == 4  # 100-day chunks
+        # Oldest chunk first, so a resumed job fills the history in order
+        assert [r.date for r in plan] == sorted(r.date for r in plan)
+
+    def test_plan_intraday_one_request_per_day(self):
+        plan = plan_range_requests(
+            [MetricType.STEPS, MetricType.SLEEP], date(2026, 1, 1), date(2026, 1, 3),
+            intraday=True,
+        )
+        assert [(r.metric, r.date, r.intraday) for r in plan] == [
+            (MetricType.STEPS, "2026-01-01", True),
+            (MetricType.SLEEP, "2026-01-01", False),
+            (MetricType.STEPS, "2026-01-02", True),
+            (MetricType.STEPS, "2026-01-03", True),
+        ]
+
+    async def test_rate_reserve_waits_for_window_reset(self):
+        limiter = _RateLimiter(150)
+        limiter.remaining, limiter.reset_at = 20, time.monotonic() + 0.1
+        start = time.monotonic()
+        await limiter.wait_for_budget(0.2)  # 20/150 left → wait for the reset
+        assert time.monotonic() - start >= 0.09
+        await limiter.wait_for_budget(0.2)
+        assert time.monotonic() - start < 0.2
+
+    async def test_failed_job_resumes_after_last_batch(self, tmp_path, monkeypatch):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'backfill.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        factory = async_sessionmaker(engine, expire_on_commit=False)
+        monkeypatch.setattr(fitbit_backfill, "get_session_factory", lambda: factory)
+
+        fail = True
+        seen: list[str] = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            kind = request.url.path.split("/")[5]
+            if kind == "distance" and fail:
+                return httpx.Response(500)
+            seen.append(kind)
+            return httpx.Response(200, json=_day_series(f"activities-{kind}"))
+
+        async with factory() as session:
+            token_repo = TokenRepository(session)
+            await _link(token_repo, "P-backfill", 3600)
+            tokens = TokenManager(token_repo, refresher=_Refresher())
+            metrics = [MetricType.STEPS, MetricType.CALORIES, MetricType.DISTANCE]
+            job = await create_backfill(
+                "P-backfill", date(2026, 1, 5), date(2026, 1, 5), metrics, intraday=False
+            )
+            assert job["total"] == 3 and job["status"] == "pending"
+
+            client = _mock_client(handler)
+            run = dict(client=client, token_manager=tokens, batch_size=1)
+            with pytest.raises(httpx.HTTPStatusError):
+                await fitbit_backfill.run_backfill(job["id"], **run)
+            async with factory() as check:
+                row = await BackfillJobRepository(check).get(job["id"])
+                assert (row.status, row.position, row.inserted) == ("failed", 2, 2)
+
+            fail = False
+            done = await fitbit_backfill.run_backfill(job["id"], **run)
+            await client.aclose()
+
+        assert seen == ["steps", "calories", "distance"]  # nothing fetched twice
+        assert done["status"] == "completed" and done["percent"] == 100.0
+        assert done["inserted"] == 3
+        await engine.dispose()
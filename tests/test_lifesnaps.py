@@ -0,0 +1,485 @@
+"""Tests for the LifeSnaps dataset collector (synthetic CSV fixtures)."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from wearable_agent.collectors.lifesnaps import LifeSnapsCollector, get_dataset
+from wearable_agent.collectors.lifesnaps_bson import (
+    BSONIndex,
+    BSONStreamer,
+    MappedBSON,
+    get_index,
+    scan_keys,
+)
+from wearable_agent.collectors.lifesnaps_import import IMPORT_SOURCE, import_high_frequency
+from wearable_agent.collectors.lifesnaps_parquet import LifeSnapsParquet
+from wearable_agent.collectors.lifesnaps_split import (
+    ensure_split,
+    load_manifest,
+    plan_ranges,
+    shard_path,
+    split_participants,
+)
+from wearable_agent.models import DeviceType, MetricType
+from wearable_agent.storage.database import Base
+from wearable_agent.storage.repository import (
+    READING_COLUMNS,
+    ImportCheckpointRepository,
+    ReadingRepository,
+)
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    csv_dir = tmp_path / "csv_rais_anonymized"
+    csv_dir.mkdir()
+    pd.DataFrame({
+        "id": ["a1", "a1", "b2"],
+        "date": ["2021-05-24", "2021-05-25", "2021-05-24"],
+        "stress_score": [70, np.nan, 60],
+        "spo2": [96.5, 97.0, np.nan],
+        "rmssd": [40.1, 41.2, 42.3],
+        "minutesAsleep": [400, np.nan, 380],
+        "unrelated": ["x", "y", "z"],
+    }).to_csv(csv_dir / "daily_fitbit_sema_df_unprocessed.csv", index=False)
+    pd.DataFrame({
+        "id": ["a1", "a1", "a1", "b2"],
+        "date": ["2021-05-24", "2021-05-24", "2021-05-25", "2021-05-24"],
+        "hour": [0, 13, 2, 5],
+        "bpm": [60.5, np.nan, 70.0, 80.0],
+        "steps": [0, 100, 5, 1],
+        "calories": [1.5, 2.5, 3.5, 4.5],
+        "distance": [0.0, 0.1, 0.2, 0.3],
+    }).to_csv(csv_dir / "hourly_fitbit_sema_df_unprocessed.csv", index=False)
+    return tmp_path
+
+
+class TestLifeSnapsCollector:
+    def test_participants(self, data_dir):
+        assert LifeSnapsCollector(data_dir).get_participants() == ["a1", "b2"]
+
+    async def test_fetch_daily_and_hourly(self, data_dir):
+        collector = LifeSnapsCollector(data_dir)
+        readings = await collector.fetch("a1", [MetricType.STRESS, MetricType.HEART_RATE])
+
+        stress = [r for r in readings if r.metric_type == MetricType.STRESS]
+        hr = [r for r in readings if r.metric_type == MetricType.HEART_RATE]
+        assert [(r.value, r.unit, r.timestamp) for r in stress] == [
+            (70.0, "score", datetime(2021, 5, 24)),
+        ]
+        # NaN cells are skipped; hour is added to the date
+        assert [(r.value, r.timestamp) for r in hr] == [
+            (60.5, datetime(2021, 5, 24, 0)),
+            (70.0, datetime(2021, 5, 25, 2)),
+        ]
+        assert all(r.device_type == DeviceType.FITBIT for r in readings)
+        assert all(r.metadata == {"source": "dataset"} for r in readings)
+        assert all(type(r.timestamp) is datetime for r in readings)
+
+    async def test_fetch_single_date(self, data_dir):
+        readings = await LifeSnapsCollector(data_dir).fetch(
+            "a1", [MetricType.STEPS, MetricType.HRV], date="2021-05-24"
+        )
+        assert sorted((r.metric_type.value, r.value) for r in readings) == [
+            ("hrv", 40.1), ("steps", 0.0), ("steps", 100.0),
+        ]
+
+    def test_fetch_frame_and_reading_tuples(self, data_dir):
+        collector = LifeSnapsCollector(data_dir)
+        frame = collector.fetch_frame("a1", list(MetricType))
+        assert list(frame.columns) == ["metric_type", "value", "unit", "timestamp", "source"]
+        # Non-empty cells: daily 4 + 2, hourly 4 + 3 + 4
+        assert len(frame) == 6 + 11
+        assert frame["value"].dtype == np.float64
+
+        rows = collector.to_reading_tuples("a1", frame)
+        assert len(rows) == len(frame)
+        assert len(rows[0]) == len(READING_COLUMNS)
+        row = dict(zip(READING_COLUMNS, rows[0], strict=True))
+        assert row["participant_id"] == "a1"
+        assert row["source"] == "dataset"
+        assert len({r[0] for r in rows}) == len(rows)  # unique ids
+
+
+class TestLifeSnapsDataset:
+    def test_collectors_share_one_load(self, data_dir):
+        first, second = LifeSnapsCollector(data_dir), LifeSnapsCollector(data_dir)
+        assert first.dataset is second.dataset is get_dataset(data_dir)
+        first.get_participants()
+        second.fetch_frame("b2", list(MetricType))
+        assert first.dataset.load_count == 1
+
+    def test_concurrent_callers_trigger_one_load(self, data_dir):
+        dataset = get_dataset(data_dir)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: dataset.participants, range(16)))
+        assert all(r == ["a1", "b2"] for r in results)
+        assert dataset.load_count == 1
+
+    def test_offset_index_slices_participant_rows(self, data_dir):
+        daily, hourly = get_dataset(data_dir).participant_rows("a1")
+        assert set(daily["id"]) == {"a1"} and len(daily) == 2
+        # Original (file) order is kept within a participant
+        assert hourly["hour"].tolist() == [0, 13, 2]
+        empty_daily, empty_hourly = get_dataset(data_dir).participant_rows("missing")
+        assert empty_daily.empty and empty_hourly.empty
+
+    def test_reloads_when_csv_changes(self, data_dir):
+        dataset = get_dataset(data_dir)
+        assert dataset.participants == ["a1", "b2"]
+
+        daily_file = data_dir / "csv_rais_anonymized" / "daily_fitbit_sema_df_unprocessed.csv"
+        pd.DataFrame({"id": ["c3"], "date": ["2021-06-01"], "spo2": [95.0]}).to_csv(
+            daily_file, mode="a", header=False, index=False
+        )
+        os.utime(daily_file, ns=(time.time_ns(), time.time_ns() + 1_000_000_000))
+
+        assert LifeSnapsCollector(data_dir).get_participants() == ["a1", "b2", "c3"]
+        assert dataset.load_count == 2
+
+
+# ── BSON offset index ─────────────────────────────────────────
+
+
+def _bson_doc(pid: str, doc_type: str, ts: datetime, value: float) -> dict:
+    stamp = ts.strftime("%m/%d/%y %H:%M:%S")
+    if doc_type == "heart_rate":
+        return {"id": pid, "type": doc_type,
+                "data": {"dateTime": stamp, "value": {"bpm": value, "confidence": 2}}}
+    return {"id": pid, "type": doc_type, "data": {"dateTime": stamp, "value": str(value)}}
+
+
+@pytest.fixture
+def bson_file(tmp_path):
+    bson = pytest.importorskip("bson")
+    docs = []
+    for pid in ("p1", "p2"):
+        for doc_type in ("heart_rate", "steps", "sleep"):
+            for day in (24, 25):
+                for minute in range(3):
+                    ts = datetime(2021, 5, day, 8, minute)
+                    docs.append(_bson_doc(pid, doc_type, ts, 60 + minute))
+    # An out-of-block straggler for p1 after p2's documents
+    docs.append(_bson_doc("p1", "heart_rate", datetime(2021, 5, 26, 9, 0), 99))
+    path = tmp_path / "fitbit.bson"
+    path.write_bytes(b"".join(bson.encode(d) for d in docs))
+    return path
+
+
+class TestBSONIndex:
+    def _readings(self, path, **kwargs):
+        streamer = BSONStreamer(path, use_index=kwargs.pop("use_index", True))
+        return [
+            (r.metric_type, r.value, r.timestamp)
+            for r in streamer.iter_readings("p1", [MetricType.HEART_RATE, MetricType.STEPS],
+                                            **kwargs)
+        ]
+
+    def test_indexed_stream_matches_linear_scan(self, bson_file):
+        indexed = self._readings(bson_file)
+        assert indexed == self._readings(bson_file, use_index=False)
+        assert len(indexed) == 2 * 2 * 3 + 1
+        assert bson_file.with_name("fitbit.bson.idx.json").exists()
+
+    def test_spans_cover_only_matching_documents(self, bson_file):
+        index = get_index(bson_file)
+        assert index.participants() == ["p1", "p2"]
+        assert index.days("p1", "heart_rate") == ["2021-05-24", "2021-05-25", "2021-05-26"]
+        assert index.count("p1", ["heart_rate", "steps"]) == 13
+        # p1's heart_rate + steps block is contiguous; the straggler is separate.
+        assert len(index.spans("p1", ["heart_rate", "steps"])) == 2
+        assert index.spans("p1", ["heart_rate"], start=date(2021, 5, 26)) == [
+            index.spans("p1", ["heart_rate"])[-1]
+        ]
+
+    def test_day_range_filter(self, bson_file):
+        rows = self._readings(bson_file, start=date(2021, 5, 25), end=date(2021, 5, 25))
+        assert {ts.date() for _, _, ts in rows} == {date(2021, 5, 25)}
+        assert len(rows) == 6
+
+    def test_sidecar_reused_then_rebuilt_on_change(self, bson_file):
+        import bson
+
+        BSONIndex(bson_file).ensure_current()
+        reloaded = BSONIndex(bson_file)
+        assert reloaded.load()
+
+        with open(bson_file, "ab") as f:
+            f.write(bson.encode(_bson_doc("p3", "steps", datetime(2021, 6, 1), 5)))
+        assert not reloaded.is_current()
+        assert not BSONIndex(bson_file).load()  # sidecar is stale
+        assert get_index(bson_file).participants() == ["p1", "p2", "p3"]
+
+
+class TestMappedBSON:
+    def test_documents_and_peek(self, bson_file):
+        import bson
+
+        with MappedBSON(bson_file) as mb:
+            offsets = list(mb.documents())
+            assert len(offsets) == 2 * 3 * 2 * 3 + 1
+            assert offsets[-1][1] == mb.size
+            start, end = offsets[0]
+            assert mb.peek(start, end, ["type", "id"]) == {"id": "p1", "type": "heart_rate"}
+            key, needles = mb.peek_key(start, end)
+            assert key == ("p1", "heart_rate", "2021-05-24")
+            assert mb.contains_all(needles, start, end)
+            assert mb.decode(start, end) == bson.decode(bytes(mb.view(start, end)))
+
+    def test_scan_keys_groups_runs(self, bson_file):
+        with MappedBSON(bson_file) as mb:
+            runs = list(scan_keys(mb))
+        assert [(count, key) for _, _, count, key in runs[:3]] == [
+            (3, ("p1", "heart_rate", "2021-05-24")),
+            (3, ("p1", "heart_rate", "2021-05-25")),
+            (3, ("p1", "steps", "2021-05-24")),
+        ]
+        assert runs[-1][2:] == (1, ("p1", "heart_rate", "2021-05-26"))
+        assert sum(count for _, _, count, _ in runs) == 37
+
+    def test_object_id_participants(self, tmp_path):
+        bson = pytest.importorskip("bson")
+        pid, other = bson.ObjectId(), bson.ObjectId()
+        docs = [
+            {"_id": bson.ObjectId(), **_bson_doc(p, "steps", datetime(2021, 5, 24, 0, i), i)}
+            for p in (other, pid, other)
+            for i in range(4)
+        ]
+        path = tmp_path / "fitbit.bson"
+        path.write_bytes(b"".join(bson.encode(d) for d in docs))
+
+        assert get_index(path).participants() == sorted([str(pid), str(other)])
+        for use_index in (True, False):
+            readings = list(BSONStreamer(path, use_index=use_index).iter_readings(
+                str(pid), [MetricType.STEPS]
+            ))
+            assert [r.value for r in readings] == [0.0, 1.0, 2.0, 3.0]
+
+
+class TestSplitParticipants:
+    def test_plan_ranges_are_document_aligned(self, bson_file):
+        ranges = plan_ranges(bson_file, 4)
+        assert ranges[0][0] == 0 and ranges[-1][1] == bson_file.stat().st_size
+        assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:], strict=False))
+        with MappedBSON(bson_file) as mb:
+            starts = {start for start, _ in mb.documents()}
+        assert all(start in starts for start, _ in ranges)
+
+    def test_split_writes_every_participant_in_file_order(self, bson_file, tmp_path):
+        import bson
+
+        out_dir = tmp_path / "shards"
+        totals = split_participants(bson_file, out_dir, workers=2)
+        assert totals["p1"]["documents"] == 19 and totals["p2"]["documents"] == 18
+
+        with open(bson_file, "rb") as f:
+            docs = list(bson.decode_file_iter(f))
+        for pid in ("p1", "p2"):
+            with open(shard_path(out_dir, pid), "rb") as f:
+                assert list(bson.decode_file_iter(f)) == [d for d in docs if d["id"] == pid]
+        assert load_manifest(bson_file, out_dir) == totals
+
+    def test_ensure_split_reuses_current_split(self, bson_file, tmp_path):
+        import bson
+
+        out_dir = tmp_path / "shards"
+        ensure_split(bson_file, out_dir, workers=1)
+        mtime = shard_path(out_dir, "p1").stat().st_mtime_ns
+        ensure_split(bson_file, out_dir, workers=1)
+        assert shard_path(out_dir, "p1").stat().st_mtime_ns == mtime
+
+        with open(bson_file, "ab") as f:
+            f.write(bson.encode(_bson_doc("p3", "steps", datetime(2021, 6, 1), 5)))
+        assert load_manifest(bson_file, out_dir) is None
+        assert "p3" in ensure_split(bson_file, out_dir, workers=1)
+
+    async def test_stream_uses_split_shard(self, bson_file):
+        mongo_dir = bson_file.parent / "mongo_rais_anonymized"
+        mongo_dir.mkdir()
+        bson_file.rename(mongo_dir / "fitbit.bson")
+        collector = LifeSnapsCollector(bson_file.parent)
+
+        path = await collector._participant_bson("p2")
+        assert path == shard_path(mongo_dir, "p2") and path.exists()
+        assert await collector._participant_bson("nobody") is None
+
+
+# ── Parquet conversion ────────────────────────────────────────
+
+
+@pytest.fixture
+def parquet_store(tmp_path):
+    pytest.importorskip("pyarrow")
+    return LifeSnapsParquet(tmp_path / "parquet")
+
+
+class TestLifeSnapsParquet:
+    def test_convert_partitions_by_type_and_month(self, bson_file, parquet_store):
+        counts = parquet_store.convert_participant("p1", bson_file)
+        assert counts == {"heart_rate": 7, "steps": 6}  # sleep is not converted
+        assert parquet_store.months("p1", "heart_rate") == [date(2021, 5, 1)]
+        assert not parquet_store.has("p2")
+
+        table = parquet_store.read("p1", ["heart_rate", "steps"])
+        assert table.num_rows == 13
+        timestamps = table.column("timestamp").to_pylist()
+        assert timestamps == sorted(timestamps)
+
+    def test_read_pushes_down_time_filter(self, bson_file, parquet_store):
+        parquet_store.convert_participant("p1", bson_file)
+        table = parquet_store.read(
+            "p1", ["heart_rate"], datetime(2021, 5, 25), datetime(2021, 5, 25, 23, 59)
+        )
+        assert table.column("value").to_pylist() == [60.0, 61.0, 62.0]
+        assert parquet_store.read("p1", ["heart_rate"], datetime(2021, 6, 1)).num_rows == 0
+
+        frame = parquet_store.read_frame("p1", ["steps"])
+        assert list(frame.columns) == ["metric_type", "value", "unit", "timestamp"]
+        assert set(frame["metric_type"]) == {"steps"} and set(frame["unit"]) == {"steps"}
+
+    def test_reconverted_when_shard_changes(self, bson_file, parquet_store):
+        import bson
+
+        parquet_store.convert_participant("p1", bson_file)
+        assert parquet_store.is_current("p1", bson_file)
+        with open(bson_file, "ab") as f:
+            f.write(bson.encode(_bson_doc("p1", "steps", datetime(2021, 6, 1), 5)))
+        assert not parquet_store.is_current("p1", bson_file)
+        assert parquet_store.convert_participant("p1", bson_file)["steps"] == 7
+        assert parquet_store.months("p1", "steps") == [date(2021, 5, 1), date(2021, 6, 1)]
+
+    async def test_collector_reads_parquet_copy(self, data_dir, bson_file):
+        pytest.importorskip("pyarrow")
+        mongo_dir = data_dir / "mongo_rais_anonymized"
+        split_participants(bson_file, mongo_dir, workers=1)
+        collector = LifeSnapsCollector(data_dir)
+
+        frame = collector.fetch_frame("p1", [MetricType.HEART_RATE], date="2021-05-24")
+        assert frame["value"].tolist() == [60.0, 61.0, 62.0]
+        assert collector.parquet.has("p1")
+
+        [readings] = await collector.replay_sources("p1", [MetricType.STEPS])
+        assert [r.value for r in readings] == [60.0, 61.0, 62.0] * 2
+        # Participants without a shard keep the hourly CSV values.
+        frame = collector.fetch_frame("a1", [MetricType.HEART_RATE])
+        assert frame["value"].tolist() == [60.5, 70.0]
+
+
+# ── Bulk BSON import ──────────────────────────────────────────
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'import.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture(params=["parquet", "bson"])
+def import_collector(request, data_dir, bson_file):
+    split_participants(bson_file, data_dir / "mongo_rais_anonymized", workers=1)
+    collector = LifeSnapsCollector(data_dir)
+    if request.param == "bson":
+        collector.parquet = None
+    elif collector.parquet is None:
+        pytest.skip("pyarrow not installed")
+    return collector
+
+
+class TestHighFrequencyImport:
+    async def _stored(self, session_factory):
+        async with session_factory() as session:
+            readings = ReadingRepository(session, cold_store=None)
+            count = await readings.count_for_participant("p1")
+            checkpoint = await ImportCheckpointRepository(session).get("p1", IMPORT_SOURCE)
+            return count, checkpoint
+
+    async def test_imports_without_pacing(self, import_collector, session_factory):
+        progress = []
+        report = await import_high_frequency(
+            "p1", collector=import_collector, session_factory=session_factory,
+            batch_size=5, on_progress=progress.append,
+        )
+        assert report["status"] == "completed"
+        assert report["position"] == report["total"] == report["inserted"] == 13
+        assert [p["position"] for p in progress] == [5, 10, 13]
+
+        count, _ = await self._stored(session_factory)
+        assert count == 13
+        async with session_factory() as session:
+            rows = await ReadingRepository(session, cold_store=None).get_range(
+                "p1", MetricType.HEART_RATE, datetime(2021, 5, 1), datetime(2021, 6, 1)
+            )
+        assert len(rows) == 7 and {r.source for r in rows} == {IMPORT_SOURCE}
+        assert rows[-1].timestamp.replace(tzinfo=None) == datetime(2021, 5, 26, 9, 0)
+
+    async def test_resumes_after_failure_without_duplicates(
+        self, import_collector, session_factory
+    ):
+        def fail_after_first_batch(report):
+            raise RuntimeError("disk full")
+
+        with pytest.raises(RuntimeError):
+            await import_high_frequency(
+                "p1", collector=import_collector, session_factory=session_factory,
+                batch_size=5, on_progress=fail_after_first_batch,
+            )
+        count, checkpoint = await self._stored(session_factory)
+        assert (checkpoint.status, checkpoint.position, count) == ("failed", 5, 5)
+
+        report = await import_high_frequency(
+            "p1", collector=import_collector, session_factory=session_factory, batch_size=5
+        )
+        assert report["status"] == "completed" and report["inserted"] == 13
+        assert (await self._stored(session_factory))[0] == 13
+
+        await import_high_frequency(
+            "p1", collector=import_collector, session_factory=session_factory, restart=True
+        )
+        assert (await self._stored(session_factory))[0] == 13
+
+    async def test_sync_then_import_stores_each_minute_once(
+        self, import_collector, session_factory
+    ):
+        # The CSV sync reads HR / steps from the same Parquet copy as the import.
+        frame = import_collector.fetch_frame("p1", list(MetricType))
+        async with session_factory() as session:
+            await ReadingRepository(session, cold_store=None).save_batch(
+                import_collector.to_reading_tuples("p1", frame)
+            )
+        synced = (await self._stored(session_factory))[0]
+
+        await import_high_frequency(
+            "p1", collector=import_collector, session_factory=session_factory, batch_size=5
+        )
+        if import_collector.parquet is not None:
+            assert synced == 13
+        assert (await self._stored(session_factory))[0] == 13
+
+    async def test_cancel_keeps_committed_batches(self, import_collector, session_factory):
+        task = asyncio.create_task(import_high_frequency(
+            "p1", collector=import_collector, session_factory=session_factory,
+            batch_size=4, on_progress=lambda report: task.cancel(),
+        ))
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        count, checkpoint = await self._stored(session_factory)
+        assert (checkpoint.status, checkpoint.position, count) == ("cancelled", 4, 4)
+
+    async def test_missing_participant(self, import_collector, session_factory):
+        with pytest.raises(FileNotFoundError):
+            await import_high_frequency(
+                "nobody", collector=import_collector, session_factory=session_factory
+            )
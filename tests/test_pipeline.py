@@ -67,3 +67,236 @@ async def test_pipeline_batch():
     task.cancel()
 
     assert len(received) == 5
+
+
+@pytest.mark.asyncio
+async def test_pipeline_batch_consumer_receives_micro_batches():
+    """Batch consumers get readings grouped up to ``batch_size``."""
+    batches: list[list[SensorReading]] = []
+    received: list[SensorReading] = []
+
+    async def batch_consumer(readings: list[SensorReading]) -> None:
+        batches.append(list(readings))
+
+    async def consumer(reading: SensorReading) -> None:
+        received.append(reading)
+
+    pipeline = StreamPipeline(batch_size=4, batch_timeout_ms=50)
+    pipeline.add_batch_consumer(batch_consumer)
+    pipeline.add_consumer(consumer)
+
+    readings = [
+        SensorReading(
+            participant_id="P001",
+            device_type=DeviceType.FITBIT,
+            metric_type=MetricType.HEART_RATE,
+            value=float(60 + i),
+            unit="bpm",
+        )
+        for i in range(10)
+    ]
+    # Enqueue before starting so the first drain sees a full queue.
+    await pipeline.publish_batch(readings)
+    task = asyncio.create_task(pipeline.start())
+
+    await asyncio.sleep(0.3)
+    await pipeline.stop()
+    task.cancel()
+
+    assert [len(b) for b in batches] == [4, 4, 2]
+    assert [r.value for b in batches for r in b] == [r.value for r in readings]
+    assert len(received) == 10
+
+
+@pytest.mark.asyncio
+async def test_pipeline_batch_window_flushes_partial_batch():
+    """A partial batch is flushed once the batch window closes."""
+    batches: list[list[SensorReading]] = []
+
+    async def batch_consumer(readings: list[SensorReading]) -> None:
+        batches.append(list(readings))
+
+    pipeline = StreamPipeline(batch_size=100, batch_timeout_ms=20)
+    pipeline.add_batch_consumer(batch_consumer)
+    task = asyncio.create_task(pipeline.start())
+
+    await pipeline.publish(
+        SensorReading(
+            participant_id="P001",
+            device_type=DeviceType.FITBIT,
+            metric_type=MetricType.STEPS,
+            value=12.0,
+            unit="steps",
+        )
+    )
+    await asyncio.sleep(0.2)
+    await pipeline.stop()
+    task.cancel()
+
+    assert len(batches) == 1
+    assert batches[0][0].value == 12.0
+
+
+def _hr(value: float) -> SensorReading:
+    return SensorReading(
+        participant_id="P001",
+        device_type=DeviceType.FITBIT,
+        metric_type=MetricType.HEART_RATE,
+        value=value,
+        unit="bpm",
+    )
+
+
+@pytest.mark.asyncio
+async def test_slow_consumer_does_not_stall_others():
+    """A slow drop-oldest consumer sheds load while a fast one sees everything."""
+    fast: list[SensorReading] = []
+    slow: list[SensorReading] = []
+    release = asyncio.Event()
+
+    async def fast_consumer(reading: SensorReading) -> None:
+        fast.append(reading)
+
+    async def slow_consumer(reading: SensorReading) -> None:
+        await release.wait()
+        slow.append(reading)
+
+    pipeline = StreamPipeline(batch_size=10, batch_timeout_ms=5)
+    pipeline.add_consumer(fast_consumer)
+    pipeline.add_consumer(slow_consumer, maxsize=3, overflow="drop_oldest")
+    task = asyncio.create_task(pipeline.start())
+
+    await pipeline.publish_batch([_hr(float(i)) for i in range(20)])
+    await asyncio.sleep(0.2)
+
+    assert len(fast) == 20
+    stats = {s["name"].rsplit(".", 1)[-1]: s for s in pipeline.consumer_stats()}
+    assert stats["slow_consumer"]["dropped"] > 0
+    assert stats["slow_consumer"]["queue_size"] <= 3
+    assert stats["fast_consumer"]["processed"] == 20
+
+    release.set()
+    await asyncio.sleep(0.1)
+    await pipeline.stop()
+    task.cancel()
+
+    # The newest readings survive the drop-oldest policy.
+    assert slow[-1].value == 19.0
+    assert stats["slow_consumer"]["dropped"] + len(slow) == 20
+
+
+@pytest.mark.asyncio
+async def test_sample_overflow_admits_every_nth():
+    received: list[SensorReading] = []
+    release = asyncio.Event()
+
+    async def consumer(reading: SensorReading) -> None:
+        await release.wait()
+        received.append(reading)
+
+    pipeline = StreamPipeline(batch_size=50, batch_timeout_ms=5)
+    pipeline.add_consumer(consumer, maxsize=2, overflow="sample", sample_every=5)
+    task = asyncio.create_task(pipeline.start())
+
+    await pipeline.publish_batch([_hr(float(i)) for i in range(23)])
+    await asyncio.sleep(0.1)
+    stats = pipeline.consumer_stats()[0]
+    release.set()
+    await asyncio.sleep(0.1)
+    await pipeline.stop()
+    task.cancel()
+
+    # The whole batch is fanned out before the worker runs: two readings
+    # fill the queue, then 21 overflow — 4 sampled in (each evicting the
+    # oldest) and 17 rejected outright.
+    assert stats["dropped"] == 17 + 4
+    assert len(received) == 2
+    assert [r.value for r in received] == [16.0, 21.0]
+
+
+@pytest.mark.asyncio
+async def test_consumer_error_is_isolated():
+    received: list[SensorReading] = []
+
+    async def broken(reading: SensorReading) -> None:
+        raise RuntimeError("boom")
+
+    async def healthy(reading: SensorReading) -> None:
+        received.append(reading)
+
+    pipeline = StreamPipeline(batch_timeout_ms=5)
+    pipeline.add_consumer(broken)
+    pipeline.add_consumer(healthy)
+    task = asyncio.create_task(pipeline.start())
+
+    await pipeline.publish_batch([_hr(70.0), _hr(71.0)])
+    await asyncio.sleep(0.1)
+    await pipeline.stop()
+    task.cancel()
+
+    assert len(received) == 2
+    assert pipeline.consumer_stats()[0]["errors"] == 2
+
+
+@pytest.mark.asyncio
+async def test_stop_drains_lossless_consumer():
+    persisted: list[SensorReading] = []
+
+    async def slow_persist(batch: list[SensorReading]) -> None:
+        await asyncio.sleep(0.01)
+        persisted.extend(batch)
+
+    pipeline = StreamPipeline(batch_size=5, batch_timeout_ms=5)
+    pipeline.add_batch_consumer(slow_persist)
+    task = asyncio.create_task(pipeline.start())
+    await asyncio.sleep(0)  # let the workers start
+
+    await pipeline.publish_batch([_hr(float(i)) for i in range(100)])
+    await pipeline.stop(timeout=5)
+    task.cancel()
+
+    assert len(persisted) == 100
+    stats = pipeline.consumer_stats()[0]
+    assert stats["dropped"] == 0
+    assert stats["lag_seconds"] == 0.0
+
+
+@pytest.mark.asyncio
+async def test_stop_drops_what_is_left_after_timeout():
+    release = asyncio.Event()
+
+    async def stuck(batch: list[SensorReading]) -> None:
+        await release.wait()
+
+    pipeline = StreamPipeline(batch_size=5, batch_timeout_ms=5)
+    pipeline.add_batch_consumer(stuck)
+    task = asyncio.create_task(pipeline.start())
+
+    await pipeline.publish_batch([_hr(float(i)) for i in range(20)])
+    await asyncio.sleep(0.05)
+    await pipeline.stop(timeout=0.1)
+    task.cancel()
+
+    stats = pipeline.consumer_stats()[0]
+    assert stats["processed"] == 0
+    assert stats["dropped"] == 20
+    assert stats["pending_readings"] == 0
+
+
+@pytest.mark.asyncio
+async def test_throughput_counts_more_than_10k_events_in_window():
+    async def noop(reading: SensorReading) -> None:
+        pass
+
+    pipeline = StreamPipeline(batch_size=500, batch_timeout_ms=5)
+    pipeline.add_consumer(noop)
+    task = asyncio.create_task(pipeline.start())
+    await asyncio.sleep(0)
+
+    await pipeline.publish_batch([_hr(float(i)) for i in range(12_000)])
+    await pipeline.stop(timeout=10)
+    task.cancel()
+
+    stats = pipeline.consumer_stats()[0]
+    assert stats["processed"] == 12_000
+    assert stats["throughput_per_sec"] == 12_000 / 60
@@ -0,0 +1,167 @@
+"""Tests for the PostgreSQL backend.
+
+The DDL / type tests run everywhere.  The integration tests need a scratch
+PostgreSQL database and are skipped unless ``TEST_POSTGRES_URL`` is set,
+e.g.::
+
+    docker run --rm -p 5432:5432 -e POSTGRES_PASSWORD=pg postgres:16
+    TEST_POSTGRES_URL=postgresql://postgres:pg@localhost/postgres pytest tests/test_postgres.py
+
+The integration tests drop and recreate every table in that database.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from datetime import UTC, date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.schema import CreateTable
+
+from wearable_agent.models import DeviceType, MetricType, SensorReading
+from wearable_agent.storage.database import (
+    Base,
+    JSONText,
+    SensorReadingRow,
+    UTCDateTime,
+    build_engine,
+    normalize_database_url,
+    run_migrations,
+)
+from wearable_agent.storage.partitions import add_months, ensure_partitions, partition_name
+from wearable_agent.storage.repository import ReadingRepository
+
+_PG_URL = os.environ.get("TEST_POSTGRES_URL", "")
+
+
+class TestUrlNormalisation:
+    @pytest.mark.parametrize(
+        ("url", "expected"),
+        [
+            ("postgres://u:p@h:5432/db", "postgresql+asyncpg://u:p@h:5432/db"),
+            ("postgresql://u:p@h/db", "postgresql+asyncpg://u:p@h/db"),
+            ("postgresql+asyncpg://u:p@h/db", "postgresql+asyncpg://u:p@h/db"),
+            ("sqlite:///tmp/x.db", "sqlite+aiosqlite:///tmp/x.db"),
+            ("sqlite+aiosqlite:///tmp/x.db", "sqlite+aiosqlite:///tmp/x.db"),
+        ],
+    )
+    def test_normalize(self, url, expected):
+        assert normalize_database_url(url) == expected
+
+
+class TestPostgresSchema:
+    def test_reading_table_ddl(self):
+        ddl = str(CreateTable(SensorReadingRow.__table__).compile(dialect=postgresql.dialect()))
+        assert "timestamp TIMESTAMP WITH TIME ZONE NOT NULL" in ddl
+        assert "metadata_json JSONB NOT NULL" in ddl
+        assert "PRIMARY KEY (id, timestamp)" in ddl
+        assert "PARTITION BY RANGE (timestamp)" in ddl
+
+    def test_sqlite_ddl_unchanged(self):
+        ddl = str(CreateTable(SensorReadingRow.__table__).compile(dialect=sqlite.dialect()))
+        assert "timestamp DATETIME NOT NULL" in ddl
+        assert "metadata_json TEXT NOT NULL" in ddl
+        assert "PARTITION" not in ddl
+
+    def test_utc_datetime_binding(self):
+        pg, lite = postgresql.dialect(), sqlite.dialect()
+        naive = datetime(2026, 3, 1, 12, 0)
+        aware = datetime(2026, 3, 1, 14, 0, tzinfo=timezone(timedelta(hours=2)))
+        col = UTCDateTime()
+        assert col.process_bind_param(naive, pg) == naive.replace(tzinfo=UTC)
+        assert col.process_bind_param(aware, lite) == naive
+        assert col.process_result_value(aware, pg) == naive
+        assert col.process_result_value(naive, lite) == naive
+
+    def test_json_text_keeps_string_api(self):
+        pg = postgresql.dialect()
+        col = JSONText()
+        assert col.process_bind_param('{"source": "live"}', pg) == {"source": "live"}
+        assert json.loads(col.process_result_value({"source": "live"}, pg)) == {"source": "live"}
+        assert col.process_bind_param("{}", sqlite.dialect()) == "{}"
+
+    def test_partition_naming(self):
+        assert partition_name(date(2026, 1, 1)) == "sensor_readings_p2026_01"
+        assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+        assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+
+
+# ── Integration (needs TEST_POSTGRES_URL) ─────────────────────
+
+requires_postgres = pytest.mark.skipif(not _PG_URL, reason="TEST_POSTGRES_URL not set")
+
+
+@pytest.fixture
+async def pg_engine():
+    pytest.importorskip("asyncpg")
+    engine = build_engine(url=_PG_URL)
+    async with engine.begin() as conn:
+        await conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(run_migrations)
+    yield engine
+    await engine.dispose()
+
+
+@requires_postgres
+class TestPostgresIntegration:
+    async def test_fresh_schema_is_partitioned(self, pg_engine):
+        async with pg_engine.begin() as conn:
+            created = await conn.run_sync(
+                ensure_partitions, months_ahead=2, now=datetime(2026, 10, 16)
+            )
+            assert created == [
+                "sensor_readings_p2026_10",
+                "sensor_readings_p2026_11",
+                "sensor_readings_p2026_12",
+            ]
+            # Idempotent
+            assert await conn.run_sync(ensure_partitions, months_ahead=2,
+                                       now=datetime(2026, 10, 16)) == []
+
+    async def test_repository_round_trip(self, pg_engine):
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        start = datetime(2021, 5, 24, 8, 0)
+        readings = [
+            SensorReading(
+                participant_id="P001",
+                device_type=DeviceType.FITBIT,
+                metric_type=MetricType.HEART_RATE,
+                value=60.0 + i,
+                unit="bpm",
+                timestamp=start + timedelta(minutes=i),
+                metadata={"source": "dataset"},
+            )
+            for i in range(10)
+        ]
+        async with async_sessionmaker(pg_engine, expire_on_commit=False)() as session:
+            repo = ReadingRepository(session)
+            assert await repo.save_batch(readings) == 10
+            assert await repo.save_batch(readings) == 0  # duplicates ignored
+
+            rows = await repo.get_range(
+                "P001", MetricType.HEART_RATE, start, start + timedelta(minutes=4)
+            )
+            assert [r.value for r in rows] == [60.0, 61.0, 62.0, 63.0, 64.0]
+            assert rows[0].timestamp == start  # naive UTC back out
+            assert json.loads(rows[0].metadata_json) == {"source": "dataset"}
+
+            latest = await repo.get_latest_by_source(
+                "P001", MetricType.HEART_RATE, "dataset", limit=1
+            )
+            assert latest[0].value == 69.0
+
+        # 2021 rows went to the default partition; maintenance carves them out.
+        async with pg_engine.begin() as conn:
+            created = await conn.run_sync(ensure_partitions, months_ahead=0)
+            assert partition_name(date(2021, 5, 1)) in created
+            leftover = (await conn.execute(
+                text("SELECT count(*) FROM sensor_readings_default")
+            )).scalar()
+            assert leftover == 0
+            total = (await conn.execute(text("SELECT count(*) FROM sensor_readings"))).scalar()
+            assert total == 10
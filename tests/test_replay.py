@@ -0,0 +1,268 @@
+"""Tests for the heap-merge replay engine."""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from wearable_agent.collectors.replay import ReplayEngine, ReplaySession, VirtualClock
+from wearable_agent.models import DeviceType, MetricType, SensorReading, reading_id
+
+_T0 = datetime(2021, 5, 24, 8, 0)
+
+
+def _source(
+    metric: MetricType, offsets_s: list[float] | range, participant_id: str = "p1"
+):
+    for offset in offsets_s:
+        yield SensorReading(
+            participant_id=participant_id,
+            device_type=DeviceType.FITBIT,
+            metric_type=metric,
+            value=float(offset),
+            timestamp=_T0 + timedelta(seconds=offset),
+        )
+
+
+async def _collect(engine: ReplayEngine) -> list[tuple[float, list[SensorReading]]]:
+    out = []
+    async for batch in engine.batches():
+        out.append((time.monotonic(), batch))
+    return out
+
+
+class TestReplayEngine:
+    async def test_merges_sorted_sources_in_timestamp_order(self):
+        engine = ReplayEngine(
+            [
+                _source(MetricType.HEART_RATE, [0, 2, 4, 6]),
+                _source(MetricType.STEPS, [1, 3, 5]),
+                _source(MetricType.STRESS, [2.5]),
+            ],
+            speed=1000,
+        )
+        readings = [r for _, batch in await _collect(engine) for r in batch]
+        assert [r.value for r in readings] == [0, 1, 2, 2.5, 3, 4, 5, 6]
+        timestamps = [r.timestamp for r in readings]
+        assert timestamps == sorted(timestamps)
+        # Shifted to now, compressed by speed: 6 s of source → 6 ms
+        assert timestamps[-1] - timestamps[0] == timedelta(milliseconds=6)
+        assert abs((timestamps[0] - datetime.now()).total_seconds()) < 5
+        assert engine.emitted == 8
+        # Ids follow the shifted timestamps, so a second replay never reuses them.
+        assert all(
+            r.id == reading_id(r.participant_id, r.metric_type, r.timestamp) for r in readings
+        )
+
+    async def test_timing_accuracy(self):
+        # 300 readings one source-second apart at 1000× → due every 1 ms over 0.3 s
+        tick = 0.02
+        engine = ReplayEngine([_source(MetricType.HEART_RATE, range(300))], speed=1000, tick=tick)
+        start = time.monotonic()
+        batches = await _collect(engine)
+        duration = time.monotonic() - start
+
+        lags = [
+            arrived - start - reading.value / 1000
+            for arrived, batch in batches
+            for reading in batch
+        ]
+        assert sum(len(b) for _, b in batches) == 300
+        assert min(lags) > -0.005  # never (noticeably) early
+        assert max(lags) < tick + 0.05  # at most about one tick late
+        assert engine.max_lag < tick + 0.05
+        assert 0.29 < duration < 0.3 + tick + 0.1
+        # One wake-up per tick, not one sleep per reading
+        assert len(batches) <= duration / tick + 3
+
+    async def test_high_speed_does_not_starve_event_loop(self):
+        beats = 0
+
+        async def heartbeat():
+            nonlocal beats
+            while True:
+                await asyncio.sleep(0.005)
+                beats += 1
+
+        # A day of 1-second readings at 100 000×: ~0.86 s of replay
+        engine = ReplayEngine(
+            [_source(MetricType.HEART_RATE, range(0, 86_400, 2)),
+             _source(MetricType.STEPS, range(1, 86_400, 2))],
+            speed=100_000, max_batch=2_000,
+        )
+        task = asyncio.create_task(heartbeat())
+        start = time.monotonic()
+        emitted = sum(len(batch) for _, batch in await _collect(engine))
+        duration = time.monotonic() - start
+        task.cancel()
+
+        assert emitted == 86_400
+        assert engine.batches_emitted < 200
+        # The loop stayed responsive: the 5 ms heartbeat kept running.
+        assert beats >= duration / 0.005 * 0.3
+
+    async def test_consumes_sources_lazily(self):
+        pulled = 0
+
+        def endless():
+            nonlocal pulled
+            for i in itertools.count():
+                pulled += 1
+                yield from _source(MetricType.HEART_RATE, [i])
+
+        engine = ReplayEngine([endless()], speed=10_000, max_batch=50)
+        emitted = 0
+        async for batch in engine.batches():
+            emitted += len(batch)
+            if emitted >= 500:
+                break
+        # Nothing is read ahead beyond the engine's head / the merge's lookahead.
+        assert emitted <= pulled <= emitted + 2
+
+    async def test_start_skips_earlier_readings(self):
+        engine = ReplayEngine(
+            [_source(MetricType.HEART_RATE, range(10))],
+            speed=1000,
+            start=_T0 + timedelta(seconds=7),
+        )
+        readings = [r for _, batch in await _collect(engine) for r in batch]
+        assert [r.value for r in readings] == [7, 8, 9]
+
+    def test_rejects_non_positive_speed(self):
+        with pytest.raises(ValueError):
+            ReplayEngine([], speed=0)
+
+    async def test_empty_sources(self):
+        assert await _collect(ReplayEngine([iter([])])) == []
+
+
+def _factory(participant_id: str, offsets_s: list[float] | range, shift_s: float = 0):
+    async def build():
+        return [_source(MetricType.HEART_RATE, [o + shift_s for o in offsets_s], participant_id)]
+
+    return build
+
+
+class _Sink:
+    def __init__(self):
+        self.batches: list[tuple[float, list[SensorReading]]] = []
+
+    async def __call__(self, batch: list[SensorReading]) -> None:
+        self.batches.append((time.monotonic(), batch))
+
+    def values(self, participant_id: str) -> list[float]:
+        return [r.value for _, b in self.batches for r in b if r.participant_id == participant_id]
+
+
+class TestReplaySession:
+    async def test_participants_share_one_clock(self):
+        sink = _Sink()
+        session = ReplaySession(sink, speed=1000, tick=0.01)
+        # p2's history starts a day later; aligned, both start together.
+        await session.add_participant("p1", _factory("p1", range(0, 100, 10)))
+        await session.add_participant("p2", _factory("p2", range(0, 100, 10), shift_s=86_400))
+        session.start()
+        await session.wait()
+
+        assert sink.values("p1") == [float(v) for v in range(0, 100, 10)]
+        assert sink.values("p2") == [float(v) + 86_400 for v in range(0, 100, 10)]
+        readings = [r for _, batch in sink.batches for r in batch]
+        assert all(
+            r.id == reading_id(r.participant_id, r.metric_type, r.timestamp) for r in readings
+        )
+        # Same tick → same batch: both participants' readings are published together.
+        assert all(
+            {r.participant_id for r in batch} == {"p1", "p2"} for _, batch in sink.batches
+        )
+        status = session.status()
+        assert status["state"] == "finished" and status["emitted"] == 20
+        assert [p["emitted"] for p in status["participants"]] == [10, 10]
+        assert status["participants"][1]["position"] == (
+            _T0 + timedelta(seconds=86_490)
+        ).isoformat()
+
+    async def test_absolute_mode_keeps_offsets(self):
+        sink = _Sink()
+        session = ReplaySession(sink, speed=100, tick=0.01, align_starts=False)
+        await session.add_participant("late", _factory("late", [0], shift_s=20))
+        await session.add_participant("early", _factory("early", [0]))
+        start = time.monotonic()
+        session.start()
+        await session.wait()
+        arrival = {b[0].participant_id: t - start for t, b in sink.batches}
+        assert arrival["early"] < 0.05
+        assert 0.19 <= arrival["late"] < 0.3  # 20 source seconds at 100×
+
+    async def test_pause_resume(self):
+        sink = _Sink()
+        session = ReplaySession(sink, speed=100, tick=0.01)
+        await session.add_participant("p1", _factory("p1", range(0, 40)))
+        session.start()
+        await asyncio.sleep(0.1)
+        session.pause()
+        assert session.state == "paused"
+        emitted = session.emitted
+        position = session.clock.position()
+        await asyncio.sleep(0.15)
+        assert session.emitted == emitted and session.clock.position() == position
+        session.resume()
+        await session.wait()
+        assert sink.values("p1") == [float(v) for v in range(40)]
+
+    async def test_seek_forward_and_back(self):
+        sink = _Sink()
+        session = ReplaySession(sink, speed=100, tick=0.01)
+        await session.add_participant("p1", _factory("p1", range(0, 100)))
+        session.start()
+        session.pause()
+        await session.seek(90)
+        session.resume()
+        await session.wait()
+        assert sink.values("p1") == [float(v) for v in range(90, 100)]
+
+        sink.batches.clear()
+        await session.seek(95)  # rewind after finishing
+        await session.wait()
+        assert sink.values("p1") == [float(v) for v in range(95, 100)]
+        assert session.status()["participants"][0]["emitted"] == 5
+
+    async def test_stop(self):
+        session = ReplaySession(_Sink(), speed=1)
+        await session.add_participant("p1", _factory("p1", range(0, 3600)))
+        session.start()
+        await session.stop()
+        assert session.state == "stopped"
+
+    async def test_on_done_when_finished_or_stopped(self):
+        done: list[str] = []
+
+        def on_done(session: ReplaySession) -> None:
+            done.append(session.state)
+
+        finished = ReplaySession(_Sink(), speed=1000, tick=0.01, on_done=on_done)
+        await finished.add_participant("p1", _factory("p1", range(0, 30, 10)))
+        finished.start()
+        await finished.wait()
+
+        stopped = ReplaySession(_Sink(), speed=1, on_done=on_done)
+        await stopped.add_participant("p1", _factory("p1", range(0, 3600)))
+        stopped.start()
+        await stopped.stop()
+        assert done == ["finished", "stopped"]
+
+
+class TestVirtualClock:
+    def test_pause_seek_speed(self):
+        clock = VirtualClock(speed=10)
+        assert clock.paused and clock.position() == 0
+        clock.seek(50)
+        assert clock.position() == 50 and clock.wall_delay(60) == float("inf")
+        clock.resume()
+        time.sleep(0.05)
+        assert 50.4 <= clock.position() < 52
+        clock.set_speed(1000)
+        assert 0 < clock.wall_delay(clock.position() + 100) <= 0.1
@@ -0,0 +1,381 @@
+"""Tests for the adaptive sync planner and the scheduler's dispatch loop."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from wearable_agent.collectors.fitbit_tokens import FitbitToken
+from wearable_agent.models import DeviceType, MetricType, SensorReading
+from wearable_agent.scheduler import service as service_module
+from wearable_agent.scheduler.planner import SyncPlanner
+from wearable_agent.scheduler.service import SchedulerService
+from wearable_agent.storage.database import Base
+from wearable_agent.storage.repository import ReadingRepository, SyncCursorRepository
+
+
+class _Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _planner(clock: _Clock, **kwargs) -> SyncPlanner:
+    kwargs.setdefault("max_interval", 3600)
+    return SyncPlanner(300, clock=clock, **kwargs)
+
+
+class TestSyncPlanner:
+    def test_new_participants_are_staggered(self):
+        clock = _Clock()
+        planner = _planner(clock)
+        planner.set_participants(["a", "b", "c"])
+        assert [planner.get(p).due - clock.now for p in "abc"] == [0, 100, 200]
+
+        order = []
+        for step in (0, 100, 200):
+            clock.now = 1000 + step
+            plan = planner.pop_due()
+            order.append(plan.participant_id)
+            assert planner.pop_due() is None  # the next one is not due yet
+        assert order == ["a", "b", "c"]
+        assert planner.next_due() is None  # all running
+
+    def test_membership_changes(self):
+        clock = _Clock()
+        planner = _planner(clock)
+        planner.set_participants(["a", "b"])
+        planner.set_participants(["b", "c"])
+        assert len(planner) == 2 and planner.get("a") is None
+        # "b" keeps its slot, "c" is added due now
+        assert planner.get("b").due == 1150 and planner.get("c").due == 1000
+        assert planner.pop_due().participant_id == "c"
+        assert planner.complete("gone", new_readings=0) is None
+
+    def test_interval_follows_device_lag(self):
+        clock = _Clock()
+        planner = _planner(clock)
+        planner.set_participants(["a"])
+        planner.pop_due()
+        clock.now += 10
+        assert planner.complete("a", new_readings=5) == 300
+
+        # No new data for two hours → poll every lag × 0.5 = one hour (the cap)
+        clock.now += 7200
+        planner.pop_due()
+        assert planner.complete("a", new_readings=0) == 3600
+        # Fresh data brings it straight back to the base interval
+        clock.now += 3600
+        planner.pop_due()
+        assert planner.complete("a", new_readings=1) == 300
+
+    def test_device_lag_follows_newest_uploaded_reading(self):
+        clock = _Clock()
+        planner = _planner(clock)
+        planner.set_participants(["a"])
+        planner.pop_due()
+        planner.complete("a", new_readings=60, newest_data=datetime(2026, 1, 5, 8, 0))
+
+        # New zero-filled minutes keep arriving, but the device has not
+        # uploaded: the newest non-zero reading stays put, so lag grows.
+        clock.now += 7200
+        planner.pop_due()
+        assert planner.complete(
+            "a", new_readings=120, newest_data=datetime(2026, 1, 5, 8, 0)
+        ) == 3600
+        clock.now += 3600
+        planner.pop_due()
+        assert planner.complete(
+            "a", new_readings=3, newest_data=datetime(2026, 1, 5, 11, 0)
+        ) == 300
+
+    def test_failures_back_off_and_low_budget_stretches(self):
+        clock = _Clock()
+        planner = _planner(clock, max_interval=10_000)
+        planner.set_participants(["a"])
+        intervals = []
+        for _ in range(3):
+            planner.pop_due()
+            intervals.append(planner.complete("a", new_readings=0, failed=True))
+            clock.now = planner.get("a").due
+        assert intervals == [600, 1200, 2400]
+
+        planner.pop_due()
+        assert planner.complete("a", new_readings=1) == 300  # success resets
+        clock.now = planner.get("a").due
+        planner.pop_due()
+        # 5 % of the hourly quota left, low water 25 % → 5× the interval
+        assert planner.complete("a", new_readings=1, budget=0.05) == pytest.approx(1500)
+
+    def test_stats_report_lateness_and_queue_depth(self):
+        clock = _Clock()
+        planner = _planner(clock)
+        planner.set_participants(["a", "b", "c"])
+        clock.now += 250  # everyone is due
+        stats = planner.stats()
+        assert stats["scheduled"] == 3 and stats["queue_depth"] == 3
+
+        planner.pop_due()
+        stats = planner.stats()
+        assert stats["queue_depth"] == 2 and stats["in_flight"] == 1
+        assert stats["max_lateness_seconds"] == 250
+        row = stats["participants"][0]
+        assert row["participant_id"] == "a" and row["running"]
+        assert row["lateness_seconds"] == 250
+
+    def test_expedite_keeps_regular_schedule(self):
+        clock = _Clock()
+        planner = _planner(clock)
+        planner.set_participants(["a", "b"])
+        planner.pop_due()
+        planner.complete("a", new_readings=1)  # regular poll at 1300
+
+        clock.now = 1050
+        planner.expedite("a")
+        plan = planner.pop_due()
+        assert plan.participant_id == "a" and plan.targeted
+        clock.now = 1052
+        planner.complete("a", new_readings=3)
+        assert planner.get("a").due == 1300 and not planner.get("a").targeted
+
+        # Expedited while running → runs again (targeted) right after
+        clock.now = 1150
+        assert planner.pop_due().participant_id == "b"
+        planner.expedite("b")
+        planner.complete("b", new_readings=1)
+        plan = planner.pop_due()
+        assert plan.participant_id == "b" and plan.targeted
+        planner.complete("b", new_readings=0)
+        assert planner.get("b").due == 1450
+
+        assert not planner.expedite("new")  # untracked participants are ignored
+        assert planner.get("new") is None and planner.pop_due() is None
+
+        planner.remove("b")
+        assert planner.get("b") is None and not planner.expedite("b")
+
+
+class TestSchedulerLoop:
+    async def test_dispatches_participants_staggered(self, monkeypatch):
+        service = SchedulerService(interval_minutes=0.005, max_concurrent=2)  # 0.3 s
+        started: dict[str, float] = {}
+
+        async def list_all(active_only: bool = False):
+            return [SimpleNamespace(participant_id=p) for p in ("p1", "p2", "p3")]
+
+        async def sync(participant_id: str, metrics=None):
+            started.setdefault(participant_id, time.monotonic())
+            return 1, 0
+
+        monkeypatch.setattr(service._participant_repo, "list_all", list_all)
+        monkeypatch.setattr(service, "_sync_participant", sync)
+        monkeypatch.setattr(service._tokens, "start", lambda: None)  # no token DB here
+
+        t0 = time.monotonic()
+        await service.start()
+        await asyncio.sleep(0.25)
+        await service.stop()
+
+        offsets = [started[p] - t0 for p in ("p1", "p2", "p3")]
+        assert offsets == sorted(offsets)
+        assert offsets[0] < 0.05
+        assert 0.08 < offsets[1] < 0.15 and 0.18 < offsets[2] < 0.25
+        stats = service.stats
+        assert stats["syncs_completed"] == 3 and stats["readings_total"] == 3
+        assert stats["active_syncs"] == 0
+        assert stats["queue"]["scheduled"] == 3
+        assert stats["queue"]["max_lateness_seconds"] < 0.05
+
+    async def test_enqueue_wakes_loop_for_targeted_sync(self, monkeypatch):
+        service = SchedulerService(interval_minutes=1, max_concurrent=2)
+        calls: list[tuple[str, list[MetricType] | None]] = []
+
+        async def list_all(active_only: bool = False):
+            return [SimpleNamespace(participant_id="p1")]
+
+        async def sync(participant_id: str, metrics=None):
+            calls.append((participant_id, metrics))
+            return 1, 0
+
+        monkeypatch.setattr(service._participant_repo, "list_all", list_all)
+        monkeypatch.setattr(service, "_sync_participant", sync)
+        monkeypatch.setattr(service._tokens, "start", lambda: None)
+
+        await service.start()
+        await asyncio.sleep(0.05)  # p1's first (full) sync; next one in 60 s
+        service.enqueue("p1", [MetricType.SLEEP])
+        service.enqueue("p1", [MetricType.BODY_WEIGHT])
+        await asyncio.sleep(0.05)
+        await service.stop()
+
+        assert calls == [
+            ("p1", None),
+            ("p1", [MetricType.SLEEP, MetricType.BODY_WEIGHT]),
+        ]
+        assert service.stats["targeted_syncs"] == 1
+        assert service.stats["queue"]["participants"][0]["due_in_seconds"] > 55
+
+    async def test_sync_all_expedites_through_the_planner(self, monkeypatch):
+        service = SchedulerService(interval_minutes=1, max_concurrent=2)
+        calls: list[tuple[str, list[MetricType] | None]] = []
+        release = asyncio.Event()
+
+        async def list_all(active_only: bool = False):
+            return [SimpleNamespace(participant_id=p) for p in ("p1", "p2")]
+
+        async def sync(participant_id: str, metrics=None):
+            calls.append((participant_id, metrics))
+            if participant_id == "p2":
+                await release.wait()
+            return 1, 0
+
+        monkeypatch.setattr(service._participant_repo, "list_all", list_all)
+        monkeypatch.setattr(service, "_sync_participant", sync)
+        monkeypatch.setattr(service._tokens, "start", lambda: None)
+
+        await service.start()
+        await asyncio.sleep(0.05)  # p1 synced; p2's first sync (staggered 30 s) not yet due
+        result = await service.trigger_sync_all()
+        assert result["status"] == "queued" and result["participants"] == 2
+        await asyncio.sleep(0.05)
+        # p2 is still running: a second sync-all queues it again, never twice at once
+        await service.trigger_sync_all()
+        await asyncio.sleep(0.05)
+        assert calls == [("p1", None), ("p1", None), ("p2", None), ("p1", None)]
+        release.set()
+        await asyncio.sleep(0.05)
+        await service.stop()
+
+        assert calls[4:] == [("p2", None)]
+        assert service.stats["syncs_completed"] == 5
+
+    async def test_revoked_participant_is_not_rescheduled(self, monkeypatch):
+        linked = {"p1", "p2"}
+
+        class _Linked:
+            stats: dict = {}
+
+            async def get(self, participant_id):
+                return FitbitToken("a0", "r0") if participant_id in linked else None
+
+            def start(self):
+                pass
+
+            async def stop(self):
+                pass
+
+        service = SchedulerService(interval_minutes=0.001, token_manager=_Linked())
+        calls: list[str] = []
+
+        async def list_all(active_only: bool = False):
+            return [SimpleNamespace(participant_id=p) for p in ("p1", "p2")]
+
+        async def sync(participant_id: str, metrics=None):
+            calls.append(participant_id)
+            return 0, 0
+
+        monkeypatch.setattr(service._participant_repo, "list_all", list_all)
+        monkeypatch.setattr(service, "_sync_participant", sync)
+
+        linked.discard("p2")
+        service.forget("p2")
+        service.enqueue("p2", [MetricType.SLEEP])
+        await service.start()
+        await asyncio.sleep(0.2)  # several reloads (every 0.06 s)
+        assert "p2" not in calls and "p1" in calls
+
+        linked.add("p2")  # linked again → back on the next reload
+        await asyncio.sleep(0.2)
+        await service.stop()
+        assert "p2" in calls
+
+
+class _Tokens:
+    """Token manager stand-in: everyone has a valid token."""
+
+    stats: dict = {}
+
+    async def get(self, participant_id: str) -> FitbitToken:
+        return FitbitToken("a0", "r0")
+
+
+class _Pipeline:
+    def __init__(self):
+        self.published: list[SensorReading] = []
+
+    async def publish_batch(self, readings):
+        self.published.extend(readings)
+
+
+class TestSyncPersistence:
+    @pytest.fixture
+    async def factory(self, tmp_path, monkeypatch):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'sync.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        factory = async_sessionmaker(engine, expire_on_commit=False)
+        monkeypatch.setattr(service_module, "get_session_factory", lambda: factory)
+        yield factory
+        await engine.dispose()
+
+    @staticmethod
+    def _service(monkeypatch, factory, values: list[float]) -> SchedulerService:
+        async def fetch_since(self, participant_id, metrics, cursors):
+            return [
+                SensorReading(
+                    participant_id=participant_id,
+                    device_type=DeviceType.FITBIT,
+                    metric_type=MetricType.STEPS,
+                    value=value,
+                    timestamp=datetime(2026, 1, 5, 8, i),
+                    metadata={"source": "live"},
+                )
+                for i, value in enumerate(values)
+            ]
+
+        async def update_last_sync(participant_id, when):
+            return None
+
+        monkeypatch.setattr(service_module.FitbitCollector, "fetch_since", fetch_since)
+        service = SchedulerService(pipeline=_Pipeline(), token_manager=_Tokens())
+        monkeypatch.setattr(service._participant_repo, "update_last_sync", update_last_sync)
+        return service
+
+    async def test_cursor_advances_with_committed_readings_only(self, factory, monkeypatch):
+        service = self._service(monkeypatch, factory, [5.0, 0.0])
+
+        async def broken_upsert(self, readings, *, commit=True):
+            raise RuntimeError("disk full")
+
+        with monkeypatch.context() as m:
+            m.setattr(ReadingRepository, "upsert_changed", broken_upsert)
+            assert await service._sync_participant("P1") == (0, 1)
+        async with factory() as session:
+            assert await SyncCursorRepository(session).get_all("P1") == {}
+        assert service._pipeline.published == []
+
+        assert await service._sync_participant("P1") == (2, 0)
+        async with factory() as session:
+            cursors = await SyncCursorRepository(session).get_all("P1")
+            assert await ReadingRepository(session).count_for_participant("P1") == 2
+        # The zero-filled 08:01 minute is not real data yet: the cursor stays at 08:00.
+        assert cursors == {MetricType.STEPS: datetime(2026, 1, 5, 8, 0)}
+        # … and it is the planner's device-lag signal too
+        assert service._newest_data == {"P1": datetime(2026, 1, 5, 8, 0)}
+
+    async def test_only_new_or_revised_readings_are_published(self, factory, monkeypatch):
+        service = self._service(monkeypatch, factory, [0.0, 5.0])
+        await service._sync_participant("P1")
+        assert await service._sync_participant("P1") == (0, 0)  # same data again
+
+        # The device uploaded: the zero-filled minute got its real value.
+        service = self._service(monkeypatch, factory, [12.0, 5.0])
+        assert await service._sync_participant("P1") == (1, 0)
+        assert [r.value for r in service._pipeline.published] == [12.0]
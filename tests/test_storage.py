@@ -0,0 +1,380 @@
+"""Tests for the storage layer (repositories against a scratch SQLite file)."""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from wearable_agent.config import Settings
+from wearable_agent.models import DeviceType, MetricType, SensorReading, reading_id
+from wearable_agent.storage.database import Base, build_engine, run_migrations
+from wearable_agent.storage.repository import (
+    ReadingRepository,
+    SyncCursorRepository,
+    _count_stmt,
+    _latest_stmt,
+    _range_stmt,
+)
+
+_COMPOSITE_INDEX = "ix_sensor_readings_participant_metric_ts"
+
+
+@pytest.fixture
+async def session(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with factory() as s:
+        yield s
+    await engine.dispose()
+
+
+def _readings(
+    n: int, participant_id: str = "P001", source: str = "dataset"
+) -> list[SensorReading]:
+    start = datetime(2026, 1, 1)
+    return [
+        SensorReading(
+            participant_id=participant_id,
+            device_type=DeviceType.FITBIT,
+            metric_type=MetricType.HEART_RATE,
+            value=float(60 + i),
+            unit="bpm",
+            timestamp=start + timedelta(minutes=i),
+            metadata={"source": source},
+        )
+        for i in range(n)
+    ]
+
+
+class TestSaveBatch:
+    async def test_inserts_readings(self, session):
+        repo = ReadingRepository(session)
+        assert await repo.save_batch(_readings(25)) == 25
+        assert await repo.count_for_participant("P001") == 25
+
+        rows = await repo.get_latest("P001", MetricType.HEART_RATE, limit=1)
+        assert rows[0].value == 84.0
+        assert json.loads(rows[0].metadata_json) == {"source": "dataset"}
+
+    async def test_ids_are_deterministic(self, session):
+        repo = ReadingRepository(session)
+        first, again = _readings(5), _readings(5)
+        assert [r.id for r in first] == [r.id for r in again]
+        await repo.save_batch(first)
+        assert await repo.save_batch(again) == 0
+        assert await repo.count_for_participant("P001") == 5
+
+    async def test_upsert_batch_updates_changed_rows_only(self, session):
+        repo = ReadingRepository(session)
+        assert await repo.upsert_batch(_readings(5)) == 5
+
+        revised = _readings(6)
+        revised[2].value = 100.0
+        assert await repo.upsert_batch(revised) == 2  # one update, one insert
+        assert await repo.count_for_participant("P001") == 6
+        rows = await repo.get_range(
+            "P001", MetricType.HEART_RATE, datetime(2026, 1, 1), datetime(2026, 1, 2)
+        )
+        assert [r.value for r in rows] == [60.0, 61.0, 100.0, 63.0, 64.0, 65.0]
+
+    async def test_duplicate_ids_are_ignored(self, session):
+        repo = ReadingRepository(session)
+        readings = _readings(10)
+        await repo.save_batch(readings[:6])
+        inserted = await repo.save_batch(readings)
+        assert inserted == 4
+        assert await repo.count_for_participant("P001") == 10
+
+    async def test_accepts_column_tuples(self, session):
+        repo = ReadingRepository(session)
+        ts = datetime(2026, 2, 1, 8, 0)
+        rows = [
+            ("t-1", "P002", "fitbit", "steps", 120.0, "steps", ts,
+             '{"source": "dataset"}', "dataset"),
+            ("t-2", "P002", "fitbit", "steps", 80.0, "steps", ts + timedelta(hours=1), "{}", ""),
+        ]
+        mixed = rows + _readings(1, participant_id="P002")
+        assert await repo.save_batch(mixed) == 3
+
+        latest = await repo.get_latest("P002", MetricType.STEPS, limit=5)
+        assert [r.id for r in latest] == ["t-2", "t-1"]
+
+    async def test_empty_batch(self, session):
+        assert await ReadingRepository(session).save_batch([]) == 0
+
+
+class TestSourceColumn:
+    async def test_source_promoted_from_metadata(self, session):
+        repo = ReadingRepository(session)
+        await repo.save_batch(_readings(5, source="dataset"))
+        live = _readings(3, source="live")
+        await repo.save(live[0])
+        await repo.save_batch(live[1:])
+
+        rows = await repo.get_latest_by_source("P001", MetricType.HEART_RATE, "live", limit=10)
+        assert len(rows) == 3
+        assert {r.source for r in rows} == {"live"}
+        dataset = await repo.get_latest_by_source(
+            "P001", MetricType.HEART_RATE, "dataset", limit=10
+        )
+        assert len(dataset) == 5
+
+    async def test_source_filter_uses_index(self, session):
+        await ReadingRepository(session).save_batch(_readings(20))
+        plan = await _query_plan(session, _latest_stmt("P001", "heart_rate", 10, source="live"))
+        assert "USING INDEX ix_sensor_readings_participant_metric_source_ts" in plan
+        assert "SCAN" not in plan
+        assert "TEMP B-TREE" not in plan
+
+
+async def _query_plan(session, stmt) -> str:
+    """Return SQLite's EXPLAIN QUERY PLAN detail lines for *stmt*, joined."""
+    compiled = stmt.compile(dialect=session.get_bind().dialect)
+    params = tuple(
+        str(v) if isinstance(v, datetime) else v
+        for v in (compiled.params[k] for k in compiled.positiontup)
+    )
+    conn = await session.connection()
+    result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params)
+    return "\n".join(row[-1] for row in result)
+
+
+class TestReadingIndexes:
+    async def test_latest_uses_composite_index(self, session):
+        await ReadingRepository(session).save_batch(_readings(50))
+        plan = await _query_plan(session, _latest_stmt("P001", "heart_rate", 10))
+        assert f"SEARCH sensor_readings USING INDEX {_COMPOSITE_INDEX}" in plan
+        assert "SCAN" not in plan
+        assert "TEMP B-TREE" not in plan
+
+    async def test_range_uses_composite_index(self, session):
+        await ReadingRepository(session).save_batch(_readings(50))
+        start = datetime(2026, 1, 1, 0, 10)
+        plan = await _query_plan(
+            session, _range_stmt("P001", "heart_rate", start, start + timedelta(minutes=20))
+        )
+        assert f"USING INDEX {_COMPOSITE_INDEX}" in plan
+        assert "timestamp>? AND timestamp<?" in plan
+        assert "SCAN" not in plan
+        assert "TEMP B-TREE" not in plan
+
+    async def test_count_is_covered_by_index(self, session):
+        plan = await _query_plan(session, _count_stmt("P001"))
+        # Either participant-prefixed composite index covers the count.
+        assert "SEARCH sensor_readings USING COVERING INDEX" in plan
+        assert "(participant_id=?)" in plan
+
+
+class TestMigrations:
+    async def test_fresh_database_is_created_and_stamped(self, tmp_path):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'fresh.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(run_migrations)
+            await conn.run_sync(run_migrations)  # idempotent
+            version = (await conn.execute(text("SELECT version_num FROM alembic_version"))).scalar()
+            indexes = await conn.run_sync(
+                lambda c: {i["name"] for i in inspect(c).get_indexes("sensor_readings")}
+            )
+        await engine.dispose()
+        assert version is not None
+        assert _COMPOSITE_INDEX in indexes
+
+    async def test_legacy_database_is_upgraded(self, tmp_path):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'legacy.db'}")
+        async with engine.begin() as conn:
+            # Pre-migration schema: single-column indexes, no alembic_version.
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(text(f"DROP INDEX {_COMPOSITE_INDEX}"))
+            await conn.execute(text(
+                "CREATE INDEX ix_sensor_readings_participant_id ON sensor_readings (participant_id)"
+            ))
+            await conn.execute(text(
+                "CREATE INDEX ix_sensor_readings_metric_type ON sensor_readings (metric_type)"
+            ))
+            # … and no source column: the data source lives only in metadata_json.
+            await conn.execute(text("DROP INDEX ix_sensor_readings_participant_metric_source_ts"))
+            await conn.execute(text("ALTER TABLE sensor_readings DROP COLUMN source"))
+            await conn.execute(text(
+                "INSERT INTO sensor_readings "
+                "(id, participant_id, device_type, metric_type, value, unit, timestamp, "
+                "metadata_json) VALUES "
+                "('a', 'P1', 'fitbit', 'heart_rate', 60, 'bpm', '2026-01-01 00:00:00', "
+                "'{\"source\": \"live\"}'), "
+                "('b', 'P1', 'fitbit', 'heart_rate', 61, 'bpm', '2026-01-01 00:01:00', '{}'), "
+                "('c', 'P1', 'fitbit', 'heart_rate', 62, 'bpm', '2026-01-01 00:02:00', 'oops')"
+            ))
+            await conn.run_sync(run_migrations)
+            sources = dict((await conn.execute(
+                text("SELECT id, source FROM sensor_readings ORDER BY id")
+            )).all())
+            indexes = await conn.run_sync(
+                lambda c: {i["name"] for i in inspect(c).get_indexes("sensor_readings")}
+            )
+        await engine.dispose()
+        assert _COMPOSITE_INDEX in indexes
+        assert "ix_sensor_readings_participant_id" not in indexes
+        assert "ix_sensor_readings_metric_type" not in indexes
+        assert "ix_sensor_readings_participant_metric_source_ts" in indexes
+        # Ids are re-keyed to the deterministic natural-key form (0007).
+        assert sources == {
+            reading_id("P1", "heart_rate", datetime(2026, 1, 1, 0, 0), "live"): "live",
+            reading_id("P1", "heart_rate", datetime(2026, 1, 1, 0, 1)): "",
+            reading_id("P1", "heart_rate", datetime(2026, 1, 1, 0, 2)): "",
+        }
+
+    async def test_duplicate_readings_are_collapsed(self, tmp_path):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'dupes.db'}")
+        async with engine.begin() as conn:
+            # Pre-0004 SQLite layout: id-only primary key, random ids.
+            await conn.execute(text(
+                "CREATE TABLE sensor_readings (id VARCHAR(36) PRIMARY KEY, "
+                "participant_id VARCHAR(128), device_type VARCHAR(32), metric_type VARCHAR(32), "
+                "value FLOAT, unit VARCHAR(16), timestamp DATETIME, metadata_json TEXT, "
+                "created_at DATETIME)"
+            ))
+            await conn.execute(text(
+                "INSERT INTO sensor_readings VALUES "
+                "('u1', 'P1', 'fitbit', 'heart_rate', 60, 'bpm', '2026-01-01 00:00:00.000000', "
+                "'{\"source\": \"live\"}', '2026-01-02 00:00:00'), "
+                "('u2', 'P1', 'fitbit', 'heart_rate', 99, 'bpm', '2026-01-01 00:00:00.000000', "
+                "'{\"source\": \"live\"}', '2026-01-03 00:00:00'), "
+                "('u3', 'P1', 'fitbit', 'heart_rate', 55, 'bpm', '2026-01-01 00:00:00.000000', "
+                "'{\"source\": \"live\", \"type\": \"resting\"}', '2026-01-03 00:00:00')"
+            ))
+            await conn.run_sync(run_migrations)
+            rows = dict((await conn.execute(
+                text("SELECT id, value FROM sensor_readings")
+            )).all())
+            indexes = await conn.run_sync(
+                lambda c: {i["name"] for i in inspect(c).get_indexes("sensor_readings")}
+            )
+        await engine.dispose()
+        ts = datetime(2026, 1, 1)
+        # The latest write of the intraday reading wins; the resting one differs by type.
+        assert rows == {
+            reading_id("P1", "heart_rate", ts, "live"): 99.0,
+            reading_id("P1", "heart_rate", ts, "live", "resting"): 55.0,
+        }
+        assert "uq_sensor_readings_id_timestamp" in indexes
+
+    async def test_rekey_chunks_never_split_a_timestamp(self, tmp_path, monkeypatch):
+        versions = Path(run_migrations.__code__.co_filename).parent / "migrations" / "versions"
+        path = next(versions.glob("0007_*.py"))
+        spec = importlib.util.spec_from_file_location("rekey_0007", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        monkeypatch.setattr(module, "_CHUNK", 2)
+
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'chunks.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(text(
+                "INSERT INTO sensor_readings "
+                "(id, participant_id, device_type, metric_type, value, unit, timestamp, "
+                "metadata_json, source, created_at) VALUES "
+                "('a', 'P1', 'fitbit', 'heart_rate', 60, 'bpm', '2026-01-01 00:00:00', "
+                "'{}', 'live', '2026-01-02 00:00:00'), "
+                "('b1', 'P1', 'fitbit', 'heart_rate', 61, 'bpm', '2026-01-01 00:01:00', "
+                "'{}', 'live', '2026-01-02 00:00:00'), "
+                "('b2', 'P1', 'fitbit', 'heart_rate', 62, 'bpm', '2026-01-01 00:01:00', "
+                "'{}', 'live', '2026-01-04 00:00:00'), "
+                "('b3', 'P1', 'fitbit', 'heart_rate', 63, 'bpm', '2026-01-01 00:01:00', "
+                "'{}', 'live', '2026-01-03 00:00:00'), "
+                "('c', 'P1', 'fitbit', 'heart_rate', 64, 'bpm', '2026-01-01 00:02:00', "
+                "'{}', 'live', '2026-01-02 00:00:00')"
+            ))
+            chunks = await conn.run_sync(
+                lambda c: [[r.id for r in rows] for rows in module._chunks(c, "P1", "heart_rate")]
+            )
+        await engine.dispose()
+        assert chunks == [["a", "b2", "b3", "b1"], ["c"]]
+
+    async def test_legacy_daily_totals_are_keyed_as_daily(self, tmp_path):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'daily.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(text("DROP INDEX ix_sensor_readings_participant_metric_source_ts"))
+            await conn.execute(text("ALTER TABLE sensor_readings DROP COLUMN source"))
+            await conn.execute(text(
+                "INSERT INTO sensor_readings "
+                "(id, participant_id, device_type, metric_type, value, unit, timestamp, "
+                "metadata_json) VALUES "
+                "('d', 'P1', 'fitbit', 'steps', 8123, 'steps', '2026-01-01 00:00:00', "
+                "'{\"source\": \"live\"}'), "
+                "('h', 'P1', 'fitbit', 'heart_rate', 60, 'bpm', '2026-01-01 00:00:00', "
+                "'{\"source\": \"live\"}')"
+            ))
+            await conn.run_sync(run_migrations)
+            rows = {
+                row.metric_type: row for row in (await conn.execute(
+                    text("SELECT id, metric_type, metadata_json FROM sensor_readings")
+                )).all()
+            }
+        await engine.dispose()
+        ts = datetime(2026, 1, 1)
+        # Old syncs stored only daily totals of steps; heart rate minutes stay untyped.
+        assert rows["steps"].id == reading_id("P1", "steps", ts, "live", "daily")
+        assert json.loads(rows["steps"].metadata_json) == {"source": "live", "type": "daily"}
+        assert rows["heart_rate"].id == reading_id("P1", "heart_rate", ts, "live")
+
+
+class TestEngineProfile:
+    async def test_sqlite_pragmas_applied_on_connect(self, tmp_path):
+        engine = build_engine(Settings(), url=f"sqlite+aiosqlite:///{tmp_path / 'tuned.db'}")
+        async with engine.connect() as conn:
+            pragmas = {
+                name: (await conn.execute(text(f"PRAGMA {name}"))).scalar()
+                for name in ("journal_mode", "synchronous", "temp_store", "busy_timeout")
+            }
+        await engine.dispose()
+        # synchronous: 1 = NORMAL; temp_store: 2 = MEMORY
+        assert pragmas == {
+            "journal_mode": "wal", "synchronous": 1, "temp_store": 2, "busy_timeout": 5000,
+        }
+
+    async def test_profile_is_configurable(self, tmp_path):
+        settings = Settings(
+            sqlite_journal_mode="delete", sqlite_synchronous="full", db_pool_size=2
+        )
+        engine = build_engine(settings, url=f"sqlite+aiosqlite:///{tmp_path / 'plain.db'}")
+        async with engine.connect() as conn:
+            mode = (await conn.execute(text("PRAGMA journal_mode"))).scalar()
+            sync = (await conn.execute(text("PRAGMA synchronous"))).scalar()
+        assert engine.pool.size() == 2
+        await engine.dispose()
+        assert (mode, sync) == ("delete", 2)
+
+
+class TestSyncCursors:
+    async def test_advance_keeps_newest_per_metric(self, session):
+        repo = SyncCursorRepository(session)
+        assert await repo.get_all("P001") == {}
+
+        assert await repo.advance("P001", _readings(10)) == 1
+        assert await repo.get_all("P001") == {MetricType.HEART_RATE: datetime(2026, 1, 1, 0, 9)}
+
+        # Older readings never move a cursor back; other participants are ignored.
+        assert await repo.advance("P001", _readings(3) + _readings(20, "P002")) == 0
+        assert await repo.get_all("P001") == {MetricType.HEART_RATE: datetime(2026, 1, 1, 0, 9)}
+
+        # Aware timestamps are converted to UTC, not just stripped of their zone.
+        local = SensorReading(
+            participant_id="P001",
+            device_type=DeviceType.FITBIT,
+            metric_type=MetricType.HEART_RATE,
+            value=70.0,
+            timestamp=datetime(2026, 1, 1, 3, 0, tzinfo=timezone(timedelta(hours=2))),
+        )
+        assert await repo.advance("P001", [local]) == 1
+        assert await repo.get_all("P001") == {MetricType.HEART_RATE: datetime(2026, 1, 1, 1, 0)}
+
+        assert await repo.delete("P001") == 1
+        assert await repo.get_all("P001") == {}
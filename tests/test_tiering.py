@@ -0,0 +1,124 @@
+"""Tests for the Parquet cold-storage tier."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+pytest.importorskip("pyarrow")
+
+from wearable_agent.models import DeviceType, MetricType, SensorReading  # noqa: E402
+from wearable_agent.storage.database import Base  # noqa: E402
+from wearable_agent.storage.repository import ReadingRepository  # noqa: E402
+from wearable_agent.storage.tiering import ColdStorageTiering, ColdStore  # noqa: E402
+
+_START = datetime(2026, 1, 30, 12, 0)
+
+
+@pytest.fixture
+async def factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ColdStore(tmp_path / "cold")
+
+
+def _daily(days: int, participant_id: str = "P001") -> list[SensorReading]:
+    """One reading per day from 30 Jan 2026: spans Jan, Feb and March."""
+    return [
+        SensorReading(
+            participant_id=participant_id,
+            device_type=DeviceType.FITBIT,
+            metric_type=MetricType.HEART_RATE,
+            value=float(i),
+            unit="bpm",
+            timestamp=_START + timedelta(days=i),
+            metadata={"source": "dataset"},
+        )
+        for i in range(days)
+    ]
+
+
+async def _compact(factory, store, now: datetime) -> dict[str, int]:
+    tiering = ColdStorageTiering(store, after_days=0, session_factory=factory)
+    return await tiering.compact(now=now)
+
+
+class TestColdStorageTiering:
+    async def test_compacts_complete_months_and_unions_reads(self, factory, store):
+        readings = _daily(40)  # 30 Jan … 10 Mar
+        async with factory() as s:
+            await ReadingRepository(s, cold_store=store).save_batch(readings)
+
+        # Cutoff is 1 March: January and February move to Parquet.
+        result = await _compact(factory, store, now=datetime(2026, 3, 15))
+        assert result == {"months": 2, "rows": 30}
+        assert store.months("P001", "heart_rate") == [
+            datetime(2026, 1, 1).date(),
+            datetime(2026, 2, 1).date(),
+        ]
+        assert store.month_path("P001", "heart_rate", datetime(2026, 2, 1).date()).exists()
+
+        async with factory() as s:
+            repo = ReadingRepository(s, cold_store=store)
+            assert await repo.count_for_participant("P001") == 10  # hot rows only
+            rows = await repo.get_range(
+                "P001", MetricType.HEART_RATE, _START, _START + timedelta(days=60)
+            )
+            assert [r.value for r in rows] == [float(i) for i in range(40)]
+            assert rows[0].timestamp == _START
+            assert rows[0].source == "dataset"
+
+            # A window entirely inside the cold tier, with month-boundary filtering
+            rows = await repo.get_range(
+                "P001", MetricType.HEART_RATE,
+                datetime(2026, 2, 27), datetime(2026, 3, 2, 23, 59),
+            )
+            assert [r.timestamp.day for r in rows] == [27, 28, 1, 2]
+
+    async def test_rerun_is_idempotent_and_merges_late_rows(self, factory, store):
+        async with factory() as s:
+            await ReadingRepository(s, cold_store=store).save_batch(_daily(10))
+        await _compact(factory, store, now=datetime(2026, 3, 15))
+        assert await _compact(factory, store, now=datetime(2026, 3, 15)) == {
+            "months": 0, "rows": 0,
+        }
+
+        # A late-arriving February reading is merged into the existing file.
+        late = SensorReading(
+            participant_id="P001",
+            device_type=DeviceType.FITBIT,
+            metric_type=MetricType.HEART_RATE,
+            value=99.0,
+            timestamp=datetime(2026, 2, 3, 1, 0),
+        )
+        async with factory() as s:
+            await ReadingRepository(s, cold_store=store).save_batch([late])
+        await _compact(factory, store, now=datetime(2026, 3, 15))
+
+        async with factory() as s:
+            repo = ReadingRepository(s, cold_store=store)
+            rows = await repo.get_range(
+                "P001", MetricType.HEART_RATE, datetime(2026, 1, 1), datetime(2026, 3, 1)
+            )
+            assert len(rows) == 11
+            assert 99.0 in [r.value for r in rows]
+            assert await repo.count_for_participant("P001") == 0
+
+    async def test_delete_participant_removes_cold_files(self, factory, store):
+        async with factory() as s:
+            await ReadingRepository(s, cold_store=store).save_batch(_daily(5))
+        await _compact(factory, store, now=datetime(2026, 4, 1))
+        assert store.months("P001", "heart_rate")
+
+        async with factory() as s:
+            await ReadingRepository(s, cold_store=store).delete_for_participant("P001")
+        assert store.months("P001", "heart_rate") == []